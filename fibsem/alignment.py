@@ -1,9 +1,13 @@
+import atexit
 import logging
 import os
+import queue
+import threading
 import time
 from typing import Optional, Tuple, Union
 
 import numpy as np
+import scipy.fft as sfft
 
 from fibsem import acquire, utils, validation
 from fibsem.config import REFERENCE_FILENAME
@@ -23,6 +27,9 @@ from threading import Event as ThreadingEvent
 
 ALIGNMENT_SUBDIR = "Alignment"
 
+# cross-correlation parameters used for beam shift alignment
+BEAM_SHIFT_ALIGNMENT_PARAMETERS = {"lowpass": 50, "highpass": 4, "sigma": 5, "use_rect_mask": True}
+
 def auto_eucentric_correction(
     microscope: FibsemMicroscope,
     settings: MicroscopeSettings,
@@ -59,6 +66,8 @@ def beam_shift_alignment_v2(
     use_autocontrast: bool = False,
     use_autofocus: bool = False,
     subsystem: Optional[str] = None,
+    engine: Optional["CrossCorrelationEngine"] = None,
+    return_confidence: bool = False,
 ):
     """Aligns the images by adjusting the beam shift instead of moving the stage.
 
@@ -73,6 +82,10 @@ def beam_shift_alignment_v2(
         use_autocontrast (bool): Whether to use autocontrast for the new image. Defaults to False.
         subsystem (Optional[str]): The subsystem to use for alignment. Can be either "stage" or None.
             If "stage", the stage will be moved instead of adjusting the beam shift. Defaults to None.
+        engine (Optional[CrossCorrelationEngine]): A cross-correlation engine for the reference image, to reuse
+            when aligning to the same reference repeatedly. Defaults to None (created for this alignment).
+        return_confidence (bool): Whether to also return the confidence (peak-to-sidelobe ratio) of the shift.
+            Defaults to False.
 
     Raises:
         ValueError: If `image_settings.beam_type` is not set to `BeamType.ION`.
@@ -110,12 +123,11 @@ def beam_shift_alignment_v2(
         microscope.auto_focus(beam_type=image_settings.beam_type, reduced_area=image_settings.reduced_area)
 
     new_image = acquire.new_image(microscope, settings=image_settings)
-    dx, dy, xcorr = shift_from_crosscorrelation(
+    dx, dy, xcorr, confidence = shift_from_crosscorrelation(
         ref_image, new_image,
-        lowpass=50,
-        highpass=4,
-        sigma=5,
-        use_rect_mask=True
+        **BEAM_SHIFT_ALIGNMENT_PARAMETERS,
+        engine=engine,
+        return_confidence=True,
     )
 
     # adjust beamshift
@@ -135,10 +147,13 @@ def beam_shift_alignment_v2(
     # reset beam current
     if alignment_current is not None:
         microscope.set_beam_current(initial_current, image_settings.beam_type)
-    logging.info(f"Beam Shift Alignment: dx: {dx}, dy: {dy}")
-    msgd = {"msg": "beam_shift_alignment", "dx": dx, "dy": dy, "image_settings": image_settings.to_dict()}
+    logging.info(f"Beam Shift Alignment: dx: {dx}, dy: {dy}, confidence: {confidence:.2f}")
+    msgd = {"msg": "beam_shift_alignment", "dx": dx, "dy": dy, "confidence": confidence,
+            "image_settings": image_settings.to_dict()}
     logging.debug(msgd)
 
+    if return_confidence:
+        return new_image, xcorr, dx, dy, confidence
     return new_image, xcorr, dx, dy
 
 
@@ -311,7 +326,10 @@ def shift_from_crosscorrelation(
     use_rect_mask: bool = False,
     ref_mask: np.ndarray = None,
     xcorr_limit: int = None,
-) -> Tuple[float, float, np.ndarray]:
+    engine: Optional["CrossCorrelationEngine"] = None,
+    subpixel: bool = True,
+    return_confidence: bool = False,
+) -> Union[Tuple[float, float, np.ndarray], Tuple[float, float, np.ndarray, float]]:
     """Calculates the shift between two images by cross-correlating them and finding the position of maximum correlation.
 
     Args:
@@ -332,35 +350,31 @@ def shift_from_crosscorrelation(
         xcorr_limit (int, optional): If not None, the correlation map will be circularly masked to a square
             with sides of length 2 * xcorr_limit + 1, centred on the maximum correlation peak. This can be used to
             limit the search range and improve the accuracy of the shift. Defaults to None.
+        engine (CrossCorrelationEngine, optional): A cross-correlation engine for the reference image. The cached
+            reference spectrum is reused if the engine matches the reference image and parameters. Defaults to None.
+        subpixel (bool, optional): Whether to refine the correlation peak to sub-pixel precision (parabolic fit).
+            Defaults to True.
+        return_confidence (bool, optional): Whether to also return the peak-to-sidelobe ratio of the correlation
+            peak, as a confidence in the shift. Defaults to False.
 
     Returns:
         A tuple (x_shift, y_shift, xcorr), where x_shift and y_shift are the shifts along x and y (in meters),
-        and xcorr is the cross-correlation map between the images.
+        and xcorr is the cross-correlation map between the images. If return_confidence, the
+        peak-to-sidelobe ratio is appended: (x_shift, y_shift, xcorr, confidence).
     """
     # get pixel_size
     pixelsize_x = new_image.metadata.pixel_size.x
     pixelsize_y = new_image.metadata.pixel_size.y
 
-    # normalise both images
-    ref_data_norm = image_utils.normalise_image(ref_image)
-    new_data_norm = image_utils.normalise_image(new_image)
-
-    # cross-correlate normalised images
-    if use_rect_mask:
-        rect_mask = masks._mask_rectangular(new_data_norm.shape)
-        ref_data_norm = rect_mask * ref_data_norm
-        new_data_norm = rect_mask * new_data_norm
-
-    if ref_mask is not None:
-        ref_data_norm = ref_mask * ref_data_norm  # mask the reference
-
-    # bandpass mask
-    bandpass = masks.create_bandpass_mask(
-        shape=ref_data_norm.shape, lp=lowpass, hp=highpass, sigma=sigma
-    )
+    # reuse the reference spectrum (and bandpass mask) when aligning to the same reference
+    params = {"lowpass": lowpass, "highpass": highpass, "sigma": sigma,
+              "use_rect_mask": use_rect_mask, "ref_mask": ref_mask}
+    if engine is None or not engine.matches(ref_image, **params):
+        engine = CrossCorrelationEngine(ref_image, **params)
+    bandpass = engine.bandpass
 
     # crosscorrelation
-    xcorr = crosscorrelation_v2(ref_data_norm, new_data_norm, bandpass=bandpass)
+    xcorr = engine.correlate(new_image)
 
     # limit xcorr range
     if xcorr_limit:
@@ -368,15 +382,19 @@ def shift_from_crosscorrelation(
 
     # calculate maximum crosscorrelation
     maxX, maxY = np.unravel_index(np.argmax(xcorr), xcorr.shape)  # TODO: backwards
-    cen = np.asarray(xcorr.shape) / 2
-    err = np.array(cen - [maxX, maxY], int)
+    confidence = peak_to_sidelobe_ratio(xcorr, (maxX, maxY))
+    if subpixel:
+        maxX, maxY = refine_peak_subpixel(xcorr, (maxX, maxY))
+    cen = np.asarray(xcorr.shape) // 2  # zero lag of the fftshifted map, also for odd shapes
+    err = np.array(cen - [maxX, maxY], float if subpixel else int)
 
     # calculate shift in metres
-    dx = err[1] * pixelsize_x
-    dy = err[0] * pixelsize_y  # this could be the issue?
+    dx = float(err[1] * pixelsize_x)
+    dy = float(err[0] * pixelsize_y)  # this could be the issue?
 
     msgd = {"msg": "cross-correlation", "pixelsize": (pixelsize_x, pixelsize_y), 
-        "max": (maxX, maxY), "centre": cen, "shift": (err[1], err[0]), "shift_meters": (dx, dy)}
+        "max": (maxX, maxY), "centre": cen, "shift": (err[1], err[0]), "shift_meters": (dx, dy),
+        "confidence": confidence}
     logging.debug(msgd)
 
     # logging.debug(f"cross-correlation:")
@@ -401,17 +419,77 @@ def shift_from_crosscorrelation(
         dy=dy,
         pixelsize_x=pixelsize_x,
         pixelsize_y=pixelsize_y,
+        confidence=confidence,
     )
 
     # metres
+    if return_confidence:
+        return dx, dy, xcorr, confidence
     return dx, dy, xcorr
 
 
+def refine_peak_subpixel(xcorr: np.ndarray, peak: Tuple[int, int]) -> Tuple[float, float]:
+    """Refine the position of a correlation peak to sub-pixel precision, by fitting a parabola
+    through the peak and its neighbours along each axis.
+
+    Args:
+        xcorr (np.ndarray): The cross-correlation map.
+        peak (Tuple[int, int]): The (row, col) of the maximum of the cross-correlation map.
+
+    Returns:
+        Tuple[float, float]: The refined (row, col) of the peak.
+    """
+    refined = []
+    for axis, p in enumerate(peak):
+        p = int(p)
+        if p <= 0 or p >= xcorr.shape[axis] - 1:
+            refined.append(float(p))  # no neighbours on both sides
+            continue
+        idx = list(peak)
+        idx[axis] = p - 1
+        left = xcorr[tuple(idx)]
+        idx[axis] = p + 1
+        right = xcorr[tuple(idx)]
+        centre = xcorr[tuple(peak)]
+        denom = left - 2 * centre + right
+        offset = 0.5 * (left - right) / denom if denom < 0 else 0.0
+        refined.append(p + float(np.clip(offset, -0.5, 0.5)))
+    return refined[0], refined[1]
+
+
+def peak_to_sidelobe_ratio(xcorr: np.ndarray, peak: Tuple[int, int], exclude: int = 5) -> float:
+    """Calculate the peak-to-sidelobe ratio (PSR) of a correlation peak, as a confidence in the shift.
+    PSR = (peak - mean(sidelobe)) / std(sidelobe), where the sidelobe is the correlation map excluding
+    a window around the peak. A sharp, unique peak has a high PSR, an ambiguous match has a low PSR.
+
+    Args:
+        xcorr (np.ndarray): The cross-correlation map.
+        peak (Tuple[int, int]): The (row, col) of the maximum of the cross-correlation map.
+        exclude (int, optional): The half-width (pixels) of the window around the peak to exclude. Defaults to 5.
+
+    Returns:
+        float: The peak-to-sidelobe ratio.
+    """
+    py, px = int(peak[0]), int(peak[1])
+    window = xcorr[max(0, py - exclude):py + exclude + 1, max(0, px - exclude):px + exclude + 1]
+    n = xcorr.size - window.size
+    if n <= 1:
+        return 0.0
+    # sidelobe statistics from the totals, without copying the map
+    total, total_sq = np.sum(xcorr, dtype=np.float64), np.sum(np.square(xcorr, dtype=np.float64))
+    mean = (total - np.sum(window, dtype=np.float64)) / n
+    var = (total_sq - np.sum(np.square(window, dtype=np.float64))) / n - mean ** 2
+    if var <= 0:
+        return 0.0
+    return float((xcorr[py, px] - mean) / np.sqrt(var))
+
+
 def crosscorrelation_v2(
     img1: np.ndarray, img2: np.ndarray, bandpass: np.ndarray = None
 ) -> np.ndarray:
     """
     Cross-correlate two images using Fourier convolution matching.
+    Stacks of images (..., H, W) are cross-correlated pairwise in a single batched FFT.
 
     Args:
         img1 (np.ndarray): The reference image.
@@ -429,19 +507,20 @@ def crosscorrelation_v2(
         raise ValueError(err)
 
     if bandpass is None:
-        bandpass = np.ones_like(img1)
+        bandpass = np.ones(img1.shape[-2:])
 
-    n_pixels = img1.shape[0] * img1.shape[1]
+    n_pixels = img1.shape[-2] * img1.shape[-1]
+    axes = (-2, -1)
 
-    img1ft = np.fft.ifftshift(bandpass * np.fft.fftshift(np.fft.fft2(img1)))
+    img1ft = np.fft.ifftshift(bandpass * np.fft.fftshift(np.fft.fft2(img1), axes=axes), axes=axes)
     tmp = img1ft * np.conj(img1ft)
-    img1ft = n_pixels * img1ft / np.sqrt(tmp.sum())
+    img1ft = n_pixels * img1ft / np.sqrt(tmp.sum(axis=axes, keepdims=True))
 
-    img2ft = np.fft.ifftshift(bandpass * np.fft.fftshift(np.fft.fft2(img2)))
-    img2ft[0, 0] = 0
+    img2ft = np.fft.ifftshift(bandpass * np.fft.fftshift(np.fft.fft2(img2), axes=axes), axes=axes)
+    img2ft[..., 0, 0] = 0
     tmp = img2ft * np.conj(img2ft)
 
-    img2ft = n_pixels * img2ft / np.sqrt(tmp.sum())
+    img2ft = n_pixels * img2ft / np.sqrt(tmp.sum(axis=axes, keepdims=True))
 
     # import matplotlib.pyplot as plt
     # fig, ax = plt.subplots(1, 2, figsize=(15, 15))
@@ -453,10 +532,272 @@ def crosscorrelation_v2(
     # plt.imshow(np.log(np.abs(np.fft.fftshift(np.fft.fft2(img1)))))
     # plt.show()
 
-    xcorr = np.real(np.fft.fftshift(np.fft.ifft2(img1ft * np.conj(img2ft))))
+    xcorr = np.real(np.fft.fftshift(np.fft.ifft2(img1ft * np.conj(img2ft)), axes=axes))
 
     return xcorr
 
+
+class CrossCorrelationEngine:
+    """Cross-correlate images against a fixed reference image.
+
+    The bandpass mask and the (normalised, masked, bandpass filtered) reference spectrum are computed once, 
+    so each alignment to the same reference only requires the forward FFT of the new image and one inverse FFT.
+    Real-input FFTs (scipy.fft.rfft2) are used, which halves the size of the spectra. scipy caches the FFT plans
+    between calls, so repeated alignments of the same shape reuse the same plans. The result is equivalent to 
+    crosscorrelation_v2.
+
+    Args:
+        ref_image (FibsemImage): The reference image.
+        lowpass (int): The low-pass filter frequency (in pixels) for the bandpass filter.
+        highpass (int): The high-pass filter frequency (in pixels) for the bandpass filter.
+        sigma (int): The standard deviation (in pixels) of the Gaussian filter used to create the bandpass mask.
+        use_rect_mask (bool): Whether to apply a soft rectangular mask to both images.
+        ref_mask (np.ndarray, optional): A mask to apply to the reference image.
+        workers (int, optional): The number of workers for the FFTs (scipy.fft). Defaults to None (single worker).
+    """
+
+    def __init__(
+        self,
+        ref_image: FibsemImage,
+        lowpass: int = 128,
+        highpass: int = 6,
+        sigma: int = 6,
+        use_rect_mask: bool = False,
+        ref_mask: Optional[np.ndarray] = None,
+        workers: Optional[int] = None,
+    ):
+        self.ref_image = ref_image
+        self.lowpass = lowpass
+        self.highpass = highpass
+        self.sigma = sigma
+        self.use_rect_mask = use_rect_mask
+        self.ref_mask = ref_mask
+        self.workers = workers
+
+        self._ref_data = ref_image.data
+        self.shape: Tuple[int, int] = ref_image.data.shape[-2:]
+        h, w = self.shape
+
+        self.rect_mask = masks.get_rectangular_mask(self.shape) if use_rect_mask else None
+        self.bandpass = masks.get_bandpass_mask(self.shape, lp=lowpass, hp=highpass, sigma=sigma)
+
+        # bandpass in the unshifted, half-spectrum (rfft) layout. crosscorrelation_v2 takes the real part of the
+        # inverse FFT, which is equivalent to filtering with the symmetric part of the (squared) bandpass.
+        # (the bandpass is only asymmetric for odd image sizes)
+        bandpass_sq = np.fft.ifftshift(self.bandpass).astype(np.float64) ** 2
+        bandpass_sq_neg = np.roll(bandpass_sq[::-1, ::-1], shift=(1, 1), axis=(0, 1))  # B(-k)
+        bandpass_sym = np.sqrt((bandpass_sq + bandpass_sq_neg) / 2)
+        self._bandpass_rfft = bandpass_sym[:, : w // 2 + 1].astype(np.float32)
+
+        # weights to compute the full spectrum power from the half spectrum
+        self._weights = np.full(w // 2 + 1, 2.0, dtype=np.float32)
+        self._weights[0] = 1.0
+        if w % 2 == 0:
+            self._weights[-1] = 1.0
+
+        ref_data = self._preprocess(ref_image)
+        if ref_mask is not None:
+            ref_data = ref_mask * ref_data  # mask the reference
+        self._ref_ft = self._spectrum(ref_data, remove_dc=False)
+
+    def matches(
+        self,
+        ref_image: FibsemImage,
+        lowpass: int,
+        highpass: int,
+        sigma: int,
+        use_rect_mask: bool = False,
+        ref_mask: Optional[np.ndarray] = None,
+    ) -> bool:
+        """Check if the engine was created for this reference image (and data) and parameters."""
+        return (
+            ref_image is self.ref_image
+            and ref_image.data is self._ref_data
+            and ref_mask is self.ref_mask
+            and (lowpass, highpass, sigma, use_rect_mask)
+            == (self.lowpass, self.highpass, self.sigma, self.use_rect_mask)
+        )
+
+    def _preprocess(self, image: FibsemImage) -> np.ndarray:
+        """Normalise (and mask) the image."""
+        data = image_utils.normalise_image(image).astype(np.float32, copy=False)
+        if self.rect_mask is not None:
+            data = self.rect_mask.astype(np.float32) * data
+        return data
+
+    def _spectrum(self, data: np.ndarray, remove_dc: bool) -> np.ndarray:
+        """Bandpass filtered, power normalised half spectrum."""
+        ft = sfft.rfft2(data, workers=self.workers) * self._bandpass_rfft
+        if remove_dc:
+            ft[..., 0, 0] = 0
+        power = np.sum((ft.real**2 + ft.imag**2) * self._weights, axis=(-2, -1), keepdims=True)
+        return (self.shape[0] * self.shape[1]) * ft / np.sqrt(power)
+
+    def correlate(self, new_image: FibsemImage) -> np.ndarray:
+        """Cross-correlate the new image with the reference image.
+        Args:
+            new_image (FibsemImage): The new image, same shape as the reference.
+        Returns:
+            np.ndarray: The cross-correlation map (centred, same as crosscorrelation_v2).
+        """
+        if new_image.data.shape[-2:] != self.shape:
+            err = f"Reference image {self.shape} and new image {new_image.data.shape} need to have the same shape"
+            logging.error(err)
+            raise ValueError(err)
+
+        new_ft = self._spectrum(self._preprocess(new_image), remove_dc=True)
+        xcorr = sfft.irfft2(self._ref_ft * np.conj(new_ft), s=self.shape, workers=self.workers)
+        return np.fft.fftshift(xcorr, axes=(-2, -1))
+
+
+class AlignmentDataWriter:
+    """Bounded background writer for alignment data (images, bandpass, xcorr and data.csv).
+
+    Alignment data is queued and written by a background thread, so disk (or network) I/O does not
+    block the alignment loop. The queue is bounded: when it is full, records are dropped rather than
+    blocking the alignment. Records can be sampled (every Nth alignment) or restricted to failed alignments 
+    (confidence below failure_confidence). Failed alignments are always saved, regardless of the sampling.
+    The backpressure metrics are available from the metrics property.
+
+    Args:
+        max_queue_size: The maximum number of records waiting to be written.
+        sample_every: Save every Nth alignment (1 = save all).
+        only_failures: Only save failed alignments.
+        failure_confidence: Alignments with a confidence (peak-to-sidelobe ratio) below this are failures.
+        compression: The tiff compression for the saved images (e.g. "zlib"), None for uncompressed.
+    """
+
+    def __init__(
+        self,
+        max_queue_size: int = 8,
+        sample_every: int = 1,
+        only_failures: bool = False,
+        failure_confidence: float = 5.0,
+        compression: Optional[str] = "zlib",
+    ):
+        self.sample_every = sample_every
+        self.only_failures = only_failures
+        self.failure_confidence = failure_confidence
+        self.compression = compression
+
+        self._queue: "queue.Queue[Optional[dict]]" = queue.Queue(maxsize=max(1, max_queue_size))
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._n_alignments = 0
+        self._metrics = {
+            "submitted": 0,     # records submitted (after sampling)
+            "sampled_out": 0,   # records skipped by sampling / only_failures
+            "dropped": 0,       # records dropped because the queue was full
+            "written": 0,       # records written to disk
+            "errors": 0,        # records that failed to write
+            "max_queue_depth": 0,
+            "write_time": 0.0,  # total time spent writing (s)
+            "last_write_time": 0.0,
+        }
+
+    def _is_failure(self, record: dict) -> bool:
+        confidence = record.get("confidence", None)
+        return confidence is None or confidence < self.failure_confidence
+
+    def submit(self, record: dict) -> bool:
+        """Queue an alignment record to be written. Never blocks.
+        Returns:
+            bool: True if the record was queued, False if it was sampled out or dropped.
+        """
+        with self._lock:
+            n = self._n_alignments
+            self._n_alignments += 1
+            is_failure = self._is_failure(record)
+            sampled = n % max(1, self.sample_every) == 0 and not self.only_failures
+            if not (sampled or is_failure):
+                self._metrics["sampled_out"] += 1
+                return False
+            self._start()
+            try:
+                self._queue.put_nowait(record)
+            except queue.Full:
+                self._metrics["dropped"] += 1
+                logging.warning(f"Alignment data writer queue is full, dropping alignment data ({record['fname']}).")
+                return False
+            self._metrics["submitted"] += 1
+            self._metrics["max_queue_depth"] = max(self._metrics["max_queue_depth"], self._queue.qsize())
+        return True
+
+    def _start(self) -> None:
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._run, name="alignment-data-writer", daemon=True)
+            self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            record = self._queue.get()
+            try:
+                if record is None:
+                    return
+                t0 = time.perf_counter()
+                _write_alignment_data(record, compression=self.compression)
+                t = time.perf_counter() - t0
+                with self._lock:
+                    self._metrics["written"] += 1
+                    self._metrics["write_time"] += t
+                    self._metrics["last_write_time"] = t
+            except Exception as e:
+                with self._lock:
+                    self._metrics["errors"] += 1
+                logging.warning(f"Failed to save alignment data: {e}")
+            finally:
+                self._queue.task_done()
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Wait for the queued records to be written.
+        Returns:
+            bool: True if all records were written before the timeout.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._queue.all_tasks_done:
+            while self._queue.unfinished_tasks:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._queue.all_tasks_done.wait(remaining)
+        return True
+
+    def close(self, timeout: Optional[float] = None) -> None:
+        """Write the queued records, and stop the background thread."""
+        if self._thread is not None and self._thread.is_alive():
+            self.flush(timeout)
+            self._queue.put(None)
+            self._thread.join(timeout)
+        self._thread = None
+
+    @property
+    def queue_depth(self) -> int:
+        """The number of records waiting to be written."""
+        return self._queue.qsize()
+
+    @property
+    def metrics(self) -> dict:
+        """The writer (backpressure) metrics."""
+        with self._lock:
+            metrics = dict(self._metrics)
+        metrics["queue_depth"] = self.queue_depth
+        metrics["mean_write_time"] = metrics["write_time"] / metrics["written"] if metrics["written"] else 0.0
+        return metrics
+
+
+_ALIGNMENT_DATA_WRITER: Optional[AlignmentDataWriter] = None
+
+
+def get_alignment_data_writer() -> AlignmentDataWriter:
+    """Get the (process-wide) alignment data writer. The sampling and compression can be
+    configured on the returned writer."""
+    global _ALIGNMENT_DATA_WRITER
+    if _ALIGNMENT_DATA_WRITER is None:
+        _ALIGNMENT_DATA_WRITER = AlignmentDataWriter()
+        atexit.register(_ALIGNMENT_DATA_WRITER.close, timeout=30)
+    return _ALIGNMENT_DATA_WRITER
+
+
 def _save_alignment_data(
     ref_image: FibsemImage,
     new_image: FibsemImage,
@@ -472,49 +813,65 @@ def _save_alignment_data(
     dy: float = None,
     pixelsize_x: float = None,
     pixelsize_y: float = None,
-    
+    confidence: float = None,
+) -> bool:
+    """Queue alignment data to be saved to disk by the alignment data writer (see AlignmentDataWriter).
+    Returns True if the data was queued."""
 
-):
+    from fibsem import config as cfg
+
+    ts = utils.current_timestamp_v2()
+    fname = os.path.join(cfg.DATA_CC_PATH, str(ts))
+
+    record = {
+        "ref_image": ref_image, "new_image": new_image, "bandpass": bandpass, "xcorr": xcorr, "ref_mask": ref_mask,
+        "lowpass": lowpass, "highpass": highpass, "sigma": sigma,
+        "pixelsize_x": pixelsize_x, "pixelsize_y": pixelsize_y, 
+        "use_rect_mask": use_rect_mask, "xcorr_limit": xcorr_limit,
+        "dx": dx, "dy": dy, "confidence": confidence, "fname": fname, "timestamp": ts }
+
+    return get_alignment_data_writer().submit(record)
+
+
+def _write_alignment_data(record: dict, compression: Optional[str] = None) -> None:
     """Save alignment data to disk."""
-    
-    import os
 
     import pandas as pd
     import tifffile as tff
 
-    from fibsem import config as cfg
-
-    ts = utils.current_timestamp_v2()
-    fname = os.path.join(cfg.DATA_CC_PATH, str(ts))
+    fname = record["fname"]
+    ref_mask = record["ref_mask"]
 
     # save fibsem images
-    ref_image.save(fname + "_ref.tif")
-    new_image.save(fname + "_new.tif")
+    record["ref_image"].save(fname + "_ref.tif", compression=compression)
+    record["new_image"].save(fname + "_new.tif", compression=compression)
 
     # convert to tiff , save
-    tff.imwrite(fname + "_xcorr.tif", xcorr)
-    tff.imwrite(fname + "_bandpass.tif", bandpass)
+    tff.imwrite(fname + "_xcorr.tif", record["xcorr"], compression=compression)
+    tff.imwrite(fname + "_bandpass.tif", record["bandpass"], compression=compression)
     if ref_mask is not None:
-        tff.imwrite(fname + "_ref_mask.tif", ref_mask)
-
-    info = {
-        # "ref_image": ref_image, "new_image": new_image, "bandpass": bandpass, "xcorr": xcorr, "ref_mask": ref_mask,
-        "lowpass": lowpass, "highpass": highpass, "sigma": sigma,
-        "pixelsize_x": pixelsize_x, "pixelsize_y": pixelsize_y, 
-        "use_rect_mask": use_rect_mask, "xcorr_limit": xcorr_limit, "ref_mask": ref_mask is not None,
-        "dx": dx, "dy": dy, "fname": fname, "timestamp": ts }
+        tff.imwrite(fname + "_ref_mask.tif", ref_mask, compression=compression)
 
+    info = {k: v for k, v in record.items() if k not in ("ref_image", "new_image", "bandpass", "xcorr")}
+    info["ref_mask"] = ref_mask is not None
 
     df = pd.DataFrame.from_dict(info, orient='index').T
     
     # save the dataframe to a csv file, append if the file already exists
-    DATAFRAME_PATH = os.path.join(cfg.DATA_CC_PATH, "data.csv")
+    DATAFRAME_PATH = os.path.join(os.path.dirname(fname), "data.csv")
     if os.path.exists(DATAFRAME_PATH):
+        with open(DATAFRAME_PATH) as f:
+            header = f.readline().strip().split(",")
+        if header == list(df.columns):
+            # append, rather than re-writing the whole file
+            df.to_csv(DATAFRAME_PATH, mode="a", header=False, index=False)
+            return
         df_tmp = pd.read_csv(DATAFRAME_PATH)
         df = pd.concat([df_tmp, df], axis=0, ignore_index=True)
     
     df.to_csv(DATAFRAME_PATH, index=False)
 
+
 def multi_step_alignment_v2(
     microscope: FibsemMicroscope,
     ref_image: FibsemImage,
@@ -527,13 +884,24 @@ def multi_step_alignment_v2(
     stop_event: Optional[ThreadingEvent] = None,
     save_plot: bool = True,
     plot_title: Optional[str] = None,
+    min_confidence: Optional[float] = None,
+    tolerance: Optional[float] = None,
 ) -> None:
-    """Runs the beam shift alignment multiple times. Optionally sets the beam current before alignment."""
+    """Runs the beam shift alignment multiple times. Optionally sets the beam current before alignment.
+    If min_confidence is set, the remaining steps are skipped once a step measures a confident 
+    (peak-to-sidelobe ratio >= min_confidence) shift within the tolerance (metres, defaults to one pixel of
+    the reference image), as further steps would only apply sub-pixel corrections."""
     # set alignment current
     if alignment_current is not None:
         initial_current = microscope.get_beam_current(beam_type)
         microscope.set_beam_current(alignment_current, beam_type)
 
+    # the reference spectrum is computed once, and reused for each step
+    engine = CrossCorrelationEngine(ref_image, **BEAM_SHIFT_ALIGNMENT_PARAMETERS)
+
+    if tolerance is None:
+        tolerance = ref_image.metadata.pixel_size.x
+
     alignment_results = []
     for i in range(steps):
         if stop_event is not None and stop_event.is_set():
@@ -541,15 +909,23 @@ def multi_step_alignment_v2(
         # only use autocontrast on first step
         use_autocontrast = use_autocontrast if i == 0 else False
         use_autofocus = use_autofocus if i == 0 else False
-        new_image, xcorr, dx, dy = beam_shift_alignment_v2(
+        new_image, xcorr, dx, dy, confidence = beam_shift_alignment_v2(
             microscope=microscope,
             ref_image=ref_image,
             use_autocontrast=use_autocontrast,
             use_autofocus=use_autofocus,
             subsystem=subsystem,
+            engine=engine,
+            return_confidence=True,
         )
         alignment_results.append((new_image, xcorr, dx, dy))
 
+        # skip the remaining acquisitions once the alignment has confidently converged
+        if (min_confidence is not None and confidence >= min_confidence 
+                and max(abs(dx), abs(dy)) <= tolerance):
+            logging.info(f"Alignment converged after {i + 1}/{steps} steps (confidence: {confidence:.2f}).")
+            break
+
     # reset beam current
     if alignment_current is not None:
         microscope.set_beam_current(initial_current, beam_type)
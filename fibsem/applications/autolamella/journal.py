@@ -0,0 +1,287 @@
+"""Append-only journal and fast loading for experiment persistence.
+
+Saving an experiment used to re-serialise every lamella and rewrite experiment.yaml.
+The journal instead appends a record for each lamella (or experiment header) that changed since
+the last save, and periodically compacts the journal into a new experiment.yaml snapshot.
+
+    experiment.yaml         snapshot of the experiment (written atomically on compaction)
+    experiment.journal      one json record per line, replayed on top of the snapshot when loading
+
+Each snapshot stores a unique journal generation id. The journal starts with a header record with
+the same generation, so a journal left over from an interrupted compaction is never replayed on
+top of a newer snapshot.
+
+Parsing a large experiment.yaml is slow, so the parsed snapshot is cached in a binary sidecar
+file (.experiment.cache), keyed by the size and modification time of the snapshot.
+"""
+
+import json
+import logging
+import os
+import pickle
+import sys
+import threading
+import time
+import uuid
+from copy import deepcopy
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
+
+import yaml
+
+if TYPE_CHECKING:
+    from fibsem.applications.autolamella.structures import Experiment
+
+EXPERIMENT_FILENAME = "experiment.yaml"
+JOURNAL_FILENAME = "experiment.journal"
+JOURNAL_GENERATION_KEY = "journal_generation"
+CACHE_FILENAME = ".experiment.cache"
+CACHE_VERSION = 1
+DEFAULT_COMPACT_EVERY = 100     # number of journal records before compacting into a new snapshot
+
+# use the C yaml implementation when available (same output as yaml.safe_dump / yaml.safe_load)
+_YAML_DUMPER = getattr(yaml, "CSafeDumper", yaml.SafeDumper)
+_YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+_HEADER_KEY = "__experiment__"
+
+
+def _atomic_write(path: str, text: str) -> None:
+    """Write text to path atomically (write to a temporary file, then replace)."""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        f.write(text)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def _experiment_to_dict(experiment: 'Experiment') -> Tuple[Dict[str, Any], List[Dict[str, Any]]]:
+    """Return the experiment header and lamella dictionaries."""
+    ddict = experiment.to_dict(include_positions=False)
+    ddict.pop("positions")
+    return ddict, [lamella.to_dict() for lamella in experiment.positions]
+
+
+class ExperimentJournal:
+    """Journaled store for an experiment directory.
+
+    Args:
+        path: The experiment directory.
+        compact_every: Number of journal records to append before compacting.
+        fsync: Flush journal records to disk on every save.
+    """
+
+    def __init__(self, path: str, compact_every: int = DEFAULT_COMPACT_EVERY, fsync: bool = True):
+        self.path = str(path)
+        self.compact_every = compact_every
+        self.fsync = fsync
+        self._lock = threading.Lock()
+        self._generation: Optional[str] = None
+        self._n_records: int = 0
+        # last written serialisation of the header and each lamella (by id), i.e. the state on disk
+        self._written: Dict[str, str] = {}
+
+    @property
+    def snapshot_path(self) -> str:
+        return os.path.join(self.path, EXPERIMENT_FILENAME)
+
+    @property
+    def journal_path(self) -> str:
+        return os.path.join(self.path, JOURNAL_FILENAME)
+
+    def save(self, experiment: 'Experiment', compact: bool = False) -> int:
+        """Append the changes since the last save to the journal. Compacts the journal into a new
+        snapshot when required (first save, too many records, or the changes can't be journaled).
+        Returns:
+            The number of records appended (0 if compacted, or nothing changed).
+        """
+        ddict, positions = _experiment_to_dict(experiment)
+        ids = [str(p.get("id", "")) for p in positions]
+        header = dict(ddict, positions=ids)
+
+        with self._lock:
+            compact = (compact or not self._written
+                       or self._n_records >= self.compact_every
+                       or len(set(ids)) != len(ids))   # lamella can't be identified
+            records: List[str] = []
+            serialised: Dict[str, str] = {}
+            if not compact:
+                try:
+                    serialised[_HEADER_KEY] = json.dumps(header)
+                    for lamella_id, data in zip(ids, positions):
+                        serialised[lamella_id] = json.dumps(data)
+                except (TypeError, ValueError) as e:
+                    logging.debug(f"Experiment changes can't be journaled, compacting: {e}")
+                    compact = True
+
+            if compact:
+                self._compact(ddict, positions)
+                return 0
+
+            now = time.time()
+            if serialised[_HEADER_KEY] != self._written.get(_HEADER_KEY):
+                records.append(f'{{"op": "experiment", "timestamp": {now}, "data": {serialised[_HEADER_KEY]}}}')
+            for lamella_id in ids:
+                if serialised[lamella_id] != self._written.get(lamella_id):
+                    records.append(f'{{"op": "lamella", "timestamp": {now}, "id": {json.dumps(lamella_id)}, '
+                                   f'"data": {serialised[lamella_id]}}}')
+            if not records:
+                return 0
+
+            with open(self.journal_path, "a") as f:
+                f.write("\n".join(records) + "\n")
+                f.flush()
+                if self.fsync:
+                    os.fsync(f.fileno())
+            self._written = serialised
+            self._n_records += len(records)
+            return len(records)
+
+    def compact(self, experiment: 'Experiment') -> None:
+        """Write a new snapshot of the experiment and reset the journal."""
+        ddict, positions = _experiment_to_dict(experiment)
+        with self._lock:
+            self._compact(ddict, positions)
+
+    def _compact(self, ddict: Dict[str, Any], positions: List[Dict[str, Any]]) -> None:
+        os.makedirs(self.path, exist_ok=True)
+        generation = uuid.uuid4().hex
+        # copy the lamella, so that shared objects are not written as yaml aliases
+        snapshot = dict(ddict, positions=[deepcopy(p) for p in positions])
+        snapshot[JOURNAL_GENERATION_KEY] = generation
+        _atomic_write(self.snapshot_path, yaml.dump(snapshot, Dumper=_YAML_DUMPER, indent=4))
+        _atomic_write(self.journal_path, json.dumps({"op": "start", JOURNAL_GENERATION_KEY: generation}) + "\n")
+        cache_path = os.path.join(self.path, CACHE_FILENAME)
+        if os.path.exists(cache_path):
+            os.remove(cache_path)
+
+        ids = [str(p.get("id", "")) for p in positions]
+        written: Dict[str, str] = {}
+        if len(set(ids)) == len(ids):
+            try:
+                written[_HEADER_KEY] = json.dumps(dict(ddict, positions=ids))
+                for lamella_id, data in zip(ids, positions):
+                    written[lamella_id] = json.dumps(data)
+            except (TypeError, ValueError):
+                written = {}
+        self._generation = generation
+        self._n_records = 0
+        self._written = written
+
+
+def replay_journal(ddict: Dict[str, Any], path: str) -> Dict[str, Any]:
+    """Apply the journal records in the experiment directory to the snapshot dictionary.
+    Journals from a different generation, and incomplete trailing records, are ignored."""
+    journal_path = os.path.join(path, JOURNAL_FILENAME)
+    if not os.path.exists(journal_path):
+        return ddict
+
+    generation = ddict.get(JOURNAL_GENERATION_KEY)
+    lamellas = {str(p.get("id", "")): p for p in ddict.get("positions", [])}
+    order: Optional[List[str]] = None
+    n_records = 0
+    with open(journal_path, "r") as f:
+        for i, line in enumerate(f):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                logging.warning(f"Ignoring incomplete record {i} in experiment journal {journal_path}.")
+                break
+            op = record.get("op")
+            if op == "start":
+                if record.get(JOURNAL_GENERATION_KEY) != generation:
+                    logging.debug(f"Experiment journal {journal_path} is from a different snapshot, ignoring.")
+                    return ddict
+            elif op == "experiment":
+                header = dict(record["data"])
+                order = header.pop("positions")
+                ddict.update(header)
+                n_records += 1
+            elif op == "lamella":
+                lamellas[record["id"]] = record["data"]
+                n_records += 1
+
+    if n_records == 0:
+        return ddict
+    if order is not None:
+        ddict["positions"] = [lamellas[lamella_id] for lamella_id in order if lamella_id in lamellas]
+    else:
+        ddict["positions"] = list(lamellas.values())
+    logging.debug(f"Replayed {n_records} records from experiment journal {journal_path}.")
+    return ddict
+
+
+_JOURNALS: Dict[str, ExperimentJournal] = {}
+_JOURNALS_LOCK = threading.Lock()
+
+
+def get_experiment_journal(path: str) -> ExperimentJournal:
+    """Get the journal for an experiment directory (shared by all copies of the experiment)."""
+    key = os.path.abspath(str(path))
+    with _JOURNALS_LOCK:
+        if key not in _JOURNALS:
+            _JOURNALS[key] = ExperimentJournal(key)
+        return _JOURNALS[key]
+
+
+class _CacheUnpickler(pickle.Unpickler):
+    """Only allow the types produced by yaml.safe_load to be unpickled from the cache."""
+    _ALLOWED = {("datetime", "datetime"), ("datetime", "date"), ("datetime", "timedelta"),
+                ("datetime", "timezone")}
+
+    def find_class(self, module: str, name: str) -> Any:
+        if (module, name) in self._ALLOWED:
+            return super().find_class(module, name)
+        raise pickle.UnpicklingError(f"{module}.{name} is not allowed in the experiment cache.")
+
+
+def _cache_key(path: str) -> Tuple:
+    stat = os.stat(path)
+    return (CACHE_VERSION, sys.version_info[:2], os.path.basename(path), stat.st_size, stat.st_mtime_ns)
+
+
+def _read_cache(path: str) -> Optional[Dict[str, Any]]:
+    """Read the cached snapshot dictionary, if it is up to date."""
+    cache_path = os.path.join(os.path.dirname(path), CACHE_FILENAME)
+    if not os.path.exists(cache_path):
+        return None
+    try:
+        with open(cache_path, "rb") as f:
+            key, ddict = _CacheUnpickler(f).load()
+        if key == _cache_key(path):
+            return ddict
+    except Exception as e:
+        logging.debug(f"Failed to read experiment cache {cache_path}: {e}")
+    return None
+
+
+def _write_cache(path: str, key: Tuple, ddict: Dict[str, Any]) -> None:
+    cache_path = os.path.join(os.path.dirname(path), CACHE_FILENAME)
+    try:
+        tmp_path = f"{cache_path}.tmp"
+        with open(tmp_path, "wb") as f:
+            pickle.dump((key, ddict), f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, cache_path)
+    except Exception as e:
+        # e.g. read-only experiment directory, the cache is optional
+        logging.debug(f"Failed to write experiment cache {cache_path}: {e}")
+
+
+def load_experiment_dict(path: str, use_cache: bool = True) -> Dict[str, Any]:
+    """Load the experiment dictionary from the snapshot (experiment.yaml) and journal.
+    Args:
+        path: The path to the experiment snapshot (experiment.yaml).
+        use_cache: Use (and update) the binary sidecar cache of the parsed snapshot.
+    Returns:
+        The experiment dictionary, with the journal replayed.
+    """
+    path = str(path)
+    ddict = _read_cache(path) if use_cache else None
+    if ddict is None:
+        key = _cache_key(path)
+        with open(path, "r") as f:
+            ddict = yaml.load(f, Loader=_YAML_LOADER)
+        if use_cache:
+            _write_cache(path, key, ddict)
+    return replay_journal(ddict, os.path.dirname(path))
@@ -7,7 +7,7 @@ from dataclasses import asdict, dataclass, field, fields
 from datetime import datetime
 from enum import Enum, auto
 from pathlib import Path
-from typing import Any, ClassVar, Dict, List, Optional, Tuple, Type
+from typing import Any, Callable, ClassVar, Dict, List, Optional, Tuple, Type
 
 import pandas as pd
 import petname
@@ -16,6 +16,7 @@ from psygnal import evented
 from psygnal.containers import EventedDict, EventedList
 
 from fibsem.applications.autolamella import config as cfg
+from fibsem.applications.autolamella.journal import get_experiment_journal, load_experiment_dict
 from fibsem.applications.autolamella.protocol.constants import (
     FIDUCIAL_KEY,
     MICROEXPANSION_KEY,
@@ -579,6 +580,58 @@ def _make_thumbnail_placeholder():
 _THUMBNAIL_PLACEHOLDER = None
 
 
+class _LazyTaskConfig(EventedDict):
+    """Task configuration dictionary that is loaded from its serialised form on first access.
+    The dictionary itself exists from the start, so event connections on the lamella are unaffected."""
+
+    def __init__(self, data: Dict[str, Any]):
+        super().__init__()
+        self._lazy_data: Optional[Dict[str, Any]] = data
+        self._on_load: Optional[Callable[[Dict[str, 'AutoLamellaTaskConfig']], None]] = None
+
+    @property
+    def is_loaded(self) -> bool:
+        return self._lazy_data is None
+
+    def _load(self) -> None:
+        if self._lazy_data is None:
+            return
+        from fibsem.applications.autolamella.workflows.tasks import load_task_config
+        data, self._lazy_data = self._lazy_data, None
+        task_config = load_task_config(data)
+        if self._on_load is not None:
+            self._on_load(task_config)
+        self._dict.update(task_config)  # populate without emitting change events
+
+    def __getitem__(self, key: str) -> 'AutoLamellaTaskConfig':
+        self._load()
+        return super().__getitem__(key)
+
+    def __setitem__(self, key: str, value: 'AutoLamellaTaskConfig') -> None:
+        self._load()
+        super().__setitem__(key, value)
+
+    def __delitem__(self, key: str) -> None:
+        self._load()
+        super().__delitem__(key)
+
+    def __len__(self) -> int:
+        self._load()
+        return super().__len__()
+
+    def __iter__(self):
+        self._load()
+        return super().__iter__()
+
+    def __repr__(self) -> str:
+        self._load()
+        return super().__repr__()
+
+    def copy(self) -> EventedDict:
+        self._load()
+        return EventedDict(self._dict)
+
+
 @evented
 @dataclass
 class Lamella:
@@ -606,11 +659,22 @@ class Lamella:
             self._id = str(uuid.uuid4())
         self.task_state.lamella_id = self._id
 
-        # assign the imaging path to the task config
-        for task_name, tc in self.task_config.items():
+        # assign the imaging path to the task config (when loaded, for a lazily loaded config)
+        if isinstance(self.task_config, _LazyTaskConfig):
+            self.task_config._on_load = self._assign_imaging_path
+        else:
+            self._assign_imaging_path(self.task_config)
+
+    def _assign_imaging_path(self, task_config: Dict[str, 'AutoLamellaTaskConfig']) -> None:
+        for task_name, tc in task_config.items():
             for name, milling_task_config in tc.milling.items():
                 milling_task_config.acquisition.imaging.path = self.path
 
+    @property
+    def is_hydrated(self) -> bool:
+        """Whether the lazily loaded task configuration (see Lamella.from_dict) has been loaded."""
+        return not isinstance(self.task_config, _LazyTaskConfig) or self.task_config.is_loaded
+
     @property
     def name(self) -> str:
         return self.petname
@@ -724,12 +788,18 @@ class Lamella:
         return f"{self.name} ({self.stage_position.x * 1e6:.1f}μm, {self.stage_position.y * 1e6:.1f}μm, {objective_str})"
 
     @classmethod
-    def from_dict(cls, data: dict) -> 'Lamella':
+    def from_dict(cls, data: dict, lazy: bool = False) -> 'Lamella':
+        """Create a lamella from a dictionary.
+        Args:
+            data: The lamella dictionary.
+            lazy: Defer loading the task configuration until it is first accessed.
+        """
         # backwards compatibility
         alignment_area_ddict = data.get("alignment_area", DEFAULT_ALIGNMENT_AREA)
         alignment_area = FibsemRectangle.from_dict(alignment_area_ddict)
 
         from fibsem.applications.autolamella.workflows.tasks import load_task_config
+        task_config = data.get("task_config", {})
 
         return cls(
             petname=data["petname"],
@@ -738,7 +808,7 @@ class Lamella:
             number=data.get("number", data.get("number", 0)),
             _id=data.get("id", ""),
             poses = {k: MicroscopeState.from_dict(v) for k, v in data.get("poses", {}).items()},
-            task_config=load_task_config(data.get("task_config", {})),
+            task_config=_LazyTaskConfig(task_config) if lazy else load_task_config(task_config),
             task_state=AutoLamellaTaskState.from_dict(data.get("task_state", {})),
             task_history=[AutoLamellaTaskState.from_dict(task) for task in data.get("task_history", [])],
             defect=DefectState.from_dict(data.get("defect", {})),
@@ -839,13 +909,13 @@ class Experiment:
         self.task_protocol: AutoLamellaTaskProtocol = None # must be set externally
         self.metadata: Dict[str, Any] = metadata if metadata is not None else {}
 
-    def to_dict(self) -> dict:
+    def to_dict(self, include_positions: bool = True) -> dict:
 
         state_dict = {
             "name": self.name,
             "_id": self._id,
             "path": self.path,
-            "positions": [deepcopy(lamella.to_dict()) for lamella in self.positions],
+            "positions": [deepcopy(lamella.to_dict()) for lamella in self.positions] if include_positions else [],
             "landing_positions": [pos.to_dict() for pos in self.landing_positions],
             "created_at": self.created_at,
             "metadata": self.metadata,
@@ -854,7 +924,7 @@ class Experiment:
         return state_dict
 
     @classmethod
-    def from_dict(cls, ddict: dict) -> 'Experiment':
+    def from_dict(cls, ddict: dict, lazy: bool = False) -> 'Experiment':
 
         path = os.path.dirname(ddict["path"])
         name = ddict["name"]
@@ -866,7 +936,7 @@ class Experiment:
 
         # load lamella from dict
         for lamella_dict in ddict["positions"]:
-            lamella = Lamella.from_dict(data=lamella_dict)
+            lamella = Lamella.from_dict(data=lamella_dict, lazy=lazy)
             experiment.positions.append(lamella)
 
         # load landing positions
@@ -920,11 +990,13 @@ class Experiment:
         """Return the Lamella with the given name, or None if not found."""
         return next((p for p in self.positions if p.name == name), None)
 
-    def save(self) -> None:
-        """Save the sample data to yaml file"""
-
-        with open(os.path.join(self.path, "experiment.yaml"), "w") as f:
-            yaml.safe_dump(self.to_dict(), f, indent=4)
+    def save(self, compact: bool = False) -> None:
+        """Save the experiment. Changed lamella are appended to the experiment journal,
+        which is periodically compacted into experiment.yaml.
+        Args:
+            compact: Write a full snapshot to experiment.yaml and reset the journal.
+        """
+        get_experiment_journal(self.path).save(self, compact=compact)
 
     def __repr__(self) -> str:
 
@@ -934,26 +1006,35 @@ class Experiment:
         """
 
     @staticmethod
-    def load(fname: Path) -> 'Experiment':
+    def load(fname: Path,
+             lazy: bool = False,
+             use_cache: bool = True,
+             setup_logging: bool = True) -> 'Experiment':
         """Load an experiment from disk.
 
         Automatically attempts to load the task_protocol from protocol.yaml
         in the same directory if it exists.
+
+        Args:
+            fname: The path to the experiment file (experiment.yaml).
+            lazy: Defer loading the lamella task configurations until they are first accessed.
+            use_cache: Use the binary cache of the parsed experiment file, when up to date.
+            setup_logging: Configure logging to the experiment logfile. Disable for read-only use (e.g. review tools).
         """
 
-        # read and open existing yaml file
+        # read and open existing yaml file (and the changes saved in the journal since)
         path = Path(fname).with_suffix(".yaml")
         if not os.path.exists(path):
             raise FileNotFoundError(f"No file with name {path} found.")
-        with open(path, "r") as f:
-            ddict = yaml.safe_load(f)
+        ddict = load_experiment_dict(path, use_cache=use_cache)
 
         # create experiment from dict
-        experiment = Experiment.from_dict(ddict)
+        experiment = Experiment.from_dict(ddict, lazy=lazy)
         experiment.path = os.path.dirname(fname)
 
         # configure experiment logging
-        configure_logging(path=experiment.path, log_filename="logfile")
+        if setup_logging:
+            configure_logging(path=experiment.path, log_filename="logfile")
 
         # attempt to load task protocol from the same directory
         protocol_path = os.path.join(experiment.path, "protocol.yaml")
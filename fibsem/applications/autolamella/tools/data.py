@@ -1,10 +1,14 @@
 from __future__ import annotations
+import ast
 import datetime
 import json
+import logging
 import os
+from concurrent.futures import ProcessPoolExecutor
 from copy import deepcopy
+from functools import lru_cache
 from pathlib import Path
-from typing import Dict, Tuple
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
 
 import pandas as pd
 
@@ -51,11 +55,22 @@ def parse_msg(msg: str):
     # return json.loads(msg, cls=PythonLiteralJSONDecoder)
     return json.loads(msg.replace("'", '"').replace("None", '"None"').replace("True", '"True"').replace("False", '"False"').replace("(", "[").replace(")", "]"))
 
+def decode_msg(msg: str) -> Any:
+    """decode a structured log message (a logged python literal, e.g. a dictionary, or json)"""
+    try:
+        return json.loads(msg)
+    except ValueError:
+        return ast.literal_eval(msg)
+
+@lru_cache(maxsize=4096)
+def _parse_timestamp(ts: str) -> float:
+    # consecutive lines mostly share the same second, so the conversion is cached
+    return datetime.datetime.fromisoformat(ts).timestamp()
+
 def get_timestamp(line: str) -> float:
     """get timestamp from line"""
     ts = line.split("—")[0].split(",")[0].strip()
-    tsd = datetime.datetime.timestamp(datetime.datetime.strptime(ts, "%Y-%m-%d %H:%M:%S"))
-    return tsd
+    return _parse_timestamp(ts)
 
 def get_function(line: str) -> str:
     """get the function name from the line"""
@@ -71,13 +86,116 @@ def get_message(line) -> str:
 def parse_line(line: str) -> Tuple[str, str, str]:
     """parse a line from the log file into a tuple of timestamp, function, and message"""
 
-    tsd = get_timestamp(line)
-    func = get_function(line)
-    msg = get_message(line)
+    # the message is the last field, and may itself contain the delimiter
+    parts = line.split("—", 4)
+    tsd = _parse_timestamp(parts[0].split(",")[0].strip())
+    func = parts[-2].strip()
+    msg = parts[-1].strip()
 
     return tsd, func, msg
 
 
+LOGFILE_CACHE_FILENAME = ".logfile.cache.json"
+LOGFILE_CACHE_VERSION = 2
+LOG_CHUNK_SIZE = 32 * 1024 * 1024   # bytes per chunk when parsing the logfile in parallel
+
+
+def _get_log_chunks(fname: str, chunk_size: int = LOG_CHUNK_SIZE) -> List[Tuple[int, int]]:
+    """Split the logfile into (start, end) byte ranges, aligned to line boundaries."""
+    size = os.path.getsize(fname)
+    chunks = []
+    start = 0
+    with open(fname, "rb") as f:
+        while start < size:
+            f.seek(min(start + chunk_size, size))
+            f.readline()
+            end = min(f.tell(), size)
+            chunks.append((start, end))
+            start = end
+    return chunks
+
+
+def _parse_log_chunk(fname: str, start: int, end: int, encoding: str,
+                     keys: Tuple[str, ...]) -> List[Tuple[float, str, Any]]:
+    """Parse and decode the lines in a byte range of the logfile that contain any of the keys."""
+    with open(fname, "rb") as f:
+        f.seek(start)
+        data = f.read(end - start).decode(encoding, errors="replace")
+
+    records = []
+    for line in data.splitlines():
+        # cheap filter on the raw line before splitting and decoding
+        if not any(key in line for key in keys):
+            continue
+        try:
+            tsd, func, msg = parse_line(line)
+            records.append((tsd, func, decode_msg(msg)))
+        except Exception:
+            pass    # not a structured message
+    return records
+
+
+def iter_log_records(fname: str, keys: Iterable[str], encoding: str = "utf-8",
+                     n_workers: int = 1, chunk_size: int = LOG_CHUNK_SIZE) -> Iterator[Tuple[float, str, Any]]:
+    """Stream the decoded (timestamp, function, message) records from a logfile.
+    Only lines containing any of the keys (in the function name or message) are decoded.
+    Args:
+        fname: path to the logfile
+        keys: substrings used to select the relevant lines
+        encoding: encoding of the logfile
+        n_workers: number of processes used to decode chunks of the file in parallel
+        chunk_size: approximate size of each chunk (bytes)
+    Returns:
+        iterator of records, in file order
+    """
+    keys = tuple(keys)
+    chunks = _get_log_chunks(fname, chunk_size)
+    if n_workers <= 1 or len(chunks) <= 1:
+        for start, end in chunks:
+            yield from _parse_log_chunk(fname, start, end, encoding, keys)
+        return
+
+    with ProcessPoolExecutor(max_workers=n_workers) as executor:
+        futures = [executor.submit(_parse_log_chunk, fname, start, end, encoding, keys)
+                   for start, end in chunks]
+        for future in futures:
+            yield from future.result()
+
+
+def _logfile_cache_key(fname: str, encoding: str) -> List:
+    stat = os.stat(fname)
+    return [LOGFILE_CACHE_VERSION, encoding, stat.st_size, stat.st_mtime_ns]
+
+
+def _read_logfile_cache(fname: str, encoding: str) -> Optional[Dict[str, pd.DataFrame]]:
+    """Read the cached parsed logfile dataframes, if they are up to date.
+    The cache is plain json (not pickle), as experiment directories are shared between machines."""
+    cache_path = os.path.join(os.path.dirname(fname), LOGFILE_CACHE_FILENAME)
+    if not os.path.exists(cache_path):
+        return None
+    try:
+        with open(cache_path, "r", encoding="utf-8") as f:
+            cache = json.load(f)
+        if cache["key"] == _logfile_cache_key(fname, encoding):
+            return {name: pd.DataFrame(**ddict) for name, ddict in cache["dataframes"].items()}
+    except Exception as e:
+        logging.debug(f"Failed to read logfile cache {cache_path}: {e}")
+    return None
+
+
+def _write_logfile_cache(fname: str, key: List, dfs: Dict[str, pd.DataFrame]) -> None:
+    cache_path = os.path.join(os.path.dirname(fname), LOGFILE_CACHE_FILENAME)
+    try:
+        cache = {"key": key, "dataframes": {name: df.to_dict(orient="split") for name, df in dfs.items()}}
+        tmp_path = f"{cache_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(cache, f, default=str)
+        os.replace(tmp_path, cache_path)
+    except Exception as e:
+        # e.g. read-only experiment directory, the cache is optional
+        logging.debug(f"Failed to write logfile cache {cache_path}: {e}")
+
+
 def calculate_statistics_dataframe(path: Path, encoding: str = "cp1252"):
 
     fname = os.path.join(path, "logfile.log")
@@ -97,161 +215,140 @@ def calculate_statistics_dataframe(path: Path, encoding: str = "cp1252"):
     print("-" * 80)
     print(f"Parsing {fname}")
     # encoding = "cp1252" if "nt" in os.name else "cp1252" # TODO: this depends on the OS it was logged on, usually windows, need to make this more robust.
-    with open(fname, encoding=encoding) as f:
-        # Note: need to check the encoding as this is required for em dash (long dash) # TODO: change this delimiter so this isnt required.
-        lines = f.read().splitlines()
-        for i, line in enumerate(lines):
-
-            if line == "":
-                continue
-            try:
+    keys = ("get_microscope_state", "get_stage_position", "log_status_message", "beam_shift",
+            "confirm_button", "save_ml", "_single_click", "_double_click", "mill_stages")
+    for tsd, func, msgd in iter_log_records(fname, keys=keys, encoding=encoding):
+        try:
+            # TELEMETRY -> depcrecated in favour of manufacturer telemetry
+            if "get_microscope_state" in func:
+                state_data.append(deepcopy(msgd["state"]))
                 
-                # get timestamp, function, and message from log line
-                tsd, func, msg = parse_line(line)
-                # msgd = parse_msg(msg) # TODO: enable, and remove indiviudal calls
-
-                # TELEMETRY -> depcrecated in favour of manufacturer telemetry
-                if "get_microscope_state" in func:
-                    msgd = parse_msg(msg)
-
-                    state_data.append(deepcopy(msgd["state"]))
-                    
-                if "get_stage_position" in func:
-                    msgd = parse_msg(msg)
-                    staged = msgd["stage"]
-                    staged["timestamp"] = tsd
-                    staged["lamella"] = current_lamella
-                    staged["stage"] = current_stage
-                    staged["step"] = current_step
+            if "get_stage_position" in func:
+                staged = msgd["stage"]
+                staged["timestamp"] = tsd
+                staged["lamella"] = current_lamella
+                staged["stage"] = current_stage
+                staged["step"] = current_step
+            
+                stage_data.append(deepcopy(staged))
+
+            if "log_status_message" in func:
+                if not isinstance(msgd, dict):
+                    continue        # skip old status messages
                 
-                    stage_data.append(deepcopy(staged))
-
-                if "log_status_message" in func:
-                    if "STATUS" in msg:
-                        continue        # skip old status messages 
-                    
-                    # global data
-                    tsd = get_timestamp(line)
-                    msgd = parse_msg(msg)
-                    current_lamella = msgd["petname"]
-                    current_stage = msgd["stage"]
-                    current_step = msgd["step"]
-
-                    # step data                    
-                    step_d = deepcopy(msgd)
-                    step_d["lamella"] = current_lamella
-                    step_d["timestamp"] = tsd
-                    step_d["step_n"] = step_n
-                    step_n += 1
-                    steps_data.append(deepcopy(step_d))
+                # global data
+                current_lamella = msgd["petname"]
+                current_stage = msgd["stage"]
+                current_step = msgd["step"]
+
+                # step data                    
+                step_d = deepcopy(msgd)
+                step_d["lamella"] = current_lamella
+                step_d["timestamp"] = tsd
+                step_d["step_n"] = step_n
+                step_n += 1
+                steps_data.append(deepcopy(step_d))
 
+            
+            if "beam_shift" in func:
+                msgd["timestamp"] = tsd
+                msgd["lamella"] = current_lamella
+                msgd["stage"] = current_stage
+                msgd["step"] = current_step
+                df_beam_shift.append(deepcopy(msgd))
+
+
+            # TODO: confirm this parses the correct data
+            if "confirm_button" in func or "save_ml" in func: # DETECTION INTERACTION
+                # log detection data
+                detd = deepcopy(msgd)
+
+                detd["px_x"] = msgd["px"]["x"]
+                detd["px_y"] = msgd["px"]["y"]
+                detd["dpx_x"] = msgd["dpx"]["x"]
+                detd["dpx_y"] = msgd["dpx"]["y"]
+                detd["dm_x"] = msgd["dm"]["x"]
+                detd["dm_y"] = msgd["dm"]["y"]
+                
+                del detd["dpx"]
+                del detd["dm"]
+                del detd["px"]
+
+                detd["timestamp"] = tsd
+                detd["lamella"] = current_lamella
+                detd["stage"] = current_stage
+                detd["step"] = current_step
+                det_data.append(deepcopy(detd))
+
+                # log detection interaction
+                if detd["is_correct"] in (False, "False"):
+                    click_d = {
+                        "lamella": detd["lamella"],
+                        "stage": detd["stage"],
+                        "step": detd["step"],
+                        "type": "DET",
+                        "subtype": detd["feature"],
+                        "dm_x": detd["dm_x"],
+                        "dm_y": detd["dm_y"],
+                        "beam_type": detd["beam_type"],
+                        "timestamp": detd["timestamp"],
+                    }
+                    click_data.append(deepcopy(click_d))    
+
+            if "_single_click" in func: # MILLING INTERACTION
+                # log milling interaction
+                clickd = {}
+                clickd["timestamp"] = tsd
+                clickd["lamella"] = current_lamella
+                clickd["stage"] = current_stage
+                clickd["step"] = current_step
+                
+                clickd["dm_x"] = msgd["dm"]["x"]
+                clickd["dm_y"] = msgd["dm"]["y"]
+                clickd["type"] = "MILL"
+                clickd["subtype"] = msgd["pattern"]
+                clickd["beam_type"] = msgd["beam_type"]
+
+                click_data.append(deepcopy(clickd))
+
+            if "_double_click" in func: # MOVEMENT INTERACTION
                 
-                if "beam_shift" in func:
-                    msgd = parse_msg(msg)
-                    msgd["timestamp"] = tsd
-                    msgd["lamella"] = current_lamella
-                    msgd["stage"] = current_stage
-                    msgd["step"] = current_step
-                    df_beam_shift.append(deepcopy(msgd))
-
-
-                # TODO: confirm this parses the correct data
-                if "confirm_button" in func or "save_ml" in func: # DETECTION INTERACTION
-                    # log detection data
-                    msgd = parse_msg(msg)
-                    detd = deepcopy(msgd)
-
-                    detd["px_x"] = msgd["px"]["x"]
-                    detd["px_y"] = msgd["px"]["y"]
-                    detd["dpx_x"] = msgd["dpx"]["x"]
-                    detd["dpx_y"] = msgd["dpx"]["y"]
-                    detd["dm_x"] = msgd["dm"]["x"]
-                    detd["dm_y"] = msgd["dm"]["y"]
-                    
-                    del detd["dpx"]
-                    del detd["dm"]
-                    del detd["px"]
-
-                    detd["timestamp"] = tsd
-                    detd["lamella"] = current_lamella
-                    detd["stage"] = current_stage
-                    detd["step"] = current_step
-                    det_data.append(deepcopy(detd))
-
-                    # log detection interaction
-                    if detd["is_correct"] == "False":
-                        click_d = {
-                            "lamella": detd["lamella"],
-                            "stage": detd["stage"],
-                            "step": detd["step"],
-                            "type": "DET",
-                            "subtype": detd["feature"],
-                            "dm_x": detd["dm_x"],
-                            "dm_y": detd["dm_y"],
-                            "beam_type": detd["beam_type"],
-                            "timestamp": detd["timestamp"],
-                        }
-                        click_data.append(deepcopy(click_d))    
-
-                if "_single_click" in func: # MILLING INTERACTION
-                    # log milling interaction
-                    msgd = parse_msg(msg)
-                    
-                    clickd = {}
-                    clickd["timestamp"] = tsd
-                    clickd["lamella"] = current_lamella
-                    clickd["stage"] = current_stage
-                    clickd["step"] = current_step
-                    
-                    clickd["dm_x"] = msgd["dm"]["x"]
-                    clickd["dm_y"] = msgd["dm"]["y"]
-                    clickd["type"] = "MILL"
-                    clickd["subtype"] = msgd["pattern"]
-                    clickd["beam_type"] = msgd["beam_type"]
-
-                    click_data.append(deepcopy(clickd))
-
-                if "_double_click" in func: # MOVEMENT INTERACTION
-                    
-                    # log movement interaction
-                    msgd = parse_msg(msg)
-                    clickd = {}
-                    clickd["timestamp"] = tsd
-                    clickd["lamella"] = current_lamella
-                    clickd["stage"] = current_stage
-                    clickd["step"] = current_step
-
-                    clickd["dm_x"] = msgd["dm"]["x"]
-                    clickd["dm_y"] = msgd["dm"]["y"]
-                    clickd["type"] = "MOVE"
-                    clickd["subtype"] = msgd["movement_mode"]
-                    clickd["beam_type"] = msgd["beam_type"]
-
-                    click_data.append(deepcopy(clickd))
-
-                if "mill_stages" in func:
-                    msgd = parse_msg(msg)
-
-                    milld = {}
-                    milld["timestamp"] = tsd
-                    milld["lamella"] = current_lamella
-                    milld["stage"] = current_stage
-                    milld["step"] = current_step
-                    milld["name"] = msgd["stage"]["name"]
-                    milld["start_time"] = msgd["start_time"]
-                    milld["end_time"] = msgd["end_time"]
-                    milld["duration"] = msgd["end_time"] - msgd["start_time"]
-                    milld["milling_current"] = msgd["stage"]["milling"]["milling_current"]
-                    milld["depth"] = msgd["stage"]["pattern"].get("depth", 0)
-                    # TODO: what other attrs are useful?
-                    milling_data.append(deepcopy(milld))
-
-            except Exception as e:
-                # print(e, " | ", line)
-                pass
+                # log movement interaction
+                clickd = {}
+                clickd["timestamp"] = tsd
+                clickd["lamella"] = current_lamella
+                clickd["stage"] = current_stage
+                clickd["step"] = current_step
+
+                clickd["dm_x"] = msgd["dm"]["x"]
+                clickd["dm_y"] = msgd["dm"]["y"]
+                clickd["type"] = "MOVE"
+                clickd["subtype"] = msgd["movement_mode"]
+                clickd["beam_type"] = msgd["beam_type"]
+
+                click_data.append(deepcopy(clickd))
+
+            if "mill_stages" in func:
+                milld = {}
+                milld["timestamp"] = tsd
+                milld["lamella"] = current_lamella
+                milld["stage"] = current_stage
+                milld["step"] = current_step
+                milld["name"] = msgd["stage"]["name"]
+                milld["start_time"] = msgd["start_time"]
+                milld["end_time"] = msgd["end_time"]
+                milld["duration"] = msgd["end_time"] - msgd["start_time"]
+                milld["milling_current"] = msgd["stage"]["milling"]["milling_current"]
+                milld["depth"] = msgd["stage"]["pattern"].get("depth", 0)
+                # TODO: what other attrs are useful?
+                milling_data.append(deepcopy(milld))
+
+        except Exception as e:
+            # print(e, " | ", msgd)
+            pass
  
     # experiment
-    experiment = Experiment.load(os.path.join(path, "experiment.yaml"))
+    experiment = Experiment.load(os.path.join(path, "experiment.yaml"), lazy=True, setup_logging=False)
     df_experiment = experiment.__to_dataframe__()
     df_history = experiment.history_dataframe()
     df_steps = pd.DataFrame(steps_data)
@@ -309,135 +406,93 @@ def calculate_statistics_dataframe(path: Path, encoding: str = "cp1252"):
 
 #### TASK REFACTORING ####
 
-def parse_logfile(path: str, encoding="utf-8") -> Dict[str, pd.DataFrame]:
-    """Updated parser for task based workflow"""
-
-    fname = os.path.join(path, "logfile.log")
+def _parse_task_records(records: Iterable[Tuple[float, str, Any]]) -> Dict[str, pd.DataFrame]:
+    """Collect the task, milling and detection data from the decoded logfile records."""
     steps_data = []
     det_data = []
-    click_data = []
     milling_data2 = []
 
     stepd = None
 
-    print("-" * 80)
-    print(f"Parsing {fname}")
-    # encoding = "cp1252" if "nt" in os.name else "cp1252" # TODO: this depends on the OS it was logged on, usually windows, need to make this more robust.
-    with open(fname, encoding=encoding) as f:
-        # Note: need to check the encoding as this is required for em dash (long dash) # TODO: change this delimiter so this isnt required.
-        lines = f.read().splitlines()
-        for i, line in enumerate(lines):
-
-            if line == "":
-                continue
-            try:
-
-                # get timestamp, function, and message from log line
-                tsd, func, msg = parse_line(line)
-                msgd = parse_msg(msg)
-
-                if "milling_task" in msg:
-
-                    if stepd is None:
-                        continue
-
-                    # add milling task data
-                    msgd2 = stepd
-                    msgd2["timestamp"] = tsd
-                    msgd2.update(msgd)
-                    milling_data2.append(deepcopy(msgd2))
-
-                if "log_status_message" in func:
-                    # global data
-                    stepd = {
-                        "timestamp": tsd,
-                        "lamella": msgd["lamella"],
-                        "lamella_id": msgd["lamella_id"],
-                        "task_name": msgd["task_name"],
-                        "task_id": msgd["task_id"],
-                        "task_type": msgd["task_type"],
-                        "task_step": msgd["task_step"],
-                    }
-                    steps_data.append(deepcopy(stepd))
-
-                if "save_ml" in func: # DETECTION INTERACTION
-                    # log detection data
-                    msgd = parse_msg(msg)
-
-                    if stepd is None:
-                        continue
-
-                    dmsgd2 = stepd
-                    dmsgd2["timestamp"] = tsd
-                    dmsgd2.update(msgd)
-                    det_data.append(deepcopy(dmsgd2))
-
-                    # # log detection interaction
-                    # if detd["is_correct"] == "False":
-                    #     click_d = {
-                    #         "lamella": detd["lamella"],
-                    #         "stage": detd["stage"],
-                    #         "step": detd["step"],
-                    #         "type": "DET",
-                    #         "subtype": detd["feature"],
-                    #         "dm_x": detd["dm_x"],
-                    #         "dm_y": detd["dm_y"],
-                    #         "beam_type": detd["beam_type"],
-                    #         "timestamp": detd["timestamp"],
-                    #     }
-                    #     click_data.append(deepcopy(click_d))    
-
-                # if "_single_click" in func: # MILLING INTERACTION
-                #     # log milling interaction
-                #     msgd = parse_msg(msg)
-                    
-                #     clickd = {}
-                #     clickd["timestamp"] = tsd
-                #     clickd["lamella"] = current_lamella
-                #     clickd["stage"] = current_stage
-                #     clickd["step"] = current_step
-                    
-                #     clickd["dm_x"] = msgd["dm"]["x"]
-                #     clickd["dm_y"] = msgd["dm"]["y"]
-                #     clickd["type"] = "MILL"
-                #     clickd["subtype"] = msgd["pattern"]
-                #     clickd["beam_type"] = msgd["beam_type"]
-
-                #     click_data.append(deepcopy(clickd))
-
-                # if "_double_click" in func: # MOVEMENT INTERACTION
-                    
-                #     # log movement interaction
-                #     msgd = parse_msg(msg)
-                #     clickd = {}
-                #     clickd["timestamp"] = tsd
-                #     clickd["lamella"] = current_lamella
-                #     clickd["stage"] = current_stage
-                #     clickd["step"] = current_step
-
-                #     clickd["dm_x"] = msgd["dm"]["x"]
-                #     clickd["dm_y"] = msgd["dm"]["y"]
-                #     clickd["type"] = "MOVE"
-                #     clickd["subtype"] = msgd["movement_mode"]
-                #     clickd["beam_type"] = msgd["beam_type"]
-
-
-            except Exception as e:
-                pass
+    for tsd, func, msgd in records:
+        try:
+            if isinstance(msgd, dict) and msgd.get("msg") == "milling_task":
+
+                if stepd is None:
+                    continue
+
+                # add milling task data
+                msgd2 = stepd
+                msgd2["timestamp"] = tsd
+                msgd2.update(msgd)
+                milling_data2.append(deepcopy(msgd2))
+
+            if "log_status_message" in func:
+                # global data
+                stepd = {
+                    "timestamp": tsd,
+                    "lamella": msgd["lamella"],
+                    "lamella_id": msgd["lamella_id"],
+                    "task_name": msgd["task_name"],
+                    "task_id": msgd["task_id"],
+                    "task_type": msgd["task_type"],
+                    "task_step": msgd["task_step"],
+                }
+                steps_data.append(deepcopy(stepd))
+
+            if "save_ml" in func: # DETECTION INTERACTION
+                # log detection data
+                if stepd is None:
+                    continue
+
+                dmsgd2 = stepd
+                dmsgd2["timestamp"] = tsd
+                dmsgd2.update(msgd)
+                det_data.append(deepcopy(dmsgd2))
+
+        except Exception as e:
+            pass
 
     df_tasks = pd.DataFrame(steps_data)
     df_tasks["duration"] = df_tasks["timestamp"].diff().shift(-1)
     df_tasks.fillna(0, inplace=True)
 
+    return {"tasks": df_tasks,
+            "milling": pd.json_normalize(milling_data2),
+            "detection": pd.json_normalize(det_data)}
+
+
+def parse_logfile(path: str, encoding="utf-8", n_workers: int = 1, use_cache: bool = True) -> Dict[str, pd.DataFrame]:
+    """Updated parser for task based workflow
+    Args:
+        path: path to the experiment directory
+        encoding: encoding of the logfile
+        n_workers: number of processes used to parse the logfile
+        use_cache: use (and update) the cache of the parsed logfile, keyed by the encoding, logfile size and modification time
+    """
+
+    fname = os.path.join(path, "logfile.log")
+
+    print("-" * 80)
+    print(f"Parsing {fname}")
+    # encoding = "cp1252" if "nt" in os.name else "cp1252" # TODO: this depends on the OS it was logged on, usually windows, need to make this more robust.
+    dfs = _read_logfile_cache(fname, encoding) if use_cache else None
+    if dfs is None:
+        key = _logfile_cache_key(fname, encoding)
+        records = iter_log_records(fname, keys=("log_status_message", "save_ml", "milling_task"),
+                                   encoding=encoding, n_workers=n_workers)
+        dfs = _parse_task_records(records)
+        if use_cache:
+            _write_logfile_cache(fname, key, dfs)
+    df_tasks, df_milling2, df_det = dfs["tasks"], dfs["milling"], dfs["detection"]
+
     from fibsem.applications.autolamella.structures import AutoLamellaTaskProtocol
-    exp = Experiment.load(os.path.join(path, "experiment.yaml")) # type: ignore
+    exp = Experiment.load(os.path.join(path, "experiment.yaml"), lazy=True, setup_logging=False) # type: ignore
     exp.task_protocol = AutoLamellaTaskProtocol.load(os.path.join(path, "protocol.yaml"))
     df_task_history = exp.task_history_dataframe()
 
     df_exp = exp.experiment_summary_dataframe()
     df_workflow = exp.workflow_dataframe()
-    df_milling2 = pd.json_normalize(milling_data2)
-    df_det = pd.json_normalize(det_data)
 
     # TODO: save these dataframes to csv
     # TODO: add experiment name and id to all dataframes
@@ -638,7 +693,7 @@ def format_pretty_dataframes(dfs: dict[str, pd.DataFrame]) -> dict[str, pd.DataF
         })
         df_det_summary = pd.merge(df_det_summary, df_totals, on=["Task Step", "Feature"])
         # remove rows where Is Correct is False
-        df_det_summary = df_det_summary[df_det_summary["Is Correct"] == "True"]
+        df_det_summary = df_det_summary[df_det_summary["Is Correct"].astype(bool)]
         # sort by Task Step and Feature
         df_det_summary = df_det_summary.sort_values(by=["Task Step", "Feature"], ascending=[True, True])
 
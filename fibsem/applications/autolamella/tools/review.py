@@ -34,7 +34,7 @@ page_title = st.empty()
 st.sidebar.title("File Selection")
 st.sidebar.write("Select the folder containing the AutoLamella data.")
 experiment_path = st.sidebar.text_input("Folder Path", value=args.experiment_path)
-exp = Experiment.load(os.path.join(experiment_path, "experiment.yaml"))
+exp = Experiment.load(os.path.join(experiment_path, "experiment.yaml"), lazy=True, setup_logging=False)
 
 page_title.title(f"AutoLamella Review - {exp.name}")
 
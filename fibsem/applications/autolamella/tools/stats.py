@@ -124,8 +124,9 @@ cols[2].metric(label="Avg Click Size (dy)", value=avg_dy)
 
 
 if len(df_det) > 0:
-    total_correct = len(df_det[df_det["is_correct"] == 'True'])
-    total_incorrect = len(df_det[df_det["is_correct"] == 'False'])
+    # is_correct is decoded as a bool from the logfile
+    total_correct = int(df_det["is_correct"].astype(bool).sum())
+    total_incorrect = len(df_det) - total_correct
     accuracy = total_correct / (total_correct + total_incorrect)
     
     BASE_ACCURACY = 0.0
@@ -287,16 +288,16 @@ with tab_automation:
         df_group = df_group.pivot(index="feature", columns="is_correct", values="lamella")
 
         # if no false, add false column
-        if "False" not in df_group.columns:
-            df_group["False"] = 0
-        if "True" not in df_group.columns:
-            df_group["True"] = 0
+        if False not in df_group.columns:
+            df_group[False] = 0
+        if True not in df_group.columns:
+            df_group[True] = 0
         
         # fill missing values with zero
         df_group.fillna(0, inplace=True)
 
-        df_group["total"] = df_group["True"] + df_group["False"]
-        df_group["percent_correct"] = df_group["True"] / df_group["total"]
+        df_group["total"] = df_group[True] + df_group[False]
+        df_group["percent_correct"] = df_group[True] / df_group["total"]
         df_group["percent_correct"] = df_group["percent_correct"].round(2)
         # df_group = df_group.sort_values(by="percent_correct", ascending=False)
         df_group.reset_index(inplace=True)
@@ -316,16 +317,16 @@ with tab_automation:
         df_group = df_group.pivot(index=["lamella", "feature"], columns="is_correct", values="stage")
         
         # if no false, add false column
-        if "False" not in df_group.columns:
-            df_group["False"] = 0
-        if "True" not in df_group.columns:
-            df_group["True"] = 0
+        if False not in df_group.columns:
+            df_group[False] = 0
+        if True not in df_group.columns:
+            df_group[True] = 0
         
         # fill missing values with zero
         df_group.fillna(0, inplace=True)
 
-        df_group["total"] = df_group["True"] + df_group["False"]
-        df_group["percent_correct"] = df_group["True"] / df_group["total"]
+        df_group["total"] = df_group[True] + df_group[False]
+        df_group["percent_correct"] = df_group[True] / df_group["total"]
         df_group["percent_correct"] = df_group["percent_correct"].round(2)
         df_group.reset_index(inplace=True)
         # plot
@@ -338,16 +339,16 @@ with tab_automation:
         df_group = df_group.pivot(index=["stage", "feature"], columns="is_correct", values="timestamp")
         
         # if no false, add false column
-        if "False" not in df_group.columns:
-            df_group["False"] = 0
-        if "True" not in df_group.columns:
-            df_group["True"] = 0
+        if False not in df_group.columns:
+            df_group[False] = 0
+        if True not in df_group.columns:
+            df_group[True] = 0
         
         # fill missing values with zero
         df_group.fillna(0, inplace=True)
 
-        df_group["total"] = df_group["True"] + df_group["False"]
-        df_group["percent_correct"] = df_group["True"] / df_group["total"]
+        df_group["total"] = df_group[True] + df_group[False]
+        df_group["percent_correct"] = df_group[True] / df_group["total"]
         df_group["percent_correct"] = df_group["percent_correct"].round(2)
         df_group.reset_index(inplace=True)
 
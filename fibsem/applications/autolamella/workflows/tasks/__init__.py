@@ -58,6 +58,14 @@ from fibsem.applications.autolamella.workflows.tasks.queue import (
     TaskQueue,
     WorkItem,
 )
+from fibsem.applications.autolamella.workflows.tasks.scheduler import (
+    DefaultSchedulingPolicy,
+    ScheduleReport,
+    SchedulingCostModel,
+    SchedulingPolicy,
+    TravelAwareSchedulingPolicy,
+    get_scheduling_policy,
+)
 
 class TaskNotRegisteredError(Exception):
     """Exception raised when a task is not registered in the TASK_REGISTRY."""
@@ -7,6 +7,12 @@ from typing import TYPE_CHECKING, List, Optional
 
 from fibsem.applications.autolamella.structures import AutoLamellaTaskStatus
 from fibsem.applications.autolamella.workflows.tasks.queue import TaskQueue
+from fibsem.applications.autolamella.workflows.tasks.scheduler import (
+    DefaultSchedulingPolicy,
+    ScheduleReport,
+    SchedulingPolicy,
+    get_sample_grids,
+)
 from fibsem.applications.autolamella.workflows.ui import update_status_ui
 from fibsem.microscope import FibsemMicroscope
 
@@ -45,27 +51,83 @@ class TaskManager:
     def __init__(self,
                  microscope: FibsemMicroscope,
                  experiment: 'Experiment',
-                 parent_ui: Optional['AutoLamellaUI'] = None):
+                 parent_ui: Optional['AutoLamellaUI'] = None,
+                 scheduler: Optional[SchedulingPolicy] = None):
         self.microscope = microscope
         self.experiment = experiment
         self.parent_ui = parent_ui
+        self.scheduler = scheduler
         self._stop_event = threading.Event()
         self.queue = TaskQueue()
 
     # --- Public API ---
 
     def run(self, task_names: List[str],
-            required_lamella: Optional[List[str]] = None) -> None:
+            required_lamella: Optional[List[str]] = None,
+            dry_run: bool = False) -> Optional[ScheduleReport]:
         """Run the specified tasks for all lamellas in the experiment.
         Args:
             task_names: List of task names to run.
             required_lamella: List of lamella names to run tasks on. If None, all lamellas are processed.
+            dry_run: Only build and schedule the queue, and report the estimated time saved
+                by the scheduler against the default order. No tasks are run.
+        Returns:
+            The schedule report when dry_run is True, otherwise None.
         """
         if required_lamella is None:
             required_lamella = [p.name for p in self.experiment.positions]
 
         self.queue.build_from_matrix(task_names, required_lamella)
+
+        if dry_run:
+            report = self.dry_run()
+            logging.info(report.summary())
+            return report
+
+        self.warm_up_models(task_names)
+        self.schedule()
         self._run_queue()
+        return None
+
+    def warm_up_models(self, task_names: List[str]) -> Optional[threading.Thread]:
+        """Load the detection models used by the tasks in the background, so the
+        model load isn't paid mid-workflow."""
+        from fibsem.applications.autolamella.workflows.tasks import get_tasks
+        if self.experiment.task_protocol is None:
+            return None
+        tasks = get_tasks()
+        checkpoints = []
+        for task_name in task_names:
+            task_config = self.experiment.task_protocol.task_config.get(task_name)
+            task_cls = tasks.get(task_config.task_type) if task_config is not None else None
+            checkpoints.extend(getattr(task_cls, "checkpoints", ()))
+        if not checkpoints:
+            return None
+
+        try:
+            from fibsem.segmentation.model import warm_up_models
+        except ImportError as e:
+            logging.debug(f"Segmentation models are not available, skipping model warm up: {e}")
+            return None
+        return warm_up_models(checkpoints, background=True)
+
+    def schedule(self) -> None:
+        """Reorder the pending queue items using the scheduling policy (if set)."""
+        if self.scheduler is None:
+            return
+        items = self.scheduler.schedule(self.queue.pending, self.experiment,
+                                        start_position=self.microscope.get_stage_position(),
+                                        grids=get_sample_grids(self.microscope))
+        self.queue.reorder([item.id for item in items])
+        logging.info(f"Scheduled {len(items)} work items using the '{self.scheduler.name}' policy.")
+
+    def dry_run(self) -> ScheduleReport:
+        """Estimate the time saved by the scheduling policy for the pending queue items,
+        without reordering the queue."""
+        scheduler = self.scheduler if self.scheduler is not None else DefaultSchedulingPolicy()
+        return scheduler.dry_run(self.queue.pending, self.experiment,
+                                 start_position=self.microscope.get_stage_position(),
+                                 grids=get_sample_grids(self.microscope))
 
     def _run_queue(self) -> None:
         """Process queue items until empty or stopped."""
@@ -127,6 +189,7 @@ class TaskManager:
                 msg=msg,
             )
 
+        self.experiment.save(compact=True)
         update_status_ui(self.parent_ui, "", workflow_info="All tasks completed.")
         print(self.experiment.task_history_dataframe())
 
@@ -211,9 +274,11 @@ def run_tasks(microscope: FibsemMicroscope,
             experiment: 'Experiment',
             task_names: List[str],
             required_lamella: Optional[List[str]] = None,
-            parent_ui: Optional['AutoLamellaUI'] = None) -> None:
+            parent_ui: Optional['AutoLamellaUI'] = None,
+            scheduler: Optional[SchedulingPolicy] = None,
+            dry_run: bool = False) -> Optional[ScheduleReport]:
     """Run the specified tasks for all lamellas in the experiment.
     Thin wrapper around TaskManager for backward compatibility and headless usage.
     """
-    manager = TaskManager(microscope, experiment, parent_ui)
-    manager.run(task_names, required_lamella)
+    manager = TaskManager(microscope, experiment, parent_ui, scheduler=scheduler)
+    return manager.run(task_names, required_lamella, dry_run=dry_run)
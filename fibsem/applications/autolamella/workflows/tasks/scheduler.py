@@ -0,0 +1,360 @@
+"""Scheduling policies for the autolamella task queue.
+
+A scheduling policy reorders the pending work items of a TaskQueue before they are executed.
+The default policy keeps the task-major order produced by TaskQueue.build_from_matrix.
+The travel aware policy greedily picks the next work item with the lowest transition overhead:
+stage travel, sample grid changes and milling current / voltage / application file changes.
+Task requirements (AutoLamellaWorkflowConfig.requirements) are always respected.
+
+Only the overhead between work items is estimated. The time spent executing the tasks does not
+depend on the order, so it is not included in the estimates.
+"""
+
+import logging
+import math
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, ClassVar, Dict, List, Optional, Tuple, Type
+
+from fibsem.applications.autolamella.workflows.tasks.queue import WorkItem
+from fibsem.imaging.scan_path import DEFAULT_SETTLE_TIME, DEFAULT_STAGE_SPEED
+from fibsem.structures import FibsemStagePosition
+
+if TYPE_CHECKING:
+    from fibsem.applications.autolamella.structures import Experiment
+    from fibsem.microscope import FibsemMicroscope
+    from fibsem.microscopes._stage import SampleGrid
+
+# transition cost model for estimating the overhead between work items
+DEFAULT_ROTATION_SPEED = math.radians(10)       # rad/s, rotation / tilt axes
+DEFAULT_GRID_CHANGE_TIME = 60.0                 # s, additional time to move between sample grids
+DEFAULT_CURRENT_CHANGE_TIME = 10.0              # s, milling current change (aperture, beam settling)
+DEFAULT_VOLTAGE_CHANGE_TIME = 120.0             # s, milling voltage change (source re-alignment)
+DEFAULT_APPLICATION_FILE_CHANGE_TIME = 2.0      # s, application file change
+
+BeamSetting = Tuple[float, float, str]          # (milling_current, milling_voltage, application_file)
+
+
+@dataclass
+class SchedulingCostModel:
+    """Estimated time (s) of the transitions between work items."""
+    stage_speed: float = DEFAULT_STAGE_SPEED                # m/s
+    rotation_speed: float = DEFAULT_ROTATION_SPEED          # rad/s
+    settle_time: float = DEFAULT_SETTLE_TIME                # s, per stage move
+    grid_change_time: float = DEFAULT_GRID_CHANGE_TIME
+    current_change_time: float = DEFAULT_CURRENT_CHANGE_TIME
+    voltage_change_time: float = DEFAULT_VOLTAGE_CHANGE_TIME
+    application_file_change_time: float = DEFAULT_APPLICATION_FILE_CHANGE_TIME
+
+    def stage_move_time(self, p0: Optional[FibsemStagePosition],
+                        p1: Optional[FibsemStagePosition]) -> float:
+        """Estimate the stage movement time between two positions (axes move simultaneously).
+        Unknown positions, or unknown axes, are not counted."""
+        if p0 is None or p1 is None:
+            return 0.0
+        durations = [0.0]
+        for axis in ["x", "y", "z", "r", "t"]:
+            v0, v1 = getattr(p0, axis), getattr(p1, axis)
+            if v0 is None or v1 is None:
+                continue
+            if axis in ["x", "y", "z"]:
+                durations.append(abs(v1 - v0) / self.stage_speed)
+            else:
+                delta = (v1 - v0 + math.pi) % (2 * math.pi) - math.pi
+                durations.append(abs(delta) / self.rotation_speed)
+        move_time = max(durations)
+        if move_time == 0:
+            return 0.0
+        return move_time + self.settle_time
+
+
+@dataclass
+class WorkItemProfile:
+    """The location and beam settings required by a work item."""
+    item: WorkItem
+    index: int                                  # position in the original (default) order
+    position: Optional[FibsemStagePosition] = None
+    grid: Optional[str] = None
+    beam_settings: List[BeamSetting] = field(default_factory=list)
+    requires: List[str] = field(default_factory=list)
+
+    @property
+    def key(self) -> Tuple[str, str]:
+        return (self.item.lamella_name, self.item.task_name)
+
+
+@dataclass
+class _ScheduleState:
+    """The microscope state between work items."""
+    position: Optional[FibsemStagePosition] = None
+    grid: Optional[str] = None
+    beam: Optional[BeamSetting] = None
+
+
+@dataclass
+class ScheduleEstimate:
+    """The estimated transition overhead of executing work items in a given order."""
+    order: List[Tuple[str, str]] = field(default_factory=list)      # (lamella_name, task_name)
+    n_stage_moves: int = 0
+    stage_time: float = 0.0
+    n_grid_changes: int = 0
+    n_current_changes: int = 0
+    n_voltage_changes: int = 0
+    n_application_file_changes: int = 0
+    estimated_time: float = 0.0
+
+
+@dataclass
+class ScheduleReport:
+    """Comparison of the default order and the scheduled order (dry run)."""
+    policy: str
+    default: ScheduleEstimate
+    scheduled: ScheduleEstimate
+
+    @property
+    def time_saved(self) -> float:
+        return self.default.estimated_time - self.scheduled.estimated_time
+
+    def summary(self) -> str:
+        lines = [f"Scheduling policy: {self.policy}"]
+        lines.append(f"{'':<24} {'default':>10} {'scheduled':>10}")
+        for label, attr in [("stage moves", "n_stage_moves"),
+                            ("grid changes", "n_grid_changes"),
+                            ("current changes", "n_current_changes"),
+                            ("voltage changes", "n_voltage_changes"),
+                            ("application changes", "n_application_file_changes")]:
+            lines.append(f"{label:<24} {getattr(self.default, attr):>10d} {getattr(self.scheduled, attr):>10d}")
+        lines.append(f"{'estimated overhead (s)':<24} {self.default.estimated_time:>10.1f} {self.scheduled.estimated_time:>10.1f}")
+        lines.append(f"Estimated time saved: {self.time_saved:.1f} s")
+        return "\n".join(lines)
+
+
+def get_sample_grids(microscope: Optional['FibsemMicroscope']) -> Dict[str, 'SampleGrid']:
+    """Get the sample grids of the microscope sample holder (if available)."""
+    stage = getattr(microscope, "_stage", None)
+    holder = getattr(stage, "holder", None)
+    if holder is None:
+        return {}
+    return dict(holder.grids)
+
+
+def _get_grid_name(position: Optional[FibsemStagePosition],
+                   grids: Optional[Dict[str, 'SampleGrid']]) -> Optional[str]:
+    """Get the name of the sample grid containing the position."""
+    if position is None or not grids:
+        return None
+    for name, grid in grids.items():
+        if position.is_close2(grid.position, tol=grid.radius, axes=["x", "y"]):
+            return name
+    return None
+
+
+def build_profiles(items: List[WorkItem],
+                   experiment: 'Experiment',
+                   grids: Optional[Dict[str, 'SampleGrid']] = None) -> List[WorkItemProfile]:
+    """Build the scheduling profile (location, beam settings, requirements) for each work item."""
+    workflow_config = None
+    if experiment.task_protocol is not None:
+        workflow_config = experiment.task_protocol.workflow_config
+
+    profiles: List[WorkItemProfile] = []
+    for index, item in enumerate(items):
+        profile = WorkItemProfile(item=item, index=index)
+        if workflow_config is not None:
+            profile.requires = list(workflow_config.requirements(item.task_name))
+
+        lamella = experiment.get_lamella_by_name(item.lamella_name)
+        if lamella is not None:
+            pose = lamella.milling_pose
+            if pose is not None:
+                profile.position = pose.stage_position
+            profile.grid = _get_grid_name(profile.position, grids)
+
+            task_config = lamella.task_config.get(item.task_name)
+            if task_config is not None:
+                for milling_task_config in task_config.milling.values():
+                    for stage in milling_task_config.stages:
+                        profile.beam_settings.append((stage.milling.milling_current,
+                                                      stage.milling.milling_voltage,
+                                                      stage.milling.application_file))
+        profiles.append(profile)
+    return profiles
+
+
+def _transition(state: _ScheduleState, profile: WorkItemProfile,
+                cost_model: SchedulingCostModel,
+                estimate: Optional[ScheduleEstimate] = None) -> Tuple[float, _ScheduleState]:
+    """Return the cost of moving from state to the work item, and the state after the work item.
+    If estimate is given, the transition is accumulated into it."""
+    cost = 0.0
+    stage_time = cost_model.stage_move_time(state.position, profile.position)
+    cost += stage_time
+    grid_changed = state.grid is not None and profile.grid is not None and state.grid != profile.grid
+    if grid_changed:
+        cost += cost_model.grid_change_time
+
+    beam = state.beam
+    current_changed = voltage_changed = application_file_changed = False
+    if profile.beam_settings:
+        first = profile.beam_settings[0]
+        if beam is not None:
+            current_changed = not math.isclose(beam[0], first[0])
+            voltage_changed = not math.isclose(beam[1], first[1])
+            application_file_changed = beam[2] != first[2]
+        cost += current_changed * cost_model.current_change_time
+        cost += voltage_changed * cost_model.voltage_change_time
+        cost += application_file_changed * cost_model.application_file_change_time
+        beam = profile.beam_settings[-1]
+
+    if estimate is not None:
+        estimate.order.append(profile.key)
+        estimate.n_stage_moves += int(stage_time > 0)
+        estimate.stage_time += stage_time
+        estimate.n_grid_changes += int(grid_changed)
+        estimate.n_current_changes += int(current_changed)
+        estimate.n_voltage_changes += int(voltage_changed)
+        estimate.n_application_file_changes += int(application_file_changed)
+        estimate.estimated_time += cost
+
+    next_state = _ScheduleState(
+        position=profile.position if profile.position is not None else state.position,
+        grid=profile.grid if profile.grid is not None else state.grid,
+        beam=beam,
+    )
+    return cost, next_state
+
+
+def estimate_schedule(profiles: List[WorkItemProfile],
+                      cost_model: Optional[SchedulingCostModel] = None,
+                      start_position: Optional[FibsemStagePosition] = None,
+                      grids: Optional[Dict[str, 'SampleGrid']] = None) -> ScheduleEstimate:
+    """Estimate the transition overhead of executing the work items in the given order."""
+    if cost_model is None:
+        cost_model = SchedulingCostModel()
+    estimate = ScheduleEstimate()
+    state = _ScheduleState(position=start_position, grid=_get_grid_name(start_position, grids))
+    for profile in profiles:
+        _, state = _transition(state, profile, cost_model, estimate)
+    return estimate
+
+
+class SchedulingPolicy(ABC):
+    """Base class for task queue scheduling policies."""
+    name: ClassVar[str]
+
+    def __init__(self, cost_model: Optional[SchedulingCostModel] = None):
+        self.cost_model = cost_model if cost_model is not None else SchedulingCostModel()
+
+    @abstractmethod
+    def order(self, profiles: List[WorkItemProfile],
+              start_position: Optional[FibsemStagePosition] = None,
+              grids: Optional[Dict[str, 'SampleGrid']] = None) -> List[WorkItemProfile]:
+        """Return the work item profiles in execution order."""
+        pass
+
+    def schedule(self, items: List[WorkItem],
+                 experiment: 'Experiment',
+                 start_position: Optional[FibsemStagePosition] = None,
+                 grids: Optional[Dict[str, 'SampleGrid']] = None) -> List[WorkItem]:
+        """Return the work items in execution order."""
+        profiles = build_profiles(items, experiment, grids)
+        return [p.item for p in self.order(profiles, start_position, grids)]
+
+    def dry_run(self, items: List[WorkItem],
+                experiment: 'Experiment',
+                start_position: Optional[FibsemStagePosition] = None,
+                grids: Optional[Dict[str, 'SampleGrid']] = None) -> ScheduleReport:
+        """Estimate the overhead of the default and scheduled orders, without changing anything."""
+        profiles = build_profiles(items, experiment, grids)
+        ordered = self.order(profiles, start_position, grids)
+        return ScheduleReport(
+            policy=self.name,
+            default=estimate_schedule(profiles, self.cost_model, start_position, grids),
+            scheduled=estimate_schedule(ordered, self.cost_model, start_position, grids),
+        )
+
+
+class DefaultSchedulingPolicy(SchedulingPolicy):
+    """Keep the queue order (task-major)."""
+    name = "default"
+
+    def order(self, profiles: List[WorkItemProfile],
+              start_position: Optional[FibsemStagePosition] = None,
+              grids: Optional[Dict[str, 'SampleGrid']] = None) -> List[WorkItemProfile]:
+        return list(profiles)
+
+
+class TravelAwareSchedulingPolicy(SchedulingPolicy):
+    """Greedily pick the next work item with the lowest transition cost.
+
+    A work item is only eligible once the pending work items for its requirements
+    (on the same lamella) have been scheduled. Ties are broken by the original order.
+
+    Args:
+        cost_model: The transition cost model.
+        preserve_lamella_order: Keep the relative order of the tasks for each lamella.
+        batch_by_task: Keep the task-major order, and only reorder the lamellas within each task.
+            Use this when all lamellas should complete a task before the next task starts
+            (e.g. rough milling everything before polishing).
+    """
+    name = "travel"
+
+    def __init__(self, cost_model: Optional[SchedulingCostModel] = None,
+                 preserve_lamella_order: bool = True,
+                 batch_by_task: bool = False):
+        super().__init__(cost_model)
+        self.preserve_lamella_order = preserve_lamella_order
+        self.batch_by_task = batch_by_task
+
+    def _is_eligible(self, profile: WorkItemProfile, remaining: List[WorkItemProfile]) -> bool:
+        lamella_name = profile.item.lamella_name
+        for other in remaining:
+            if other is profile or other.item.lamella_name != lamella_name:
+                continue
+            if other.item.task_name in profile.requires:
+                return False
+            if self.preserve_lamella_order and other.index < profile.index:
+                return False
+        return True
+
+    def order(self, profiles: List[WorkItemProfile],
+              start_position: Optional[FibsemStagePosition] = None,
+              grids: Optional[Dict[str, 'SampleGrid']] = None) -> List[WorkItemProfile]:
+        remaining = sorted(profiles, key=lambda p: p.index)
+        ordered: List[WorkItemProfile] = []
+        state = _ScheduleState(position=start_position, grid=_get_grid_name(start_position, grids))
+
+        while remaining:
+            candidates = remaining
+            if self.batch_by_task:
+                task_name = remaining[0].item.task_name
+                candidates = [p for p in remaining if p.item.task_name == task_name]
+            eligible = [p for p in candidates if self._is_eligible(p, remaining)]
+            if not eligible:
+                # unsatisfiable requirements (e.g. cyclic), fall back to the original order
+                logging.debug(f"No eligible work items for scheduling, using original order for {remaining[0].key}.")
+                eligible = [remaining[0]]
+
+            best, best_cost, best_state = None, math.inf, state
+            for profile in eligible:
+                cost, next_state = _transition(state, profile, self.cost_model)
+                if cost < best_cost:
+                    best, best_cost, best_state = profile, cost, next_state
+            ordered.append(best)
+            remaining.remove(best)
+            state = best_state
+
+        return ordered
+
+
+SCHEDULING_POLICIES: Dict[str, Type[SchedulingPolicy]] = {
+    DefaultSchedulingPolicy.name: DefaultSchedulingPolicy,
+    TravelAwareSchedulingPolicy.name: TravelAwareSchedulingPolicy,
+}
+
+
+def get_scheduling_policy(name: str, **kwargs) -> SchedulingPolicy:
+    """Create a scheduling policy by name."""
+    if name not in SCHEDULING_POLICIES:
+        raise ValueError(f"Unknown scheduling policy: {name}. Available policies: {list(SCHEDULING_POLICIES)}")
+    return SCHEDULING_POLICIES[name](**kwargs)
@@ -87,6 +87,7 @@ TAutoLamellaTaskConfig = TypeVar(
 
 MAX_ALIGNMENT_ATTEMPTS = 3
 ALIGNMENT_REFERENCE_IMAGE_FILENAME = "ref_alignment_ib.tif"
+UNDERCUT_CHECKPOINT = "autolamella-waffle-20240107.pt"
 
 # feature flags
 
@@ -282,6 +283,7 @@ class AutoLamellaTask(ABC):
     """Base class for AutoLamella tasks."""
     config_cls: ClassVar[AutoLamellaTaskConfig]
     config: AutoLamellaTaskConfig
+    checkpoints: ClassVar[Tuple[str, ...]] = ()    # detection models used by the task (warmed up at the start of the workflow)
 
     def __init__(self,
                  microscope: FibsemMicroscope,
@@ -608,7 +610,7 @@ class AutoLamellaTask(ABC):
         self.log_status_message("MOVE_TO_POSITION", "Moving to Position...")
         if self.lamella.milling_pose is None:
             raise ValueError(f"Milling pose for {self.lamella.name} is not set. Please set the milling pose before milling the lamella.")
-        self.microscope.set_microscope_state(self.lamella.milling_pose)
+        self.microscope.set_microscope_state(self.lamella.milling_pose, diff=True)
 
     def _acquire_alignment_reference_image(self, 
                                             image_settings: ImageSettings, 
@@ -707,6 +709,7 @@ class MillUndercutTask(AutoLamellaTask):
     """Task to mill the undercut for a lamella."""
     config: MillUndercutTaskConfig
     config_cls: ClassVar[Type[MillUndercutTaskConfig]] = MillUndercutTaskConfig
+    checkpoints: ClassVar[Tuple[str, ...]] = (UNDERCUT_CHECKPOINT,)
 
     def _run(self) -> None:
 
@@ -714,7 +717,7 @@ class MillUndercutTask(AutoLamellaTask):
         image_settings = self.config.imaging
         image_settings.path = self.lamella.path
 
-        checkpoint = "autolamella-waffle-20240107.pt" # if self.lamella.protocol.options.checkpoint is None else self.lamella.protocol.options.checkpoint
+        checkpoint = UNDERCUT_CHECKPOINT # if self.lamella.protocol.options.checkpoint is None else self.lamella.protocol.options.checkpoint
 
         # move to sem orientation
         self.log_status_message("MOVE_TO_UNDERCUT", "Moving to Undercut Position...")
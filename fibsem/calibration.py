@@ -1,4 +1,7 @@
 import logging
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Callable, List, Optional, Sequence, Union
 
 import numpy as np
 import skimage
@@ -26,7 +29,16 @@ def auto_focus_beam(
     num_steps: int = 5,
     kwargs: dict = {},
     verbose: bool = False,
-) -> None:
+    method: str = "sweep",
+) -> Optional['FocusResult']:
+    """Auto focus the beam by maximising the focus metric over the working distance.
+    Args:
+        metric_fn: The focus metric. If None, the microscope auto focus routine is used.
+        method: "sweep" evaluates num_steps + 1 evenly spaced working distances,
+            "adaptive" runs a coarse-to-fine search over the same range (see adaptive_auto_focus).
+    Returns:
+        The focus result, including the metric curve (None if the microscope auto focus was used).
+    """
 
     # TODO: @patrickcleeve2 this could be generalised further if we specify the parameter to sweep through too...
     # e.g. microscope.set("working_distance", value, beam_type) for auto focus
@@ -38,8 +50,16 @@ def auto_focus_beam(
     if metric_fn is None:
         # run the default autofocus routine
         microscope.auto_focus(beam_type=beam_type)
-        return
-        
+        return None
+
+    if method == "adaptive":
+        return adaptive_auto_focus(microscope=microscope,
+                                   beam_type=beam_type,
+                                   metric_fn=metric_fn,
+                                   image_settings=focus_image_settings,
+                                   search_range=num_steps * step_size,
+                                   kwargs=kwargs)
+
     if focus_image_settings is None:
         # use preset settings if not defined
         focus_image_settings = ImageSettings(
@@ -70,21 +90,15 @@ def auto_focus_beam(
 
     # loop through working distances and calculate the sharpness (acutance)
     # highest acutance is best focus
-    metrics = []
-    for i, wd in enumerate(wds):
-
-        logging.info(f"image {i}: {wd:.2e}")
-        microscope.set("working_distance", wd, beam_type)
-
-        focus_image_settings.filename = f"{utils.current_timestamp()}_sharpness_{i}"
-        img = acquire.new_image(microscope, focus_image_settings)
-
-        # calculate focus metric 
-        metric = metric_fn(img, **kwargs)
-        metrics.append(metric)
+    result = FocusResult(initial_working_distance=current_wd, working_distance=current_wd)
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        _evaluate_working_distances(microscope, beam_type, wds, focus_image_settings,
+                                    metric_fn, kwargs, executor, result)
+    metrics = result.metrics
 
     # select working distance with highest metric
     idx = np.argmax(metrics)
+    result.working_distance = float(wds[idx])
 
     if verbose:
         pairs = list(zip(wds, metrics))
@@ -98,8 +112,7 @@ def auto_focus_beam(
         beam_type=beam_type,
     )
 
-
-    return
+    return result
 
 def _sharpness(img:FibsemImage, **kwargs) -> float:
     """Calculate sharpness (accutance) of an image.
@@ -132,6 +145,216 @@ def _dog(img: FibsemImage, **kwargs) -> float:
     from skimage.filters import difference_of_gaussians
     return np.mean(difference_of_gaussians(np.copy(img.data), low, high))
 
+### FOCUS METRICS
+# fast, vectorised focus metrics. higher is sharper. images can be FibsemImage or np.ndarray
+
+def _focus_data(img: Union[FibsemImage, np.ndarray]) -> np.ndarray:
+    data = img.data if isinstance(img, FibsemImage) else img
+    if data.ndim == 3:
+        data = data.mean(axis=-1)
+    return np.asarray(data, dtype=np.float32)
+
+def laplacian_variance(img: Union[FibsemImage, np.ndarray], **kwargs) -> float:
+    """Calculate the variance of the laplacian of an image."""
+    data = _focus_data(img)
+    laplacian = (data[:-2, 1:-1] + data[2:, 1:-1] + data[1:-1, :-2] + data[1:-1, 2:]
+                 - 4 * data[1:-1, 1:-1])
+    return float(laplacian.var())
+
+def brenner(img: Union[FibsemImage, np.ndarray], **kwargs) -> float:
+    """Calculate the Brenner gradient of an image (mean squared difference of pixels step apart).
+    Args:
+        step (int, optional): The pixel offset. Defaults to 2.
+    """
+    step = kwargs.get("step", 2)
+    data = _focus_data(img)
+    dx = data[:, step:] - data[:, :-step]
+    dy = data[step:, :] - data[:-step, :]
+    return float(np.mean(dx * dx) + np.mean(dy * dy))
+
+def fft_high_frequency_energy(img: Union[FibsemImage, np.ndarray], **kwargs) -> float:
+    """Calculate the fraction of the spectral energy above a cutoff frequency.
+    Normalised by the total energy, so it is insensitive to the image brightness / contrast.
+    Args:
+        cutoff (float, optional): The cutoff as a fraction of the nyquist frequency. Defaults to 0.25.
+    """
+    cutoff = kwargs.get("cutoff", 0.25)
+    data = _focus_data(img)
+    power = np.abs(np.fft.rfft2(data - data.mean())) ** 2
+    fy = np.fft.fftfreq(data.shape[0])[:, np.newaxis]
+    fx = np.fft.rfftfreq(data.shape[1])[np.newaxis, :]
+    radius = np.sqrt(fx ** 2 + fy ** 2) / 0.5
+    total = power.sum()
+    if total == 0:
+        return 0.0
+    return float(power[radius > cutoff].sum() / total)
+
+FOCUS_METRICS = {
+    "laplacian_variance": laplacian_variance,
+    "brenner": brenner,
+    "fft_high_frequency_energy": fft_high_frequency_energy,
+    "sharpness": _sharpness,
+    "dog": _dog,
+}
+
+
+### ADAPTIVE AUTO FOCUS
+
+@dataclass
+class FocusResult:
+    """The result of an auto focus search.
+    Attributes:
+        initial_working_distance: The working distance before the search.
+        working_distance: The selected working distance.
+        working_distances: The working distances evaluated (in acquisition order).
+        metrics: The focus metric for each working distance.
+        fitted: Whether the working distance was selected from a fit of the metric curve.
+    """
+    initial_working_distance: float
+    working_distance: float
+    working_distances: List[float] = field(default_factory=list)
+    metrics: List[float] = field(default_factory=list)
+    fitted: bool = False
+
+    @property
+    def n_images(self) -> int:
+        return len(self.working_distances)
+
+    def to_dict(self) -> dict:
+        return {
+            "initial_working_distance": self.initial_working_distance,
+            "working_distance": self.working_distance,
+            "working_distances": self.working_distances,
+            "metrics": self.metrics,
+            "fitted": self.fitted,
+        }
+
+
+def _fit_peak(wds: Sequence[float], metrics: Sequence[float], fit: str = "parabola") -> Optional[float]:
+    """Fit a parabola (or gaussian) to the metric curve, and return the position of the peak.
+    Returns None if the fit doesn't have a maximum within the range of working distances."""
+    wds, metrics = np.asarray(wds, dtype=float), np.asarray(metrics, dtype=float)
+    if len(wds) < 3 or len(np.unique(wds)) < 3:
+        return None
+    if fit == "gaussian":
+        # a gaussian is a parabola in log space
+        if np.any(metrics <= 0):
+            return None
+        metrics = np.log(metrics)
+    centre, scale = wds.mean(), np.ptp(wds)    # fit in normalised coordinates for conditioning
+    a, b, _ = np.polyfit((wds - centre) / scale, metrics, 2)
+    if a >= 0:
+        return None
+    peak = centre + scale * (-b / (2 * a))
+    if not wds.min() <= peak <= wds.max():
+        return None
+    return float(peak)
+
+
+def _evaluate_working_distances(microscope: FibsemMicroscope,
+                                beam_type: BeamType,
+                                wds: Sequence[float],
+                                image_settings: ImageSettings,
+                                metric_fn: Callable,
+                                kwargs: dict,
+                                executor: ThreadPoolExecutor,
+                                result: FocusResult) -> List[float]:
+    """Acquire an image at each working distance, and calculate the focus metric.
+    The metric is calculated on the worker thread, while the next working distance is set and imaged."""
+    futures: List[Future] = []
+    for wd in wds:
+        microscope.set("working_distance", float(wd), beam_type)
+        image_settings.filename = f"{utils.current_timestamp()}_focus_{result.n_images + len(futures)}"
+        image = acquire.new_image(microscope, image_settings)
+        futures.append(executor.submit(metric_fn, image, **kwargs))
+    metrics = [float(f.result()) for f in futures]
+    for wd, metric in zip(wds, metrics):
+        logging.debug({"msg": "auto_focus", "beam_type": beam_type.name, "working_distance": float(wd), "metric": metric})
+    result.working_distances.extend(float(wd) for wd in wds)
+    result.metrics.extend(metrics)
+    return metrics
+
+
+def adaptive_auto_focus(microscope: FibsemMicroscope,
+                        beam_type: BeamType,
+                        metric_fn: Callable = laplacian_variance,
+                        image_settings: Optional[ImageSettings] = None,
+                        search_range: float = 0.25e-3,
+                        coarse_steps: int = 5,
+                        fine_steps: int = 3,
+                        tolerance: float = 5e-6,
+                        max_iterations: int = 2,
+                        fit: str = "parabola",
+                        kwargs: Optional[dict] = None) -> FocusResult:
+    """Coarse-to-fine auto focus search over the working distance.
+
+    A coarse sweep over the search range brackets the focus. The bracket around the best
+    working distance is then refined with a few images per iteration, until the step is below
+    the tolerance. The working distance is selected from a parabolic (or gaussian) fit of the
+    metric curve around the peak, falling back to the best imaged working distance.
+
+    Args:
+        microscope: The microscope.
+        beam_type: The beam to focus.
+        metric_fn: The focus metric (higher is sharper), see FOCUS_METRICS.
+        image_settings: The image settings for the focus images. Defaults to reduced area, low dwell time images, which are not saved.
+        search_range: The working distance range to search, centred on the current working distance (m).
+        coarse_steps: The number of images in the coarse sweep.
+        fine_steps: The number of images per refinement iteration.
+        tolerance: Stop refining when the step size is below the tolerance (m).
+        max_iterations: The maximum number of refinement iterations.
+        fit: The fit of the metric curve, "parabola" or "gaussian".
+        kwargs: Additional arguments for the metric function.
+    Returns:
+        The focus result, including the full metric curve.
+    """
+    kwargs = kwargs or {}
+    if image_settings is None:
+        image_settings = ImageSettings(
+            resolution=[768, 512],
+            dwell_time=100e-9,
+            hfw=100e-6,
+            beam_type=beam_type,
+            save=False,
+            autocontrast=False,     # keep the contrast fixed, so the metrics are comparable
+            autogamma=False,
+            reduced_area=FibsemRectangle(0.3, 0.3, 0.4, 0.4),
+        )
+    image_settings.beam_type = beam_type
+
+    current_wd = float(microscope.get("working_distance", beam_type))
+    result = FocusResult(initial_working_distance=current_wd, working_distance=current_wd)
+
+    wds = np.linspace(current_wd - search_range / 2, current_wd + search_range / 2, coarse_steps)
+    step = wds[1] - wds[0] if coarse_steps > 1 else search_range
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        _evaluate_working_distances(microscope, beam_type, wds, image_settings, metric_fn, kwargs, executor, result)
+
+        for _ in range(max_iterations):
+            if step <= tolerance:
+                break
+            best = result.working_distances[int(np.argmax(result.metrics))]
+            # refine the bracket around the best working distance
+            step = 2 * step / (fine_steps + 1)
+            candidates = best + step * (np.arange(fine_steps) - (fine_steps - 1) / 2)
+            if fine_steps % 2 == 1:     # the best working distance is already imaged
+                candidates = candidates[~np.isclose(candidates, best, rtol=0, atol=step / 10)]
+            _evaluate_working_distances(microscope, beam_type, candidates, image_settings, metric_fn, kwargs, executor, result)
+
+    # fit the metric curve around the best working distance
+    wds, metrics = np.asarray(result.working_distances), np.asarray(result.metrics)
+    best = wds[int(np.argmax(metrics))]
+    order = np.argsort(np.abs(wds - best))[:max(3, fine_steps + 2)]
+    peak = _fit_peak(wds[order], metrics[order], fit=fit)
+    result.fitted = peak is not None
+    result.working_distance = float(peak) if peak is not None else float(best)
+
+    logging.info({"msg": "adaptive_auto_focus", "beam_type": beam_type.name, **result.to_dict()})
+
+    microscope.set("working_distance", result.working_distance, beam_type)
+    return result
+
+
 def auto_charge_neutralisation(
     microscope: FibsemMicroscope,
     image_settings: ImageSettings,
@@ -1,5 +1,7 @@
 import logging
-from typing import List, Tuple
+import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import List, Optional, Tuple
 
 import numpy as np
 from scipy import ndimage
@@ -299,39 +301,96 @@ def scipy_interpolation(
 
 #### multi-channel interpolation ####
 
+DEFAULT_INTERPOLATION_CHUNK_SIZE = 64 # number of rows (y) interpolated per task
+
+
+def _z_interpolation_matrix(nz: int, scale_factor: float, order: int) -> np.ndarray:
+    """Get the (Z_out, Z) weights of the spline interpolation along the z-axis, equivalent to 
+    ndimage.zoom(image, (scale_factor, 1, 1), order=order, mode="reflect", prefilter=True).
+    The interpolation is linear in the image values, so the weights are the zoom of the identity."""
+    weights = ndimage.zoom(np.eye(nz), (scale_factor, 1), order=order, mode="reflect", prefilter=True)
+    return weights.astype(np.float32)
+
+
+def _cast_interpolated(data: np.ndarray, dtype: np.dtype) -> np.ndarray:
+    """Cast the interpolated data to the output dtype (integers are rounded and clipped, as ndimage)."""
+    if np.issubdtype(dtype, np.integer):
+        info = np.iinfo(dtype)
+        np.rint(data, out=data)
+        np.clip(data, info.min, info.max, out=data)
+    return data.astype(dtype, copy=False)
+
+
 def multi_channel_interpolation(
     image: np.ndarray,
     pixelsize_in: float,
     pixelsize_out: float,
     method: str = "cubic",
     parent_ui=None,
+    separable: bool = True,
+    num_workers: Optional[int] = None,
+    chunk_size: int = DEFAULT_INTERPOLATION_CHUNK_SIZE,
+    output_path: Optional[str] = None,
 ) -> np.ndarray:
-    """Interpolate a multi-channel z-stack (CZYX) along the z-axis
+    """Interpolate a multi-channel z-stack (CZYX) along the z-axis. 
+    Channels, and chunks of rows (y) within each channel, are interpolated in parallel in float32.
     Args:
         image: 4D numpy array (CZYX)
         pixelsize_in: original pixel size in z-axis
         pixelsize_out: desired pixel size in z-axis
+        method: interpolation method ('linear' or 'cubic')
+        parent_ui: ui to report the progress to (progress_update signal)
+        separable: use the 1D z-only spline (fast), otherwise ndimage.zoom on each chunk
+        num_workers: number of interpolation threads (default: number of cpus)
+        chunk_size: number of rows (y) interpolated per task
+        output_path: write the output to a memory-mapped .npy file (for large stacks)
     Returns:
-        interpolated: 4D numpy array (CZYX) with adjusted z-axis resolution
+        interpolated: 4D numpy array (CZYX) with adjusted z-axis resolution (same dtype as the image)
     """
-    if parent_ui:
-        parent_ui.progress_update.emit({"value": 0, "max": image.shape[0]})
-
-    # QUERY: how to speed up?
-    ch_interpolated = []
-    for i, channel in enumerate(image):
-        logging.info(f"Interpolating channel {i+1}/{image.shape[0]}")
-        ch_interpolated.append(
-            interpolate_z_stack(
-                image=channel,
-                pixelsize_in=pixelsize_in,
-                pixelsize_out=pixelsize_out,
-                method=method,
-            )
+    if image.ndim != 4:
+        raise ValueError(f"image must be a CZYX array, but got {image.ndim} dimensions")
+    if method not in INTERPOLATION_METHODS:
+        raise ValueError(
+            f"interpolation method  must be in {INTERPOLATION_METHODS} got {method}"
         )
-        if parent_ui:
-            parent_ui.progress_update.emit({"value": i + 1, "max": image.shape[0]})
-    return np.array(ch_interpolated)
+
+    order = 1 if method == "linear" else 3
+    scale_factor = pixelsize_in / pixelsize_out
+    nc, nz, ny, nx = image.shape
+    weights = _z_interpolation_matrix(nz, scale_factor, order)
+    shape = (nc, weights.shape[0], ny, nx)
+
+    if output_path is not None:
+        interpolated = np.lib.format.open_memmap(output_path, mode="w+", dtype=image.dtype, shape=shape)
+    else:
+        interpolated = np.empty(shape, dtype=image.dtype)
+
+    def interpolate_chunk(c: int, y0: int, y1: int) -> None:
+        chunk = image[c, :, y0:y1].astype(np.float32)
+        if separable:
+            result = (weights @ chunk.reshape(nz, -1)).reshape(shape[1], y1 - y0, nx)
+        else:
+            result = ndimage.zoom(chunk, (scale_factor, 1, 1), order=order, mode="reflect", prefilter=True)
+        interpolated[c, :, y0:y1] = _cast_interpolated(result, image.dtype)
+
+    chunk_size = max(1, chunk_size)
+    tasks = [(c, y0, min(y0 + chunk_size, ny)) for c in range(nc) for y0 in range(0, ny, chunk_size)]
+    num_workers = num_workers or os.cpu_count() or 1
+
+    if parent_ui:
+        parent_ui.progress_update.emit({"value": 0, "max": len(tasks)})
+
+    logging.info(f"Interpolating {nc} channels, {len(tasks)} chunks, {scale_factor:.2f}x along z ({method})")
+    with ThreadPoolExecutor(max_workers=num_workers) as executor:
+        futures = [executor.submit(interpolate_chunk, *task) for task in tasks]
+        for i, future in enumerate(as_completed(futures)):
+            future.result()
+            if parent_ui:
+                parent_ui.progress_update.emit({"value": i + 1, "max": len(tasks)})
+
+    if isinstance(interpolated, np.memmap):
+        interpolated.flush()
+    return interpolated
 
 
 def multi_channel_get_z_guass(image: np.ndarray, x: int, y: int, show: bool = False) -> List[float]:
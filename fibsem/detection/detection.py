@@ -1,12 +1,15 @@
-import copy
+import concurrent.futures
 import glob
 import json
 import logging
+import multiprocessing
 import os
+import queue
+import threading
 from abc import ABC, abstractmethod
 from copy import deepcopy
 from dataclasses import dataclass, field
-from typing import List, Tuple, Union, Optional, Dict, Any, Sequence
+from typing import List, Tuple, Union, Optional, Dict, Any, Iterable, Iterator, Sequence
 
 import matplotlib.patches as patches
 import matplotlib.pyplot as plt
@@ -32,7 +35,7 @@ from fibsem.structures import (
 
 try:
     from fibsem.segmentation import config as segcfg
-    from fibsem.segmentation.utils import decode_segmap_v2
+    from fibsem.segmentation.utils import decode_segmap, decode_segmap_v2
 except ImportError as e:
     logging.debug(f"Could not import segmentation util / config {e}")
 
@@ -828,25 +831,17 @@ def detect_features(
         fibsem_image = None
 
     if pixelsize is None:
-        try:
-            pixelsize = image.metadata.pixel_size.x
-        except Exception as e: # default (wrong value)
-            logging.debug(f"Error getting pixelsize: {e}, using default value of 25nm")
-            pixelsize = 25e-9
-        
+        pixelsize = _get_pixelsize(fibsem_image)
+
     # model inference
     mask = model.inference(image, rgb=False)
+    nc = None
     if mask.ndim == 3:
-        rgb = model.postprocess(mask, model.num_classes)
+        nc = model.num_classes
         mask = mask[0] # remove channel dim
-    else:
-        rgb = decode_segmap_v2(mask)
 
     # detect features
-    features = detect_features_v2(img=image, 
-                                  mask=mask, 
-                                  features=features, 
-                                  filter=filter, point=point)
+    features, rgb = _extract_features(image, mask, features, filter=filter, point=point, pixelsize=pixelsize, nc=nc)
 
     det = DetectedFeatures(
         features=features, # type: ignore
@@ -858,13 +853,232 @@ def detect_features(
         checkpoint=model.checkpoint
     )
 
+    return det
+
+
+DEFAULT_DETECTION_BATCH_SIZE = 4
+DEFAULT_DETECTION_PREFETCH = 2
+
+_DETECTION_DONE = object()
+
+
+def _get_pixelsize(fibsem_image: Optional[FibsemImage]) -> float:
+    try:
+        return fibsem_image.metadata.pixel_size.x
+    except Exception as e: # default (wrong value)
+        logging.debug(f"Error getting pixelsize: {e}, using default value of 25nm")
+        return 25e-9
+
+
+def _extract_features(image: np.ndarray, mask: np.ndarray, features: Sequence[Feature], 
+                      filter: bool, point: Optional[Point], pixelsize: float, 
+                      nc: Optional[int] = None) -> Tuple[List[Feature], np.ndarray]:
+    """Detect the features in the mask, and decode the mask to rgb. 
+    Module level so it can run in a worker process (detect_features_batch)."""
+    features = detect_features_v2(img=image, mask=mask, features=features, filter=filter, point=point)
+
     # distance in metres (from centre)
-    for feature in det.features:
+    for feature in features:
         feature.feature_m = conversions.image_to_microscope_image_coordinates(
-            feature.px, det.image.data, det.pixelsize
+            feature.px, image, pixelsize
         )
 
-    return det
+    if nc is not None:
+        rgb = decode_segmap(mask, nc=nc)
+    else:
+        rgb = decode_segmap_v2(mask)
+    return features, rgb
+
+
+def _extract_features_worker(image: np.ndarray, mask: np.ndarray, dtype: np.dtype, *args, **kwargs):
+    """Extract features in a worker process (the mask is sent as uint8 to reduce the transfer size)."""
+    return _extract_features(image, mask.astype(dtype, copy=False), *args, **kwargs)
+
+
+@dataclass
+class _DetectionItem:
+    image: np.ndarray
+    fibsem_image: Optional[FibsemImage]
+    pixelsize: float
+    mask: Optional[np.ndarray] = None
+    nc: Optional[int] = None
+
+
+def _load_detection_item(image: Union[np.ndarray, FibsemImage, str], pixelsize: Optional[float]) -> _DetectionItem:
+    if isinstance(image, (str, os.PathLike)):
+        image = FibsemImage.load(image)
+    fibsem_image = image if isinstance(image, FibsemImage) else None
+    data = image.data if fibsem_image is not None else image
+    if pixelsize is None:
+        pixelsize = _get_pixelsize(fibsem_image)
+    return _DetectionItem(image=data, fibsem_image=fibsem_image, pixelsize=pixelsize)
+
+
+def _batch_inference(model: 'SegmentationModel', items: List[_DetectionItem]) -> None:
+    """Run model inference on a batch of images. Images are stacked into a single batch if the model 
+    supports batch inference (and the images have the same shape), otherwise inference is per image."""
+    shapes = {item.image.shape for item in items}
+    if len(items) > 1 and getattr(model, "supports_batch_inference", False) and len(shapes) == 1 and items[0].image.ndim == 2:
+        masks = model.inference(np.stack([item.image for item in items]), rgb=False)
+        for item, mask in zip(items, masks):
+            item.mask, item.nc = mask, model.num_classes
+        return
+
+    for item in items:
+        mask = model.inference(item.image, rgb=False)
+        if mask.ndim == 3:
+            item.mask, item.nc = mask[0], model.num_classes
+        else:
+            item.mask = mask
+
+
+def _put(q: queue.Queue, item, stop: threading.Event) -> bool:
+    """Put an item on the queue, unless the pipeline is stopped. Returns whether the item was queued."""
+    while not stop.is_set():
+        try:
+            q.put(item, timeout=0.1)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+
+def _get(q: queue.Queue, stop: threading.Event):
+    """Get an item from the queue, unless the pipeline is stopped (returns _DETECTION_DONE)."""
+    while not stop.is_set():
+        try:
+            return q.get(timeout=0.1)
+        except queue.Empty:
+            continue
+    return _DETECTION_DONE
+
+
+def detect_features_batch(
+    images: Iterable[Union[np.ndarray, FibsemImage, str]],
+    model: 'SegmentationModel',
+    features: Sequence[Feature],
+    pixelsize: Optional[float] = None,
+    filter: bool = True,
+    point: Optional[Point] = None,
+    batch_size: int = DEFAULT_DETECTION_BATCH_SIZE,
+    prefetch: int = DEFAULT_DETECTION_PREFETCH,
+    num_workers: Optional[int] = None,
+) -> Iterator[DetectedFeatures]:
+    """Detect features in a stream of images. Equivalent to calling detect_features on each image,
+    but loading, model inference and feature extraction are pipelined:
+        - images (arrays, FibsemImages or filenames) are loaded by a prefetching loader thread,
+        - model inference runs in batches on a worker thread,
+        - feature extraction runs in a process pool.
+    Args:
+        images: The images to detect features in (filenames are loaded with FibsemImage.load).
+        model: The segmentation model.
+        features: The features to detect (copied for each image).
+        pixelsize: The pixelsize of the images (default: from the image metadata).
+        filter: Filter the multi-feature detections to the best feature.
+        point: The point to filter the features to (closest).
+        batch_size: The number of images per model inference.
+        prefetch: The number of batches to load ahead of the model inference.
+        num_workers: The number of feature extraction processes (default: number of cpus). 
+            If 0, features are extracted in the calling thread.
+    Returns:
+        The detected features for each image, in the order of the images (as they become available).
+        Note: the fibsem_image of the detection references the input image (not a copy).
+    """
+    batch_size = max(1, batch_size)
+    loaded: queue.Queue = queue.Queue(maxsize=max(1, prefetch) * batch_size)
+    results: queue.Queue = queue.Queue(maxsize=max(1, prefetch) * batch_size)
+    stop = threading.Event()
+
+    executor = None
+    if num_workers is None or num_workers > 0:
+        executor = concurrent.futures.ProcessPoolExecutor(
+            max_workers=num_workers, mp_context=multiprocessing.get_context("spawn"))
+
+    def loader():
+        try:
+            for image in images:
+                if not _put(loaded, _load_detection_item(image, pixelsize), stop):
+                    return
+        except Exception as e:
+            _put(loaded, e, stop)
+            return
+        _put(loaded, _DETECTION_DONE, stop)
+
+    def submit(batch: List[_DetectionItem]) -> bool:
+        _batch_inference(model, batch)
+        for item in batch:
+            args = (deepcopy(features),)
+            kwargs = dict(filter=filter, point=point, pixelsize=item.pixelsize, nc=item.nc)
+            if executor is None:
+                job = None
+            elif item.mask.max(initial=0) < 256:
+                job = executor.submit(_extract_features_worker, item.image, item.mask.astype(np.uint8), 
+                                      item.mask.dtype, *args, **kwargs)
+            else:
+                job = executor.submit(_extract_features, item.image, item.mask, *args, **kwargs)
+            if not _put(results, (item, job, args, kwargs), stop):
+                return False
+        return True
+
+    def inference():
+        try:
+            batch = []
+            while True:
+                item = _get(loaded, stop)
+                if stop.is_set():
+                    return
+                if isinstance(item, Exception):
+                    _put(results, item, stop)
+                    return
+                if item is not _DETECTION_DONE:
+                    batch.append(item)
+                if batch and (len(batch) == batch_size or item is _DETECTION_DONE):
+                    if not submit(batch):
+                        return
+                    batch = []
+                if item is _DETECTION_DONE:
+                    break
+        except Exception as e:
+            _put(results, e, stop)
+            return
+        _put(results, _DETECTION_DONE, stop)
+
+    threads = [threading.Thread(target=loader, daemon=True), threading.Thread(target=inference, daemon=True)]
+    for thread in threads:
+        thread.start()
+
+    try:
+        while True:
+            result = results.get()
+            if result is _DETECTION_DONE:
+                break
+            if isinstance(result, Exception):
+                raise result
+            item, job, args, kwargs = result
+            if job is None:
+                dets, rgb = _extract_features(item.image, item.mask, *args, **kwargs)
+            else:
+                dets, rgb = job.result()
+            yield DetectedFeatures(
+                features=dets,
+                image=item.image,
+                mask=item.mask,
+                rgb=rgb,
+                pixelsize=item.pixelsize,
+                fibsem_image=item.fibsem_image,
+                checkpoint=model.checkpoint,
+            )
+    finally:
+        stop.set()
+        # unblock the loader / inference threads, if waiting for the queues
+        for q in (loaded, results):
+            while True:
+                try:
+                    q.get_nowait()
+                except queue.Empty:
+                    break
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
 
 
 def take_image_and_detect_features(
@@ -1077,20 +1291,15 @@ def mask_contours(image):
         # Convert the contour coordinates to integers
         contour = np.round(contour).astype(int)
 
-        # Create a polygonal mask for this contour
-        rr, cc = np.meshgrid(np.arange(mask.shape[0]), np.arange(mask.shape[1]), indexing='ij')
-        inside_contour = np.zeros_like(mask, dtype=np.uint8)
-        inside_contour[rr, cc] = 0
-        inside_contour[contour[:, 0], contour[:, 1]] = i+1
-
-        # mask the area inside the contour
+        # mask the area inside the contour (bbox-local, rather than a full size mask per contour)
         ymin, ymax = np.min(contour[:, 0]), np.max(contour[:, 0])
         xmin, xmax = np.min(contour[:, 1]), np.max(contour[:, 1])
+        mask[ymin:ymax, xmin:xmax] += np.uint8(i+1)
 
-        inside_contour[ymin:ymax, xmin:xmax] = i+1
-
-        # Apply the mask for this contour
-        mask = mask + inside_contour
+        # the contour points on the max edges are outside the area
+        outside = (contour[:, 0] >= ymax) | (contour[:, 1] >= xmax)
+        points = np.unique(contour[outside], axis=0)
+        mask[points[:, 0], points[:, 1]] += np.uint8(i+1)
 
     return mask
 
@@ -1106,19 +1315,22 @@ def detect_multi_features(image: np.ndarray, mask: np.ndarray, feature: Feature,
     mask = mask == class_idx # filter to class 
     mask = mask_contours(mask)
     idxs = np.unique(mask)
+    slices = ndimage.find_objects(mask)
 
+    # re-use a single feature mask, only the bbox of each instance is written / cleared
+    feature_mask = np.zeros_like(mask)
     features = []
     for idx in idxs:
         if idx==0:
             continue
 
-        # create a new image
-        feature_mask = np.zeros_like(mask)
-        feature_mask[mask==idx] = class_idx
+        slc = slices[idx - 1]
+        feature_mask[slc][mask[slc] == idx] = class_idx
 
         # detect features
         feature.detect(image, feature_mask)
         features.append(deepcopy(feature))
+        feature_mask[slc] = 0
 
     if features == []:
         logging.info(f"No features detected for {feature.name}")
@@ -1196,10 +1408,7 @@ def plot_instance_masks(image: np.ndarray, mask: np.ndarray, objects: List[dict]
 
         c = obj["class"]
         instance = obj["instance"]
-        imask = np.array(obj["mask"])
-
-        mask = np.zeros_like(mask)
-        mask[imask[:, 0], imask[:, 1]] = 1
+        mask = get_instance_mask(obj, mask.shape).astype(mask.dtype)
 
         tmp_cmap_rgb = [(0, 0, 0), segcfg.CLASS_COLORS_RGB[c]] # black and class color
 
@@ -1258,10 +1467,7 @@ def plot_instance_masks_grid(image: np.ndarray, mask: np.ndarray,
 
             c = obj["class"]
             instance = obj["instance"]
-            imask = np.array(obj["mask"])
-
-            mask = np.zeros_like(mask)
-            mask[imask[:, 0], imask[:, 1]] = 1
+            mask = get_instance_mask(obj, mask.shape).astype(mask.dtype)
 
             tmp_cmap_rgb = [(0, 0, 0), segcfg.CLASS_COLORS_RGB[c]] # black and class color
 
@@ -1345,11 +1551,9 @@ def plot_keypoints(mask: np.ndarray, objects: List[dict]):
 
         c = obj["class"]
         instance = obj["instance"]
-        imask = np.array(obj["mask"])
         keypoints = obj["keypoints"]
 
-        mask = np.zeros_like(mask)
-        mask[imask[:, 0], imask[:, 1]] = 1   
+        mask = get_instance_mask(obj, mask.shape).astype(mask.dtype)
         
         # filter points for specific classes
         mmap = {
@@ -1377,72 +1581,125 @@ def plot_keypoints(mask: np.ndarray, objects: List[dict]):
         plt.legend()
         plt.show()
 
-def get_objects(mask: np.ndarray, ignore_classes: List[int] = [0, 3], min_pixels: int = 100):
-    """ Extract individual objects from a mask """
+def get_objects(mask: np.ndarray, ignore_classes: List[int] = [0, 3], min_pixels: int = 100, mask_format: str = "coords"):
+    """ Extract individual objects from a mask.
+    The instances of all classes are labelled in a single pass, and each instance is processed within its bounding box.
+    Args:
+        mask: The class mask.
+        ignore_classes: The classes to ignore.
+        min_pixels: The minimum number of pixels for an instance.
+        mask_format: The format of the instance mask: "coords" (pixel coordinates), "rle" (run length encoding
+            of the bbox-local mask, see encode_rle) or "bbox" (bbox-local boolean array).
+            The format is stored in each object (see get_instance_mask).
+    """
+    if mask_format not in ("coords", "rle", "bbox"):
+        raise ValueError(f"Unsupported mask format: {mask_format}")
 
-    classes = [c for c in np.unique(mask) if c not in ignore_classes] # TODO: make this more granular, e.g. ignore-bbox, ignore-keypoints, etc.
+    # label the instances of all classes at once (connected pixels of the same class), ignored classes are background
+    ignore = np.isin(mask, ignore_classes)
+    label = measure.label(np.where(ignore, 0, mask.astype(np.int64) + 1), background=0)
+    if label.max() == 0:
+        return []
+    counts = np.bincount(label.ravel())
 
+    # labels are assigned in scan order, so the instance index is the rank within the class
     objects = []
-    for c in classes:
-        mask_c = mask == c
+    n_instances = {}
+    for i, slc in enumerate(ndimage.find_objects(label), start=1):
+        if slc is None:
+            continue
+        crop = label[slc] == i
+        c = mask[slc][crop][0]
+        instance = n_instances[c] = n_instances.get(c, 0) + 1
 
-        # extract instance labels
-        label = measure.label(mask_c).astype(np.uint8)
-        instances = np.unique(label)  # 0 = background, 1 = instance 1, 2 = instance 2, etc.
-        for instance in instances[1:]: # skip background
-            
-            # get bounding box
-            instance_mask = np.argwhere(label==instance)
+        # check how many pixels are in the instance mask
+        if counts[i] < min_pixels:
+            logging.debug(f"skipping instance {instance} of class {c} because it has {counts[i]} pixels. The minimum is {min_pixels}")
+            continue
 
-            # check how many pixels are in the instance mask
-            if len(instance_mask) < min_pixels:
-                logging.debug(f"skipping instance {instance} of class {c} because it has {len(instance_mask)} pixels. The minimum is {min_pixels}")
-                continue
+        ystart, xstart = slc[0].start, slc[1].start
+        bbox = [(ystart, xstart), (slc[0].stop, slc[1].stop)]
+        keypoints = _get_keypoints_from_crop(crop, offset=(ystart, xstart))
 
-            (ystart, xstart), (ystop, xstop) = instance_mask.min(0), instance_mask.max(0) + 1
-            bbox = [(ystart, xstart), (ystop, xstop)]
-            
-            # get keypoints
-            kmask = np.zeros_like(mask)
-            kmask[instance_mask[:, 0], instance_mask[:, 1]] = 1   
-            keypoints = get_keypoints(kmask) # TODO: fix inefficiency here
+        if mask_format == "coords":
+            instance_mask = np.argwhere(crop) + (ystart, xstart)
+        elif mask_format == "rle":
+            instance_mask = encode_rle(crop)
+        else:
+            instance_mask = crop
 
-            # save instance masks
-            odict = {"class": c, "instance": instance, 
-                     "mask": instance_mask, 
-                     "bbox": bbox, "keypoints": keypoints}
-            objects.append(copy.deepcopy(odict))
+        objects.append({"class": c, "instance": instance,
+                        "mask": instance_mask, "mask_format": mask_format,
+                        "bbox": bbox, "keypoints": keypoints})
 
+    # sort by class, then instance
+    objects.sort(key=lambda obj: (obj["class"], obj["instance"]))
     return objects
 
 
-def get_keypoints(mask: np.ndarray) -> dict:
-        """Get keypoints from instance mask.
-        Args:
-            mask (np.ndarray): instance mask    
-        """
+def encode_rle(mask: np.ndarray) -> dict:
+    """Run length encode a boolean mask (row major). The counts alternate between
+    background and foreground, starting with background.
+    Args:
+        mask (np.ndarray): boolean mask (e.g. bbox-local instance mask)
+    """
+    flat = np.asarray(mask, dtype=bool).ravel()
+    changes = np.flatnonzero(flat[1:] != flat[:-1]) + 1
+    boundaries = np.concatenate([[0], changes, [flat.size]])
+    counts = np.diff(boundaries).tolist()
+    if flat.size and flat[0]:
+        counts = [0] + counts
+    return {"size": list(mask.shape), "counts": counts}
+
+
+def decode_rle(rle: dict) -> np.ndarray:
+    """Decode a run length encoded mask (see encode_rle)."""
+    counts = np.asarray(rle["counts"], dtype=np.int64)
+    values = np.arange(len(counts)) % 2 == 1
+    return np.repeat(values, counts).reshape(rle["size"])
+
+
+def get_instance_mask(obj: dict, shape: Tuple[int, int]) -> np.ndarray:
+    """Get the full image boolean mask of an object (see get_objects), for any mask format.
+    Objects without a mask_format (e.g. older data.json files) are pixel coordinates.
+    Args:
+        obj (dict): the object, with the mask, mask_format and bbox
+        shape (Tuple[int, int]): the shape of the image
+    """
+    mask_format = obj.get("mask_format", "coords")
+    mask = np.zeros(shape[:2], dtype=bool)
+    if mask_format == "coords":
+        imask = np.asarray(obj["mask"], dtype=np.int64).reshape(-1, 2)
+        mask[imask[:, 0], imask[:, 1]] = True
+        return mask
+
+    if mask_format == "rle":
+        crop = decode_rle(obj["mask"])
+    elif mask_format == "bbox":
+        crop = np.asarray(obj["mask"], dtype=bool)
+    else:
+        raise ValueError(f"Unsupported mask format: {mask_format}")
+    (ystart, xstart), _ = obj["bbox"]
+    mask[ystart:ystart + crop.shape[0], xstart:xstart + crop.shape[1]] = crop
+    return mask
 
-        # get center of mass, from list of points
-        cy, cx = np.array(ndimage.center_of_mass(mask))
 
-        # get edges
-        imask = np.argwhere(mask==1) # probably inefficient to recompute this
+def _get_keypoints_from_crop(crop: np.ndarray, offset: Tuple[int, int] = (0, 0)) -> dict:
+    """Get keypoints from a bbox-local instance mask, in image coordinates."""
+    ys, xs = np.nonzero(crop)
+    cy, cx = ys.mean() + offset[0], xs.mean() + offset[1]
+    ymin, ymax = ys.min() + offset[0], ys.max() + offset[0]
+    xmin, xmax = xs.min() + offset[1], xs.max() + offset[1]
+    return _keypoints(cx, cy, xmin, xmax, ymin, ymax)
 
-        ymin = np.min(imask[:, 0])
-        ymax = np.max(imask[:, 0])
-        xmin = np.min(imask[:, 1])
-        xmax = np.max(imask[:, 1])
 
+def _keypoints(cx, cy, xmin, xmax, ymin, ymax) -> dict:
         centre = cx, cy
         bot = cx, ymin
         top = cx, ymax
         left = xmin, cy
         right = xmax, cy
 
-        # get width and height
-        w = xmax - xmin
-        h = ymax - ymin   
-        
         # corners
         tl = xmin, ymin
         tr = xmax, ymin
@@ -1458,6 +1715,23 @@ def get_keypoints(mask: np.ndarray) -> dict:
         return keypoints 
 
 
+def get_keypoints(mask: np.ndarray) -> dict:
+        """Get keypoints from instance mask.
+        Args:
+            mask (np.ndarray): instance mask    
+        """
+
+        # get center of mass, from list of points
+        cy, cx = np.array(ndimage.center_of_mass(mask))
+
+        # get edges, within the bbox of the instance
+        slc = ndimage.find_objects((mask == 1).astype(np.uint8))[0]
+        ymin, ymax = slc[0].start, slc[0].stop - 1
+        xmin, xmax = slc[1].start, slc[1].stop - 1
+
+        return _keypoints(cx, cy, xmin, xmax, ymin, ymax)
+
+
 # SAVE/ LOAD data as json
 
 
@@ -1484,7 +1758,7 @@ def load_json(filename):
 
 
 
-def generate_segmentation_objects(data_path: str, labels_path: str, dataset_json_path: str, min_pixels: int = 100, save: bool=True):
+def generate_segmentation_objects(data_path: str, labels_path: str, dataset_json_path: str, min_pixels: int = 100, save: bool=True, mask_format: str = "coords"):
     image_filenames = sorted(glob.glob(os.path.join(data_path, "*.tif")))
     label_filenames = sorted(glob.glob(os.path.join(labels_path, "*.tif")))
 
@@ -1499,14 +1773,14 @@ def generate_segmentation_objects(data_path: str, labels_path: str, dataset_json
         mask = tff.imread(label_fname)
 
         # get objects
-        objects = get_objects(mask, min_pixels=min_pixels)
+        objects = get_objects(mask, min_pixels=min_pixels, mask_format=mask_format)
 
         # save 
-        dat.append(copy.deepcopy({"filename": os.path.basename(img_fname), 
-                                "path": os.path.dirname(img_fname), 
-                                "mask_filename": os.path.basename(label_fname), 
-                                "mask_path": os.path.dirname(label_fname),
-                                "objects": objects}))
+        dat.append({"filename": os.path.basename(img_fname), 
+                    "path": os.path.dirname(img_fname), 
+                    "mask_filename": os.path.basename(label_fname), 
+                    "mask_path": os.path.dirname(label_fname),
+                    "objects": objects})
 
     if save:
         print(f"Saving data.json to {dataset_json_path}")
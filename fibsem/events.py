@@ -0,0 +1,151 @@
+"""Structured event log for machine consumption.
+
+Telemetry (stage moves, beam changes, acquisitions, milling progress) is written as JSON Lines
+alongside the text logfile, so reporting tools can read events directly rather than parsing
+dictionaries back out of the text log. Events are put on a queue by the caller and written by a
+background listener thread, so logging an event does not block on disk i/o. When the event log
+exceeds its maximum size it is rolled over into a gzip compressed file.
+
+Usage:
+    configure_event_log(path)
+    log_event("move_stage_absolute", position=position.to_dict())
+    events = list(read_events(path))
+"""
+
+import atexit
+import glob
+import gzip
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import shutil
+import threading
+from typing import Any, Dict, Iterator, Optional
+
+EVENT_LOGGER_NAME = "fibsem.events"
+EVENT_LOG_FILENAME = "events.jsonl"
+DEFAULT_MAX_EVENT_LOG_BYTES = 64 * 1024 * 1024
+
+_event_logger = logging.getLogger(EVENT_LOGGER_NAME)
+_event_logger.propagate = False     # events are not written to the text logfile
+_event_logger.setLevel(logging.INFO)
+
+_listener: Optional[logging.handlers.QueueListener] = None
+_listener_lock = threading.Lock()
+
+
+def log_event(event: str, **data: Any) -> None:
+    """Log a structured event to the event log (if configured).
+    Args:
+        event: The event type (e.g. "move_stage_absolute", "acquire_image").
+        data: The event data, must be json serialisable (other values are written as strings).
+    """
+    if not _event_logger.handlers:
+        return
+    _event_logger.info(event, extra={"event_data": data})
+
+
+class JsonlEventHandler(logging.Handler):
+    """Write event records as JSON Lines, rolling over into a compressed file when full.
+    Args:
+        filename: The path to the event log file.
+        max_bytes: The size at which the event log is rolled over (0 to disable).
+    """
+    def __init__(self, filename: str, max_bytes: int = DEFAULT_MAX_EVENT_LOG_BYTES):
+        super().__init__()
+        self.filename = filename
+        self.max_bytes = max_bytes
+        self._stream = open(filename, "a", encoding="utf-8")
+
+    def emit(self, record: logging.LogRecord) -> None:
+        try:
+            ddict = {"timestamp": record.created, "event": record.getMessage()}
+            ddict.update(getattr(record, "event_data", {}))
+            self._stream.write(json.dumps(ddict, default=str) + "\n")
+            self._stream.flush()
+            if self.max_bytes and self._stream.tell() >= self.max_bytes:
+                self.rollover()
+        except Exception:
+            self.handleError(record)
+
+    def rollover(self) -> str:
+        """Compress the current event log into the next numbered rollover file, and start a new log."""
+        self._stream.close()
+        n = len(glob.glob(f"{self.filename}.*.gz"))
+        rollover_path = f"{self.filename}.{n:04d}.gz"
+        with open(self.filename, "rb") as src, gzip.open(rollover_path, "wb") as dst:
+            shutil.copyfileobj(src, dst)
+        self._stream = open(self.filename, "w", encoding="utf-8")
+        return rollover_path
+
+    def close(self) -> None:
+        self._stream.close()
+        super().close()
+
+
+def configure_event_log(path: str,
+                        filename: str = EVENT_LOG_FILENAME,
+                        max_bytes: int = DEFAULT_MAX_EVENT_LOG_BYTES) -> str:
+    """Configure the event log in the directory, replacing any previous event log.
+    Args:
+        path: The directory to write the event log to.
+        filename: The filename of the event log.
+        max_bytes: The size at which the event log is rolled over into a compressed file.
+    Returns:
+        The path to the event log.
+    """
+    global _listener
+    stop_event_log()
+    os.makedirs(path, exist_ok=True)
+    filename = os.path.join(path, filename)
+
+    handler = JsonlEventHandler(filename, max_bytes=max_bytes)
+    event_queue: queue.Queue = queue.Queue(-1)
+    with _listener_lock:
+        _listener = logging.handlers.QueueListener(event_queue, handler)
+        _listener.start()
+        _event_logger.addHandler(logging.handlers.QueueHandler(event_queue))
+    return filename
+
+
+def stop_event_log() -> None:
+    """Stop the event log, writing any pending events."""
+    global _listener
+    with _listener_lock:
+        for handler in list(_event_logger.handlers):
+            _event_logger.removeHandler(handler)
+        if _listener is not None:
+            _listener.stop()
+            for handler in _listener.handlers:
+                handler.close()
+            _listener = None
+
+
+atexit.register(stop_event_log)
+
+
+def read_events(path: str, event: Optional[str] = None, filename: str = EVENT_LOG_FILENAME) -> Iterator[Dict[str, Any]]:
+    """Read the events from an event log directory, including the compressed rollover files, in order.
+    Args:
+        path: The directory containing the event log.
+        event: Only return events of this type.
+        filename: The filename of the event log.
+    Returns:
+        Iterator of event dictionaries.
+    """
+    filename = os.path.join(path, filename)
+    paths = sorted(glob.glob(f"{filename}.*.gz"))
+    if os.path.exists(filename):
+        paths.append(filename)
+    for fname in paths:
+        opener = gzip.open if fname.endswith(".gz") else open
+        with opener(fname, "rt", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    ddict = json.loads(line)
+                except json.JSONDecodeError:
+                    continue    # incomplete trailing line
+                if event is None or ddict.get("event") == event:
+                    yield ddict
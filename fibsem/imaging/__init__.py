@@ -1,5 +1,6 @@
 from fibsem.imaging.spot import *
 from fibsem.imaging.autogamma import *
 from fibsem.imaging.masks import *
+from fibsem.imaging.scan_path import *
 from fibsem.imaging.tiled import *
 from fibsem.imaging.utils import *
\ No newline at end of file
@@ -38,14 +38,10 @@ def auto_gamma(
     """
 
     if method == "autogamma":
-        std = np.std(image.data)  # unused variable?
         mean = np.mean(image.data)
         diff = mean - 255 / 2.0
-        gam = np.clip(
-            min_gamma, 1 + diff * scale_factor, max_gamma
-        )
-        if abs(diff) < gamma_threshold:
-            gam = 1.0
+        gam = calculate_gamma(mean, min_gamma=min_gamma, max_gamma=max_gamma,
+                              scale_factor=scale_factor, gamma_threshold=gamma_threshold)
         if image.metadata is not None:
             logging.debug(
                 f"AUTO_GAMMA | {image.metadata.image_settings.beam_type} | {diff:.3f} | {gam:.3f}"
@@ -60,6 +56,46 @@ def auto_gamma(
     return image
 
 
+def calculate_gamma(
+    mean: float,
+    min_gamma: float = 0.15,
+    max_gamma: float = 1.8,
+    scale_factor: float = 0.01,
+    gamma_threshold: int = 45,
+) -> float:
+    """Calculate the auto gamma value from the mean image intensity. See auto_gamma for parameter details.
+    Args:
+        mean (float): The mean intensity of the image (8-bit range).
+    Returns:
+        float: The gamma value to apply.
+    """
+    diff = mean - 255 / 2.0
+    if abs(diff) < gamma_threshold:
+        return 1.0
+    return float(np.clip(min_gamma, 1 + diff * scale_factor, max_gamma))
+
+def histogram_mean(histogram: np.ndarray) -> float:
+    """Calculate the mean intensity from an intensity histogram (bin index = intensity).
+    Used to calculate the gamma value incrementally, e.g. from per-tile histograms."""
+    histogram = np.asarray(histogram, dtype=np.float64)
+    total = histogram.sum()
+    if total == 0:
+        return 0.0
+    return float(np.dot(np.arange(histogram.size), histogram) / total)
+
+def apply_gamma(data: np.ndarray, gamma: float) -> np.ndarray:
+    """Apply gamma correction to image data. Uses a lookup table for 8-bit data.
+    Args:
+        data (np.ndarray): The image data.
+        gamma (float): The gamma value.
+    Returns:
+        np.ndarray: The gamma corrected image data.
+    """
+    if data.dtype != np.uint8:
+        return exposure.adjust_gamma(data, gamma)
+    lut = exposure.adjust_gamma(np.arange(256, dtype=np.uint8), gamma)
+    return np.take(lut, data)
+
 
 def apply_clahe(
     image: FibsemImage,
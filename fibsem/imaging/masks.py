@@ -1,3 +1,5 @@
+from functools import lru_cache
+
 import numpy as np
 import scipy.ndimage as ndi
 from fibsem import conversions
@@ -56,6 +58,22 @@ def create_bandpass_mask(
     return mask
 
 
+@lru_cache(maxsize=16)
+def get_bandpass_mask(shape: tuple, lp: int = 32, hp: int = 2, sigma: int = 3) -> np.ndarray:
+    """Cached version of create_bandpass_mask. The returned mask is shared, and read-only."""
+    mask = create_bandpass_mask(shape=tuple(shape), lp=lp, hp=hp, sigma=sigma)
+    mask.flags.writeable = False
+    return mask
+
+
+@lru_cache(maxsize=16)
+def get_rectangular_mask(shape: tuple) -> np.ndarray:
+    """Cached version of _mask_rectangular (default parameters). The returned mask is shared, and read-only."""
+    mask = _mask_rectangular(tuple(shape))
+    mask.flags.writeable = False
+    return mask
+
+
 # FROM AUTOLAMELLA
 def _mask_rectangular(image_shape, sigma=5.0, *, start=None, extent=None):
     """Make a rectangular mask with soft edges for image normalization.
@@ -0,0 +1,310 @@
+"""Multi-resolution (pyramid) chunked storage for overview mosaics.
+
+Mosaics are stored as an OME-Zarr (v0.4) style multiscale image on local disk: a zarr (v2) group
+with one chunked array per resolution level (level 0 = full resolution, each level is downsampled 2x).
+Chunks are written directly (raw or zlib compressed), so the store can be written incrementally during
+acquisition without requiring the zarr package, and can be opened with zarr / napari-ome-zarr.
+
+The reader returns lazily loaded levels, which only read the chunks required for the requested region.
+The levels can be passed directly to napari as a multiscale image.
+"""
+from __future__ import annotations
+
+import json
+import logging
+import math
+import os
+import threading
+import zlib
+from typing import Dict, List, Optional, Tuple, Union
+
+import numpy as np
+
+PYRAMID_SUFFIX = ".ome.zarr"
+DEFAULT_CHUNK_SIZE = 512
+DIMENSION_SEPARATOR = "/"
+
+
+def _level_shapes(shape: Tuple[int, int], chunk_size: int, n_levels: Optional[int] = None) -> List[Tuple[int, int]]:
+    """Return the shape of each level, downsampling by 2 until the image fits in a single chunk."""
+    shapes = [tuple(shape)]
+    while (n_levels is None and max(shapes[-1]) > chunk_size) or (n_levels is not None and len(shapes) < n_levels):
+        h, w = shapes[-1]
+        if h == 1 and w == 1:
+            break
+        shapes.append((math.ceil(h / 2), math.ceil(w / 2)))
+    return shapes
+
+
+def _downsample(data: np.ndarray) -> np.ndarray:
+    """Downsample by 2 (mean of 2x2 blocks). Odd edges are padded by repeating the edge pixels."""
+    h, w = data.shape
+    if h % 2 or w % 2:
+        data = np.pad(data, ((0, h % 2), (0, w % 2)), mode="edge")
+    out = data.reshape(data.shape[0] // 2, 2, data.shape[1] // 2, 2).mean(axis=(1, 3))
+    if np.issubdtype(data.dtype, np.integer):
+        out = np.round(out)
+    return out.astype(data.dtype)
+
+
+class PyramidLevel:
+    """A lazily loaded pyramid level (zarr v2 array). Supports numpy style 2D slicing,
+    only reading (and decompressing) the chunks that intersect the requested region."""
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(os.path.join(path, ".zarray")) as f:
+            meta = json.load(f)
+        self.shape: Tuple[int, int] = tuple(meta["shape"])
+        self.chunks: Tuple[int, int] = tuple(meta["chunks"])
+        self.dtype = np.dtype(meta["dtype"])
+        self.fill_value = meta.get("fill_value", 0) or 0
+        self.separator = meta.get("dimension_separator", ".")
+        compressor = meta.get("compressor", None)
+        self.compressor: Optional[str] = compressor["id"] if compressor else None
+        self.compression_level: int = compressor.get("level", 1) if compressor else 0
+
+    @property
+    def ndim(self) -> int:
+        return len(self.shape)
+
+    @property
+    def size(self) -> int:
+        return int(np.prod(self.shape))
+
+    def __len__(self) -> int:
+        return self.shape[0]
+
+    def _chunk_path(self, cy: int, cx: int) -> str:
+        return os.path.join(self.path, *f"{cy}{self.separator}{cx}".split("/"))
+
+    def read_chunk(self, cy: int, cx: int) -> np.ndarray:
+        """Read a single (full size) chunk. Missing chunks are returned as the fill value."""
+        path = self._chunk_path(cy, cx)
+        if not os.path.exists(path):
+            return np.full(self.chunks, self.fill_value, dtype=self.dtype)
+        with open(path, "rb") as f:
+            buf = f.read()
+        if self.compressor == "zlib":
+            buf = zlib.decompress(buf)
+        return np.frombuffer(buf, dtype=self.dtype).reshape(self.chunks)
+
+    def write_chunk(self, cy: int, cx: int, data: np.ndarray) -> None:
+        """Write a single (full size) chunk."""
+        path = self._chunk_path(cy, cx)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        buf = np.ascontiguousarray(data, dtype=self.dtype).tobytes()
+        if self.compressor == "zlib":
+            buf = zlib.compress(buf, self.compression_level)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(buf)
+        os.replace(tmp_path, path) # readers never see a partial chunk
+
+    def _chunk_ranges(self, y0: int, y1: int, x0: int, x1: int):
+        ch, cw = self.chunks
+        for cy in range(y0 // ch, (y1 - 1) // ch + 1):
+            for cx in range(x0 // cw, (x1 - 1) // cw + 1):
+                # intersection of the region and the chunk, in image coordinates
+                iy0, iy1 = max(y0, cy * ch), min(y1, (cy + 1) * ch)
+                ix0, ix1 = max(x0, cx * cw), min(x1, (cx + 1) * cw)
+                yield cy, cx, iy0, iy1, ix0, ix1
+
+    def read(self, y0: int, y1: int, x0: int, x1: int) -> np.ndarray:
+        """Read a region of the level."""
+        out = np.empty((max(y1 - y0, 0), max(x1 - x0, 0)), dtype=self.dtype)
+        ch, cw = self.chunks
+        if out.size == 0:
+            return out
+        for cy, cx, iy0, iy1, ix0, ix1 in self._chunk_ranges(y0, y1, x0, x1):
+            chunk = self.read_chunk(cy, cx)
+            out[iy0 - y0:iy1 - y0, ix0 - x0:ix1 - x0] = chunk[iy0 - cy * ch:iy1 - cy * ch, ix0 - cx * cw:ix1 - cx * cw]
+        return out
+
+    def write(self, y0: int, x0: int, data: np.ndarray) -> None:
+        """Write a region of the level (read-modify-write for partially covered chunks)."""
+        y1, x1 = min(y0 + data.shape[0], self.shape[0]), min(x0 + data.shape[1], self.shape[1])
+        ch, cw = self.chunks
+        for cy, cx, iy0, iy1, ix0, ix1 in self._chunk_ranges(y0, y1, x0, x1):
+            if (iy1 - iy0, ix1 - ix0) == (ch, cw):
+                chunk = np.empty(self.chunks, dtype=self.dtype)
+            else:
+                chunk = self.read_chunk(cy, cx).copy()
+            chunk[iy0 - cy * ch:iy1 - cy * ch, ix0 - cx * cw:ix1 - cx * cw] = data[iy0 - y0:iy1 - y0, ix0 - x0:ix1 - x0]
+            self.write_chunk(cy, cx, chunk)
+
+    def __getitem__(self, key) -> np.ndarray:
+        if not isinstance(key, tuple):
+            key = (key,)
+        key = key + (slice(None),) * (2 - len(key))
+        ranges, squeeze, steps = [], [], []
+        for axis, k in enumerate(key):
+            n = self.shape[axis]
+            if isinstance(k, slice):
+                start, stop, step = k.indices(n)
+                if step < 0:
+                    raise IndexError("Negative steps are not supported.")
+                ranges.append((start, max(start, stop)))
+                steps.append(step)
+            else:
+                k = int(k)
+                k = k + n if k < 0 else k
+                if not 0 <= k < n:
+                    raise IndexError(f"Index {k} out of bounds for axis {axis} with size {n}")
+                ranges.append((k, k + 1))
+                steps.append(1)
+                squeeze.append(axis)
+        (y0, y1), (x0, x1) = ranges
+        out = self.read(y0, y1, x0, x1)[::steps[0], ::steps[1]]
+        if squeeze:
+            out = out.squeeze(axis=tuple(squeeze))
+        return out
+
+    def __array__(self, dtype=None, copy=None) -> np.ndarray:
+        arr = self.read(0, self.shape[0], 0, self.shape[1])
+        return arr.astype(dtype) if dtype is not None else arr
+
+    def __repr__(self) -> str:
+        return f"PyramidLevel(shape={self.shape}, chunks={self.chunks}, dtype={self.dtype}, path={self.path})"
+
+
+class OverviewPyramidWriter:
+    """Incrementally write a mosaic into a multi-resolution chunked store (OME-Zarr style).
+    Regions (e.g. tiles) can be written in any order, and from multiple threads.
+    Args:
+        path: The path to the store (directory), typically ending in .ome.zarr.
+        shape: The shape of the full resolution mosaic (rows, cols).
+        dtype: The data type of the mosaic.
+        chunk_size: The chunk size (pixels) for each level.
+        n_levels: The number of levels. Defaults to downsampling until the mosaic fits in a single chunk.
+        pixel_size: The full resolution pixel size (m), used for the multiscale scale metadata.
+        compression: The zlib compression level (None -> uncompressed).
+        metadata: Additional metadata to store in the group attributes (under 'fibsem').
+    """
+    def __init__(self,
+                 path: str,
+                 shape: Tuple[int, int],
+                 dtype: Union[np.dtype, type] = np.uint8,
+                 chunk_size: int = DEFAULT_CHUNK_SIZE,
+                 n_levels: Optional[int] = None,
+                 pixel_size: Optional[float] = None,
+                 compression: Optional[int] = None,
+                 metadata: Optional[dict] = None):
+        self.path = path
+        self.shape = tuple(shape)
+        self.dtype = np.dtype(dtype)
+        self.chunk_size = chunk_size
+        self.pixel_size = pixel_size
+        self._lock = threading.Lock()
+
+        os.makedirs(path, exist_ok=True)
+        with open(os.path.join(path, ".zgroup"), "w") as f:
+            json.dump({"zarr_format": 2}, f)
+
+        compressor = {"id": "zlib", "level": compression} if compression is not None else None
+        self.levels: List[PyramidLevel] = []
+        for level, level_shape in enumerate(_level_shapes(self.shape, chunk_size, n_levels)):
+            level_path = os.path.join(path, str(level))
+            os.makedirs(level_path, exist_ok=True)
+            with open(os.path.join(level_path, ".zarray"), "w") as f:
+                json.dump({
+                    "zarr_format": 2,
+                    "shape": list(level_shape),
+                    "chunks": [chunk_size, chunk_size],
+                    "dtype": self.dtype.str,
+                    "compressor": compressor,
+                    "fill_value": 0,
+                    "order": "C",
+                    "filters": None,
+                    "dimension_separator": DIMENSION_SEPARATOR,
+                }, f)
+            self.levels.append(PyramidLevel(level_path))
+        self.update_metadata(metadata)
+
+    def update_metadata(self, metadata: Optional[dict] = None) -> None:
+        """Write the multiscales (and optional fibsem) metadata to the group attributes."""
+        scale = (self.pixel_size or 1.0) * 1e6 # micrometer
+        attrs: Dict = {
+            "multiscales": [{
+                "version": "0.4",
+                "name": os.path.basename(self.path).replace(PYRAMID_SUFFIX, ""),
+                "axes": [
+                    {"name": "y", "type": "space", "unit": "micrometer"},
+                    {"name": "x", "type": "space", "unit": "micrometer"},
+                ],
+                "datasets": [
+                    {"path": str(level), "coordinateTransformations": [
+                        {"type": "scale", "scale": [scale * 2 ** level, scale * 2 ** level]}]}
+                    for level in range(len(self.levels))
+                ],
+                "type": "mean",
+            }],
+        }
+        if metadata is not None:
+            attrs["fibsem"] = metadata
+        with open(os.path.join(self.path, ".zattrs"), "w") as f:
+            json.dump(attrs, f)
+
+    def write(self, y: int, x: int, data: np.ndarray) -> None:
+        """Write a region into the full resolution level, and update the downsampled levels.
+        Args:
+            y: The row of the top left corner of the region (full resolution pixels).
+            x: The column of the top left corner of the region (full resolution pixels).
+            data: The region data.
+        """
+        # clip to the mosaic
+        data = data[max(0, -y):, max(0, -x):]
+        y, x = max(0, y), max(0, x)
+        data = data[:max(0, self.shape[0] - y), :max(0, self.shape[1] - x)]
+        if data.size == 0:
+            return
+
+        # chunks can be shared between regions, so writes are serialised
+        with self._lock:
+            self.levels[0].write(y, x, data.astype(self.dtype, copy=False))
+            y0, y1, x0, x1 = y, y + data.shape[0], x, x + data.shape[1]
+            for prev, level in zip(self.levels[:-1], self.levels[1:]):
+                # expand to even bounds, and downsample from the previous level
+                y0, x0 = y0 // 2 * 2, x0 // 2 * 2
+                y1, x1 = min(y1 + y1 % 2, prev.shape[0]), min(x1 + x1 % 2, prev.shape[1])
+                block = _downsample(prev.read(y0, y1, x0, x1))
+                y0, x0, y1, x1 = y0 // 2, x0 // 2, y0 // 2 + block.shape[0], x0 // 2 + block.shape[1]
+                level.write(y0, x0, block)
+
+    def write_array(self, data: np.ndarray) -> None:
+        """Write the full mosaic, one chunk-aligned band at a time."""
+        band = self.chunk_size * 4
+        for y in range(0, data.shape[0], band):
+            self.write(y, 0, data[y:y + band])
+
+
+def open_pyramid(path: str) -> List[PyramidLevel]:
+    """Open a pyramid store, returning the lazily loaded levels (full resolution first)."""
+    with open(os.path.join(path, ".zattrs")) as f:
+        attrs = json.load(f)
+    datasets = attrs["multiscales"][0]["datasets"]
+    return [PyramidLevel(os.path.join(path, ds["path"])) for ds in datasets]
+
+
+def load_pyramid_metadata(path: str) -> Optional[dict]:
+    """Load the fibsem metadata stored with the pyramid (if any)."""
+    with open(os.path.join(path, ".zattrs")) as f:
+        attrs = json.load(f)
+    return attrs.get("fibsem", None)
+
+
+def get_pyramid_path(image_path: str) -> str:
+    """Return the pyramid path for an image path, e.g. overview.tif -> overview.ome.zarr"""
+    base, ext = os.path.splitext(str(image_path))
+    if ext.lower() not in (".tif", ".tiff"):
+        base = str(image_path)
+    return base + PYRAMID_SUFFIX
+
+
+def select_level(levels: List[PyramidLevel], max_size: int) -> int:
+    """Return the index of the highest resolution level with both dimensions <= max_size."""
+    for i, level in enumerate(levels):
+        if max(level.shape) <= max_size:
+            return i
+    logging.debug(f"No pyramid level fits in {max_size}px, returning the lowest resolution level.")
+    return len(levels) - 1
@@ -0,0 +1,305 @@
+"""Scan path planning for tiled (overview) acquisitions.
+
+Tiles are indexed as (row, col) in the overview grid, with row 0 at the top and col 0 on the left.
+A scan plan is an ordered list of tiles to acquire, and the estimated stage travel / time to acquire them.
+"""
+from __future__ import annotations
+
+import logging
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, List, Optional, Tuple
+
+import numpy as np
+
+if TYPE_CHECKING:
+    from fibsem.structures import OverviewAcquisitionSettings
+
+# supported scan orders
+SCAN_ORDER_RASTER = "raster"            # row by row, returning to the start of each row (legacy behaviour)
+SCAN_ORDER_SERPENTINE = "serpentine"    # row by row, alternating direction (boustrophedon)
+SCAN_ORDER_SPIRAL = "spiral"            # outwards from the centre of the grid
+SCAN_ORDER_SHORTEST = "shortest"        # travel minimising order (nearest neighbour + 2-opt)
+SCAN_ORDERS = (SCAN_ORDER_RASTER, SCAN_ORDER_SERPENTINE, SCAN_ORDER_SPIRAL, SCAN_ORDER_SHORTEST)
+
+# stage model for estimating scan times
+DEFAULT_STAGE_SPEED = 1e-3  # m/s
+DEFAULT_SETTLE_TIME = 0.5   # s, per stage move
+
+Tile = Tuple[int, int]
+
+
+@dataclass
+class ScanPlan:
+    """An ordered set of tiles to acquire, with the estimated cost of acquiring them.
+
+    Attributes:
+        scan_order: The scan order used to generate the plan.
+        tiles: The tiles to acquire, in acquisition order (row, col).
+        tile_size: The distance between adjacent tiles (m).
+        n_moves: The number of stage moves required.
+        travel: The estimated total stage travel (m).
+        estimated_time: The estimated total time (s), including stage moves and acquisition.
+    """
+    scan_order: str
+    tiles: List[Tile] = field(default_factory=list)
+    tile_size: float = 0.0
+    n_moves: int = 0
+    travel: float = 0.0
+    estimated_time: float = 0.0
+
+    @property
+    def n_tiles(self) -> int:
+        return len(self.tiles)
+
+    def to_dict(self) -> dict:
+        return {
+            "scan_order": self.scan_order,
+            "tiles": [list(t) for t in self.tiles],
+            "tile_size": self.tile_size,
+            "n_moves": self.n_moves,
+            "travel": self.travel,
+            "estimated_time": self.estimated_time,
+        }
+
+    @property
+    def pretty(self) -> str:
+        return (f"{self.scan_order}: {self.n_tiles} tiles, {self.n_moves} moves, "
+                f"travel: {self.travel*1e3:.2f} mm, estimated time: {self.estimated_time:.1f} s")
+
+
+def _grid_tiles(nrows: int, ncols: int, mask: Optional[np.ndarray] = None) -> List[Tile]:
+    """Return the tiles in the grid (row-major), filtered by the mask."""
+    if mask is not None:
+        mask = np.asarray(mask, dtype=bool)
+        if mask.shape != (nrows, ncols):
+            raise ValueError(f"Mask shape {mask.shape} does not match grid shape {(nrows, ncols)}")
+    return [(i, j) for i in range(nrows) for j in range(ncols) if mask is None or mask[i, j]]
+
+
+def raster_order(nrows: int, ncols: int, mask: Optional[np.ndarray] = None) -> List[Tile]:
+    """Row by row, left to right."""
+    return _grid_tiles(nrows, ncols, mask)
+
+
+def serpentine_order(nrows: int, ncols: int, mask: Optional[np.ndarray] = None) -> List[Tile]:
+    """Row by row, alternating direction on each row (boustrophedon)."""
+    tiles = set(_grid_tiles(nrows, ncols, mask))
+    order: List[Tile] = []
+    for i in range(nrows):
+        cols = range(ncols) if i % 2 == 0 else range(ncols - 1, -1, -1)
+        order.extend((i, j) for j in cols if (i, j) in tiles)
+    return order
+
+
+def spiral_order(nrows: int, ncols: int, mask: Optional[np.ndarray] = None) -> List[Tile]:
+    """Spiral outwards from the centre tile of the grid."""
+    tiles = set(_grid_tiles(nrows, ncols, mask))
+    order: List[Tile] = []
+    i, j = (nrows - 1) // 2, (ncols - 1) // 2
+    if (i, j) in tiles:
+        order.append((i, j))
+    directions = [(0, 1), (1, 0), (0, -1), (-1, 0)] # right, down, left, up
+    step, d = 1, 0
+    max_steps = 2 * max(nrows, ncols) + 1
+    while len(order) < len(tiles) and step <= max_steps:
+        for _ in range(2):
+            di, dj = directions[d % 4]
+            for _ in range(step):
+                i, j = i + di, j + dj
+                if (i, j) in tiles:
+                    order.append((i, j))
+            d += 1
+        step += 1
+    return order
+
+
+def _tile_positions(tiles: List[Tile], tile_size: float) -> np.ndarray:
+    """Return the (x, y) position of the tile centres (m), relative to the first grid tile."""
+    arr = np.asarray(tiles, dtype=float).reshape(-1, 2)
+    return arr[:, ::-1] * tile_size
+
+
+def _move_distance(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """Stage move distance between positions. Axes move simultaneously, so the move is limited by the longest axis."""
+    return np.max(np.abs(a - b), axis=-1)
+
+
+def shortest_order(nrows: int, ncols: int, mask: Optional[np.ndarray] = None,
+                   start: Optional[Tile] = None, max_iterations: int = 100) -> List[Tile]:
+    """Travel minimising order. Nearest neighbour tour from the start tile, improved by 2-opt.
+    Args:
+        start: The tile to start from. Defaults to the first tile in the grid (top left).
+        max_iterations: The maximum number of 2-opt improvement passes.
+    """
+    tiles = _grid_tiles(nrows, ncols, mask)
+    if len(tiles) < 3:
+        return tiles
+    pts = _tile_positions(tiles, 1.0)
+
+    # nearest neighbour tour
+    current = tiles.index(start) if start in tiles else 0
+    unvisited = np.ones(len(tiles), dtype=bool)
+    unvisited[current] = False
+    order = [current]
+    for _ in range(len(tiles) - 1):
+        dist = _move_distance(pts[current], pts)
+        dist[~unvisited] = np.inf
+        current = int(np.argmin(dist))
+        unvisited[current] = False
+        order.append(current)
+
+    # 2-opt improvement (open path, start tile fixed)
+    order = np.asarray(order)
+    n = len(order)
+    for _ in range(max_iterations):
+        improved = False
+        for i in range(n - 2):
+            a, b = pts[order[i]], pts[order[i + 1]]
+            c = pts[order[i + 1:]]  # candidate segment ends (k = i+1..n-1)
+            nxt = np.vstack([pts[order[i + 2:]], np.full((1, 2), np.nan)])  # k+1 (nan for the end of the path)
+            d_ab = _move_distance(a, b)
+            d_ac = _move_distance(a, c)
+            d_cn = np.nan_to_num(_move_distance(c, nxt), nan=0.0)
+            d_bn = np.nan_to_num(_move_distance(b, nxt), nan=0.0)
+            delta = d_ac + d_bn - d_ab - d_cn
+            delta[0] = 0 # reversing a single tile is a no-op
+            k = int(np.argmin(delta))
+            if delta[k] < -1e-9:
+                k += i + 1
+                order[i + 1:k + 1] = order[i + 1:k + 1][::-1].copy()
+                improved = True
+        if not improved:
+            break
+
+    return [tiles[idx] for idx in order]
+
+
+SCAN_ORDER_FUNCTIONS = {
+    SCAN_ORDER_RASTER: raster_order,
+    SCAN_ORDER_SERPENTINE: serpentine_order,
+    SCAN_ORDER_SPIRAL: spiral_order,
+    SCAN_ORDER_SHORTEST: shortest_order,
+}
+
+
+def generate_scan_order(nrows: int, ncols: int, scan_order: str = SCAN_ORDER_RASTER,
+                        mask: Optional[np.ndarray] = None) -> List[Tile]:
+    """Generate the tile acquisition order for a grid.
+    Args:
+        nrows: The number of rows in the grid.
+        ncols: The number of columns in the grid.
+        scan_order: The scan order, one of SCAN_ORDERS.
+        mask: Optional boolean mask (nrows, ncols) of the tiles to acquire.
+    Returns:
+        The tiles (row, col) in acquisition order.
+    """
+    if scan_order not in SCAN_ORDER_FUNCTIONS:
+        raise ValueError(f"Unsupported scan order: {scan_order}. Supported scan orders are: {SCAN_ORDERS}")
+    return SCAN_ORDER_FUNCTIONS[scan_order](nrows, ncols, mask=mask)
+
+
+def get_scan_moves(tiles: List[Tile], tile_size: float, scan_order: str = SCAN_ORDER_RASTER) -> np.ndarray:
+    """Return the stage moves (dx, dy) required to acquire the tiles (m), starting from the top left grid tile.
+    For raster scans, the stage returns to the top left tile at the start of each row (as in tiled_image_acquisition)."""
+    pts = _tile_positions(tiles, tile_size)
+    origin = np.zeros(2)
+    prev = origin
+    moves = []
+    for k, pt in enumerate(pts):
+        if scan_order == SCAN_ORDER_RASTER and (k == 0 or tiles[k][0] != tiles[k - 1][0]):
+            moves.append(origin - prev)     # return to start
+            moves.append(pt - origin)       # move to the start of the row
+        else:
+            moves.append(pt - prev)
+        prev = pt
+    return np.asarray(moves).reshape(-1, 2)
+
+
+def estimate_scan_plan(tiles: List[Tile],
+                       tile_size: float,
+                       scan_order: str = SCAN_ORDER_RASTER,
+                       acquisition_time: float = 0.0,
+                       stage_speed: float = DEFAULT_STAGE_SPEED,
+                       settle_time: float = DEFAULT_SETTLE_TIME) -> ScanPlan:
+    """Estimate the stage travel and time required to acquire the tiles in order.
+    Args:
+        tiles: The tiles in acquisition order.
+        tile_size: The distance between adjacent tiles (m), i.e. the tile size less the overlap.
+        scan_order: The scan order used to generate the tiles.
+        acquisition_time: The time to acquire a single tile (s).
+        stage_speed: The stage speed (m/s).
+        settle_time: The settle time per stage move (s).
+    Returns:
+        The scan plan.
+    """
+    moves = get_scan_moves(tiles, tile_size, scan_order)
+    moves = moves[np.any(moves != 0, axis=1)] if len(moves) else moves
+    travel = float(np.sum(np.linalg.norm(moves, axis=1))) if len(moves) else 0.0
+    move_time = float(np.sum(np.max(np.abs(moves), axis=1))) / stage_speed if len(moves) else 0.0
+    estimated_time = move_time + len(moves) * settle_time + len(tiles) * acquisition_time
+    return ScanPlan(scan_order=scan_order, tiles=list(tiles), tile_size=tile_size,
+                    n_moves=len(moves), travel=travel, estimated_time=estimated_time)
+
+
+def plan_scan(settings: 'OverviewAcquisitionSettings',
+              scan_order: Optional[str] = None,
+              mask: Optional[np.ndarray] = None,
+              stage_speed: float = DEFAULT_STAGE_SPEED,
+              settle_time: float = DEFAULT_SETTLE_TIME) -> ScanPlan:
+    """Generate a scan plan for an overview acquisition.
+    Args:
+        settings: The overview acquisition settings.
+        scan_order: The scan order. Defaults to settings.scan_order.
+        mask: Optional boolean mask (nrows, ncols) of the tiles to acquire.
+        stage_speed: The stage speed (m/s).
+        settle_time: The settle time per stage move (s).
+    Returns:
+        The scan plan.
+    """
+    scan_order = scan_order or settings.scan_order
+    image_settings = settings.image_settings
+    tiles = generate_scan_order(settings.nrows, settings.ncols, scan_order=scan_order, mask=mask)
+    acquisition_time = image_settings.dwell_time * image_settings.resolution[0] * image_settings.resolution[1]
+    return estimate_scan_plan(tiles=tiles,
+                              tile_size=image_settings.hfw * (1 - settings.overlap),
+                              scan_order=scan_order,
+                              acquisition_time=acquisition_time,
+                              stage_speed=stage_speed,
+                              settle_time=settle_time)
+
+
+def compare_scan_plans(settings: 'OverviewAcquisitionSettings',
+                       mask: Optional[np.ndarray] = None,
+                       scan_orders: Tuple[str, ...] = SCAN_ORDERS,
+                       stage_speed: float = DEFAULT_STAGE_SPEED,
+                       settle_time: float = DEFAULT_SETTLE_TIME) -> List[ScanPlan]:
+    """Generate a scan plan for each scan order, sorted by estimated time (cheapest first)."""
+    plans = [plan_scan(settings, scan_order=order, mask=mask,
+                       stage_speed=stage_speed, settle_time=settle_time) for order in scan_orders]
+    plans.sort(key=lambda p: p.estimated_time)
+    for plan in plans:
+        logging.debug(f"SCAN_PLAN | {plan.pretty}")
+    return plans
+
+
+def circular_grid_mask(nrows: int, ncols: int, tile_size: float, radius: float,
+                       centre: Tuple[float, float] = (0.0, 0.0)) -> np.ndarray:
+    """Return a mask of the tiles that intersect a circle (e.g. the sample grid).
+    Args:
+        nrows: The number of rows in the grid.
+        ncols: The number of columns in the grid.
+        tile_size: The size of each tile (m).
+        radius: The radius of the circle (m).
+        centre: The (x, y) centre of the circle relative to the centre of the overview (m). y is positive down.
+    Returns:
+        Boolean mask (nrows, ncols) of the tiles to acquire.
+    """
+    # tile bounds, relative to the centre of the overview
+    x0 = (np.arange(ncols) - ncols / 2) * tile_size
+    y0 = (np.arange(nrows) - nrows / 2) * tile_size
+    # closest point on each tile to the centre of the circle
+    cx = np.clip(centre[0], x0, x0 + tile_size)
+    cy = np.clip(centre[1], y0, y0 + tile_size)
+    dx = cx[np.newaxis, :] - centre[0]
+    dy = cy[:, np.newaxis] - centre[1]
+    return (dx ** 2 + dy ** 2) <= radius ** 2
@@ -0,0 +1,300 @@
+"""Registration based stitching for tiled (overview) acquisitions with overlap.
+
+Adjacent tiles are registered by cross-correlating their overlap strips (batched FFTs, see
+alignment.crosscorrelation_v2), the tile positions are solved with a global weighted least-squares
+over all pairwise shifts, and the tiles are blended into the mosaic with linear feathering.
+
+Tiles are indexed as (row, col), and positions are in pixels (y, x) of the top left corner of the tile.
+"""
+from __future__ import annotations
+
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from fibsem.imaging import masks
+
+Tile = Tuple[int, int]
+TileGrid = Sequence[Sequence[Optional[np.ndarray]]]
+
+
+@dataclass
+class TilePairRegistration:
+    """The measured offset between two adjacent tiles.
+
+    Attributes:
+        tile_a: The first tile (row, col).
+        tile_b: The second tile (row, col), to the right of or below tile_a.
+        offset: The measured position of tile_b relative to tile_a (y, x) in pixels.
+        nominal: The nominal (stage) position of tile_b relative to tile_a (y, x) in pixels.
+        confidence: The normalised cross-correlation peak value (0 -> 1).
+    """
+    tile_a: Tile
+    tile_b: Tile
+    offset: Tuple[float, float]
+    nominal: Tuple[float, float]
+    confidence: float
+
+    @property
+    def error(self) -> Tuple[float, float]:
+        """The measured deviation from the nominal offset (y, x) in pixels."""
+        return (self.offset[0] - self.nominal[0], self.offset[1] - self.nominal[1])
+
+
+@dataclass
+class StitchingResult:
+    """The result of registering and stitching a tile grid.
+
+    Attributes:
+        mosaic: The stitched image.
+        positions: The solved tile positions {(row, col): (y, x)} in mosaic pixels.
+        pairs: The pairwise tile registrations.
+        residual: The root mean square residual of the least-squares solution (pixels).
+        elapsed: The time taken to register and stitch (s).
+    """
+    mosaic: np.ndarray
+    positions: dict = field(default_factory=dict)
+    pairs: List[TilePairRegistration] = field(default_factory=list)
+    residual: float = 0.0
+    elapsed: float = 0.0
+
+
+def _normalise_stack(stack: np.ndarray) -> np.ndarray:
+    """Normalise each image in a stack (N, H, W) to zero mean and unit variance."""
+    stack = stack.astype(np.float32)
+    mean = stack.mean(axis=(-2, -1), keepdims=True)
+    std = stack.std(axis=(-2, -1), keepdims=True)
+    return (stack - mean) / np.where(std == 0, 1, std)
+
+
+def _register_strips(ref: np.ndarray, new: np.ndarray,
+                     bandpass: Optional[np.ndarray] = None,
+                     max_shift: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray]:
+    """Register stacks of overlap strips (N, H, W) with a single batched cross-correlation.
+    Returns:
+        The shift of each new strip relative to the reference strip (N, 2) as (y, x) in pixels
+        (new(x) = ref(x - shift)), and the normalised peak value (N,).
+    """
+    from fibsem.alignment import crosscorrelation_v2
+
+    window = masks._mask_rectangular(ref.shape[-2:], sigma=2).astype(np.float32)
+    ref = _normalise_stack(ref) * window
+    new = _normalise_stack(new) * window
+    xcorr = crosscorrelation_v2(ref, new, bandpass=bandpass)
+
+    n, h, w = xcorr.shape
+    cen = np.array([h // 2, w // 2])
+    if max_shift is not None:
+        yy, xx = np.ogrid[:h, :w]
+        outside = (yy - cen[0]) ** 2 + (xx - cen[1]) ** 2 > max_shift ** 2
+        xcorr[:, outside] = -np.inf
+
+    flat = xcorr.reshape(n, -1)
+    idx = np.argmax(flat, axis=1)
+    peaks = np.stack(np.unravel_index(idx, (h, w)), axis=1)
+    confidence = np.clip(flat[np.arange(n), idx] / (h * w), 0, 1)
+    return cen - peaks, confidence
+
+
+def register_tiles(tiles: TileGrid,
+                   overlap: float,
+                   max_shift: Optional[int] = None,
+                   lowpass: Optional[int] = None,
+                   highpass: int = 2,
+                   sigma: int = 2) -> List[TilePairRegistration]:
+    """Measure the offsets between all adjacent tiles by cross-correlating their overlap strips.
+    Args:
+        tiles: The tile grid [row][col], missing tiles are None. All tiles must have the same shape.
+        overlap: The fractional overlap between adjacent tiles (0 -> 1).
+        max_shift: The maximum deviation from the nominal offset to search (pixels). Defaults to half the overlap size.
+        lowpass: The low-pass filter radius for the bandpass mask (pixels). None -> no bandpass filtering.
+        highpass: The high-pass filter radius for the bandpass mask (pixels).
+        sigma: The sigma for the bandpass mask.
+    Returns:
+        The pairwise tile registrations.
+    """
+    shape = next(t.shape for row in tiles for t in row if t is not None)
+    h, w = shape[0], shape[1]
+    ov_y, ov_x = int(round(h * overlap)), int(round(w * overlap))
+    if ov_y < 2 or ov_x < 2:
+        raise ValueError(f"Overlap ({overlap}) is too small to register tiles of shape {shape}.")
+    step_y, step_x = h - ov_y, w - ov_x
+
+    nrows, ncols = len(tiles), len(tiles[0])
+    pairs: List[TilePairRegistration] = []
+
+    # (direction, neighbour offset, reference strip, new strip, nominal offset)
+    directions = [
+        ((0, 1), lambda t: t[:, step_x:], lambda t: t[:, :ov_x], (0, step_x), (h, ov_x)),
+        ((1, 0), lambda t: t[step_y:, :], lambda t: t[:ov_y, :], (step_y, 0), (ov_y, w)),
+    ]
+    for (di, dj), ref_strip, new_strip, nominal, strip_shape in directions:
+        tile_pairs = [((i, j), (i + di, j + dj))
+                      for i in range(nrows - di) for j in range(ncols - dj)
+                      if tiles[i][j] is not None and tiles[i + di][j + dj] is not None]
+        if not tile_pairs:
+            continue
+        ref = np.stack([ref_strip(tiles[a[0]][a[1]]) for a, _ in tile_pairs])
+        new = np.stack([new_strip(tiles[b[0]][b[1]]) for _, b in tile_pairs])
+        bandpass = None
+        if lowpass is not None:
+            bandpass = masks.create_bandpass_mask(shape=strip_shape, lp=lowpass, hp=highpass, sigma=sigma)
+        shifts, confidence = _register_strips(ref, new, bandpass=bandpass,
+                                              max_shift=max_shift if max_shift is not None else min(strip_shape) // 2)
+        for (a, b), shift, conf in zip(tile_pairs, shifts, confidence):
+            # new strip is displaced by -error relative to the reference strip
+            offset = (nominal[0] - float(shift[0]), nominal[1] - float(shift[1]))
+            pairs.append(TilePairRegistration(tile_a=a, tile_b=b, offset=offset,
+                                              nominal=(float(nominal[0]), float(nominal[1])),
+                                              confidence=float(conf)))
+    return pairs
+
+
+def solve_tile_positions(tiles: List[Tile],
+                         pairs: List[TilePairRegistration],
+                         nominal_positions: dict,
+                         min_confidence: float = 0.1,
+                         prior_weight: float = 0.01) -> Tuple[dict, float]:
+    """Solve the global tile positions from the pairwise registrations (weighted least-squares).
+    Each pair constrains the difference between two tile positions, weighted by the registration confidence.
+    Pairs below min_confidence are ignored, and a weak prior keeps each tile close to its nominal position
+    (so that disconnected tiles, and the mosaic as a whole, stay anchored to the stage positions).
+    Args:
+        tiles: The tiles to solve positions for.
+        pairs: The pairwise tile registrations.
+        nominal_positions: The nominal positions {(row, col): (y, x)}.
+        min_confidence: The minimum registration confidence to use a pair.
+        prior_weight: The weight of the nominal position prior.
+    Returns:
+        The solved positions {(row, col): (y, x)}, and the rms residual of the pair constraints (pixels).
+    """
+    index = {t: k for k, t in enumerate(tiles)}
+    valid = [p for p in pairs if p.confidence >= min_confidence and p.tile_a in index and p.tile_b in index]
+    n, m = len(tiles), len(valid)
+
+    A = np.zeros((m + n, n))
+    b = np.zeros((m + n, 2))
+    weights = np.empty(m + n)
+    for r, p in enumerate(valid):
+        A[r, index[p.tile_b]], A[r, index[p.tile_a]] = 1, -1
+        b[r] = p.offset
+        weights[r] = p.confidence
+    for k, t in enumerate(tiles):
+        A[m + k, k] = 1
+        b[m + k] = nominal_positions[t]
+        weights[m + k] = prior_weight
+
+    sw = np.sqrt(weights)[:, np.newaxis]
+    solution, *_ = np.linalg.lstsq(A * sw, b * sw, rcond=None)
+
+    residual = 0.0
+    if m:
+        residual = float(np.sqrt(np.mean(np.sum((A[:m] @ solution - b[:m]) ** 2, axis=1))))
+    positions = {t: (float(solution[k, 0]), float(solution[k, 1])) for t, k in index.items()}
+    return positions, residual
+
+
+def _feather_weights(shape: Tuple[int, int], ramp: Tuple[int, int]) -> np.ndarray:
+    """Linear feathering weights, ramping from the tile edges over the overlap."""
+    h, w = shape
+    wy = np.clip((np.minimum(np.arange(h), np.arange(h)[::-1]) + 1) / max(ramp[0], 1), 0, 1)
+    wx = np.clip((np.minimum(np.arange(w), np.arange(w)[::-1]) + 1) / max(ramp[1], 1), 0, 1)
+    return np.outer(wy, wx).astype(np.float32)
+
+
+def blend_tiles(tiles: TileGrid, positions: dict, mosaic_shape: Tuple[int, int],
+                ramp: Optional[Tuple[int, int]], dtype: Optional[np.dtype] = None) -> np.ndarray:
+    """Blend tiles into a mosaic at the given positions with linear feathering across the seams.
+    Tiles (partially) outside the mosaic are clipped.
+    Args:
+        tiles: The tile grid [row][col], missing tiles are None.
+        positions: The tile positions {(row, col): (y, x)} in mosaic pixels.
+        mosaic_shape: The shape of the mosaic.
+        ramp: The feathering ramp (y, x) in pixels, typically the overlap. None -> paste tiles without blending.
+        dtype: The mosaic data type. Defaults to the tile data type.
+    Returns:
+        The blended mosaic.
+    """
+    shape = next(t.shape for row in tiles for t in row if t is not None)
+    if dtype is None:
+        dtype = next(t.dtype for row in tiles for t in row if t is not None)
+    mosaic = np.zeros(mosaic_shape, dtype=dtype)
+    if ramp is not None:
+        weight_sum = np.zeros(mosaic_shape, dtype=np.float32)
+        feather = _feather_weights(shape[:2], ramp)
+
+    for (i, j), (py, px) in positions.items():
+        tile = tiles[i][j]
+        if tile is None:
+            continue
+        y0, x0 = int(round(py)), int(round(px))
+        # clip to the mosaic
+        ty0, tx0 = max(0, -y0), max(0, -x0)
+        my0, mx0 = max(0, y0), max(0, x0)
+        my1, mx1 = min(mosaic_shape[0], y0 + shape[0]), min(mosaic_shape[1], x0 + shape[1])
+        if my1 <= my0 or mx1 <= mx0:
+            continue
+        ty1, tx1 = ty0 + (my1 - my0), tx0 + (mx1 - mx0)
+
+        if ramp is None:
+            mosaic[my0:my1, mx0:mx1] = tile[ty0:ty1, tx0:tx1]
+            continue
+
+        # running weighted average, so only the weight sum needs to be kept at full resolution
+        w = feather[ty0:ty1, tx0:tx1]
+        acc = weight_sum[my0:my1, mx0:mx1]
+        acc += w
+        region = mosaic[my0:my1, mx0:mx1]
+        current = region.astype(np.float32)
+        current += (tile[ty0:ty1, tx0:tx1].astype(np.float32) - current) * (w / acc)
+        if np.issubdtype(dtype, np.integer):
+            info = np.iinfo(dtype)
+            current = np.clip(np.round(current), info.min, info.max)
+        region[:] = current.astype(dtype)
+
+    return mosaic
+
+
+def stitch_tiles(tiles: TileGrid,
+                 overlap: float,
+                 mosaic_shape: Optional[Tuple[int, int]] = None,
+                 max_shift: Optional[int] = None,
+                 min_confidence: float = 0.1,
+                 blend: bool = True) -> StitchingResult:
+    """Register and stitch a grid of overlapping tiles.
+    The mosaic keeps the nominal (stage) frame, so the centre of the mosaic is the centre of the tile grid.
+    Args:
+        tiles: The tile grid [row][col], missing tiles are None. All tiles must have the same shape.
+        overlap: The fractional overlap between adjacent tiles (0 -> 1).
+        mosaic_shape: The shape of the mosaic. Defaults to the nominal grid extent.
+        max_shift: The maximum deviation from the nominal offset to search (pixels).
+        min_confidence: The minimum registration confidence to use a pair.
+        blend: Whether to feather the seams between tiles (otherwise tiles are pasted in order).
+    Returns:
+        The stitching result, including the mosaic and solved tile positions.
+    """
+    t0 = time.time()
+    nrows, ncols = len(tiles), len(tiles[0])
+    shape = next(t.shape for row in tiles for t in row if t is not None)
+    h, w = shape[0], shape[1]
+    ov_y, ov_x = int(round(h * overlap)), int(round(w * overlap))
+    step_y, step_x = h - ov_y, w - ov_x
+    if mosaic_shape is None:
+        mosaic_shape = (step_y * (nrows - 1) + h, step_x * (ncols - 1) + w)
+
+    present = [(i, j) for i in range(nrows) for j in range(ncols) if tiles[i][j] is not None]
+    nominal = {(i, j): (float(i * step_y), float(j * step_x)) for (i, j) in present}
+
+    pairs = register_tiles(tiles, overlap=overlap, max_shift=max_shift)
+    positions, residual = solve_tile_positions(present, pairs, nominal, min_confidence=min_confidence)
+
+    mosaic = blend_tiles(tiles, positions, mosaic_shape, ramp=(ov_y, ov_x) if blend else None)
+
+    elapsed = time.time() - t0
+    n_valid = sum(p.confidence >= min_confidence for p in pairs)
+    logging.info(f"Stitched {len(present)} tiles ({n_valid}/{len(pairs)} pairs registered), "
+                 f"residual: {residual:.2f}px, elapsed: {elapsed:.2f}s")
+    return StitchingResult(mosaic=mosaic, positions=positions, pairs=pairs, residual=residual, elapsed=elapsed)
@@ -3,7 +3,9 @@ from __future__ import annotations
 import datetime
 import logging
 import os
+import threading
 import time
+from concurrent.futures import Future, ThreadPoolExecutor
 from copy import deepcopy
 from typing import TYPE_CHECKING, List, Optional, Tuple
 
@@ -14,6 +16,8 @@ from matplotlib.figure import Figure
 
 from fibsem import acquire, conversions
 from fibsem.microscope import FibsemMicroscope
+from fibsem.imaging.pyramid import OverviewPyramidWriter, get_pyramid_path
+from fibsem.imaging.scan_path import SCAN_ORDER_RASTER, generate_scan_order
 from fibsem.microscopes.simulator import DemoMicroscope
 from fibsem.structures import (
     BeamType,
@@ -29,6 +33,126 @@ if TYPE_CHECKING:
 
 POSITION_COLOURS = ["lime", "blue", "cyan", "magenta", "hotpink", "yellow", "orange", "red"]
 
+class TileProcessingPipeline:
+    """Background pipeline for processing acquired tiles.
+    The acquisition loop submits tiles as they are acquired, while a worker pool saves
+    each tile to disk, pastes it into the mosaic and accumulates the intensity histogram
+    (used to calculate the gamma correction without another pass over the mosaic).
+    Args:
+        mosaic_shape: The shape of the stitched mosaic (rows, cols).
+        tile_shape: The shape of each tile (rows, cols).
+        tile_step: The step between adjacent tiles in the mosaic (rows, cols). Defaults to the tile shape (no overlap).
+        max_workers: The number of worker threads.
+        memmap_path: Optional path to a .npy file to back the mosaic (memory-mapped).
+        parent_ui: The parent UI for progress updates.
+        total: The number of tiles to be processed (for progress updates). Defaults to all tiles in the mosaic.
+        pyramid: Optional multi-resolution store to write each tile into as it is processed.
+    """
+    def __init__(self,
+                 mosaic_shape: Tuple[int, int],
+                 tile_shape: Tuple[int, int],
+                 tile_step: Optional[Tuple[int, int]] = None,
+                 max_workers: int = 2,
+                 memmap_path: Optional[str] = None,
+                 parent_ui: Optional['FibsemMinimapWidget'] = None,
+                 total: Optional[int] = None,
+                 pyramid: Optional[OverviewPyramidWriter] = None):
+        self.tile_shape = tile_shape
+        self.tile_step = tile_step if tile_step is not None else tile_shape
+        if memmap_path is not None:
+            self.mosaic = np.lib.format.open_memmap(memmap_path, mode="w+", dtype=np.uint8, shape=mosaic_shape)
+        else:
+            self.mosaic = np.zeros(shape=mosaic_shape, dtype=np.uint8)
+        self.histogram = np.zeros(256, dtype=np.int64)
+        self.parent_ui = parent_ui
+        self.pyramid = pyramid
+        if total is None:
+            total = self.n_rows * self.n_cols
+        self.total = total
+        self.n_processed = 0
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max(1, max_workers), thread_name_prefix="tile-pipeline")
+        self._futures: List[Future] = []
+
+    def submit(self, image: FibsemImage, i: int, j: int, path: Optional[str] = None) -> Future:
+        """Submit an acquired tile for processing.
+        Args:
+            image: The tile image.
+            i: The row index of the tile.
+            j: The column index of the tile.
+            path: The path to save the tile to (None -> don't save).
+        """
+        future = self._executor.submit(self._process_tile, image, i, j, path)
+        self._futures.append(future)
+        return future
+
+    def _process_tile(self, image: FibsemImage, i: int, j: int, path: Optional[str]) -> None:
+        """Save, stitch and calculate the histogram for a single tile (worker thread)."""
+        if path is not None:
+            image.save(path)
+
+        # stitch image
+        h, w = self.tile_shape
+        sy, sx = self.tile_step
+        tile = self.mosaic[i*sy:i*sy+h, j*sx:j*sx+w]
+        tile[:] = image.filtered_data
+        histogram = np.bincount(tile.ravel(), minlength=256)
+        if self.pyramid is not None:
+            self.pyramid.write(i*sy, j*sx, tile)
+
+        with self._lock:
+            self.histogram += histogram
+            self.n_processed += 1
+            counter = self.n_processed
+
+        if self.parent_ui:
+            self.parent_ui.tile_acquisition_progress_signal.emit(
+                {
+                    "msg": "Tile Collected",
+                    "i": i,
+                    "j": j,
+                    "n_rows": self.n_rows,
+                    "n_cols": self.n_cols,
+                    "image": self.mosaic,
+                    "counter": counter,
+                    "total": self.total,
+                }
+            )
+
+    @property
+    def n_rows(self) -> int:
+        return (self.mosaic.shape[0] - self.tile_shape[0]) // self.tile_step[0] + 1
+
+    @property
+    def n_cols(self) -> int:
+        return (self.mosaic.shape[1] - self.tile_shape[1]) // self.tile_step[1] + 1
+
+    @property
+    def pending(self) -> int:
+        """The number of tiles waiting to be processed."""
+        return sum(not f.done() for f in self._futures)
+
+    def wait(self) -> None:
+        """Wait for all submitted tiles to be processed. Raises the first error from the workers."""
+        for future in self._futures:
+            future.result()
+
+    def shutdown(self, cancel: bool = False) -> None:
+        """Shutdown the worker pool.
+        Args:
+            cancel: Cancel tiles that have not started processing.
+        """
+        if cancel:
+            for future in self._futures:
+                future.cancel()
+        self._executor.shutdown(wait=True)
+
+    def mean(self) -> float:
+        """The mean intensity of the processed tiles."""
+        from fibsem.imaging.autogamma import histogram_mean
+        with self._lock:
+            return histogram_mean(self.histogram)
+
 ##### TILED ACQUISITION
 def tiled_image_acquisition(
     microscope: FibsemMicroscope,
@@ -39,33 +163,55 @@ def tiled_image_acquisition(
     overlap: float = 0.0,
     cryo: bool = True,
     parent_ui: Optional['FibsemMinimapWidget']=None,
+    max_workers: int = 2,
+    use_memmap: bool = False,
+    scan_order: str = "raster",
+    mask: Optional[np.ndarray] = None,
+    save_pyramid: bool = False,
 ) -> dict: 
     """Tiled image acquisition.
+    Tiles are saved and stitched in a background pipeline (TileProcessingPipeline), 
+    so the stage can move to and acquire the next tile while the previous tiles are processed.
     Args:
         microscope: The microscope connection.
         image_settings: The image settings.
         nrows: The number of rows in the grid.
         ncols: The number of columns in the grid.
         tile_size: The size of the tiles.
-        overlap: The overlap between tiles in pixels. Currently not supported.
+        overlap: The fractional overlap between adjacent tiles (0.0 = no overlap). 
+            Overlapping tiles are registered and blended when stitching (see fibsem.imaging.stitching).
         cryo: Whether to use cryo mode (histogram equalisation).
         parent_ui: The parent UI for progress updates.
+        max_workers: The number of background workers for saving / stitching tiles.
+        use_memmap: Whether to back the stitched image with a memory-mapped file (in the tile directory).
+        scan_order: The tile acquisition order (raster, serpentine, spiral, shortest). See fibsem.imaging.scan_path.
+        mask: Optional boolean mask (nrows, ncols) of the tiles to acquire. Unacquired tiles are left blank.
+        save_pyramid: Whether to write the mosaic into a multi-resolution store (.ome.zarr, next to the stitched image)
+            as the tiles are acquired. See fibsem.imaging.pyramid.
     Returns:
         A dictionary containing the acquisition details for stitching."""
 
+    if not 0 <= overlap < 0.5:
+        raise ValueError(f"Overlap must be between 0 and 0.5, got {overlap}")
+
     n_rows, n_cols = nrows, ncols
-    dx, dy = image_settings.hfw, image_settings.hfw
+    step = tile_size * (1 - overlap) # distance between tile centres
+    dx, dy = step, step
 
     dy *= -1 # need to invert y-axis
 
     # fixed image settings
     image_settings.autogamma = False
-    total_fov = ncols * tile_size  # total hfw
+    total_fov = tile_size + (ncols - 1) * step  # total hfw
 
     logging.info(f"TILE COLLECTION: {image_settings.filename}")
     logging.info(f"Taking nrows={n_rows}, ncols={n_cols} ({n_rows*n_cols}) images. TotalFoV={total_fov*1e6} um, TileFoV={tile_size*1e6} um")
     logging.info(f"dx: {dx*1e6} um, dy: {dy*1e6} um")
 
+    # plan the tile acquisition order
+    tiles = generate_scan_order(n_rows, n_cols, scan_order=scan_order, mask=mask)
+    logging.info(f"Scan order: {scan_order}, acquiring {len(tiles)}/{n_rows*n_cols} tiles.")
+
     # start in the middle of the grid
     start_state = microscope.get_microscope_state()
     
@@ -86,83 +232,97 @@ def tiled_image_acquisition(
     image_settings.hfw = tile_size
     image_settings.filename = prev_label
     image_settings.autocontrast = False # required for cryo
-    image_settings.save = True
-    start_move_x = (ncols * tile_size) / 2 - tile_size / 2
-    start_move_y = (nrows * tile_size) / 2 - tile_size / 2
+    image_settings.save = False # tiles are saved by the pipeline
+    start_move_x = (ncols - 1) * step / 2
+    start_move_y = (nrows - 1) * step / 2
     dxg, dyg = start_move_x, start_move_y
     dyg *= -1
 
     microscope.stable_move(dx=-dxg, dy=-dyg, beam_type=image_settings.beam_type)
     start_position = microscope.get_stage_position()
-    images = []
+    images: List[List[Optional[FibsemImage]]] = [[None] * n_cols for _ in range(n_rows)]
 
     # stitched image
     shape = image_settings.resolution
-    full_shape = (shape[0]*n_rows, shape[1]*n_cols)
-    arr = np.zeros(shape=(full_shape), dtype=np.uint8)
-    n_tiles_acquired = 0
-    total_tiles = n_rows*n_cols
+    tile_step = (int(round(shape[0] * (1 - overlap))), int(round(shape[1] * (1 - overlap))))
+    full_shape = (tile_step[0]*(n_rows-1) + shape[0], tile_step[1]*(n_cols-1) + shape[1])
+    memmap_path = os.path.join(image_settings.path, "mosaic.npy") if use_memmap else None
+    pyramid = None
+    if save_pyramid:
+        pyramid = OverviewPyramidWriter(path=get_pyramid_path(os.path.join(prev_path, prev_label)),
+                                        shape=full_shape,
+                                        dtype=np.uint8,
+                                        pixel_size=tile_size / shape[0])
+    pipeline = TileProcessingPipeline(mosaic_shape=full_shape,
+                                      tile_shape=(shape[0], shape[1]),
+                                      tile_step=tile_step,
+                                      max_workers=max_workers,
+                                      memmap_path=memmap_path,
+                                      parent_ui=parent_ui,
+                                      total=len(tiles),
+                                      pyramid=pyramid)
+    suffix = "eb" if image_settings.beam_type is BeamType.ELECTRON else "ib"
+    cancelled = True
     try:
-        for i in range(n_rows):
-
-            microscope.safe_absolute_stage_movement(start_position)
-
-            img_row: list[FibsemImage] = []
-            microscope.stable_move(dx=0, dy=i*dy, beam_type=image_settings.beam_type)
-
-            for j in range(n_cols):
-                image_settings.filename = f"tile_{i}_{j}"
-                microscope.stable_move(dx=dx*(j!=0),  dy=0, beam_type=image_settings.beam_type) # dont move on the first tile?
-
-                if parent_ui:
-                    if parent_ui._thread_stop_event.is_set():
-                        raise Exception("User Stopped Acquisition")
-
-                logging.info(f"Acquiring Tile {i}, {j}")
-                image = acquire.acquire_image(microscope, image_settings)
-
-                # stitch image
-                arr[i*shape[0]:(i+1)*shape[0], j*shape[1]:(j+1)*shape[1]] = image.filtered_data
-
-                if parent_ui:
-                    n_tiles_acquired += 1
-                    parent_ui.tile_acquisition_progress_signal.emit(
-                        {
-                            "msg": "Tile Collected",
-                            "i": i,
-                            "j": j,
-                            "n_rows": n_rows,
-                            "n_cols": n_cols,
-                            "image": arr,
-                            "counter": n_tiles_acquired,
-                            "total": total_tiles,
-                        }
-                    )
-                    if isinstance(microscope, DemoMicroscope):
-                        time.sleep(1)
-
-                img_row.append(image)
-            images.append(img_row)
+        prev_tile: Tuple[int, int] = (0, 0) # stage is at the top left tile
+        for n, (i, j) in enumerate(tiles):
+
+            if scan_order == SCAN_ORDER_RASTER and (n == 0 or i != prev_tile[0]):
+                # return to the start of the grid, then move down to the row
+                microscope.safe_absolute_stage_movement(start_position)
+                microscope.stable_move(dx=j*dx, dy=i*dy, beam_type=image_settings.beam_type)
+            elif (i, j) != prev_tile:
+                # relative move from the previous tile
+                microscope.stable_move(dx=(j-prev_tile[1])*dx, dy=(i-prev_tile[0])*dy, beam_type=image_settings.beam_type)
+            prev_tile = (i, j)
+            image_settings.filename = f"tile_{i}_{j}"
+
+            if parent_ui:
+                if parent_ui._thread_stop_event.is_set():
+                    raise Exception("User Stopped Acquisition")
+
+            logging.info(f"Acquiring Tile {i}, {j}")
+            image = acquire.acquire_image(microscope, image_settings)
+
+            # save, stitch and update ui in the background
+            tile_path = os.path.join(image_settings.path, f"{image_settings.filename}_{suffix}")
+            pipeline.submit(image, i, j, path=tile_path)
+
+            if parent_ui and isinstance(microscope, DemoMicroscope):
+                microscope.clock.sleep(1)
+
+            images[i][j] = image
+
+        # wait for remaining tiles to be processed
+        logging.debug(f"Waiting for {pipeline.pending} tiles to be processed.")
+        pipeline.wait()
+        cancelled = False
     except Exception as e:
         logging.error(f"Tiled acquisition failed: {e}")
         raise
     finally:
+        pipeline.shutdown(cancel=cancelled)
         logging.info(f"Tiled acquisition complete, restoring initial position: {start_state.stage_position.pretty}")
-        microscope.set_microscope_state(start_state)
+        microscope.set_microscope_state(start_state, diff=True)
     image_settings.path = prev_path
+    image_settings.save = True
 
     ddict = {"total_fov": total_fov, "tile_size": tile_size, "n_rows": n_rows, "n_cols": n_cols, 
             "image_settings": image_settings, 
-            "dx": dx, "dy": dy, "cryo": cryo,
+            "dx": dx, "dy": dy, "cryo": cryo, "overlap": overlap,
             "start_state": start_state, "prev-filename": prev_label, 
             "start_move_x": start_move_x, "start_move_y": start_move_y, 
             "dxg": dxg, "dyg": dyg,
-            "images": images, "big_image": big_image, "stitched_image": arr}
+            "images": images, "big_image": big_image, "stitched_image": pipeline.mosaic,
+            "histogram": pipeline.histogram,
+            "pyramid_path": pyramid.path if pyramid is not None else None}
 
     return ddict
 
 def stitch_images(images: List[List[FibsemImage]], ddict: dict, parent_ui: Optional['FibsemMinimapWidget'] = None) -> FibsemImage:
-    """Stitch an array (2D) of images together. Assumes images are ordered in a grid with no overlap.
+    """Stitch an array (2D) of images together. Assumes images are ordered in a grid.
+    Overlapping tiles are registered and blended (see fibsem.imaging.stitching), otherwise
+    the tiles stitched during acquisition are used directly.
     Args:
         images: The images.
         parent_ui: The parent UI for progress updates.
@@ -173,26 +333,63 @@ def stitch_images(images: List[List[FibsemImage]], ddict: dict, parent_ui: Optio
         parent_ui.tile_acquisition_progress_signal.emit({"msg": "Stitching Tiles", "counter": total, "total": total})
     arr = ddict["stitched_image"]
 
-    # convert to fibsem image
-    image = FibsemImage(data=arr, metadata=images[0][0].metadata)
+    # register and blend overlapping tiles
+    if ddict.get("overlap", 0) > 0:
+        from fibsem.imaging.stitching import stitch_tiles
+        tiles = [[img.filtered_data if img is not None else None for img in row] for row in images]
+        result = stitch_tiles(tiles, overlap=ddict["overlap"], mosaic_shape=arr.shape)
+        arr = result.mosaic.astype(np.uint8, copy=False)
+        ddict["stitched_image"] = arr
+        ddict["registration"] = result
+        ddict["histogram"] = np.bincount(arr.ravel(), minlength=256)
+
+    # convert to fibsem image (use the metadata from the first acquired tile)
+    first_image = next(img for row in images for img in row if img is not None)
+    image = FibsemImage(data=arr, metadata=first_image.metadata)
     if image.metadata is None:
         raise ValueError("Image metadata is not set. Cannot update metadata for stitched image.")
     image.metadata.microscope_state = deepcopy(ddict["start_state"])
     image.metadata.image_settings = ddict["image_settings"]
+    image.metadata.image_settings.filename = ddict["prev-filename"]
     image.metadata.image_settings.hfw = deepcopy(float(ddict["total_fov"]))
     image.metadata.image_settings.resolution = deepcopy((arr.shape[0], arr.shape[1]))
 
     # TODO: support overwrite protection here, very annoying to overwrite
 
     filename = os.path.join(image.metadata.image_settings.path, f'{ddict["prev-filename"]}') # type: ignore
-    image.save(filename)
     # for cryo need to histogram equalise
     if ddict.get("cryo", False):
-        from fibsem.imaging.autogamma import auto_gamma
-        image = auto_gamma(image, method="autogamma")
-        filename = os.path.join(image.metadata.image_settings.path, f'{ddict["prev-filename"]}-autogamma') # type: ignore
+        from fibsem.imaging import autogamma
+
+        # save the raw stitched image in the background while applying gamma correction
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            save_future = executor.submit(image.save, filename)
+
+            # use the histogram accumulated during acquisition, rather than another pass over the mosaic
+            histogram = ddict.get("histogram", None)
+            if histogram is not None and arr.dtype == np.uint8:
+                gamma = autogamma.calculate_gamma(autogamma.histogram_mean(histogram))
+                logging.debug(f"AUTO_GAMMA | stitched | {gamma:.3f}")
+                image = FibsemImage(data=autogamma.apply_gamma(arr, gamma), metadata=image.metadata)
+            else:
+                image = autogamma.auto_gamma(image, method="autogamma")
+            filename = os.path.join(image.metadata.image_settings.path, f'{ddict["prev-filename"]}-autogamma') # type: ignore
+            image.save(filename)
+            save_future.result()
+    else:
         image.save(filename)
 
+    # the pyramid was written tile-by-tile during acquisition, update it with the blended / gamma corrected mosaic
+    pyramid_path = ddict.get("pyramid_path", None)
+    if pyramid_path is not None:
+        pyramid = OverviewPyramidWriter(path=pyramid_path,
+                                        shape=image.data.shape,
+                                        dtype=image.data.dtype,
+                                        pixel_size=image.metadata.pixel_size.x)
+        if ddict.get("overlap", 0) > 0 or ddict.get("cryo", False):
+            pyramid.write_array(image.data)
+        pyramid.update_metadata(image.metadata.to_dict())
+
     # for garbage collection
     del ddict["images"]
     del ddict["big_image"]
@@ -205,7 +402,11 @@ def tiled_image_acquisition_and_stitch(microscope: FibsemMicroscope,
                                   ncols: int, 
                                   tile_size: float, 
                                   overlap: float = 0, cryo: bool = True, 
-                                  parent_ui: Optional['FibsemMinimapWidget'] = None) -> FibsemImage:
+                                  parent_ui: Optional['FibsemMinimapWidget'] = None,
+                                  max_workers: int = 2,
+                                  scan_order: str = "raster",
+                                  mask: Optional[np.ndarray] = None,
+                                  save_pyramid: bool = False) -> FibsemImage:
     """Acquire a tiled image and stitch it together.
     Args:
         microscope: The microscope connection.
@@ -213,9 +414,13 @@ def tiled_image_acquisition_and_stitch(microscope: FibsemMicroscope,
         nrows: The number of rows in the grid.
         ncols: The number of columns in the grid.
         tile_size: The size of the tiles.
-        overlap: The overlap between tiles in pixels. Currently not supported.
+        overlap: The fractional overlap between adjacent tiles (0.0 = no overlap).
         cryo: Whether to use cryo mode (histogram equalisation).
         parent_ui: The parent UI for progress updates.
+        max_workers: The number of background workers for saving / stitching tiles.
+        scan_order: The tile acquisition order (raster, serpentine, spiral, shortest).
+        mask: Optional boolean mask (nrows, ncols) of the tiles to acquire.
+        save_pyramid: Whether to also save the stitched image as a multi-resolution store (.ome.zarr).
     Returns:
         The stitched image."""
 
@@ -227,7 +432,10 @@ def tiled_image_acquisition_and_stitch(microscope: FibsemMicroscope,
     ddict = tiled_image_acquisition(microscope=microscope, 
                                     image_settings=image_settings, 
                                     nrows=nrows, ncols=ncols, tile_size=tile_size, 
-                                    cryo=cryo, parent_ui=parent_ui)
+                                    overlap=overlap, cryo=cryo, parent_ui=parent_ui,
+                                    max_workers=max_workers,
+                                    scan_order=scan_order, mask=mask,
+                                    save_pyramid=save_pyramid)
     image = stitch_images(images=ddict["images"], ddict=ddict, parent_ui=parent_ui)
 
     return image
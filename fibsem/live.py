@@ -0,0 +1,122 @@
+"""Live imaging frame pipeline.
+
+The acquisition thread submits frames to a bounded ring buffer and returns immediately, while a
+dispatcher thread emits the most recent frame to the consumer (e.g. the napari viewer). When the
+consumer is slower than the acquisition, older frames are dropped (latest frame wins), so a slow
+consumer never stalls the acquisition.
+"""
+
+import logging
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Callable, Deque, Optional, Tuple
+
+from fibsem.structures import FibsemImage
+
+DEFAULT_LIVE_BUFFER_SIZE = 4
+_RATE_SMOOTHING = 0.2   # exponential moving average weight of the latest frame interval / latency
+
+
+@dataclass
+class LiveStreamStats:
+    """Frame rate and latency counters for a live imaging stream.
+    Attributes:
+        frames_acquired: The number of frames submitted by the acquisition.
+        frames_emitted: The number of frames emitted to the consumer.
+        frames_dropped: The number of frames dropped because the consumer was busy.
+        acquisition_fps: The (smoothed) acquisition frame rate.
+        display_fps: The (smoothed) rate frames are emitted to the consumer.
+        latency: The (smoothed) time between a frame being acquired and emitted (seconds).
+    """
+    frames_acquired: int = 0
+    frames_emitted: int = 0
+    frames_dropped: int = 0
+    acquisition_fps: float = 0.0
+    display_fps: float = 0.0
+    latency: float = 0.0
+
+
+def _update_rate(rate: float, last_time: Optional[float], now: float) -> float:
+    if last_time is None or now <= last_time:
+        return rate
+    instantaneous = 1.0 / (now - last_time)
+    return instantaneous if rate == 0 else (1 - _RATE_SMOOTHING) * rate + _RATE_SMOOTHING * instantaneous
+
+
+class LiveFramePipeline:
+    """Bounded, latest-frame-wins pipeline between the acquisition thread and the consumer.
+    Args:
+        emit: The function called (on the dispatcher thread) with each emitted frame.
+        maxsize: The number of frames held in the ring buffer.
+    """
+    def __init__(self, emit: Callable[[FibsemImage], None], maxsize: int = DEFAULT_LIVE_BUFFER_SIZE):
+        self._emit = emit
+        self._buffer: Deque[Tuple[FibsemImage, float]] = deque(maxlen=max(1, maxsize))
+        self._condition = threading.Condition()
+        self._stopped = False
+        self._stats = LiveStreamStats()
+        self._last_acquired: Optional[float] = None
+        self._last_emitted: Optional[float] = None
+        self._thread = threading.Thread(target=self._dispatch, daemon=True, name="live-frame-pipeline")
+        self._thread.start()
+
+    def submit(self, image: FibsemImage, acquired_at: Optional[float] = None) -> None:
+        """Submit a frame to be emitted, returns immediately.
+        Args:
+            image: The acquired frame.
+            acquired_at: The time the frame was acquired. Defaults to now.
+        """
+        now = time.time()
+        with self._condition:
+            if self._stopped:
+                return
+            if len(self._buffer) == self._buffer.maxlen:
+                self._stats.frames_dropped += 1     # oldest frame is overwritten
+            self._buffer.append((image, acquired_at if acquired_at is not None else now))
+            self._stats.frames_acquired += 1
+            self._stats.acquisition_fps = _update_rate(self._stats.acquisition_fps, self._last_acquired, now)
+            self._last_acquired = now
+            self._condition.notify()
+
+    def _dispatch(self) -> None:
+        while True:
+            with self._condition:
+                while not self._buffer and not self._stopped:
+                    self._condition.wait()
+                if self._stopped:
+                    return
+                # latest frame wins, older frames were not displayed in time
+                image, acquired_at = self._buffer.pop()
+                self._stats.frames_dropped += len(self._buffer)
+                self._buffer.clear()
+
+            try:
+                self._emit(image)
+            except Exception as e:
+                logging.error(f"Error emitting live frame: {e}")
+
+            now = time.time()
+            with self._condition:
+                stats = self._stats
+                stats.frames_emitted += 1
+                stats.display_fps = _update_rate(stats.display_fps, self._last_emitted, now)
+                latency = now - acquired_at
+                stats.latency = latency if stats.frames_emitted == 1 else (1 - _RATE_SMOOTHING) * stats.latency + _RATE_SMOOTHING * latency
+                self._last_emitted = now
+
+    @property
+    def stats(self) -> LiveStreamStats:
+        """A snapshot of the frame rate and latency counters."""
+        with self._condition:
+            return LiveStreamStats(**vars(self._stats))
+
+    def stop(self, timeout: float = 2.0) -> None:
+        """Stop the pipeline, pending frames are discarded."""
+        with self._condition:
+            self._stopped = True
+            self._buffer.clear()
+            self._condition.notify_all()
+        if self._thread is not threading.current_thread():
+            self._thread.join(timeout=timeout)
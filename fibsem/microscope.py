@@ -18,6 +18,9 @@ from packaging.version import InvalidVersion
 from packaging.version import parse as parse_version
 from psygnal import Signal
 
+from fibsem.events import log_event
+from fibsem.live import DEFAULT_LIVE_BUFFER_SIZE, LiveFramePipeline, LiveStreamStats
+
 
 THERMO_API_AVAILABLE = False
 MINIMUM_AUTOSCRIPT_VERSION_4_7 = parse_version("4.7")
@@ -128,6 +131,87 @@ if TYPE_CHECKING:
     from numpy.typing import NDArray
     from fibsem.structures import TFibsemPatternSettings
 
+# state cache (see FibsemMicroscope.get)
+DEFAULT_STATE_CACHE_TTL = 1.0   # seconds a cached value is served without reading from the microscope
+_STATE_CACHE_STAGE_KEYS = ("stage_position", "stage_homed", "stage_linked")
+_STATE_CACHE_MILLING_KEYS = ("on", "blanked", "current", "voltage", "shift")
+_STATE_CACHE_MANIPULATOR_KEYS = ("manipulator_position", "manipulator_state")
+_STATE_CACHE_CHANNEL_KEYS = ("active_view", "active_device")
+# keys that change other values when set (e.g. the preset changes the current, pumping changes the chamber state)
+_STATE_CACHE_COUPLED_KEYS = ("preset", "on", "beam_enabled", "plasma", "plasma_gas", "detector_type",
+                             "stage_home", "stage_link", "pump_chamber", "vent_chamber")
+# methods that invalidate the cached values for these keys, as they change them outside of set()
+_STATE_CACHE_INVALIDATING_METHODS = {
+    **{name: _STATE_CACHE_STAGE_KEYS for name in (
+        "move_stage_absolute", "move_stage_relative", "stable_move", "vertical_move",
+        "move_flat_to_beam", "safe_absolute_stage_movement", "_safe_rotation_movement",
+        "move_coincident_from_sem", "_y_corrected_stage_movement", "move_to_milling_angle", "home")},
+    **{name: _STATE_CACHE_MILLING_KEYS for name in (
+        "run_milling", "finish_milling", "finish_milling2", "start_milling",
+        "stop_milling", "pause_milling", "resume_milling")},
+    **{name: _STATE_CACHE_MANIPULATOR_KEYS for name in (
+        "insert_manipulator", "retract_manipulator", "move_manipulator_relative",
+        "move_manipulator_absolute", "move_manipulator_corrected", "move_manipulator_to_position_offset")},
+    # the auto functions and sputtering write to the microscope connection directly
+    "auto_focus": ("working_distance",) + _STATE_CACHE_CHANNEL_KEYS,
+    "autocontrast": ("detector_brightness", "detector_contrast") + _STATE_CACHE_CHANNEL_KEYS,
+    "acquire_chamber_image": _STATE_CACHE_CHANNEL_KEYS,
+    "setup_sputter": _STATE_CACHE_CHANNEL_KEYS,
+    "draw_sputter_pattern": ("hfw",),
+    "run_sputter": ("blanked",),
+    "finish_sputter": ("blanked",) + _STATE_CACHE_CHANNEL_KEYS,
+}
+
+
+def _invalidates_state_cache(method: 'Callable', keys: Tuple[str, ...]) -> 'Callable':
+    """Bypass the state cache while the method runs, and invalidate the keys once it is done."""
+    @wraps(method)
+    def wrapper(self: 'FibsemMicroscope', *args, **kwargs):
+        with self._state_cache_lock():
+            self._state_cache_bypass += 1
+        try:
+            return method(self, *args, **kwargs)
+        finally:
+            with self._state_cache_lock():
+                self._state_cache_bypass -= 1
+            self.invalidate_state_cache(keys)
+    wrapper._invalidates_state_cache = True
+    return wrapper
+
+
+def _wrap_state_cache_methods(cls: type) -> None:
+    # stage motion, milling and the auto functions change the microscope state outside of set(), invalidate the cached values
+    for name, keys in _STATE_CACHE_INVALIDATING_METHODS.items():
+        method = cls.__dict__.get(name)
+        if (callable(method)
+                and not getattr(method, "__isabstractmethod__", False)
+                and not getattr(method, "_invalidates_state_cache", False)):
+            setattr(cls, name, _invalidates_state_cache(method, keys))
+
+
+# tolerances for comparing values when only writing the changed state (set_microscope_state(diff=True))
+STATE_DIFF_REL_TOLERANCE = 1e-6
+STATE_DIFF_STAGE_TOLERANCE = 1e-7   # m, rad
+
+
+def _state_values_equal(value: Any, target: Any) -> bool:
+    """Check if a current state value is equal to the target value (floats within a relative tolerance)."""
+    if isinstance(value, Point) and isinstance(target, Point):
+        return _state_values_equal(value.x, target.x) and _state_values_equal(value.y, target.y)
+    if isinstance(value, (list, tuple)) and isinstance(target, (list, tuple)):
+        return len(value) == len(target) and all(_state_values_equal(v, t) for v, t in zip(value, target))
+    if (isinstance(value, (int, float)) and isinstance(target, (int, float))
+            and not isinstance(value, bool) and not isinstance(target, bool)):
+        return np.isclose(value, target, rtol=STATE_DIFF_REL_TOLERANCE, atol=0)
+    return value == target
+
+
+def _copy_state_value(value: Any) -> Any:
+    # cached values are copied, so callers can't modify the cache (e.g. a stage position)
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    return deepcopy(value)
+
 class FibsemMicroscope(ABC):
     """Abstract class containing all the core microscope functionalities"""
     milling_progress_signal = Signal(dict)
@@ -143,9 +227,20 @@ class FibsemMicroscope(ABC):
     _stop_acquisition_event = threading.Event()
     _acquisition_thread: threading.Thread = None
     _threading_lock: threading.RLock = threading.RLock()
+    _live_pipeline: Optional[LiveFramePipeline] = None
+    live_buffer_size: int = DEFAULT_LIVE_BUFFER_SIZE
 
     fm: 'FluorescenceMicroscope' = None
 
+    # state cache
+    state_cache_ttl: float = DEFAULT_STATE_CACHE_TTL
+    _state_cache_bypass: int = 0
+    _state_cache_generation: int = 0
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        _wrap_state_cache_methods(cls)
+
     stage_position_changed = Signal(FibsemStagePosition)
     _stage_position: FibsemStagePosition = None
 
@@ -182,6 +277,10 @@ class FibsemMicroscope(ABC):
         # reset stop event if needed
         self._stop_acquisition_event.clear()
 
+        # frames are emitted from the live pipeline, so a slow consumer doesn't stall the acquisition
+        signal = self.sem_acquisition_signal if beam_type is BeamType.ELECTRON else self.fib_acquisition_signal
+        self._live_pipeline = LiveFramePipeline(emit=signal.emit, maxsize=self.live_buffer_size)
+
         # start acquisition thread
         self._acquisition_thread = threading.Thread(
             target=self._acquisition_worker,
@@ -196,15 +295,48 @@ class FibsemMicroscope(ABC):
             self._stop_acquisition_event.set()
             if self._acquisition_thread:
                 self._acquisition_thread.join(timeout=2)
+            if self._live_pipeline is not None:
+                self._live_pipeline.stop()
             # Disconnect signal handler
             # self.sem_acquisition_signal.disconnect()
             # self.fib_acquisition_signal.disconnect()
 
+    @property
+    def live_stream_stats(self) -> Optional[LiveStreamStats]:
+        """The frame rate and latency counters of the current (or last) live acquisition."""
+        if self._live_pipeline is None:
+            return None
+        return self._live_pipeline.stats
+
     def _acquisition_worker(self, beam_type: BeamType) -> None:
         """The worker function for the acquisition thread. 
         Acquires images from the microscope, and emits them as signals."""
         pass
 
+    def _submit_live_frame(self, image: FibsemImage, beam_type: BeamType, acquired_at: Optional[float] = None) -> None:
+        """Submit an acquired frame to the live pipeline (emitted directly if there is no pipeline)."""
+        if self._live_pipeline is not None:
+            self._live_pipeline.submit(image, acquired_at=acquired_at)
+            return
+        if beam_type is BeamType.ELECTRON:
+            self.sem_acquisition_signal.emit(image)
+        if beam_type is BeamType.ION:
+            self.fib_acquisition_signal.emit(image)
+
+    def _get_live_metadata(self, beam_type: BeamType) -> Tuple[MicroscopeState, ImageSettings]:
+        """Get the microscope state and imaging settings for live frames.
+        The full state is only re-read when the state cache has changed (or expired), rather than for every frame.
+        """
+        generation = self._state_cache_generation
+        cached = self.__dict__.get("_live_metadata")
+        if (cached is not None and cached[0] is beam_type and cached[1] == generation
+                and time.time() - cached[2] <= self.state_cache_ttl):
+            return cached[3], cached[4]
+        state = self.get_microscope_state(beam_type=beam_type)
+        image_settings = self.get_imaging_settings(beam_type=beam_type)
+        self._live_metadata = (beam_type, generation, time.time(), state, image_settings)
+        return state, image_settings
+
     @abstractmethod
     def acquire_chamber_image(self) -> FibsemImage:
         pass
@@ -546,19 +678,89 @@ class FibsemMicroscope(ABC):
             cache_key = f"{key}_{beam_type.name if beam_type else 'None'}"
             self._available_values_cache.pop(cache_key, None)
 
+    def _state_cache_lock(self) -> threading.RLock:
+        if "_state_cache_rlock" not in self.__dict__:
+            self._state_cache_rlock = threading.RLock()
+        return self._state_cache_rlock
+
+    def invalidate_state_cache(self, keys: Optional[Tuple[str, ...]] = None, beam_type: Optional[BeamType] = None) -> None:
+        """Invalidate the cached microscope state.
+        Args:
+            keys: If provided, only invalidate these keys (for all beams). Otherwise invalidate all keys.
+            beam_type: If provided, only invalidate the values for this beam type.
+        """
+        with self._state_cache_lock():
+            self._state_cache_generation += 1
+            cache = self.__dict__.get("_state_cache")
+            if not cache:
+                return
+            for cache_key in list(cache):
+                if keys is not None and cache_key[0] not in keys:
+                    continue
+                if beam_type is not None and cache_key[1] is not beam_type:
+                    continue
+                del cache[cache_key]
+
+    def _cache_state_value(self, key: str, beam_type: Optional[BeamType], value: Any, generation: int) -> None:
+        with self._state_cache_lock():
+            # don't cache values read while the state was changing (e.g. during stage motion)
+            if self._state_cache_bypass or generation != self._state_cache_generation:
+                return
+            if "_state_cache" not in self.__dict__:
+                self._state_cache: Dict[Tuple[str, Optional[BeamType]], Tuple[float, Any]] = {}
+            self._state_cache[(key, beam_type)] = (time.time(), _copy_state_value(value))
+
     # TODO: use a decorator instead?
-    def get(self, key: str, beam_type: Optional[BeamType] = None) -> Union[float, int, bool, str, list, tuple, Point]:
-        """Get wrapper for logging."""
+    def get(self, key: str, beam_type: Optional[BeamType] = None, refresh: bool = False) -> Union[float, int, bool, str, list, tuple, Point]:
+        """Get wrapper for logging and caching.
+        Values read within the last state_cache_ttl seconds are returned from the state cache.
+        Args:
+            key: The key to get.
+            beam_type: The beam type (optional).
+            refresh: Always read the value from the microscope.
+        """
+        if self.state_cache_ttl > 0 and not refresh and not self._state_cache_bypass:
+            cached = self.__dict__.get("_state_cache", {}).get((key, beam_type))
+            if cached is not None and time.time() - cached[0] <= self.state_cache_ttl:
+                return _copy_state_value(cached[1])
+
+        generation = self._state_cache_generation
         value = self._get(key, beam_type)
         beam_name = "None" if beam_type is None else beam_type.name
         logging.debug({"msg": "get", "key": key, "beam_type": beam_name, "value": value})
+        if self.state_cache_ttl > 0:
+            self._cache_state_value(key, beam_type, value, generation)
         return value
 
     def set(self, key: str, value: Union[str, float, int, tuple, list, Point], beam_type: Optional[BeamType] = None) -> None:
-        """Set wrapper for logging"""
-        self._set(key, value, beam_type)
+        """Set wrapper for logging, invalidates the state cache.
+        The requested value is not cached, as the microscope may not apply it as requested
+        (e.g. the value is clipped to the valid range), the next get reads the applied value."""
+        keys = None if key in _STATE_CACHE_COUPLED_KEYS else (key,)
+        self.invalidate_state_cache(keys=keys, beam_type=beam_type)
+        try:
+            self._set(key, value, beam_type)
+        finally:
+            # also drop values read while the value was being set
+            self.invalidate_state_cache(keys=keys, beam_type=beam_type)
         beam_name = "None" if beam_type is None else beam_type.name
         logging.debug({"msg": "set", "key": key, "beam_type": beam_name, "value": value})
+        log_event("set", key=key, beam_type=beam_name, value=value)
+
+    def _log_acquisition_event(self, image: FibsemImage, start_time: float) -> None:
+        """Record an image acquisition (and its duration) in the event log."""
+        image_settings = image.metadata.image_settings
+        log_event("acquire_image",
+                  beam_type=image_settings.beam_type.name,
+                  resolution=image_settings.resolution,
+                  hfw=image_settings.hfw,
+                  dwell_time=image_settings.dwell_time,
+                  duration=time.time() - start_time)
+
+    def _emit_milling_progress(self, progress: dict) -> None:
+        """Emit a milling progress update, and record it in the event log."""
+        self.milling_progress_signal.emit({"progress": progress})
+        log_event("milling_progress", **progress)
 
     @abstractmethod
     def _get(self, key: str, beam_type: Optional[BeamType] = None) -> Union[float, int, bool, str, list]:
@@ -623,8 +825,65 @@ class FibsemMicroscope(ABC):
 
         return beam_settings
 
-    def set_beam_settings(self, beam_settings: BeamSettings) -> None:
-        """Set the beam settings for the specified beam type"""
+    def _write_changed(self, name: str, target: Any, getter: 'Callable[[], Any]', setter: 'Callable[[Any], Any]',
+                       report: Dict[str, List[str]]) -> None:
+        """Write the target value only if it differs from the current (cached) value."""
+        if target is None:
+            return
+        try:
+            changed = not _state_values_equal(getter(), target)
+        except Exception as e:
+            logging.debug(f"Failed to get the current value of {name}, writing it: {e}")
+            changed = True
+        if changed:
+            setter(target)
+            report["written"].append(name)
+        else:
+            report["skipped"].append(name)
+
+    def _set_changed_beam_settings(self, beam_settings: BeamSettings, report: Dict[str, List[str]]) -> None:
+        beam_type = beam_settings.beam_type
+        # the preset, voltage and current are written first, as changing them is slow (settling) and can change the other values
+        fields = [
+            ("preset", lambda: self.get("preset", beam_type), lambda v: self.set("preset", v, beam_type)),
+            ("voltage", lambda: self.get_beam_voltage(beam_type), lambda v: self.set_beam_voltage(v, beam_type)),
+            ("beam_current", lambda: self.get_beam_current(beam_type), lambda v: self.set_beam_current(v, beam_type)),
+            ("working_distance", lambda: self.get_working_distance(beam_type), lambda v: self.set_working_distance(v, beam_type)),
+            ("hfw", lambda: self.get_field_of_view(beam_type), lambda v: self.set_field_of_view(v, beam_type)),
+            ("resolution", lambda: self.get_resolution(beam_type), lambda v: self.set_resolution(v, beam_type)),
+            ("dwell_time", lambda: self.get_dwell_time(beam_type), lambda v: self.set_dwell_time(v, beam_type)),
+            ("stigmation", lambda: self.get_stigmation(beam_type), lambda v: self.set_stigmation(v, beam_type)),
+            ("shift", lambda: self.get_beam_shift(beam_type), lambda v: self.set_beam_shift(v, beam_type)),
+            ("scan_rotation", lambda: self.get_scan_rotation(beam_type), lambda v: self.set_scan_rotation(v, beam_type)),
+        ]
+        for name, getter, setter in fields:
+            self._write_changed(f"{beam_type.name}.{name}", getattr(beam_settings, name), getter, setter, report)
+
+    def _set_changed_detector_settings(self, detector_settings: FibsemDetectorSettings, beam_type: BeamType,
+                                       report: Dict[str, List[str]]) -> None:
+        fields = [
+            ("type", lambda: self.get_detector_type(beam_type), lambda v: self.set_detector_type(v, beam_type)),
+            ("mode", lambda: self.get_detector_mode(beam_type), lambda v: self.set_detector_mode(v, beam_type)),
+            ("brightness", lambda: self.get_detector_brightness(beam_type), lambda v: self.set_detector_brightness(v, beam_type)),
+            ("contrast", lambda: self.get_detector_contrast(beam_type), lambda v: self.set_detector_contrast(v, beam_type)),
+        ]
+        for name, getter, setter in fields:
+            self._write_changed(f"{beam_type.name}.detector.{name}", getattr(detector_settings, name), getter, setter, report)
+
+    def set_beam_settings(self, beam_settings: BeamSettings, diff: bool = False) -> Optional[Dict[str, List[str]]]:
+        """Set the beam settings for the specified beam type
+        Args:
+            beam_settings: The beam settings to set.
+            diff: Only write the values that differ from the current (cached) values.
+        Returns:
+            When diff is set, the names of the written and skipped values ({"written": [...], "skipped": [...]}).
+        """
+        if diff:
+            report = {"written": [], "skipped": []}
+            self._set_changed_beam_settings(beam_settings, report)
+            log_event("set_beam_settings", beam_type=beam_settings.beam_type.name, beam_settings=beam_settings.to_dict(), **report)
+            return report
+
         logging.debug(f"Setting {beam_settings.beam_type.name} beam settings...")
         self.set_working_distance(beam_settings.working_distance, beam_settings.beam_type)
         self.set_beam_current(beam_settings.beam_current, beam_settings.beam_type)
@@ -638,6 +897,7 @@ class FibsemMicroscope(ABC):
         self.set("preset", beam_settings.preset, beam_settings.beam_type)
 
         logging.debug({"msg": "set_beam_settings", "beam_settings": beam_settings.to_dict(), "beam_type": beam_settings.beam_type.name})
+        log_event("set_beam_settings", beam_type=beam_settings.beam_type.name, beam_settings=beam_settings.to_dict())
         return
 
     def get_beam_system_settings(self, beam_type: BeamType) -> BeamSystemSettings:
@@ -701,8 +961,14 @@ class FibsemMicroscope(ABC):
 
         return
 
-    def get_microscope_state(self, beam_type: Optional[BeamType] = None) -> MicroscopeState:
-        """Get the current microscope state."""
+    def get_microscope_state(self, beam_type: Optional[BeamType] = None, refresh: bool = False) -> MicroscopeState:
+        """Get the current microscope state.
+        Args:
+            beam_type: Only get the state of this beam (and the stage). Defaults to both beams.
+            refresh: Read all values from the microscope, rather than the state cache.
+        """
+        if refresh:
+            self.invalidate_state_cache()
 
         # default values
         electron_beam, electron_detector = None, None
@@ -738,8 +1004,17 @@ class FibsemMicroscope(ABC):
 
         return deepcopy(current_microscope_state)
 
-    def set_microscope_state(self, microscope_state: MicroscopeState) -> None:
-        """Reset the microscope state to the provided state."""
+    def set_microscope_state(self, microscope_state: MicroscopeState, diff: bool = False) -> Optional[Dict[str, List[str]]]:
+        """Reset the microscope state to the provided state.
+        Args:
+            microscope_state: The state to restore.
+            diff: Only write the values that differ from the current (cached) state, and
+                skip the stage movement if the stage is already at the position.
+        Returns:
+            When diff is set, the names of the written and skipped values ({"written": [...], "skipped": [...]}).
+        """
+        if diff:
+            return self._set_changed_microscope_state(microscope_state)
 
         if self.is_available("electron_beam"):
             if microscope_state.electron_beam is not None:
@@ -760,6 +1035,37 @@ class FibsemMicroscope(ABC):
 
         return
 
+    def _set_changed_microscope_state(self, microscope_state: MicroscopeState) -> Dict[str, List[str]]:
+        """Write only the changed values of the microscope state (see set_microscope_state)."""
+        report: Dict[str, List[str]] = {"written": [], "skipped": []}
+
+        for beam_type, beam_settings, detector_settings, system in [
+            (BeamType.ELECTRON, microscope_state.electron_beam, microscope_state.electron_detector, "electron_beam"),
+            (BeamType.ION, microscope_state.ion_beam, microscope_state.ion_detector, "ion_beam")]:
+            if not self.is_available(system):
+                continue
+            if beam_settings is not None:
+                self._set_changed_beam_settings(beam_settings, report)
+            if detector_settings is not None:
+                self._set_changed_detector_settings(detector_settings, beam_type, report)
+
+        if self.is_available("stage") and microscope_state.stage_position is not None:
+            target = microscope_state.stage_position
+            axes = [axis for axis in ["x", "y", "z", "r", "t"] if getattr(target, axis) is not None]
+            if self.get_stage_position().is_close2(target, tol=STATE_DIFF_STAGE_TOLERANCE, axes=axes):
+                report["skipped"].append("stage_position")
+            else:
+                self.safe_absolute_stage_movement(target)
+                report["written"].append("stage_position")
+        if self.fm is not None and microscope_state.objective_position is not None:
+            self.fm.objective.move_absolute(microscope_state.objective_position)
+            report["written"].append("objective_position")
+
+        logging.debug({"msg": "set_microscope_state", "state": microscope_state.to_dict(), **report})
+        log_event("set_microscope_state", **report)
+
+        return report
+
     def set_milling_settings(self, mill_settings: FibsemMillingSettings) -> None:
         self.set("active_view", mill_settings.milling_channel, mill_settings.milling_channel)
         self.set("active_device", mill_settings.milling_channel, mill_settings.milling_channel)
@@ -1309,6 +1615,10 @@ class FibsemMicroscope(ABC):
     def manufacturer(self) -> str:
         return "ThermoFisher"
 
+
+_wrap_state_cache_methods(FibsemMicroscope)
+
+
 def _thermo_application_file_wrapper_for_drawing_functions(
     patterning_function: Callable[["ThermoMicroscope", TFibsemPatternSettings], Any],
 ) -> Callable[["ThermoMicroscope", TFibsemPatternSettings], Any]:
@@ -1582,6 +1892,7 @@ class ThermoMicroscope(FibsemMicroscope):
         self.set_field_of_view(hfw=image_settings.hfw, beam_type=image_settings.beam_type)
 
         logging.info(f"acquiring new {image_settings.beam_type.name} image.")
+        start_time = time.time()
         self.set_channel(image_settings.beam_type)
 
         # set the imaging frame settings
@@ -1622,6 +1933,7 @@ class ThermoMicroscope(FibsemMicroscope):
         self._last_imaging_settings = image_settings
 
         logging.debug({"msg": "acquire_image", "metadata": fibsem_image.metadata.to_dict()})
+        self._log_acquisition_event(fibsem_image, start_time)
 
         return fibsem_image
 
@@ -1709,6 +2021,7 @@ class ThermoMicroscope(FibsemMicroscope):
             frame_settings = None
 
         logging.info(f"acquiring new {effective_beam_type.name} image.")
+        start_time = time.time()
 
         self.set_channel(effective_beam_type)
         adorned_image: AdornedImage = self.connection.imaging.grab_frame(frame_settings)
@@ -1738,6 +2051,7 @@ class ThermoMicroscope(FibsemMicroscope):
         logging.debug(
             {"msg": "acquire_image", "metadata": fibsem_image.metadata.to_dict()}
         )
+        self._log_acquisition_event(fibsem_image, start_time)
 
         return fibsem_image
 
@@ -1849,10 +2163,7 @@ class ThermoMicroscope(FibsemMicroscope):
                 image = self.acquire_image(beam_type=beam_type, image_settings=None)
 
                 # emit the acquired image
-                if beam_type is BeamType.ELECTRON:
-                    self.sem_acquisition_signal.emit(image)
-                if beam_type is BeamType.ION:
-                    self.fib_acquisition_signal.emit(image)
+                self._submit_live_frame(image, beam_type=beam_type)
 
         except Exception as e:
             logging.error(f"Error in acquisition worker: {e}")
@@ -1867,31 +2178,39 @@ class ThermoMicroscope(FibsemMicroscope):
                 if self._stop_acquisition_event.is_set():
                     self.connection.imaging.stop_acquisition()
                     break
+                # only hold the lock to grab the frame, metadata and emitting happen outside it
                 with self._threading_lock:
                     self.set_channel(channel=beam_type)  # re-force active channel...?
                     adorned_image = self.connection.imaging.get_image(GetImageSettings(wait_for_frame=True))
-                    image = self._construct_image(adorned_image, beam_type=beam_type)
-
-                    logging.info(f"Acquired Image: {image.data.shape}")
-                    # emit the acquired image
-                    if beam_type is BeamType.ELECTRON:
-                        self.sem_acquisition_signal.emit(image)
-                    if beam_type is BeamType.ION:
-                        self.fib_acquisition_signal.emit(image)
+                acquired_at = time.time()
+                image = self._construct_image(adorned_image, beam_type=beam_type, live=True)
+
+                logging.debug(f"Acquired Image: {image.data.shape}")
+                # emit the acquired image (latest frame wins if the consumer is busy)
+                self._submit_live_frame(image, beam_type=beam_type, acquired_at=acquired_at)
         except Exception as e:
                 logging.error(f"Exception occurred during fast acquisition: {e}")
         finally:
             self.connection.imaging.stop_acquisition()
 
-    def _construct_image(self, adorned_image: AdornedImage, beam_type: BeamType) -> FibsemImage:
-        """Construct a FibsemImage from an AdornedImage and the current microscope state."""
+    def _construct_image(self, adorned_image: AdornedImage, beam_type: BeamType, live: bool = False) -> FibsemImage:
+        """Construct a FibsemImage from an AdornedImage and the current microscope state.
+        Args:
+            adorned_image: The acquired image.
+            beam_type: The beam type the image was acquired with.
+            live: Use the live metadata (only re-read when the state changes), and don't copy the frame.
+        """
         # get the required metadata, convert to FibsemImage
-        state = self.get_microscope_state(beam_type=beam_type)
-        image_settings = self.get_imaging_settings(beam_type=beam_type)
+        if live:
+            state, image_settings = self._get_live_metadata(beam_type=beam_type)
+        else:
+            state = self.get_microscope_state(beam_type=beam_type)
+            image_settings = self.get_imaging_settings(beam_type=beam_type)
+            adorned_image = copy.deepcopy(adorned_image)
 
         image = FibsemImage.fromAdornedImage(
-            copy.deepcopy(adorned_image), 
-            copy.deepcopy(image_settings), 
+            adorned_image,
+            copy.deepcopy(image_settings),
             copy.deepcopy(state),
         )
 
@@ -1989,6 +2308,7 @@ class ThermoMicroscope(FibsemMicroscope):
         autoscript_position = position.to_autoscript_position(compustage=self.stage_is_compustage) # TODO: apply compucentric/raw coordinate offset here?
 
         logging.info(f"Moving stage to {position}.")
+        start_time = time.time()
         self.stage.absolute_move(autoscript_position, MoveSettings(rotate_compucentric=True)) # TODO: This needs at least an optional safe move to prevent collision?
 
         # restore working distance to adjust for microscope compenstation
@@ -1996,6 +2316,7 @@ class ThermoMicroscope(FibsemMicroscope):
             self.set_working_distance(wd, BeamType.ELECTRON)
 
         logging.debug({"msg": "move_stage_absolute", "position": position.to_dict()})
+        log_event("move_stage_absolute", position=position.to_dict(), duration=time.time() - start_time)
 
         return self.get_stage_position()
 
@@ -2013,9 +2334,11 @@ class ThermoMicroscope(FibsemMicroscope):
         thermo_position = position.to_autoscript_position(self.stage_is_compustage)
 
         # move stage
+        start_time = time.time()
         self.stage.relative_move(thermo_position)
 
         logging.debug({"msg": "move_stage_relative", "position": position.to_dict()})
+        log_event("move_stage_relative", position=position.to_dict(), duration=time.time() - start_time)
 
         return self.get_stage_position()
 
@@ -2696,13 +3019,12 @@ class ThermoMicroscope(FibsemMicroscope):
             # TODO: refresh the remaining time by getting the milling time from the patterning API as user can change the patterns on xtUI
 
             # update milling progress via signal
-            self.milling_progress_signal.emit({"progress": {
+            self._emit_milling_progress({
                     "state": "update", 
                     "start_time": start_time,
                     "milling_state": self.get_milling_state(),
                     "estimated_time": estimated_time, 
-                    "remaining_time": remaining_time}
-                    })
+                    "remaining_time": remaining_time})
 
         # milling complete
         self.clear_patterns()
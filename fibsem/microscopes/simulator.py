@@ -2,11 +2,16 @@ from __future__ import annotations
 
 import copy
 import glob
+import hashlib
 import logging
 import os
 import random
+import tempfile
+import threading
 import time
+from collections import OrderedDict
 from collections.abc import Iterator
+from concurrent.futures import Future, ThreadPoolExecutor
 from dataclasses import dataclass, field
 from itertools import cycle
 from typing import Dict, List, Optional, Tuple, Union
@@ -14,6 +19,7 @@ from typing import Dict, List, Optional, Tuple, Union
 import numpy as np
 from skimage.transform import resize
 
+from fibsem.events import log_event
 from fibsem.microscope import (
     FibsemMicroscope,
     ThermoMicroscope,
@@ -78,6 +84,165 @@ STAGE_LIMITS_COMPUSTAGE = {
 }
 # hack, do this properly @patrick
 
+# simulated timing
+SIMULATOR_STAGE_SPEED = 1.0e-3              # m/s, linear axes
+SIMULATOR_STAGE_ROTATION_SPEED = np.deg2rad(10) # rad/s, rotation / tilt axes
+SIMULATOR_MILLING_UPDATE_STEPS = 100        # maximum number of milling progress updates (scaled clock)
+SIMULATOR_MIN_FRAME_INTERVAL = 0.05         # s, minimum real time between live imaging frames
+SIMULATOR_SPEED_UP_ENV = "FIBSEM_SIM_SPEED_UP"
+SIMULATOR_PREFETCH_FRAMES = 2               # number of image sequence frames to decode ahead
+SIMULATOR_MAX_OPEN_FRAMES = 64              # number of memory-mapped image sequence frames kept open
+
+
+class SimulatorClock:
+    """Simulated time for the DemoMicroscope.
+    Simulated durations (acquisition, milling, stage movement, autocontrast, gis, ...) are divided by the 
+    speed up factor (e.g. 10 = ten times faster than real time). In instant mode (speed_up <= 0 or inf) 
+    nothing sleeps. The simulated time (SimulatorClock.time) advances by the full simulated durations.
+    Args:
+        speed_up: The speed up factor relative to real time.
+    """
+    def __init__(self, speed_up: float = 1.0):
+        self.speed_up = speed_up
+        self._offset: float = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def instant(self) -> bool:
+        return self.speed_up <= 0 or np.isinf(self.speed_up)
+
+    def sleep(self, seconds: float) -> None:
+        """Sleep for a simulated duration (seconds)."""
+        if seconds is None or seconds <= 0:
+            return
+        real_seconds = 0.0 if self.instant else seconds / self.speed_up
+        with self._lock:
+            self._offset += seconds - real_seconds
+        if real_seconds > 0:
+            time.sleep(real_seconds)
+
+    def time(self) -> float:
+        """The simulated time (seconds since the epoch, like time.time)."""
+        return time.time() + self._offset
+
+    @staticmethod
+    def from_config(sim: Optional[dict]) -> "SimulatorClock":
+        """Create the clock from the simulator configuration (speed_up, instant).
+        Without a speed_up in the configuration, the clock is instant.
+        The FIBSEM_SIM_SPEED_UP environment variable overrides the configuration (e.g. for regression runs)."""
+        sim = sim or {}
+        speed_up = float(sim.get("speed_up", 1.0) or 1.0)
+        if sim.get("instant", "speed_up" not in sim):
+            speed_up = float("inf")
+        env_speed_up = os.environ.get(SIMULATOR_SPEED_UP_ENV, None)
+        if env_speed_up:
+            speed_up = float(env_speed_up)
+        return SimulatorClock(speed_up=speed_up)
+
+class ImageSequenceCache:
+    """Playback cache for simulator image sequences.
+    Each image is decoded once, resized to the requested shape and stored as a memory-mapped array, 
+    cached by (filename, shape, dtype). A background prefetcher decodes the next frames of the sequence,
+    so playback is not limited by loading and resizing the images. Each open array holds a file descriptor,
+    so only the most recently used max_open arrays are kept open; evicted frames are re-opened from disk.
+    Args:
+        cache_dir: The directory for the memory-mapped arrays. If set, the cache persists between sessions 
+            (entries are keyed by the file modification time). Defaults to a temporary directory.
+        max_workers: The number of prefetch workers.
+        max_open: The maximum number of memory-mapped arrays kept open.
+    """
+    def __init__(self, cache_dir: Optional[str] = None, max_workers: int = 1,
+                 max_open: int = SIMULATOR_MAX_OPEN_FRAMES):
+        self._tmp_dir = None
+        if cache_dir is None:
+            self._tmp_dir = tempfile.TemporaryDirectory(prefix="fibsem-sim-cache-")
+            cache_dir = self._tmp_dir.name
+        os.makedirs(cache_dir, exist_ok=True)
+        self.cache_dir = cache_dir
+        self.max_open = max(1, max_open)
+        self._arrays: "OrderedDict[tuple, np.ndarray]" = OrderedDict()
+        self._pending: Dict[tuple, Future] = {}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max(1, max_workers), thread_name_prefix="sim-prefetch")
+        self.hits: int = 0
+        self.misses: int = 0
+
+    @staticmethod
+    def _key(filename: str, shape: Tuple[int, int], dtype) -> tuple:
+        return (os.path.abspath(filename), tuple(int(v) for v in shape), np.dtype(dtype).str)
+
+    def _path(self, key: tuple) -> str:
+        filename, shape, dtype = key
+        ident = f"{filename}|{os.path.getmtime(filename)}|{shape}|{dtype}"
+        return os.path.join(self.cache_dir, hashlib.sha1(ident.encode()).hexdigest() + ".npy")
+
+    def _load(self, key: tuple) -> np.ndarray:
+        """Decode, resize and store the image as a memory-mapped array."""
+        filename, shape, dtype = key
+        path = self._path(key)
+        if not os.path.exists(path):
+            img = FibsemImage.load(filename)
+            image_data = resize(img.data, output_shape=shape, anti_aliasing=True, preserve_range=True)
+            tmp_path = f"{path}.{threading.get_ident()}.tmp.npy"
+            np.save(tmp_path, image_data.astype(dtype))
+            os.replace(tmp_path, path)
+        arr = np.load(path, mmap_mode="r")
+        with self._lock:
+            self._arrays[key] = arr
+            self._arrays.move_to_end(key)
+            while len(self._arrays) > self.max_open:
+                self._arrays.popitem(last=False)
+            self._pending.pop(key, None)
+        return arr
+
+    def get(self, filename: str, shape: Tuple[int, int], dtype: np.dtype = np.uint8) -> np.ndarray:
+        """Get the image data for the file, resized to shape (read-only, memory-mapped)."""
+        key = self._key(filename, shape, dtype)
+        with self._lock:
+            arr = self._arrays.get(key, None)
+            if arr is not None:
+                self._arrays.move_to_end(key)
+            future = self._pending.get(key, None)
+            if arr is not None or future is not None:
+                self.hits += 1
+            else:
+                self.misses += 1
+        if arr is not None:
+            return arr
+        if future is not None:
+            return future.result()
+        return self._load(key)
+
+    def prefetch(self, filenames: List[str], shape: Tuple[int, int], dtype: np.dtype = np.uint8) -> None:
+        """Decode the files in the background."""
+        for filename in filenames:
+            key = self._key(filename, shape, dtype)
+            with self._lock:
+                if key in self._arrays or key in self._pending:
+                    continue
+                future = self._executor.submit(self._load_safe, key)
+                self._pending[key] = future
+
+    def _load_safe(self, key: tuple) -> Optional[np.ndarray]:
+        try:
+            return self._load(key)
+        except Exception as e:
+            logging.debug(f"Failed to prefetch simulator image {key[0]}: {e}")
+            with self._lock:
+                self._pending.pop(key, None)
+            raise
+
+    def close(self) -> None:
+        """Stop the prefetcher and remove the temporary cache directory."""
+        self._executor.shutdown(wait=True)
+        with self._lock:
+            self._arrays.clear()
+            self._pending.clear()
+        if self._tmp_dir is not None:
+            self._tmp_dir.cleanup()
+            self._tmp_dir = None
+
+
 @dataclass
 class DemoMicroscopeClient:
     connected: bool = False
@@ -240,6 +405,7 @@ class DemoMicroscope(FibsemMicroscope):
             scanning_mode_value = None,
         )
         self.stage_is_compustage: bool = self.system.sim.get("is_compustage", False)
+        self.clock = SimulatorClock.from_config(self.system.sim)
         self.milling_system = MillingSystem(patterns=[])
         self.imaging_system = ImagingSystem()
 
@@ -343,6 +509,7 @@ class DemoMicroscope(FibsemMicroscope):
             effective_image_settings = self.get_imaging_settings(beam_type=effective_beam_type)
 
         logging.info(f"acquiring new {effective_beam_type.name} image.")
+        start_time = time.time()
 
         # get state for image metadata
         microscope_state = self.get_microscope_state(beam_type=effective_beam_type)
@@ -353,7 +520,7 @@ class DemoMicroscope(FibsemMicroscope):
             hfw=effective_image_settings.hfw,
             random=True
         )
-        time.sleep(effective_image_settings.dwell_time * effective_image_settings.resolution[0] * effective_image_settings.resolution[1])  # simulate acquisition time
+        self.clock.sleep(effective_image_settings.dwell_time * effective_image_settings.resolution[0] * effective_image_settings.resolution[1])  # simulate acquisition time
 
         # generate the next image from the sequence iterator
         if self.use_image_sequence:
@@ -395,6 +562,7 @@ class DemoMicroscope(FibsemMicroscope):
             self._last_imaging_settings = image_settings
 
         logging.debug({"msg": "acquire_image", "metadata": image.metadata.to_dict()})
+        self._log_acquisition_event(image, start_time)
 
         return image
 
@@ -420,24 +588,24 @@ class DemoMicroscope(FibsemMicroscope):
                 raise ValueError(f"No image iterator found for beam type {beam_type.name}")
 
             filename = next(image_iterator)
+            position = self._sequence_positions.get(beam_type, 0)
+            self._sequence_positions[beam_type] = position + 1
 
             # check if file still exists
             if not os.path.exists(filename):
                 logging.warning(f"Image file not found: {filename}, falling back to random noise")
                 return np.random.randint(0, 256, output_shape, dtype=dtype)
 
-            # load and process the image
+            # load the (cached) image, resized to the specified resolution
             logging.debug(f"Generating image from {filename} for beam type {beam_type.name}")
-            img = FibsemImage.load(filename)
+            image_data = self._image_sequence_cache.get(filename, shape=output_shape, dtype=dtype)
+
+            # decode the next frames in the background
+            self._image_sequence_cache.prefetch(
+                self._next_sequence_filenames(beam_type, position + 1, self._prefetch_frames), 
+                shape=output_shape, dtype=dtype)
 
-            # resize the image data to the specified resolution
-            image_data = resize(
-                img.data, 
-                output_shape=output_shape, 
-                anti_aliasing=True, 
-                preserve_range=True
-            )
-            return image_data.astype(dtype)
+            return np.array(image_data) # copy, the cached data is read-only
         except StopIteration as e:
             logging.debug(f"Image sequence for {beam_type.name} exhausted, falling back to random noise: {e}")
             return np.random.randint(0, 256, output_shape, dtype=dtype)
@@ -449,6 +617,15 @@ class DemoMicroscope(FibsemMicroscope):
             logging.error(f"Unexpected error loading image for {beam_type.name}: {e}, falling back to random noise")
             return np.random.randint(0, 256, output_shape, dtype=dtype)
 
+    def _next_sequence_filenames(self, beam_type: BeamType, position: int, n: int) -> List[str]:
+        """Get the next n filenames in the image sequence, starting from position."""
+        filenames = self._image_sequences.get(beam_type, [])
+        if not filenames:
+            return []
+        if self._use_cycle:
+            return [filenames[(position + i) % len(filenames)] for i in range(min(n, len(filenames)))]
+        return filenames[position:position + n]
+
     def _setup_image_iterators(self) -> None:
         """Setup image iterators for simulator image sequences.
         
@@ -481,8 +658,20 @@ class DemoMicroscope(FibsemMicroscope):
         if len(self._fib_filenames) == 0:
             raise ValueError(f"No .tif files found in FIB data path: {fib_data_path}")
 
+        # playback cache (decoded, resized and memory-mapped images), and prefetching
+        if getattr(self, "_image_sequence_cache", None) is not None:
+            self._image_sequence_cache.close()
+        self._image_sequence_cache = ImageSequenceCache(
+            cache_dir=self.system.sim.get("cache_dir", None),
+            max_open=int(self.system.sim.get("max_open_frames", SIMULATOR_MAX_OPEN_FRAMES)),
+        )
+        self._prefetch_frames: int = int(self.system.sim.get("prefetch", SIMULATOR_PREFETCH_FRAMES))
+        self._image_sequences = {BeamType.ELECTRON: self._sem_filenames, BeamType.ION: self._fib_filenames}
+        self._sequence_positions: Dict[BeamType, int] = {}
+
         # create cycling iterators for continuous image sequences
         use_cycle = self.system.sim.get("use_cycle", False)
+        self._use_cycle = use_cycle
         if use_cycle:
             self.imaging_system.image_iterators[BeamType.ELECTRON] = cycle(self._sem_filenames)
             self.imaging_system.image_iterators[BeamType.ION] = cycle(self._fib_filenames)
@@ -493,6 +682,13 @@ class DemoMicroscope(FibsemMicroscope):
         self.use_image_sequence = True
         logging.info(f"Image iterators initialized: {len(self._sem_filenames)} SEM images, {len(self._fib_filenames)} FIB images")
 
+        # pre-decode the sequences at the current imaging resolution
+        if self.system.sim.get("preload", False):
+            for beam_type, beam_system in [(BeamType.ELECTRON, self.electron_system), (BeamType.ION, self.ion_system)]:
+                resolution = beam_system.beam.resolution
+                self._image_sequence_cache.prefetch(self._image_sequences[beam_type], 
+                                                    shape=(resolution[1], resolution[0]), dtype=np.uint8)
+
     def last_image(self, beam_type: BeamType) -> Optional[FibsemImage]:
         """Get the last acquired image of the specified beam type.
         Args:
@@ -533,13 +729,12 @@ class DemoMicroscope(FibsemMicroscope):
                 dwell_time = image.metadata.image_settings.dwell_time
                 resolution = image.metadata.image_settings.resolution
                 estimated_time = dwell_time * resolution[0] * resolution[1]
-                time.sleep(estimated_time)
+                self.clock.sleep(estimated_time)
+                if self.clock.instant:
+                    time.sleep(SIMULATOR_MIN_FRAME_INTERVAL)
 
                 # emit the acquired image
-                if beam_type is BeamType.ELECTRON:
-                    self.sem_acquisition_signal.emit(image)
-                if beam_type is BeamType.ION:
-                    self.fib_acquisition_signal.emit(image)
+                self._submit_live_frame(image, beam_type=beam_type)
 
         except Exception as e:
             logging.error(f"Error in acquisition worker: {e}")
@@ -549,7 +744,7 @@ class DemoMicroscope(FibsemMicroscope):
             self.set_reduced_area_scanning_mode(reduced_area, beam_type)
         # TODO: implement auto-contrast
         logging.info(f"Autocontrasting {beam_type.name} beam.")
-        time.sleep(random.uniform(0.5, 1.0))  # simulate time taken to calculate auto-contrast
+        self.clock.sleep(random.uniform(0.5, 1.0))  # simulate time taken to calculate auto-contrast
         self.set_detector_brightness(random.uniform(0.4, 0.6), beam_type)
         self.set_detector_contrast(random.uniform(0.4, 0.6), beam_type)
 
@@ -562,7 +757,7 @@ class DemoMicroscope(FibsemMicroscope):
             self.set_reduced_area_scanning_mode(reduced_area, beam_type)
         # TODO: implement auto-focus
         wd: float = self.get("eucentric_height", beam_type=beam_type) # type: ignore
-        time.sleep(random.uniform(0.5, 1.0))  # simulate time taken to calculate auto-focus
+        self.clock.sleep(random.uniform(0.5, 1.0))  # simulate time taken to calculate auto-focus
         focus_adjustment = random.uniform(-100e-6, 100e-6)
         new_wd = wd + focus_adjustment
         self.set_working_distance(new_wd, beam_type)
@@ -596,8 +791,21 @@ class DemoMicroscope(FibsemMicroscope):
             return STAGE_LIMITS_COMPUSTAGE
         return STAGE_LIMITS_DEFAULT
 
+    def _simulate_stage_movement(self, start: FibsemStagePosition, end: FibsemStagePosition) -> None:
+        """Sleep for the simulated stage movement time (axes move simultaneously)."""
+        durations = [0.0]
+        for axis in ["x", "y", "z", "r", "t"]:
+            p0, p1 = getattr(start, axis), getattr(end, axis)
+            if p0 is None or p1 is None:
+                continue
+            speed = SIMULATOR_STAGE_SPEED if axis in ["x", "y", "z"] else SIMULATOR_STAGE_ROTATION_SPEED
+            durations.append(abs(p1 - p0) / speed)
+        self.clock.sleep(max(durations))
+
     def move_stage_absolute(self, position: FibsemStagePosition) -> FibsemStagePosition:
         """Move the stage to the specified position."""
+        start_time = time.time()
+        start_position = copy.deepcopy(self.stage_system.position)
 
         # only assign if not None
         if position.x is not None:
@@ -611,16 +819,22 @@ class DemoMicroscope(FibsemMicroscope):
         if position.t is not None:
             self.stage_system.position.t = position.t
 
+        self._simulate_stage_movement(start_position, self.stage_system.position)
         logging.debug({"msg": "move_stage_absolute", "position": position.to_dict()})
+        log_event("move_stage_absolute", position=position.to_dict(), duration=time.time() - start_time)
 
         return self.get_stage_position()
 
     def move_stage_relative(self, position: FibsemStagePosition) -> FibsemStagePosition:
         """Move the stage by the specified amount."""
 
+        start_time = time.time()
+        start_position = copy.deepcopy(self.stage_system.position)
         self.stage_system.position += position
+        self._simulate_stage_movement(start_position, self.stage_system.position)
 
         logging.debug({"msg": "move_stage_relative", "position": position.to_dict()})
+        log_event("move_stage_relative", position=position.to_dict(), duration=time.time() - start_time)
 
         return self.get_stage_position()
 
@@ -723,6 +937,10 @@ class DemoMicroscope(FibsemMicroscope):
         remaining_time = estimated_time
         self.milling_system.state = MillingState.RUNNING
 
+        # limit the number of progress updates when the clock is scaled
+        if self.clock.speed_up != 1:
+            MILLING_SLEEP_TIME = max(MILLING_SLEEP_TIME, estimated_time / SIMULATOR_MILLING_UPDATE_STEPS)
+
         if asynch:
             return # up to the caller to handle
 
@@ -730,22 +948,22 @@ class DemoMicroscope(FibsemMicroscope):
             logging.debug(f"Running milling: {remaining_time} s remaining.")
             if self.get_milling_state() == MillingState.PAUSED:
                 logging.info("Milling paused.")
-                time.sleep(MILLING_SLEEP_TIME)
+                time.sleep(max(SIMULATOR_MIN_FRAME_INTERVAL, MILLING_SLEEP_TIME / max(self.clock.speed_up, 1)))
                 continue
             if self.get_milling_state() == MillingState.IDLE:
                 logging.info("Milling stopped.")
                 break
-            time.sleep(MILLING_SLEEP_TIME)
-            remaining_time -= MILLING_SLEEP_TIME
+            sleep_time = min(MILLING_SLEEP_TIME, max(remaining_time, 0))
+            self.clock.sleep(sleep_time)
+            remaining_time = max(remaining_time - sleep_time, 0)
 
             # update milling progress via signal
-            self.milling_progress_signal.emit({"progress": {
+            self._emit_milling_progress({
                     "state": "update", 
                     "start_time": start_time,
                     "milling_state": self.get_milling_state(),
                     "estimated_time": estimated_time, 
-                    "remaining_time": remaining_time}
-                    })
+                    "remaining_time": remaining_time})
 
             if remaining_time <= 0: # milling complete
                 self.milling_system.state = MillingState.IDLE
@@ -784,9 +1002,17 @@ class DemoMicroscope(FibsemMicroscope):
         return self.milling_system.state
 
     def estimate_milling_time(self) -> float:
-        """Estimate the milling time for the specified patterns."""
-        PATTERN_SLEEP_TIME = 5
-        return PATTERN_SLEEP_TIME * len(self.milling_system.patterns)
+        """Estimate the milling time for the specified patterns (pattern volume / sputter rate at the milling current)."""
+        from fibsem.milling.base import estimate_milling_time
+
+        milling_current = self.get_beam_current(beam_type=self.milling_channel)
+        total_time = 0.0
+        for pattern in self.milling_system.patterns:
+            try:
+                total_time += estimate_milling_time(pattern, milling_current)
+            except Exception as e:
+                logging.debug(f"Failed to estimate milling time for {pattern}: {e}")
+        return total_time
 
     def set_default_application_file(self, application_file: str, strict: bool = True) -> str:
         application_file = ThermoMicroscope.get_application_file(self, application_file, strict)
@@ -851,13 +1077,13 @@ class DemoMicroscope(FibsemMicroscope):
         logging.info(f"Turning on heater for {gas}")
         # turn on heater
         gis.turn_heater_on()
-        time.sleep(3) # wait for the heat
+        self.clock.sleep(3) # wait for the heat
         # TODO: get state feedback, wait for heater to be at temp
 
         # run deposition
         logging.info(f"Running deposition for {duration} seconds")
         # gis.open()
-        time.sleep(duration) 
+        self.clock.sleep(duration) 
         gis.close()
 
         # turn off heater
@@ -989,7 +1215,7 @@ class DemoMicroscope(FibsemMicroscope):
         # stage 
         if key == "stage_position":
             logging.info(f"--------------GETTING STAGE POSITION--------------")
-            time.sleep(0.1)
+            self.clock.sleep(0.1)
             return self.stage_system.position
         if key == "stage_homed":
             return self.stage_system.is_homed
@@ -1260,5 +1486,5 @@ class DemoMicroscope(FibsemMicroscope):
             NotImplementedError: If the system is not an Arctis system.
         """
         logging.info(f"Running sputter coater for {time_seconds} seconds...")
-        time.sleep(time_seconds)
+        self.clock.sleep(time_seconds)
         logging.info("Sputter coating complete.")
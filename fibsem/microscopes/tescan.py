@@ -11,6 +11,7 @@ from typing import Dict, List, Union, Tuple, Optional
 import numpy as np
 
 import fibsem.constants as constants
+from fibsem.events import log_event
 from fibsem.microscope import FibsemMicroscope
 
 TESCAN_API_AVAILABLE = False
@@ -366,6 +367,7 @@ class TescanMicroscope(FibsemMicroscope):
             effective_image_settings = self.get_imaging_settings(beam_type=effective_beam_type)
 
         logging.info(f"acquiring new {effective_beam_type.name} image.")
+        start_time = time.time()
 
         # prepare the beam (turn on, stop scanning)
         beam: Union[Automation.SEM, Automation.FIB]
@@ -440,6 +442,7 @@ class TescanMicroscope(FibsemMicroscope):
         fibsem_image.metadata.user = self.user
         fibsem_image.metadata.experiment = self.experiment 
         fibsem_image.metadata.system = self.system
+        self._log_acquisition_event(fibsem_image, start_time)
 
         return fibsem_image
 
@@ -560,9 +563,11 @@ class TescanMicroscope(FibsemMicroscope):
         logging.info(f"Moving stage to {position}.")
         # convert to tescan position
         x, y, z, r, t = to_tescan_stage_position(position=position)
+        start_time = time.time()
         self.connection.Stage.MoveTo(x=x, y=y, z=z, rot=r, tiltx=t)
 
         logging.debug({"msg": "move_stage_absolute", "position": position.to_dict()})
+        log_event("move_stage_absolute", position=position.to_dict(), duration=time.time() - start_time)
 
     def move_stage_relative(
         self,
@@ -1015,13 +1020,12 @@ class TescanMicroscope(FibsemMicroscope):
                 time.sleep(MILLING_SLEEP_TIME)
 
                 # update milling progress via signal
-                self.milling_progress_signal.emit({"progress": {
+                self._emit_milling_progress({
                         "state": "update",
                         "milling_state": self.get_milling_state(),
                         "start_time": start_time, 
                         "estimated_time": estimated_time, 
-                        "remaining_time": remaining_time}
-                        })
+                        "remaining_time": remaining_time})
 
         except Exception as err:
             logging.error(f"Error in run_milling: {err}")
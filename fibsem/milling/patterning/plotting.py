@@ -23,6 +23,7 @@ from fibsem.structures import (
     FibsemPolygonSettings,
     Point,
 )
+from .raster import find_overlaps, place_drawn_pattern, rasterise_patterns
 from .utils import (
     create_pattern_mask,
     get_pattern_bounding_box,
@@ -478,54 +479,49 @@ def _add_overlaps_mpl(
     
     overlap_patches = []
     
-    # Create masks for each pattern
-    pattern_masks = []
-    for stage in milling_stages:
-        stage_mask = create_pattern_mask(stage.pattern, image.data.shape, pixelsize=image.metadata.pixel_size.x, include_exclusions=False)
-        pattern_masks.append(stage_mask)
-    
-    # Find overlaps between patterns
-    for i in range(len(pattern_masks)):
-        for j in range(i + 1, len(pattern_masks)):
-            overlap = pattern_masks[i] & pattern_masks[j]
-            if np.any(overlap):
-                # Create contour patches for overlap regions
-                try:
-                    import skimage.measure
-                    contours = skimage.measure.find_contours(overlap.astype(float), 0.5)
-                    
-                    for contour in contours:
-                        if len(contour) > 3:  # Only create patches for significant overlaps
-                            # Swap x,y coordinates for matplotlib (contour gives row,col)
-                            contour_xy = contour[:, [1, 0]]
-                            patch = mpatches.Polygon(
-                                contour_xy,
-                                closed=True,
-                                linewidth=OVERLAP_PROPERTIES["line_width"],
-                                edgecolor=OVERLAP_PROPERTIES["edge_color"],
-                                facecolor=OVERLAP_PROPERTIES["face_color"],
-                                alpha=OVERLAP_PROPERTIES["alpha"],
-                                linestyle=OVERLAP_PROPERTIES["line_style"],
-                            )
-                            overlap_patches.append(patch)
-                except ImportError:
-                    # Fallback: create simple rectangle patches for overlap bounding boxes
-                    overlap_coords = np.where(overlap)
-                    if len(overlap_coords[0]) > 0:
-                        y_min, y_max = overlap_coords[0].min(), overlap_coords[0].max()
-                        x_min, x_max = overlap_coords[1].min(), overlap_coords[1].max()
-                        
-                        patch = mpatches.Rectangle(
-                            (x_min, y_min),
-                            x_max - x_min,
-                            y_max - y_min,
-                            linewidth=OVERLAP_PROPERTIES["line_width"],
-                            edgecolor=OVERLAP_PROPERTIES["edge_color"],
-                            facecolor=OVERLAP_PROPERTIES["face_color"],
-                            alpha=OVERLAP_PROPERTIES["alpha"],
-                            linestyle=OVERLAP_PROPERTIES["line_style"],
-                        )
-                        overlap_patches.append(patch)
+    # Create masks for each pattern (shapes shared between stages are only rasterised once)
+    pattern_masks = rasterise_patterns([stage.pattern for stage in milling_stages], image.data.shape,
+                                       pixelsize=image.metadata.pixel_size.x, include_exclusions=False)
+
+    # Find overlaps between patterns (only compared where the pattern bounding boxes intersect)
+    for overlap in find_overlaps(pattern_masks).values():
+        # Create contour patches for overlap regions
+        try:
+            import skimage.measure
+            contours = skimage.measure.find_contours(overlap.astype(float), 0.5)
+            
+            for contour in contours:
+                if len(contour) > 3:  # Only create patches for significant overlaps
+                    # Swap x,y coordinates for matplotlib (contour gives row,col)
+                    contour_xy = contour[:, [1, 0]]
+                    patch = mpatches.Polygon(
+                        contour_xy,
+                        closed=True,
+                        linewidth=OVERLAP_PROPERTIES["line_width"],
+                        edgecolor=OVERLAP_PROPERTIES["edge_color"],
+                        facecolor=OVERLAP_PROPERTIES["face_color"],
+                        alpha=OVERLAP_PROPERTIES["alpha"],
+                        linestyle=OVERLAP_PROPERTIES["line_style"],
+                    )
+                    overlap_patches.append(patch)
+        except ImportError:
+            # Fallback: create simple rectangle patches for overlap bounding boxes
+            overlap_coords = np.where(overlap)
+            if len(overlap_coords[0]) > 0:
+                y_min, y_max = overlap_coords[0].min(), overlap_coords[0].max()
+                x_min, x_max = overlap_coords[1].min(), overlap_coords[1].max()
+                
+                patch = mpatches.Rectangle(
+                    (x_min, y_min),
+                    x_max - x_min,
+                    y_max - y_min,
+                    linewidth=OVERLAP_PROPERTIES["line_width"],
+                    edgecolor=OVERLAP_PROPERTIES["edge_color"],
+                    facecolor=OVERLAP_PROPERTIES["face_color"],
+                    alpha=OVERLAP_PROPERTIES["alpha"],
+                    linestyle=OVERLAP_PROPERTIES["line_style"],
+                )
+                overlap_patches.append(patch)
     if not overlap_patches:
         return None
 
@@ -1004,26 +1000,19 @@ def draw_pattern_shape(ps: FibsemPatternSettings, image_shape: Tuple[int, int],
 
 def draw_pattern_in_image(image: np.ndarray, 
                           drawn_pattern: DrawnPattern) -> np.ndarray:
-
-    pattern = drawn_pattern.pattern
-    pos = drawn_pattern.position
-    
-    # place the annulus shape in the image
-    w = pattern.shape[1] // 2
-    h = pattern.shape[0] // 2
-
-    # fill the annulus shape in the image
-    xmin, xmax = pos.x - w, pos.x + w
-    ymin, ymax = pos.y - h, pos.y + h
-    zero_image = np.zeros_like(image)
-    zero_image[ymin:ymax, xmin:xmax] = pattern[:2*h, :2*w].astype(bool)
+    """Draw the pattern in the image (in place), only the region covered by the pattern is updated."""
+    raster = place_drawn_pattern(drawn_pattern, image.shape[:2])
+    if raster is None:
+        return image
+    window, shape_mask = raster
+    region = image[window]
 
     # if the pattern is an exclusion, set the image to zero
     if drawn_pattern.is_exclusion:
-        image[zero_image == 1] = 0
+        region[shape_mask] = 0
     else:
-        # add the annulus shape to the image, clip to 1
-        image = np.clip(image+zero_image, 0, 1)
+        # add the pattern shape to the image, clip to 1
+        np.clip(region + shape_mask, 0, 1, out=region, casting="unsafe")
 
     return image
 
@@ -1037,7 +1026,7 @@ def compose_pattern_image(image: np.ndarray, drawn_patterns: List[DrawnPattern])
 
     # add each pattern shape to the image
     for dp in drawn_patterns:
-        pattern_image = draw_pattern_in_image(pattern_image, dp)
+        draw_pattern_in_image(pattern_image, dp)
 
     return pattern_image
 
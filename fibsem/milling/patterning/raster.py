@@ -0,0 +1,269 @@
+"""Rasterise milling pattern shapes into image masks.
+
+Shapes are rasterised within their bounding box, clipped to the image, so the cost of drawing a
+shape scales with the visible area of the shape rather than the image (or the full shape) size.
+Rasterised shapes are cached, keyed by the shape settings, image shape and pixel size, so
+redrawing patterns (e.g. when a single parameter is edited in the ui) only rasterises the shapes
+that changed.
+"""
+from __future__ import annotations
+
+import hashlib
+import threading
+from collections import OrderedDict
+from dataclasses import fields
+from enum import Enum
+from typing import TYPE_CHECKING, Dict, Hashable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from fibsem.structures import FibsemCircleSettings, FibsemPatternSettings, FibsemRectangleSettings
+
+if TYPE_CHECKING:
+    from fibsem.milling.patterning.patterns2 import BasePattern
+    from fibsem.milling.patterning.plotting import DrawnPattern
+
+Window = Tuple[slice, slice]
+RasterisedShape = Tuple[Window, np.ndarray]   # image window (y, x), boolean mask of the shape within the window
+
+MAX_RASTER_CACHE_BYTES = 256 * 1024 * 1024
+
+
+def _freeze(value) -> Hashable:
+    """Convert a shape settings value into a hashable cache key."""
+    if isinstance(value, np.ndarray):
+        return (value.shape, value.dtype.str, hashlib.sha1(np.ascontiguousarray(value).tobytes()).hexdigest())
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(v) for v in value)
+    if isinstance(value, dict):
+        return tuple(sorted((k, _freeze(v)) for k, v in value.items()))
+    if isinstance(value, Enum):
+        return value.name
+    return value
+
+
+def _shape_key(shape: FibsemPatternSettings) -> Hashable:
+    return (type(shape).__name__,) + tuple((f.name, _freeze(getattr(shape, f.name, None))) for f in fields(shape))
+
+
+class _RasterCache:
+    """LRU cache of rasterised shapes, limited by the total size of the masks."""
+    def __init__(self, max_bytes: int = MAX_RASTER_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self._cache: "OrderedDict[Hashable, RasterisedShape]" = OrderedDict()
+        self._nbytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Optional[RasterisedShape]:
+        with self._lock:
+            value = self._cache.get(key)
+            if value is not None:
+                self._cache.move_to_end(key)
+            return value
+
+    def put(self, key: Hashable, value: RasterisedShape) -> None:
+        nbytes = value[1].nbytes if value[1].base is None else 0    # broadcast masks don't use memory
+        if nbytes > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._cache:
+                return
+            self._cache[key] = value
+            self._nbytes += nbytes
+            while self._nbytes > self.max_bytes:
+                _, (_, mask) = self._cache.popitem(last=False)
+                self._nbytes -= mask.nbytes if mask.base is None else 0
+
+    def clear(self) -> None:
+        with self._lock:
+            self._cache.clear()
+            self._nbytes = 0
+
+
+_raster_cache = _RasterCache()
+
+
+def clear_raster_cache() -> None:
+    """Clear the cache of rasterised shapes."""
+    _raster_cache.clear()
+
+
+def _clip_window(y0: int, x0: int, h: int, w: int, image_shape: Tuple[int, int]) -> Optional[Tuple[Window, Window]]:
+    """Clip a (y0, x0, h, w) box to the image. Returns the image window and the corresponding window in the box."""
+    ymin, ymax = max(0, y0), min(image_shape[0], y0 + h)
+    xmin, xmax = max(0, x0), min(image_shape[1], x0 + w)
+    if ymax <= ymin or xmax <= xmin:
+        return None
+    image_window = (slice(ymin, ymax), slice(xmin, xmax))
+    box_window = (slice(ymin - y0, ymax - y0), slice(xmin - x0, xmax - x0))
+    return image_window, box_window
+
+
+def place_drawn_pattern(drawn_pattern: "DrawnPattern", image_shape: Tuple[int, int]) -> Optional[RasterisedShape]:
+    """Place a drawn pattern (centred on its position) in the image, clipped to the image bounds."""
+    pattern = drawn_pattern.pattern
+    pos = drawn_pattern.position
+    h, w = pattern.shape[0] // 2, pattern.shape[1] // 2
+    windows = _clip_window(int(pos.y) - h, int(pos.x) - w, 2 * h, 2 * w, image_shape)
+    if windows is None:
+        return None
+    image_window, box_window = windows
+    return image_window, pattern[box_window].astype(bool)
+
+
+def _rasterise_circle(shape: FibsemCircleSettings, image_shape: Tuple[int, int], pixelsize: float) -> Optional[RasterisedShape]:
+    """Rasterise a circle / annulus, only evaluating the pixels within the image (see plotting.draw_annulus_shape)."""
+    icy, icx = image_shape[0] // 2, image_shape[1] // 2
+    size = int(2 * shape.radius / pixelsize)
+    if size <= 0:
+        return None
+    inner_radius_ratio = 0
+    if not np.isclose(shape.thickness, 0):
+        inner_radius_ratio = (shape.radius - shape.thickness) / shape.radius
+
+    cx = int(icx + shape.centre_x / pixelsize)
+    cy = int(icy - shape.centre_y / pixelsize)
+    half = size // 2
+    windows = _clip_window(cy - half, cx - half, 2 * half, 2 * half, image_shape)
+    if windows is None:
+        return None
+    image_window, (ys, xs) = windows
+
+    # normalised coordinates of the grid, only the distances of the visible rows / columns are evaluated
+    grid = np.linspace(-1, 1, size)
+    y, x = grid[ys], grid[xs]
+    distance = np.sqrt(x[np.newaxis, :] ** 2 + y[:, np.newaxis] ** 2)
+    mask = distance <= 1
+    if inner_radius_ratio > 0:
+        mask &= distance >= inner_radius_ratio
+    return image_window, mask
+
+
+def _rasterise_rectangle(shape: FibsemRectangleSettings, image_shape: Tuple[int, int], pixelsize: float) -> Optional[RasterisedShape]:
+    """Rasterise an (unrotated) rectangle (see plotting.draw_rectangle_shape)."""
+    icy, icx = image_shape[0] // 2, image_shape[1] // 2
+    w, h = int(shape.width / pixelsize), int(shape.height / pixelsize)
+    cx = int(icx + shape.centre_x / pixelsize)
+    cy = int(icy - shape.centre_y / pixelsize)
+    windows = _clip_window(cy - h // 2, cx - w // 2, 2 * (h // 2), 2 * (w // 2), image_shape)
+    if windows is None:
+        return None
+    image_window, _ = windows
+    size = (image_window[0].stop - image_window[0].start, image_window[1].stop - image_window[1].start)
+    return image_window, np.broadcast_to(True, size)   # read-only, no memory allocated
+
+
+def _rasterise_shape(shape: FibsemPatternSettings, image_shape: Tuple[int, int], pixelsize: float) -> Optional[RasterisedShape]:
+    if isinstance(shape, FibsemCircleSettings):
+        return _rasterise_circle(shape, image_shape, pixelsize)
+    if isinstance(shape, FibsemRectangleSettings) and np.isclose(shape.rotation, 0):
+        return _rasterise_rectangle(shape, image_shape, pixelsize)
+
+    # other shapes are bounded by their own size, draw them and place them in the image
+    from fibsem.milling.patterning.plotting import draw_pattern_shape
+    return place_drawn_pattern(draw_pattern_shape(shape, image_shape, pixelsize), image_shape)
+
+
+def rasterise_shape(shape: FibsemPatternSettings, image_shape: Tuple[int, int], pixelsize: float, use_cache: bool = True) -> Optional[RasterisedShape]:
+    """Rasterise a shape into the image.
+
+    Args:
+        shape: The shape settings.
+        image_shape: Shape of the image as (height, width).
+        pixelsize: Pixel size in meters.
+        use_cache: Use the cache of rasterised shapes.
+
+    Returns:
+        The image window (y, x slices) and the boolean mask of the shape within the window (read-only),
+        or None if the shape is outside the image.
+    """
+    image_shape = (int(image_shape[0]), int(image_shape[1]))
+    if not use_cache:
+        return _rasterise_shape(shape, image_shape, pixelsize)
+
+    key = (_shape_key(shape), image_shape, float(pixelsize))
+    raster = _raster_cache.get(key)
+    if raster is None:
+        raster = _rasterise_shape(shape, image_shape, pixelsize)
+        if raster is None:
+            return None
+        raster[1].flags.writeable = False
+        _raster_cache.put(key, raster)
+    return raster
+
+
+def _is_exclusion(shape: FibsemPatternSettings) -> bool:
+    return bool(getattr(shape, "is_exclusion", False))
+
+
+def rasterise_shapes(shapes: Sequence[FibsemPatternSettings],
+                     image_shape: Tuple[int, int],
+                     pixelsize: float,
+                     include_exclusions: bool = False,
+                     out: Optional[np.ndarray] = None) -> np.ndarray:
+    """Compose the shapes into a boolean mask. Exclusions are applied last (they take precedence).
+
+    Args:
+        shapes: The shapes to rasterise.
+        image_shape: Shape of the image as (height, width).
+        pixelsize: Pixel size in meters.
+        include_exclusions: Whether to apply the exclusion shapes.
+        out: The mask to compose the shapes into (default: a new, empty mask).
+
+    Returns:
+        Binary mask with the image shape.
+    """
+    mask = np.zeros(image_shape, dtype=bool) if out is None else out
+    for shape in sorted(shapes, key=_is_exclusion):
+        exclusion = _is_exclusion(shape)
+        if exclusion and not include_exclusions:
+            continue
+        raster = rasterise_shape(shape, image_shape, pixelsize)
+        if raster is None:
+            continue
+        window, shape_mask = raster
+        if exclusion:
+            mask[window] &= ~shape_mask
+        else:
+            mask[window] |= shape_mask
+    return mask
+
+
+def rasterise_patterns(patterns: Sequence["BasePattern"],
+                       image_shape: Tuple[int, int],
+                       pixelsize: float,
+                       include_exclusions: bool = False) -> List[np.ndarray]:
+    """Rasterise a batch of patterns (e.g. of each milling stage), sharing the cache of rasterised shapes.
+    Returns a boolean mask per pattern."""
+    from fibsem.milling.patterning.utils import create_pattern_mask
+    return [create_pattern_mask(pattern, image_shape, pixelsize, include_exclusions=include_exclusions)
+            for pattern in patterns]
+
+
+def find_overlaps(masks: Sequence[np.ndarray]) -> Dict[Tuple[int, int], np.ndarray]:
+    """Find the overlapping regions between pairs of masks.
+    Only the pairs with overlapping bounding boxes are compared, within the intersection of the bounding boxes.
+    Returns:
+        The full size overlap mask, for each pair (i, j) of masks that overlap.
+    """
+    from scipy import ndimage
+
+    bboxes = []
+    for mask in masks:
+        objects = ndimage.find_objects(mask.astype(np.uint8))
+        bboxes.append(objects[0] if objects else None)
+
+    overlaps = {}
+    for i in range(len(masks)):
+        for j in range(i + 1, len(masks)):
+            if bboxes[i] is None or bboxes[j] is None:
+                continue
+            window = tuple(slice(max(a.start, b.start), min(a.stop, b.stop)) for a, b in zip(bboxes[i], bboxes[j]))
+            if any(s.stop <= s.start for s in window):
+                continue
+            local = masks[i][window] & masks[j][window]
+            if local.any():
+                overlap = np.zeros(masks[i].shape, dtype=bool)
+                overlap[window] = local
+                overlaps[(i, j)] = overlap
+    return overlaps
@@ -4,6 +4,7 @@ import logging
 import numpy as np
 from typing import List, Tuple, Any, TYPE_CHECKING
 
+from fibsem.milling.patterning.raster import rasterise_shapes
 from fibsem.structures import FibsemRectangle
 
 if TYPE_CHECKING:
@@ -27,41 +28,9 @@ def create_pattern_mask(pattern: "BasePattern", image_shape: Tuple[int, int], pi
     pattern_mask = np.zeros(image_shape, dtype=bool)
 
     try:
-        shapes = pattern.define()
-
-        # Sort shapes so exclusions are processed last (exclusions take precedence)
-        shapes.sort(key=lambda s: hasattr(s, 'is_exclusion') and s.is_exclusion)
-
-        for shape in shapes:
-            # Skip exclusion patterns unless explicitly requested
-            if hasattr(shape, 'is_exclusion') and shape.is_exclusion and not include_exclusions:
-                continue
-
-            # Import here to avoid circular import
-            from .plotting import draw_pattern_shape
-            drawn_pattern = draw_pattern_shape(shape, image_shape, pixelsize)
-            shape_mask = np.zeros(image_shape, dtype=bool)
-
-            # Place the pattern in the image mask
-            w = drawn_pattern.pattern.shape[1] // 2
-            h = drawn_pattern.pattern.shape[0] // 2
-            pos = drawn_pattern.position
-
-            xmin, xmax = max(0, pos.x - w), min(image_shape[1], pos.x + w)
-            ymin, ymax = max(0, pos.y - h), min(image_shape[0], pos.y + h)
-
-            if xmax > xmin and ymax > ymin:
-                pattern_h = min(2*h, ymax-ymin)
-                pattern_w = min(2*w, xmax-xmin)
-                shape_mask[ymin:ymin+pattern_h, xmin:xmin+pattern_w] = \
-                    drawn_pattern.pattern[:pattern_h, :pattern_w].astype(bool)
-
-            # If this is an exclusion shape, zero out the region instead of adding it
-            if hasattr(shape, 'is_exclusion') and shape.is_exclusion:
-                pattern_mask &= ~shape_mask
-            else:
-                pattern_mask |= shape_mask
-
+        # shapes are composed within their (cached) bounding box, exclusions take precedence
+        rasterise_shapes(pattern.define(), image_shape, pixelsize,
+                         include_exclusions=include_exclusions, out=pattern_mask)
     except Exception as e:
         logging.debug(f"Failed to create mask for pattern {pattern.name}: {e}")
 
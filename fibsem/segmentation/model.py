@@ -1,5 +1,9 @@
-from typing import Optional
+from typing import Dict, Iterable, List, Optional, Tuple
 import logging
+import threading
+import time
+from dataclasses import dataclass
+from functools import wraps
 
 import numpy as np
 import torch
@@ -31,6 +35,8 @@ __DEPRECIATED_CHECKPOINTS__ = [
 
 
 class SegmentationModel:
+    supports_batch_inference = True  # inference accepts a (batch, height, width) stack of images
+
     def __init__(
         self,
         checkpoint: str = None,
@@ -190,15 +196,8 @@ def get_backend(checkpoint: str) -> str:
     else:
         return "smp"
 
-def load_model(
-    checkpoint: Path, encoder: str = "resnet34", nc: int = 3, _fix_numeric_scaling: bool = True, backend = None
-) -> SegmentationModel:
-    """Load a model checkpoint
-    backend: str, optional The backend to use. If None, will try to infer from the checkpoint name"""
-    
-    if backend is None:
-        backend = get_backend(checkpoint=checkpoint)
-
+def _load_model(checkpoint: Path, encoder: str, nc: int, _fix_numeric_scaling: bool, backend: str) -> SegmentationModel:
+    """Construct the model for the backend, and load the checkpoint"""
     # load model
     if backend == "nnunet":
         from fibsem.segmentation.nnunet_model import SegmentationModelNNUnet
@@ -225,6 +224,162 @@ def load_model(
     return model
 
 
+### MODEL REGISTRY
+# loaded models are shared across tasks and threads, so the model construction, weight loading and
+# first inference are only paid once per process (or ahead of time, by warm_up_models).
+# the backends are not guaranteed to be thread-safe (torch modules, onnx sessions, ...), so the
+# inference of a shared model is serialised by a per-model lock (e.g. the background warm up and a task).
+
+ModelKey = Tuple[str, str, str, tuple]  # (checkpoint, backend, device, load options)
+WARM_UP_IMAGE_SHAPE = (1024, 1536)
+
+
+@dataclass
+class ModelTiming:
+    """Load and first inference timing for a model in the registry (seconds)."""
+    checkpoint: str
+    backend: str
+    device: str
+    load_time: float
+    first_inference_time: Optional[float] = None
+
+
+_MODEL_REGISTRY: Dict[ModelKey, SegmentationModel] = {}
+_MODEL_TIMINGS: Dict[ModelKey, ModelTiming] = {}
+_MODEL_LOCKS: Dict[ModelKey, threading.Lock] = {}
+_MODEL_REGISTRY_LOCK = threading.Lock()
+
+
+def _serialise_inference(model: SegmentationModel) -> SegmentationModel:
+    """Wrap the model inference with a lock, so the (shared) model only runs one inference at a time."""
+    inference = model.inference
+    lock = threading.Lock()
+
+    @wraps(inference)
+    def _inference(*args, **kwargs):
+        with lock:
+            return inference(*args, **kwargs)
+
+    model.inference = _inference
+    return model
+
+
+def _get_device() -> str:
+    return "cuda:0" if torch.cuda.is_available() else "cpu"
+
+
+def _model_key(checkpoint: Path, encoder: str, nc: int, _fix_numeric_scaling: bool, backend: str) -> ModelKey:
+    return (str(checkpoint), backend, _get_device(), (encoder, nc, _fix_numeric_scaling))
+
+
+def load_model(
+    checkpoint: Path, encoder: str = "resnet34", nc: int = 3, _fix_numeric_scaling: bool = True, backend = None,
+    use_cache: bool = True,
+) -> SegmentationModel:
+    """Load a model checkpoint
+    backend: str, optional The backend to use. If None, will try to infer from the checkpoint name
+    use_cache: bool, optional Return the model from the model registry if it was already loaded (shared between callers).
+        The inference of a shared model is serialised between threads."""
+    
+    if backend is None:
+        backend = get_backend(checkpoint=checkpoint)
+
+    if not use_cache:
+        return _load_model(checkpoint, encoder, nc, _fix_numeric_scaling, backend)
+
+    key = _model_key(checkpoint, encoder, nc, _fix_numeric_scaling, backend)
+    with _MODEL_REGISTRY_LOCK:
+        model = _MODEL_REGISTRY.get(key)
+        if model is not None:
+            return model
+        lock = _MODEL_LOCKS.setdefault(key, threading.Lock())
+
+    # load outside the registry lock, so different models can load concurrently,
+    # while concurrent requests for the same model wait for the first load
+    with lock:
+        model = _MODEL_REGISTRY.get(key)
+        if model is not None:
+            return model
+        t0 = time.perf_counter()
+        model = _serialise_inference(_load_model(checkpoint, encoder, nc, _fix_numeric_scaling, backend))
+        load_time = time.perf_counter() - t0
+        logging.info({"msg": "load_model", "checkpoint": str(checkpoint), "backend": backend,
+                      "device": key[2], "load_time": load_time})
+        with _MODEL_REGISTRY_LOCK:
+            _MODEL_REGISTRY[key] = model
+            _MODEL_TIMINGS[key] = ModelTiming(checkpoint=str(checkpoint), backend=backend,
+                                              device=key[2], load_time=load_time)
+    return model
+
+
+def warm_up_model(checkpoint: Path, backend: Optional[str] = None, **kwargs) -> ModelTiming:
+    """Load the model into the registry, and run a first inference (e.g. kernel selection, allocations),
+    so the first detection doesn't pay for it.
+    Args:
+        checkpoint: The model checkpoint.
+        backend: The backend to use. If None, will try to infer from the checkpoint name.
+        kwargs: Additional load_model arguments.
+    Returns:
+        The load and first inference timing for the model.
+    """
+    if backend is None:
+        backend = get_backend(checkpoint=checkpoint)
+    model = load_model(checkpoint, backend=backend, **kwargs)
+    key = _model_key(checkpoint, kwargs.get("encoder", "resnet34"), kwargs.get("nc", 3),
+                     kwargs.get("_fix_numeric_scaling", True), backend)
+
+    with _MODEL_LOCKS[key]:
+        timing = _MODEL_TIMINGS[key]
+        if timing.first_inference_time is None:
+            image = np.zeros(WARM_UP_IMAGE_SHAPE, dtype=np.uint8)
+            t0 = time.perf_counter()
+            model.inference(image, rgb=False)
+            timing.first_inference_time = time.perf_counter() - t0
+            logging.info({"msg": "warm_up_model", "checkpoint": str(checkpoint), "backend": backend,
+                          "device": key[2], "first_inference_time": timing.first_inference_time})
+    return timing
+
+
+def warm_up_models(checkpoints: Iterable[Path], background: bool = True) -> Optional[threading.Thread]:
+    """Warm up the models (load and first inference), e.g. at the start of an experiment.
+    Failures are logged, rather than raised, so a missing model is only reported when it is used.
+    Args:
+        checkpoints: The model checkpoints to warm up.
+        background: Warm up the models in a background thread.
+    Returns:
+        The warm up thread, if running in the background.
+    """
+    checkpoints = list(dict.fromkeys(checkpoints))  # unique, ordered
+
+    def _warm_up():
+        for checkpoint in checkpoints:
+            try:
+                warm_up_model(checkpoint)
+            except Exception as e:
+                logging.warning(f"Failed to warm up model {checkpoint}: {e}")
+
+    if not background:
+        _warm_up()
+        return None
+    thread = threading.Thread(target=_warm_up, daemon=True, name="model-warm-up")
+    thread.start()
+    return thread
+
+
+def get_model_timings() -> List[ModelTiming]:
+    """Get the load and first inference timing of the models in the registry."""
+    with _MODEL_REGISTRY_LOCK:
+        return list(_MODEL_TIMINGS.values())
+
+
+def clear_model_cache() -> None:
+    """Remove all the models from the registry."""
+    with _MODEL_REGISTRY_LOCK:
+        _MODEL_REGISTRY.clear()
+        _MODEL_TIMINGS.clear()
+        _MODEL_LOCKS.clear()
+
+
 if __name__ == "__main__":
 
     model = SegmentationModel(checkpoint="checkpoint_train.pth.tar", mode="train")
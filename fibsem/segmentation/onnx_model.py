@@ -2,6 +2,7 @@ from __future__ import annotations
 
 import os
 import logging
+from typing import List, Optional, Tuple
 
 import cv2
 import numpy as np
@@ -108,12 +109,59 @@ def export_model_to_onnx(checkpoint: str, onnx_path: str):
 # export_model_to_onnx("autolamella-mega-latest.pt", "autolamella-mega-20231230.onnx")
 
 ## PPLITESEG WINDOWED MODEL
-def load_windowed_onnx_model(model_path: str) -> tuple:
+DEFAULT_WINDOW_BATCH_SIZE = 1   # number of windows per session.run, see scripts/benchmark_onnx_segmentation.py
+QUANTIZED_MODEL_SUFFIX = ".int8.onnx"
+
+
+def create_session_options(num_threads: Optional[int] = None) -> onnxruntime.SessionOptions:
+    """
+    Create the session options for CPU inference.
+
+    Args:
+        num_threads (int): The number of threads used within each operator (None to use all cores).
+
+    Returns:
+        SessionOptions: The ONNX session options.
+    """
+    options = onnxruntime.SessionOptions()
+    options.graph_optimization_level = onnxruntime.GraphOptimizationLevel.ORT_ENABLE_ALL
+    options.execution_mode = onnxruntime.ExecutionMode.ORT_SEQUENTIAL
+    options.intra_op_num_threads = num_threads or 0     # 0: onnxruntime default (all cores)
+    options.inter_op_num_threads = 1
+    # windows always have the same shape, so the memory arena / allocation pattern can be reused between runs
+    options.enable_cpu_mem_arena = True
+    options.enable_mem_pattern = True
+    return options
+
+
+def quantize_onnx_model(model_path: str, output_path: Optional[str] = None) -> str:
+    """
+    Quantize the model weights to int8 (dynamic quantization), for faster CPU inference.
+    The quantized model is only created if it doesn't already exist.
+
+    Args:
+        model_path (str): File path to the ONNX model.
+        output_path (str): File path to the quantized model. Defaults to model.int8.onnx, next to the model.
+
+    Returns:
+        str: File path to the quantized model.
+    """
+    if output_path is None:
+        output_path = os.path.splitext(model_path)[0] + QUANTIZED_MODEL_SUFFIX
+    if not os.path.exists(output_path):
+        from onnxruntime.quantization import QuantType, quantize_dynamic
+        logging.info(f"Quantizing {model_path} to {output_path}")
+        quantize_dynamic(model_path, output_path, weight_type=QuantType.QInt8)
+    return output_path
+
+
+def load_windowed_onnx_model(model_path: str, num_threads: Optional[int] = None) -> tuple:
     """
     Load the ONNX model.
 
     Args:
         model_path (str): File path to the ONNX model.
+        num_threads (int): The number of threads used within each operator (None to use all cores).
 
     Returns:
         InferenceSession: The ONNX model session.
@@ -121,7 +169,8 @@ def load_windowed_onnx_model(model_path: str) -> tuple:
         Tuple[int, int]: The shape of the input tensor.
         str: The name of the output tensor.
     """
-    session = InferenceSession(model_path)
+    session = InferenceSession(model_path, sess_options=create_session_options(num_threads),
+                               providers=["CPUExecutionProvider"])
     input_name = session.get_inputs()[0].name
     window_shape = session.get_inputs()[0].shape[2:]
     output_name = session.get_outputs()[0].name
@@ -154,21 +203,37 @@ class SegmentationModelWindowONNX:
     """
     ONNX model for windowed inference.
     This code refactor enables multi-threaded inference and Gaussian weighted windows
-    Improves model inference, inference time and window edge effects"""
-    def __init__(self, checkpoint: str = None):
-        if checkpoint is not None:
-            self.load_model(checkpoint)
+    Improves model inference, inference time and window edge effects.
+    Windows are run in batches (batch_size windows per session.run), if the model supports it.
+    Args:
+        checkpoint: The ONNX model checkpoint.
+        batch_size: The number of windows per session.run.
+        quantized: Use an int8 quantized model (created next to the checkpoint if required).
+    """
+    def __init__(self, checkpoint: str = None, batch_size: int = DEFAULT_WINDOW_BATCH_SIZE, quantized: bool = False):
         self.device = None
-        self.num_workers = min(8, os.cpu_count())
+        # a couple of concurrent runs overlap the accumulation with inference, the cores are shared between them
+        self.num_workers = min(2, os.cpu_count())
+        self.batch_size = batch_size
+        if checkpoint is not None:
+            self.load_model(checkpoint, quantized=quantized)
     
-    def load_model(self, checkpoint="autolamella-mega.onnx"):
+    def load_model(self, checkpoint="autolamella-mega.onnx", quantized: bool = False):
         # download checkpoint if needed
         # checkpoint = download_checkpoint(checkpoint)
+        if quantized:
+            checkpoint = quantize_onnx_model(checkpoint)
         self.checkpoint = os.path.basename(checkpoint)
 
         # load inference session
-        session = load_windowed_onnx_model(checkpoint)
+        num_threads = max(1, os.cpu_count() // self.num_workers)
+        session = load_windowed_onnx_model(checkpoint, num_threads=num_threads)
         self.session, self.input_name, self.window_shape, self.output_name, self.num_output_classes = session
+
+        # models exported with a fixed batch dimension only support one window per run
+        batch_dim = self.session.get_inputs()[0].shape[0]
+        if isinstance(batch_dim, int):
+            self.batch_size = min(self.batch_size, batch_dim)
     
     def GaussianWeightMatrix(self, window_shape: tuple[int, int]) -> np.ndarray:
         """
@@ -182,7 +247,7 @@ class SegmentationModelWindowONNX:
         w_matrix = w_matrix / np.max(w_matrix)
         w_matrix = w_matrix[np.newaxis, ...]
         del ksize
-        return w_matrix
+        return w_matrix.astype(np.float32)
     
     def pre_process(self, img: np.ndarray) -> np.ndarray:
         """Pre-process the image for inference, calculate window parameters"""
@@ -209,47 +274,47 @@ class SegmentationModelWindowONNX:
         img = np.pad(img, ((0, 0), (0, pad_h), (0, pad_w)), mode="constant")
         _, pad_h, pad_w = img.shape
 
-        #   window input image 
+        #   window input image (a view (nh, nw, 3, wh, ww), windows are only copied when batched)
         windows = view_as_windows(
         img, (3, self.window_shape[0], self.window_shape[1]), step=stride
-        ).reshape(-1, 3, self.window_shape[0], self.window_shape[1])
+        )[0]
 
         logging.debug(f"pre_process: {img.shape}, {windows.shape}, {h}, {w}, {pad_h}, {pad_w}, {stride}")
 
         return img, windows, h, w, pad_h, pad_w, stride
     
-    def window_indices(self,pad_h: int, pad_w: int, window_shape: tuple[int, int], stride: int, windows: np.ndarray) -> None:
+    def window_indices(self,pad_h: int, pad_w: int, window_shape: tuple[int, int], stride: int, windows: np.ndarray) -> List[Tuple[int, int]]:
         #   determine the i and j indices for each window
         num_windows_h = ((pad_h - window_shape[0]) / stride) + 1
         num_windows_w = ((pad_w - window_shape[1]) / stride) + 1
         indices_i = [i * stride for i in range(int(num_windows_h))]
         indices_j = [j * stride for j in range(int(num_windows_w))]
         indices = list(itertools.product(indices_i, indices_j))
-        assert len(indices) == windows.shape[0], "Indices do not match windows shape."
+        assert len(indices) == windows.shape[0] * windows.shape[1], "Indices do not match windows shape."
         del num_windows_h, num_windows_w, indices_i
         return indices
 
     def worker_process(
-    self,session: InferenceSession, window: np.ndarray, index: tuple[int, int]
-    ) -> tuple[np.ndarray, tuple[int, int]]:
+    self,session: InferenceSession, windows: np.ndarray, indices: List[tuple[int, int]]
+    ) -> tuple[np.ndarray, List[tuple[int, int]]]:
         """
         Worker process for multi-threaded ONNX inference.
 
         Args:
             session (InferenceSession): The ONNX model session.
-            window (np.ndarray): The input image window.
-            index (tuple[int, int]): The i and j indices for the window.
+            windows (np.ndarray): The batch of input image windows (N, C, H, W).
+            indices (List[tuple[int, int]]): The i and j indices for each window.
 
         Returns:
-            np.ndarray: The logits for the input window.
-            tuple[int, int]: The i and j indices for the window.
+            np.ndarray: The logits for the input windows (N, classes, H, W).
+            List[tuple[int, int]]: The i and j indices for each window.
         """
         logits = session.run(
-            [session.get_outputs()[0].name],
-            {session.get_inputs()[0].name: window[np.newaxis, ...]},
-        )[0].squeeze()
+            [self.output_name],
+            {self.input_name: windows},
+        )[0]
 
-        return logits, index
+        return logits, indices
     
     def inference(self, img: np.ndarray, rgb: bool = True) -> np.ndarray:
         """Perform inference on the provided image.
@@ -258,44 +323,38 @@ class SegmentationModelWindowONNX:
             rgb (bool): Whether to return an RGB image.
         Returns:
             np.ndarray: The segmented image."""
-        pass
-        
         w_matrix = self.GaussianWeightMatrix(self.window_shape)
 
         img, windows, h, w, pad_h, pad_w, stride = self.pre_process(img)
 
         indices = self.window_indices(pad_h, pad_w, self.window_shape, stride, windows)
+        batches = [indices[i:i + self.batch_size] for i in range(0, len(indices), self.batch_size)]
 
-        container = np.zeros([1, self.num_output_classes, pad_h, pad_w])
-        count = np.zeros([1, 1, pad_h, pad_w])
+        # gaussian weighted sum of the window logits. the argmax is unchanged by normalising
+        # by the summed weights (positive, per pixel), so no count accumulator is required.
+        container = np.zeros([self.num_output_classes, pad_h, pad_w], dtype=np.float32)
+        wh, ww = self.window_shape
+
+        def accumulate(jobs: set) -> None:
+            for job in jobs:
+                logits, batch = job.result()
+                for k, (i, j) in enumerate(batch):
+                    container[:, i : i + wh, j : j + ww] += logits[k] * w_matrix
+
+        # limit the number of batches in flight, so only a few windows are copied at a time
         with concurrent.futures.ThreadPoolExecutor(max_workers=self.num_workers) as executor:
-            jobs = {
-                executor.submit(self.worker_process, self.session, window, idx): (window, idx)
-                for (window, idx) in zip(windows, indices)
-            }
-            for job in concurrent.futures.as_completed(jobs):
-                logits, idx = job.result()
-                container[
-                    :,
-                    :,
-                    idx[0] : idx[0] + logits.shape[1],
-                    idx[1] : idx[1] + logits.shape[2],
-                ] += (
-                    logits * w_matrix
-                )
-                count[
-                    :,
-                    :,
-                    idx[0] : idx[0] + logits.shape[1],
-                    idx[1] : idx[1] + logits.shape[2],
-                ] = w_matrix
-        del w_matrix, executor, jobs, logits, idx
-
-        
-        mask = np.argmax(container / count, axis=1).squeeze()  # 2d class map
-        del container, count
-        # crop image to remove padding
-        mask = mask[:h, :w]
+            pending = set()
+            for batch in batches:
+                if len(pending) >= 2 * self.num_workers:
+                    done, pending = concurrent.futures.wait(pending, return_when=concurrent.futures.FIRST_COMPLETED)
+                    accumulate(done)
+                window_batch = np.stack([windows[i // stride, j // stride] for (i, j) in batch])
+                pending.add(executor.submit(self.worker_process, self.session, window_batch, batch))
+            accumulate(concurrent.futures.wait(pending)[0])
+        del w_matrix, executor, pending
+
+        mask = np.argmax(container[:, :h, :w], axis=0)  # 2d class map, cropped to remove padding
+        del container
 
         if rgb:
             mask = decode_segmap_v2(mask)
@@ -0,0 +1,47 @@
+"""Helpers for testing and benchmarking the segmentation models, without a trained checkpoint."""
+from typing import Optional
+
+import numpy as np
+
+
+def create_synthetic_model(path: str, window: int, num_classes: int = 4, channels: int = 16,
+                           batch_size: Optional[int] = None) -> str:
+    """Create a small fully convolutional ONNX model, with the same inputs and outputs as the windowed models.
+
+    Args:
+        path: File path to save the model to.
+        window: The window size (height and width) of the model input.
+        num_classes: The number of output classes.
+        channels: The number of hidden channels.
+        batch_size: A fixed batch size, or None for a dynamic batch size.
+
+    Returns:
+        str: File path to the model.
+    """
+    import onnx
+    from onnx import TensorProto, helper, numpy_helper
+
+    rng = np.random.default_rng(0)
+    layers = [(3, channels, 3), (channels, channels, 3), (channels, num_classes, 1)]
+    nodes, initializers = [], []
+    x = "input"
+    for n, (cin, cout, k) in enumerate(layers):
+        weight = rng.normal(scale=0.1, size=(cout, cin, k, k)).astype(np.float32)
+        initializers.append(numpy_helper.from_array(weight, name=f"w{n}"))
+        y = "output" if n == len(layers) - 1 else f"conv{n}"
+        nodes.append(helper.make_node("Conv", [x, f"w{n}"], [y], pads=[k // 2] * 4))
+        if n < len(layers) - 1:
+            nodes.append(helper.make_node("Relu", [y], [f"relu{n}"]))
+            y = f"relu{n}"
+        x = y
+
+    batch_dim = "batch_size" if batch_size is None else batch_size
+    graph = helper.make_graph(
+        nodes, "synthetic-segmentation",
+        [helper.make_tensor_value_info("input", TensorProto.FLOAT, [batch_dim, 3, window, window])],
+        [helper.make_tensor_value_info("output", TensorProto.FLOAT, [batch_dim, num_classes, window, window])],
+        initializer=initializers,
+    )
+    model = helper.make_model(graph, opset_imports=[helper.make_opsetid("", 17)], ir_version=8)
+    onnx.save(model, path)
+    return path
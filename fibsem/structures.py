@@ -840,18 +840,20 @@ class OverviewAcquisitionSettings:
         image_settings: Per-tile image settings (hfw = tile FOV, beam_type, resolution, etc.)
         nrows: Number of tile rows in the grid.
         ncols: Number of tile columns in the grid.
-        overlap: Fractional overlap between adjacent tiles (0.0 = no overlap). Not yet supported.
+        overlap: Fractional overlap between adjacent tiles (0.0 = no overlap). Overlapping tiles are registered when stitching.
+        scan_order: The tile acquisition order (raster, serpentine, spiral, shortest). See fibsem.imaging.scan_path.
     """
 
     image_settings: ImageSettings = field(default_factory=ImageSettings)
     nrows: int = 3
     ncols: int = 3
     overlap: float = 0.0
+    scan_order: str = "raster"
 
     @property
     def total_fov(self) -> float:
-        """Total field of view in meters (width = ncols * tile_hfw)."""
-        return self.ncols * self.image_settings.hfw
+        """Total field of view in meters (width = tile_hfw + (ncols - 1) * tile_hfw * (1 - overlap))."""
+        return self.image_settings.hfw * (1 + (self.ncols - 1) * (1 - self.overlap))
 
     @staticmethod
     def from_dict(d: dict) -> "OverviewAcquisitionSettings":
@@ -860,6 +862,7 @@ class OverviewAcquisitionSettings:
             nrows=d.get("nrows", 3),
             ncols=d.get("ncols", 3),
             overlap=d.get("overlap", 0.0),
+            scan_order=d.get("scan_order", "raster"),
         )
 
     def to_dict(self) -> dict:
@@ -868,6 +871,7 @@ class OverviewAcquisitionSettings:
             "nrows": self.nrows,
             "ncols": self.ncols,
             "overlap": self.overlap,
+            "scan_order": self.scan_order,
         }
 
 
@@ -1718,7 +1722,7 @@ class SystemSettings:
     manipulator: ManipulatorSystemSettings
     gis: GISSystemSettings
     info: SystemInfo
-    sim: Dict[str, Union[str, bool]] = field(default_factory=dict)
+    sim: Dict[str, Union[str, bool, float]] = field(default_factory=dict)
 
     def to_dict(self):
         return {
@@ -1978,11 +1982,17 @@ class FibsemImage:
                 path (path): path to save directory and filename
     """
 
+    # default filter parameters for filtered_data (median size, gaussian sigma)
+    FILTER_MEDIAN_SIZE: int = 3
+    FILTER_GAUSSIAN_SIGMA: float = 1
+
     def __init__(self, data: np.ndarray, metadata: Optional[FibsemImageMetadata] = None):
+        self._filter_size: int = self.FILTER_MEDIAN_SIZE
+        self._filter_sigma: float = self.FILTER_GAUSSIAN_SIGMA
         if check_data_format(data):
             if data.ndim == 3 and data.shape[2] == 1:
                 data = data[:, :, 0]
-            self.data = data  # setter also populates _filtered_data
+            self.data = data  # setter also invalidates _filtered_data
         else:
             raise Exception("Invalid Data format for Fibsem Image")
         if metadata is not None:
@@ -2009,15 +2019,36 @@ class FibsemImage:
     def data(self, value: NDArray) -> None:
         if check_data_format(value):
             self._data = value
-            self._filtered_data = self._filter_data(value)
+            self._filtered_data: Optional[NDArray] = None # computed lazily in filtered_data
         else:
             raise Exception("Invalid Data format for Fibsem Image")
 
     @property
     def filtered_data(self) -> NDArray:
-        """Returns a median filtered version of the image data. Typically used for display purposes."""
+        """Returns a median + gaussian filtered version of the image data. Typically used for display purposes.
+        The filtered data is computed on first access and cached until the data or filter parameters change.
+        Note: in-place modifications of data (e.g. image.data[...] = x) are not tracked, re-assign data instead."""
+        if self._filtered_data is None:
+            self._filtered_data = self._filter_data(self._data, size=self._filter_size, sigma=self._filter_sigma)
         return self._filtered_data
 
+    def set_filter_parameters(self, size: Optional[int] = None, sigma: Optional[float] = None) -> None:
+        """Set the filter parameters used for filtered_data. Invalidates the cached filtered data if changed.
+        Args:
+            size: median filter size (pixels). Defaults to the current value.
+            sigma: gaussian filter sigma (pixels). Defaults to the current value.
+        """
+        size = self._filter_size if size is None else int(size)
+        sigma = self._filter_sigma if sigma is None else float(sigma)
+        if (size, sigma) != (self._filter_size, self._filter_sigma):
+            self._filter_size, self._filter_sigma = size, sigma
+            self._filtered_data = None
+
+    @property
+    def filter_parameters(self) -> Tuple[int, float]:
+        """Returns the (median size, gaussian sigma) used for filtered_data."""
+        return self._filter_size, self._filter_sigma
+
     def _filter_data(self, data, size: int = 3, sigma: float = 1) -> NDArray:
         """Returns a filtered version of the image data using a median filter followed by a gaussian filter. Can be used for display or processing purposes."""
         return gaussian_filter(median_filter(data, size=size), sigma=sigma)
@@ -2046,11 +2077,12 @@ class FibsemImage:
                 # traceback.print_exc()
         return cls(data=data, metadata=metadata)
 
-    def save(self, path: Optional[Union[Path, str]] = None) -> None:
+    def save(self, path: Optional[Union[Path, str]] = None, compression: Optional[str] = None) -> None:
         """Saves a FibsemImage to a tiff file.
 
         Inputs:
             path (path): path to save directory and filename
+            compression (str): tiff compression (e.g. "zlib"), None for uncompressed
         """
         
         if path is None:
@@ -2074,6 +2106,7 @@ class FibsemImage:
             path,
             self.data,
             metadata=metadata_dict,
+            compression=compression,
         )
 
     ### EXPERIMENTAL START ####
@@ -285,6 +285,10 @@ class FibsemImageSettingsWidget(QtWidgets.QWidget):
                     self.eb_image = image
                 elif image.metadata.beam_type is BeamType.ION:
                     self.ib_image = image
+                stats = self.microscope.live_stream_stats
+                if stats is not None:
+                    self.viewer.status = (f"Live: {stats.display_fps:.1f} fps (acquired {stats.acquisition_fps:.1f} fps), "
+                                          f"latency {stats.latency * 1000:.0f} ms, dropped {stats.frames_dropped} frames")
         except Exception as e:
             logging.error(f"Error updating image layer: {e}")
 
@@ -47,6 +47,7 @@ from fibsem.applications.autolamella.structures import (
     Lamella,
 )
 from fibsem.imaging import tiled
+from fibsem.imaging.pyramid import get_pyramid_path, open_pyramid
 from fibsem.microscope import FibsemMicroscope
 from fibsem.milling import FibsemMillingStage
 from fibsem.structures import (
@@ -590,6 +591,8 @@ class FibsemMinimapWidget(QWidget):
                 overlap=overview_settings.overlap,
                 cryo=image_settings.autogamma,
                 parent_ui=self,
+                scan_order=overview_settings.scan_order,
+                save_pyramid=True,
             )
         except Exception as e:
             # TODO: specify the error, user cancelled, or error in acquisition
@@ -705,19 +708,29 @@ class FibsemMinimapWidget(QWidget):
         """Update the viewer with the image and positions."""
         if image is not None:
 
+            levels = None
             if not tmp:
                 self.image = image
-                arr = image.filtered_data
+                levels = self._load_overview_pyramid(image)
+                arr = levels if levels is not None else image.filtered_data
             else:
                 arr = image # np.array(image)
 
+            # switching between single / multiscale data requires a new layer
+            multiscale = levels is not None
+            if self.image_layer is not None and self.image_layer.multiscale != multiscale:
+                if self.image_layer in self.viewer.layers:
+                    self.viewer.layers.remove(self.image_layer)
+                self.image_layer = None
+
             try:
                 self.image_layer.data = arr
             except Exception as e:
                 self.image_layer = self.viewer.add_image(arr, 
                                                          name=OVERVIEW_IMAGE_LAYER_PROPERTIES["name"],
                                                          colormap=OVERVIEW_IMAGE_LAYER_PROPERTIES["colormap"],
-                                                         blending=OVERVIEW_IMAGE_LAYER_PROPERTIES["blending"])  # type: ignore
+                                                         blending=OVERVIEW_IMAGE_LAYER_PROPERTIES["blending"],
+                                                         multiscale=multiscale)  # type: ignore
 
             if tmp:
                 return # don't update the rest of the UI, we are just updating the image
@@ -744,6 +757,24 @@ class FibsemMinimapWidget(QWidget):
         update_text_overlay(self.viewer, self.microscope)
         self.set_active_layer_for_movement()
 
+    def _load_overview_pyramid(self, image: FibsemImage) -> Optional[list]:
+        """Load the lazily loaded levels of the multi-resolution store saved with the overview image (if any),
+        so the viewer only reads the visible region at the displayed resolution."""
+        try:
+            image_settings = image.metadata.image_settings
+            if image_settings.path is None or image_settings.filename is None:
+                return None
+            path = get_pyramid_path(os.path.join(image_settings.path, image_settings.filename))
+            if not os.path.exists(path):
+                return None
+            levels = open_pyramid(path)
+            if levels[0].shape != image.data.shape or len(levels) < 2:
+                return None
+            return levels
+        except Exception as e:
+            logging.warning(f"Failed to load overview pyramid: {e}")
+            return None
+
     def get_coordinate_in_microscope_coordinates(self, layer: NapariLayer, event: NapariEvent) -> Tuple[np.ndarray, Point]:
         """Validate if event position is inside image, and convert to microscope coords
         Args:
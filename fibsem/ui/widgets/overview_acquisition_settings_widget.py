@@ -1,3 +1,5 @@
+import logging
+
 from PyQt5.QtCore import Qt, pyqtSignal
 from PyQt5.QtWidgets import (
     QComboBox,
@@ -13,6 +15,7 @@ from typing import Optional
 
 from fibsem import constants
 from fibsem.config import SQUARE_RESOLUTIONS_ZIP, DEFAULT_SQUARE_RESOLUTION
+from fibsem.imaging.scan_path import SCAN_ORDERS, plan_scan
 from fibsem.structures import BeamType, ImageSettings, OverviewAcquisitionSettings
 from fibsem.ui import stylesheets
 from fibsem.ui.widgets.custom_widgets import IconToolButton, TitledPanel, WheelBlocker
@@ -34,6 +37,7 @@ class OverviewAcquisitionSettingsWidget(QWidget):
         self._setup_ui()
         self._connect_signals()
         self._update_total_fov_label()
+        self._update_scan_plan_label()
 
     # ------------------------------------------------------------------
     # UI setup
@@ -80,10 +84,37 @@ class OverviewAcquisitionSettingsWidget(QWidget):
         _tiles_layout.addWidget(self.ncols_spinbox)
         grid_layout.addWidget(_tiles_row, 1, 1, 1, 2)
 
+        # Overlap
+        grid_layout.addWidget(QLabel("Overlap"), 2, 0)
+        self.overlap_spinbox = QDoubleSpinBox()
+        self.overlap_spinbox.setRange(0, 40)
+        self.overlap_spinbox.setSingleStep(5)
+        self.overlap_spinbox.setDecimals(0)
+        self.overlap_spinbox.setSuffix(" %")
+        self.overlap_spinbox.setValue(0)
+        self.overlap_spinbox.setKeyboardTracking(False)
+        self.overlap_spinbox.setToolTip("Overlap between adjacent tiles. Overlapping tiles are registered when stitching.")
+        self.overlap_spinbox.installEventFilter(WheelBlocker(parent=self.overlap_spinbox))
+        grid_layout.addWidget(self.overlap_spinbox, 2, 1, 1, 2)
+
+        # Scan order
+        grid_layout.addWidget(QLabel("Scan Order"), 3, 0)
+        self.scan_order_combo = QComboBox()
+        for order in SCAN_ORDERS:
+            self.scan_order_combo.addItem(order.capitalize(), order)
+        self.scan_order_combo.setToolTip("The order to acquire the tiles in. Serpentine / shortest reduce stage travel.")
+        self.scan_order_combo.installEventFilter(WheelBlocker(parent=self.scan_order_combo))
+        grid_layout.addWidget(self.scan_order_combo, 3, 1, 1, 2)
+
         # Total FOV label (read-only, auto-updated)
         self._label_total_fov = QLabel("Total FOV: —")
         self._label_total_fov.setAlignment(Qt.AlignRight | Qt.AlignVCenter)  # type: ignore
-        grid_layout.addWidget(self._label_total_fov, 2, 0, 1, 3)
+        grid_layout.addWidget(self._label_total_fov, 4, 0, 1, 3)
+
+        # Scan plan estimate label (read-only, auto-updated)
+        self._label_scan_plan = QLabel("")
+        self._label_scan_plan.setAlignment(Qt.AlignRight | Qt.AlignVCenter)  # type: ignore
+        grid_layout.addWidget(self._label_scan_plan, 5, 0, 1, 3)
 
         grid_panel = TitledPanel("Overview Acquisition", content=grid_content)
         grid_panel._btn_collapse.setChecked(True)
@@ -127,10 +158,13 @@ class OverviewAcquisitionSettingsWidget(QWidget):
         self.nrows_spinbox.valueChanged.connect(self._on_changed)
         self._btn_advanced_imaging.toggled.connect(self.image_settings_widget.set_show_advanced)
         self.ncols_spinbox.valueChanged.connect(self._on_changed)
+        self.scan_order_combo.currentIndexChanged.connect(self._on_changed)
+        self.overlap_spinbox.valueChanged.connect(self._on_changed)
         self.image_settings_widget.settings_changed.connect(self._on_changed)
 
     def _on_changed(self):
         self._update_total_fov_label()
+        self._update_scan_plan_label()
         self.settings_changed.emit()
 
     # ------------------------------------------------------------------
@@ -141,13 +175,24 @@ class OverviewAcquisitionSettingsWidget(QWidget):
         tile_fov_um = self.image_settings_widget.hfw_spinbox.value()  # already in µm
         nrows = self.nrows_spinbox.value()
         ncols = self.ncols_spinbox.value()
-        total_w = ncols * tile_fov_um
-        total_h = nrows * tile_fov_um
+        step_um = tile_fov_um * (1 - self.overlap_spinbox.value() / 100)
+        total_w = tile_fov_um + (ncols - 1) * step_um
+        total_h = tile_fov_um + (nrows - 1) * step_um
         sym = constants.MICRON_SYMBOL
         self._label_total_fov.setText(
             f"Total FOV: {total_w:.0f} × {total_h:.0f} {sym}"
         )
 
+    def _update_scan_plan_label(self):
+        try:
+            plan = plan_scan(self.get_settings())
+            self._label_scan_plan.setText(
+                f"Est. travel: {plan.travel*1e3:.1f} mm, time: {plan.estimated_time/60:.1f} min"
+            )
+        except Exception as e:
+            logging.debug(f"Failed to estimate scan plan: {e}")
+            self._label_scan_plan.setText("")
+
     # ------------------------------------------------------------------
     # Public API
     # ------------------------------------------------------------------
@@ -160,7 +205,8 @@ class OverviewAcquisitionSettingsWidget(QWidget):
             image_settings=image_settings,
             nrows=self.nrows_spinbox.value(),
             ncols=self.ncols_spinbox.value(),
-            overlap=0.0,
+            overlap=self.overlap_spinbox.value() / 100,
+            scan_order=self.scan_order_combo.currentData(),
         )
 
     def update_from_settings(self, settings: OverviewAcquisitionSettings):
@@ -169,19 +215,28 @@ class OverviewAcquisitionSettingsWidget(QWidget):
         self.beam_type_combo.blockSignals(True)
         self.nrows_spinbox.blockSignals(True)
         self.ncols_spinbox.blockSignals(True)
+        self.scan_order_combo.blockSignals(True)
+        self.overlap_spinbox.blockSignals(True)
 
         idx = self.beam_type_combo.findData(settings.image_settings.beam_type)
         if idx >= 0:
             self.beam_type_combo.setCurrentIndex(idx)
         self.nrows_spinbox.setValue(settings.nrows)
         self.ncols_spinbox.setValue(settings.ncols)
+        idx = self.scan_order_combo.findData(settings.scan_order)
+        if idx >= 0:
+            self.scan_order_combo.setCurrentIndex(idx)
+        self.overlap_spinbox.setValue(settings.overlap * 100)
 
         self.beam_type_combo.blockSignals(False)
         self.nrows_spinbox.blockSignals(False)
         self.ncols_spinbox.blockSignals(False)
+        self.scan_order_combo.blockSignals(False)
+        self.overlap_spinbox.blockSignals(False)
 
         self.image_settings_widget.update_from_settings(settings.image_settings)
         self._update_total_fov_label()
+        self._update_scan_plan_label()
 
 
 # ---------------------------------------------------------------------------
@@ -17,6 +17,7 @@ from packaging import version
 from PIL import Image
 
 from fibsem import config as cfg
+from fibsem.events import configure_event_log
 from fibsem.structures import (
     BeamType,
     FibsemImage,
@@ -160,8 +161,10 @@ def make_logging_directory(path: Optional[Path] = None, name="run"):
 
 # TODO: better logs: https://www.toptal.com/python/in-depth-python-logging
 # https://stackoverflow.com/questions/61483056/save-logging-debug-and-show-only-logging-info-python
-def configure_logging(path: Path = "", log_filename="logfile", log_level=logging.DEBUG, _DEBUG: bool = False):
-    """Log to the terminal and to file simultaneously."""
+def configure_logging(path: Path = "", log_filename="logfile", log_level=logging.DEBUG, _DEBUG: bool = False,
+                      log_events: bool = True):
+    """Log to the terminal and to file simultaneously.
+    When log_events is set, structured events are also written to the event log (events.jsonl) in the same directory."""
     logfile = os.path.join(path, f"{log_filename}.log")
 
     file_handler = logging.FileHandler(logfile, encoding="utf-8")
@@ -182,6 +185,9 @@ def configure_logging(path: Path = "", log_filename="logfile", log_level=logging
     logging.getLogger("PIL").setLevel(logging.WARNING)
     logging.getLogger("napari").setLevel(logging.WARNING)
 
+    if log_events:
+        configure_event_log(os.path.dirname(os.path.abspath(logfile)))
+
     return logfile
 
 
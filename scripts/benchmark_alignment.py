@@ -0,0 +1,75 @@
+"""Benchmark the per-iteration latency of cross-correlation alignment against a fixed reference.
+
+Compares the previous behaviour (bandpass mask, rectangular mask and reference FFT rebuilt on every
+alignment, complex FFTs) with CrossCorrelationEngine (cached masks and reference spectrum, real FFTs).
+Image acquisition and alignment data saving are not included.
+
+Usage:
+    python scripts/benchmark_alignment.py --resolution 1536 1024 3072 2048 --repeats 10
+"""
+import argparse
+import time
+
+import numpy as np
+
+from fibsem.alignment import BEAM_SHIFT_ALIGNMENT_PARAMETERS, CrossCorrelationEngine, crosscorrelation_v2
+from fibsem.imaging import masks
+from fibsem.imaging import utils as image_utils
+from fibsem.structures import FibsemImage
+
+
+def _timeit(fn, repeats: int) -> float:
+    """Return the mean wall-clock time (s) of fn over repeats."""
+    t0 = time.perf_counter()
+    for _ in range(repeats):
+        fn()
+    return (time.perf_counter() - t0) / repeats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark cross-correlation alignment latency.")
+    parser.add_argument("--resolution", type=int, nargs="+", default=[1536, 1024, 3072, 2048],
+                        help="Image resolutions (width height pairs)")
+    parser.add_argument("--repeats", type=int, default=10, help="Number of alignments per measurement")
+    parser.add_argument("--workers", type=int, default=None, help="Number of FFT workers for the engine")
+    args = parser.parse_args()
+
+    if len(args.resolution) % 2:
+        parser.error("--resolution requires width height pairs")
+    resolutions = list(zip(args.resolution[::2], args.resolution[1::2]))
+
+    params = dict(BEAM_SHIFT_ALIGNMENT_PARAMETERS)
+    lp, hp, sigma = params["lowpass"], params["highpass"], params["sigma"]
+
+    for resolution in resolutions:
+        ref_image = FibsemImage.generate_blank_image(resolution=resolution, random=True)
+        new_image = FibsemImage(data=np.roll(ref_image.data, (10, -20), axis=(0, 1)), metadata=ref_image.metadata)
+
+        def align_previous():
+            ref = image_utils.normalise_image(ref_image)
+            new = image_utils.normalise_image(new_image)
+            rect_mask = masks._mask_rectangular(new.shape)
+            bandpass = masks.create_bandpass_mask(shape=ref.shape, lp=lp, hp=hp, sigma=sigma)
+            xcorr = crosscorrelation_v2(rect_mask * ref, rect_mask * new, bandpass=bandpass)
+            np.unravel_index(np.argmax(xcorr), xcorr.shape)
+
+        t0 = time.perf_counter()
+        engine = CrossCorrelationEngine(ref_image, **params, workers=args.workers)
+        t_setup = time.perf_counter() - t0
+
+        def align_engine():
+            xcorr = engine.correlate(new_image)
+            np.unravel_index(np.argmax(xcorr), xcorr.shape)
+
+        t_previous = _timeit(align_previous, args.repeats)
+        t_engine = _timeit(align_engine, args.repeats)
+
+        print(f"Resolution: {resolution[0]}x{resolution[1]}, repeats: {args.repeats}")
+        print(f"{'previous (per iteration)':<30} {t_previous*1000:10.2f} ms")
+        print(f"{'engine setup (once)':<30} {t_setup*1000:10.2f} ms")
+        print(f"{'engine (per iteration)':<30} {t_engine*1000:10.2f} ms")
+        print(f"{'speedup':<30} {t_previous/t_engine:10.2f} x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""Benchmark the per-frame cost of constructing and loading FibsemImages.
+
+Compares the previous behaviour (eager median + gaussian filtering on every data
+assignment) with the lazy, cached FibsemImage.filtered_data.
+
+Usage:
+    python scripts/benchmark_filtered_data.py --resolution 6144 4096 --repeats 5
+"""
+import argparse
+import os
+import tempfile
+import time
+
+import numpy as np
+
+from fibsem.structures import FibsemImage
+
+
+def _timeit(fn, repeats: int) -> float:
+    """Return the mean wall-clock time (s) of fn over repeats."""
+    t0 = time.perf_counter()
+    for _ in range(repeats):
+        fn()
+    return (time.perf_counter() - t0) / repeats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark FibsemImage filtered_data cost.")
+    parser.add_argument("--resolution", type=int, nargs=2, default=[6144, 4096], help="Image resolution (width height)")
+    parser.add_argument("--repeats", type=int, default=5, help="Number of repeats per measurement")
+    args = parser.parse_args()
+
+    resolution = tuple(args.resolution)
+    image = FibsemImage.generate_blank_image(resolution=resolution, random=True)
+    data = image.data
+
+    def construct_lazy():
+        FibsemImage(data=data, metadata=image.metadata)
+
+    def construct_eager():
+        img = FibsemImage(data=data, metadata=image.metadata)
+        img.filtered_data # previous behaviour: always filtered on assignment
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "benchmark.tif")
+        image.save(path)
+
+        def load_lazy():
+            FibsemImage.load(path)
+
+        def load_eager():
+            FibsemImage.load(path).filtered_data
+
+        results = {
+            "acquire (construct) eager": _timeit(construct_eager, args.repeats),
+            "acquire (construct) lazy": _timeit(construct_lazy, args.repeats),
+            "load eager": _timeit(load_eager, args.repeats),
+            "load lazy": _timeit(load_lazy, args.repeats),
+        }
+
+    print(f"Resolution: {resolution[0]}x{resolution[1]}, repeats: {args.repeats}")
+    for name, t in results.items():
+        print(f"{name:<30} {t*1000:10.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""Benchmark the CPU latency of windowed ONNX segmentation.
+
+Compares one window per session.run (previous behaviour) with batched window inference,
+and the fp32 with the int8 quantized model. If no checkpoint is provided, a small synthetic
+convolutional model is generated, which is useful to compare the overheads, but not the
+absolute latency of the production models.
+
+Usage:
+    python scripts/benchmark_onnx_segmentation.py --checkpoint autolamella-mega.onnx --repeats 3
+"""
+import argparse
+import os
+import tempfile
+import time
+
+import numpy as np
+
+from fibsem.segmentation.onnx_model import SegmentationModelWindowONNX
+from fibsem.segmentation.testing import create_synthetic_model
+
+RESOLUTIONS = [(1536, 1024), (3072, 2048)]
+
+
+def _timeit(fn, repeats: int) -> float:
+    """Return the mean wall-clock time (s) of fn over repeats (after a warm-up run)."""
+    fn()
+    t0 = time.perf_counter()
+    for _ in range(repeats):
+        fn()
+    return (time.perf_counter() - t0) / repeats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark windowed ONNX segmentation on the CPU.")
+    parser.add_argument("--checkpoint", type=str, default=None, help="ONNX model (default: synthetic model)")
+    parser.add_argument("--window", type=int, default=512, help="Window size of the synthetic model")
+    parser.add_argument("--channels", type=int, default=16, help="Hidden channels of the synthetic model")
+    parser.add_argument("--batch-size", type=int, default=4, help="Number of windows per session.run")
+    parser.add_argument("--repeats", type=int, default=3, help="Number of repeats per measurement")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        checkpoint = args.checkpoint
+        if checkpoint is None:
+            checkpoint = create_synthetic_model(os.path.join(tmp, "synthetic.onnx"), window=args.window, channels=args.channels)
+        else:
+            # the quantized model is written next to the checkpoint, keep a copy in the temporary directory
+            import shutil
+            checkpoint = shutil.copy(checkpoint, tmp)
+
+        models = {
+            "fp32, batch 1": SegmentationModelWindowONNX(checkpoint, batch_size=1),
+            f"fp32, batch {args.batch_size}": SegmentationModelWindowONNX(checkpoint, batch_size=args.batch_size),
+            f"int8, batch {args.batch_size}": SegmentationModelWindowONNX(checkpoint, batch_size=args.batch_size, quantized=True),
+        }
+
+        rng = np.random.default_rng(0)
+        print(f"Checkpoint: {os.path.basename(checkpoint)}, window: {models['fp32, batch 1'].window_shape}, "
+              f"cpus: {os.cpu_count()}, repeats: {args.repeats}")
+        for width, height in RESOLUTIONS:
+            image = rng.integers(0, 255, size=(height, width), dtype=np.uint8)
+            for name, model in models.items():
+                t = _timeit(lambda: model.inference(image, rgb=False), args.repeats)
+                print(f"{width}x{height} {name:<20} {t*1000:10.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -11,6 +11,7 @@ def main():
     parser.add_argument("--labels_path", type=str, help="Path to labels directory")
     parser.add_argument("--dataset_json_path", type=str, default=None, help="Path to save dataset json")
     parser.add_argument("--min_pixels", type=int, default=100, help="Minimum number of pixels for an object to be considered")
+    parser.add_argument("--mask_format", type=str, default="coords", choices=["coords", "rle"], help="Format of the instance masks (pixel coordinates, or run length encoded within the bbox)")
 
     args = parser.parse_args()
 
@@ -22,7 +23,8 @@ def main():
         labels_path=args.labels_path, 
         dataset_json_path=args.dataset_json_path, 
         min_pixels=args.min_pixels,
-        save=True
+        save=True,
+        mask_format=args.mask_format,
     )
 
 
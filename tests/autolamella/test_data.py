@@ -0,0 +1,93 @@
+import os
+
+import pandas as pd
+
+from fibsem.applications.autolamella.tools.data import (
+    LOGFILE_CACHE_FILENAME,
+    _logfile_cache_key,
+    _parse_task_records,
+    _read_logfile_cache,
+    _write_logfile_cache,
+    decode_msg,
+    iter_log_records,
+)
+
+KEYS = ("log_status_message", "save_ml", "milling_task")
+
+
+def _write_logfile(path, n: int = 50) -> str:
+    fname = os.path.join(path, "logfile.log")
+    with open(fname, "w", encoding="utf-8") as f:
+        for i in range(n):
+            ts = f"2025-01-01 10:{i // 60:02d}:{i % 60:02d},123"
+            status = {"msg": "status", "lamella": f"lamella-{i % 3}", "lamella_id": str(i % 3),
+                      "task_name": "Mill Rough", "task_id": str(i), "task_type": "MILL_ROUGH", "task_step": "STARTED"}
+            milling = {"msg": "milling_task", "milling_task_name": "Rough", "duration": (i, 1.5), "stage": None}
+            f.write(f"{ts} — root — DEBUG — log_status_message:377 — {status}\n")
+            f.write(f"{ts} — root — INFO — acquire_image:498 — acquiring new ELECTRON image.\n")
+            f.write(f"{ts} — root — DEBUG — run:290 — {milling}\n")
+            f.write(f"{ts} — root — INFO — move_stage:10 — {{'msg': 'a — b', 'done': True}}\n")
+    return fname
+
+
+def test_decode_msg():
+    assert decode_msg("{'a': None, 'b': (1, 2), 'c': True, 'd': \"it's\"}") == {"a": None, "b": (1, 2), "c": True, "d": "it's"}
+    assert decode_msg('{"a": null, "b": [1, 2]}') == {"a": None, "b": [1, 2]}
+
+
+def test_iter_log_records(tmp_path):
+
+    fname = _write_logfile(tmp_path)
+    records = list(iter_log_records(fname, keys=KEYS))
+    assert len(records) == 100  # only the status and milling lines are decoded
+    assert records[0][1] == "log_status_message:377"
+    assert records[1][2]["duration"] == (0, 1.5)
+
+    # parsing in parallel chunks gives the same records, in order
+    assert list(iter_log_records(fname, keys=KEYS, n_workers=2, chunk_size=1024)) == records
+
+    dfs = _parse_task_records(records)
+    assert len(dfs["tasks"]) == 50
+    assert len(dfs["milling"]) == 50
+    assert list(dfs["milling"]["task_id"]) == [str(i) for i in range(50)]
+
+
+def test_logfile_cache(tmp_path):
+
+    fname = _write_logfile(tmp_path)
+    dfs = _parse_task_records(iter_log_records(fname, keys=KEYS))
+    _write_logfile_cache(fname, _logfile_cache_key(fname, "utf-8"), dfs)
+
+    cached = _read_logfile_cache(fname, "utf-8")
+    assert cached is not None
+    for name, df in dfs.items():
+        pd.testing.assert_frame_equal(cached[name], df, check_dtype=False, check_index_type=False,
+                                      check_column_type=False)
+
+    # the cache is keyed by the encoding
+    assert _read_logfile_cache(fname, "cp1252") is None
+
+    # the cache is not unpickled (e.g. a cache copied from another machine)
+    with open(os.path.join(tmp_path, LOGFILE_CACHE_FILENAME), "wb") as f:
+        f.write(b"cos\nsystem\n(S'echo unsafe'\ntR.")
+    assert _read_logfile_cache(fname, "utf-8") is None
+
+
+def test_detection_is_correct(tmp_path):
+
+    fname = os.path.join(tmp_path, "logfile.log")
+    with open(fname, "w", encoding="utf-8") as f:
+        status = {"msg": "status", "lamella": "lamella-0", "lamella_id": "0",
+                  "task_name": "Mill Rough", "task_id": "0", "task_type": "MILL_ROUGH", "task_step": "ALIGN"}
+        f.write(f"2025-01-01 10:00:00,123 — root — DEBUG — log_status_message:377 — {status}\n")
+        for i, is_correct in enumerate([True, False, True]):
+            det = {"msg": "detection", "feature": "LamellaCentre", "is_correct": is_correct, "beam_type": "ION"}
+            f.write(f"2025-01-01 10:00:0{i + 1},123 — root — DEBUG — save_ml:88 — {det}\n")
+
+    # is_correct is decoded as a bool, not the "True"/"False" strings of the old parser
+    df_det = _parse_task_records(iter_log_records(fname, keys=KEYS))["detection"]
+    assert df_det["is_correct"].tolist() == [True, False, True]
+    assert int(df_det["is_correct"].astype(bool).sum()) == 2
+    df_group = df_det.pivot_table(index="feature", columns="is_correct", values="lamella", aggfunc="count")
+    assert df_group.loc["LamellaCentre", True] == 2
+    assert df_group.loc["LamellaCentre", False] == 1
@@ -0,0 +1,100 @@
+import json
+import os
+
+from fibsem.applications.autolamella.journal import (
+    CACHE_FILENAME,
+    JOURNAL_FILENAME,
+    ExperimentJournal,
+    get_experiment_journal,
+)
+from fibsem.applications.autolamella.structures import Experiment, Lamella
+
+
+def _create_experiment(tmp_path, n: int = 5) -> Experiment:
+    experiment = Experiment(path=tmp_path, name="test-journal")
+    os.makedirs(experiment.path, exist_ok=True)
+    for i in range(n):
+        experiment.positions.append(Lamella(path=os.path.join(experiment.path, f"lamella-{i}"),
+                                            number=i, petname=f"lamella-{i}"))
+    return experiment
+
+
+def _load(experiment: Experiment) -> Experiment:
+    return Experiment.load(os.path.join(experiment.path, "experiment.yaml"))
+
+
+def test_experiment_journal_save_and_load(tmp_path):
+
+    experiment = _create_experiment(tmp_path)
+    journal = get_experiment_journal(experiment.path)
+    experiment.save()       # first save writes a snapshot
+    assert journal.save(experiment) == 0
+
+    # only the changed lamella (and the header) are appended
+    experiment.positions[1].task_state.name = "Mill Rough"
+    assert journal.save(experiment) == 1
+    experiment.positions.pop(3)
+    experiment.metadata["user"] = "test"
+    assert journal.save(experiment) == 1
+
+    loaded = _load(experiment)
+    assert [p.name for p in loaded.positions] == [p.name for p in experiment.positions]
+    assert loaded.positions[1].task_state.name == "Mill Rough"
+    assert loaded.metadata["user"] == "test"
+
+    # an incomplete trailing record (e.g. crash during write) is ignored
+    with open(os.path.join(experiment.path, JOURNAL_FILENAME), "a") as f:
+        f.write('{"op": "lamella", "id": ')
+    assert _load(experiment).positions[1].task_state.name == "Mill Rough"
+
+    # compaction writes a new snapshot and resets the journal
+    experiment.save(compact=True)
+    with open(os.path.join(experiment.path, JOURNAL_FILENAME)) as f:
+        assert [json.loads(line)["op"] for line in f] == ["start"]
+    assert _load(experiment).positions[1].task_state.name == "Mill Rough"
+
+
+def test_experiment_journal_compaction(tmp_path):
+
+    experiment = _create_experiment(tmp_path, n=2)
+    journal = ExperimentJournal(experiment.path, compact_every=3)
+    journal.save(experiment)
+    for i in range(4):
+        experiment.positions[0].task_state.name = f"task-{i}"
+        journal.save(experiment)
+    assert journal._n_records == 0  # compacted on the 4th change
+    assert _load(experiment).positions[0].task_state.name == "task-3"
+
+    # a journal from a previous snapshot is not replayed
+    with open(os.path.join(experiment.path, JOURNAL_FILENAME)) as f:
+        stale = f.read()
+    experiment.positions[0].task_state.name = "final"
+    journal.compact(experiment)
+    with open(os.path.join(experiment.path, JOURNAL_FILENAME), "w") as f:
+        f.write(stale)
+    assert _load(experiment).positions[0].task_state.name == "final"
+
+
+def test_experiment_load_lazy_and_cached(tmp_path):
+
+    experiment = _create_experiment(tmp_path, n=3)
+    experiment.save(compact=True)
+    path = os.path.join(experiment.path, "experiment.yaml")
+
+    # the first load writes the cache, the second load reads it
+    Experiment.load(path, setup_logging=False)
+    assert os.path.exists(os.path.join(experiment.path, CACHE_FILENAME))
+    loaded = Experiment.load(path, lazy=True, setup_logging=False)
+    assert [p.name for p in loaded.positions] == [p.name for p in experiment.positions]
+
+    # task config is loaded on first access
+    lamella = loaded.positions[0]
+    assert not lamella.is_hydrated
+    assert lamella.task_config.keys() == experiment.positions[0].task_config.keys()
+    assert lamella.is_hydrated
+    assert lamella.to_dict() == experiment.positions[0].to_dict()
+
+    # compaction invalidates the cache
+    experiment.positions[0].task_state.name = "Mill Rough"
+    experiment.save(compact=True)
+    assert Experiment.load(path, lazy=True, setup_logging=False).positions[0].task_state.name == "Mill Rough"
@@ -0,0 +1,83 @@
+from fibsem.applications.autolamella.structures import (
+    AutoLamellaTaskDescription,
+    AutoLamellaTaskProtocol,
+    AutoLamellaWorkflowConfig,
+    Experiment,
+    Lamella,
+)
+from fibsem.applications.autolamella.workflows.tasks import (
+    MillRoughTaskConfig,
+    TaskQueue,
+    TravelAwareSchedulingPolicy,
+    get_scheduling_policy,
+)
+from fibsem.applications.autolamella.workflows.tasks.scheduler import build_profiles
+from fibsem.microscopes._stage import SampleGrid
+from fibsem.milling.base import FibsemMillingStage
+from fibsem.milling.tasks import FibsemMillingTaskConfig
+from fibsem.structures import FibsemMillingSettings, FibsemStagePosition, MicroscopeState
+
+TASK_NAMES = ["Mill Rough", "Mill Polishing"]
+
+
+def _create_experiment(tmp_path) -> Experiment:
+    experiment = Experiment(path=tmp_path, name="test-scheduler")
+    experiment.task_protocol = AutoLamellaTaskProtocol(
+        workflow_config=AutoLamellaWorkflowConfig(tasks=[
+            AutoLamellaTaskDescription(name="Mill Rough", supervise=False, required=True),
+            AutoLamellaTaskDescription(name="Mill Polishing", supervise=False, required=True, requires=["Mill Rough"]),
+        ]))
+
+    # lamellas alternate between two grids, 4 mm apart
+    for i in range(4):
+        x = 0.0 if i % 2 == 0 else 4e-3
+        position = FibsemStagePosition(x=x + i * 10e-6, y=0, z=0, r=0, t=0)
+        task_config = {}
+        for task_name, current in zip(TASK_NAMES, [2e-9, 60e-12]):
+            stage = FibsemMillingStage(milling=FibsemMillingSettings(milling_current=current))
+            config = MillRoughTaskConfig(task_name=task_name, milling={"mill": FibsemMillingTaskConfig(stages=[stage])})
+            task_config[task_name] = config
+        lamella = Lamella(path=str(tmp_path / f"lamella-{i}"), number=i, petname=f"lamella-{i}",
+                          task_config=task_config, poses={"MILLING": MicroscopeState(stage_position=position)})
+        experiment.positions.append(lamella)
+    return experiment
+
+
+def test_travel_aware_scheduler(tmp_path):
+
+    experiment = _create_experiment(tmp_path)
+    grids = {
+        "Grid-01": SampleGrid(name="Grid-01", index=1, position=FibsemStagePosition(x=0, y=0, z=0, r=0, t=0), radius=1e-3),
+        "Grid-02": SampleGrid(name="Grid-02", index=2, position=FibsemStagePosition(x=4e-3, y=0, z=0, r=0, t=0), radius=1e-3),
+    }
+    queue = TaskQueue()
+    items = queue.build_from_matrix(TASK_NAMES, [p.name for p in experiment.positions])
+
+    profiles = build_profiles(items, experiment, grids)
+    assert [p.grid for p in profiles[:4]] == ["Grid-01", "Grid-02", "Grid-01", "Grid-02"]
+    assert profiles[-1].requires == ["Mill Rough"]
+
+    # requirements are respected: rough milling always before polishing for each lamella
+    policy = TravelAwareSchedulingPolicy()
+    order = [(i.lamella_name, i.task_name) for i in policy.schedule(items, experiment, grids=grids)]
+    assert sorted(order) == sorted((i.lamella_name, i.task_name) for i in items)
+    for lamella in experiment.positions:
+        assert order.index((lamella.name, "Mill Rough")) < order.index((lamella.name, "Mill Polishing"))
+
+    report = policy.dry_run(items, experiment, grids=grids)
+    assert report.default.n_grid_changes == 7
+    assert report.scheduled.n_grid_changes == 1
+    assert report.time_saved > 0
+
+    # batch by task keeps the task-major order, only the lamellas within each task are reordered
+    policy = get_scheduling_policy("travel", batch_by_task=True)
+    scheduled = policy.schedule(items, experiment, grids=grids)
+    assert [i.task_name for i in scheduled] == [i.task_name for i in items]
+    report = policy.dry_run(items, experiment, grids=grids)
+    assert report.scheduled.n_grid_changes == 2
+    assert report.scheduled.n_current_changes == 1
+    assert report.time_saved > 0
+
+    # the default policy does not change the order
+    report = get_scheduling_policy("default").dry_run(items, experiment, grids=grids)
+    assert report.time_saved == 0
@@ -0,0 +1,16 @@
+import pytest
+
+from fibsem import alignment
+from fibsem import config as cfg
+
+
+@pytest.fixture(autouse=True)
+def alignment_data_path(tmp_path, monkeypatch):
+    """Write alignment data to a temporary directory, rather than into the package log directory."""
+    path = tmp_path / "crosscorrelation"
+    path.mkdir()
+    monkeypatch.setattr(cfg, "DATA_CC_PATH", str(path))
+    writer = alignment.AlignmentDataWriter()
+    monkeypatch.setattr(alignment, "_ALIGNMENT_DATA_WRITER", writer)
+    yield path
+    writer.close(timeout=30)
@@ -11,7 +11,7 @@ def test_mill_stages_with_acquisitions(tmp_path: Path) -> None:
     Smoke test to ensure images are being acquired and saved correctly.
     """
     # setup a microscope session
-    microscope, settings = utils.setup_session(manufacturer="Demo")
+    microscope, settings = utils.setup_session(session_path=tmp_path, manufacturer="Demo")
 
     milling_stage = FibsemMillingStage(name="test-stage")
     milling_stage.milling.acquire_images = True
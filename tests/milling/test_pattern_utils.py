@@ -17,6 +17,12 @@ from fibsem.milling.patterning.utils import (
     bbox_to_normalized_coords,
     normalized_coords_to_bbox,
 )
+from fibsem.milling.patterning.raster import (
+    clear_raster_cache,
+    find_overlaps,
+    rasterise_patterns,
+    rasterise_shape,
+)
 
 
 class TestBoundingBoxFunctions:
@@ -246,6 +252,51 @@ class TestPatternMask:
             assert mask.shape == (height, width)
 
 
+class TestPatternRaster:
+    """Test the bbox-local pattern rasteriser."""
+
+    def test_rasterise_shape_cached(self):
+        """Test rasterised shapes are cached and read-only."""
+        clear_raster_cache()
+        shape = FibsemCircleSettings(radius=5e-6, depth=1e-6, centre_x=2e-6, centre_y=-1e-6, thickness=1e-6)
+        r1 = rasterise_shape(shape, (256, 384), pixelsize=50e-9)
+        r2 = rasterise_shape(shape, (256, 384), pixelsize=50e-9)
+        assert r1 is r2
+        assert not r1[1].flags.writeable
+
+        # changing the settings rasterises the shape again
+        shape.radius = 4e-6
+        assert rasterise_shape(shape, (256, 384), pixelsize=50e-9) is not r1
+
+    def test_rasterise_shape_clipped_at_edge(self):
+        """Test shapes clipped at the left / top image edge are placed at the correct position."""
+        image_shape = (100, 100)
+        shape = FibsemRectangleSettings(width=20e-9, height=20e-9, centre_x=-45e-9, centre_y=45e-9,
+                                        depth=1e-6, rotation=0)
+        window, mask = rasterise_shape(shape, image_shape, pixelsize=1e-9)
+        full = np.zeros(image_shape, dtype=bool)
+        full[window] = mask
+
+        # rectangle is centred at (5, 5), and extends 10 px in each direction
+        ys, xs = np.where(full)
+        assert (ys.min(), ys.max(), xs.min(), xs.max()) == (0, 14, 0, 14)
+
+    def test_find_overlaps(self):
+        """Test overlaps are only reported for intersecting masks."""
+        image_shape = (128, 128)
+        pixelsize = 1e-9
+        patterns = [
+            RectanglePattern(width=40e-9, height=40e-9, point=Point(x=-20e-9, y=0)),
+            RectanglePattern(width=40e-9, height=40e-9, point=Point(x=10e-9, y=0)),
+            RectanglePattern(width=10e-9, height=10e-9, point=Point(x=0, y=50e-9)),
+        ]
+        masks = rasterise_patterns(patterns, image_shape, pixelsize)
+        overlaps = find_overlaps(masks)
+
+        assert list(overlaps.keys()) == [(0, 1)]
+        np.testing.assert_array_equal(overlaps[(0, 1)], masks[0] & masks[1])
+
+
 class TestUtilityFunctionIntegration:
     """Test integration between utility functions."""
     
@@ -7,10 +7,10 @@ from fibsem.structures import (
     FibsemRectangle,
 )
 
-def test_reduced_area_acquisition():
+def test_reduced_area_acquisition(tmp_path):
     """Test the reduced area acquisition functionality of the acquire module."""
     # setup a demo microscope session
-    microscope, settings = utils.setup_session(manufacturer="Demo")
+    microscope, settings = utils.setup_session(session_path=tmp_path, manufacturer="Demo")
 
     resolution = settings.image.resolution
 
@@ -5,9 +5,9 @@ from fibsem.structures import MicroscopeSettings, BeamType, ImageSettings, Fibse
 from fibsem.microscope import FibsemMicroscope
 
 @pytest.fixture
-def demo_microscope() -> tuple[FibsemMicroscope, MicroscopeSettings]:
+def demo_microscope(tmp_path) -> tuple[FibsemMicroscope, MicroscopeSettings]:
     """Fixture that provides a demo microscope and settings for testing."""
-    microscope, settings = utils.setup_session(manufacturer="Demo")
+    microscope, settings = utils.setup_session(session_path=tmp_path, manufacturer="Demo")
     return microscope, settings
 
 
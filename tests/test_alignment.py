@@ -3,9 +3,9 @@ from fibsem import utils, acquire, alignment
 import random
 import numpy as np
 
-def test_align_from_crosscorrelation():
+def test_align_from_crosscorrelation(tmp_path):
     
-    microscope, settings = utils.setup_session(debug=False)
+    microscope, settings = utils.setup_session(session_path=tmp_path, debug=False)
 
     # create random images
     ref_image = acquire.acquire_image(microscope, settings.image)
@@ -38,4 +38,121 @@ def test_align_from_crosscorrelation():
 
     pixel_size = ref_image.metadata.pixel_size.x
     assert np.isclose(dx, offset*pixel_size, atol=pixel_size), f"dx: {dx}, offset: {offset*pixel_size}"
-    assert np.isclose(dy, offset*pixel_size, atol=pixel_size), f"dy: {dy}, offset: {offset*pixel_size}"
\ No newline at end of file
+    assert np.isclose(dy, offset*pixel_size, atol=pixel_size), f"dy: {dy}, offset: {offset*pixel_size}"
+
+@pytest.mark.parametrize("shape", [(128, 192), (101, 150)])
+def test_crosscorrelation_engine_matches_crosscorrelation_v2(shape):
+    from fibsem.imaging import masks
+    from fibsem.imaging import utils as image_utils
+    from fibsem.structures import FibsemImage
+
+    rng = np.random.default_rng(0)
+    ref_image = FibsemImage(data=rng.integers(0, 255, size=shape, dtype=np.uint8))
+    new_image = FibsemImage(data=np.roll(ref_image.data, (5, -7), axis=(0, 1)))
+
+    engine = alignment.CrossCorrelationEngine(ref_image, lowpass=50, highpass=4, sigma=5, use_rect_mask=True)
+    xcorr = engine.correlate(new_image)
+
+    rect_mask = masks._mask_rectangular(shape)
+    bandpass = masks.create_bandpass_mask(shape=shape, lp=50, hp=4, sigma=5)
+    expected = alignment.crosscorrelation_v2(rect_mask * image_utils.normalise_image(ref_image),
+                                             rect_mask * image_utils.normalise_image(new_image),
+                                             bandpass=bandpass)
+    np.testing.assert_allclose(xcorr, expected, atol=1e-3 * np.abs(expected).max())
+    assert np.argmax(xcorr) == np.argmax(expected)
+
+    # the engine is reused for the same reference image and parameters only
+    assert engine.matches(ref_image, lowpass=50, highpass=4, sigma=5, use_rect_mask=True)
+    assert not engine.matches(ref_image, lowpass=50, highpass=4, sigma=5, use_rect_mask=False)
+    assert not engine.matches(new_image, lowpass=50, highpass=4, sigma=5, use_rect_mask=True)
+
+
+def test_shift_from_crosscorrelation_subpixel():
+    from scipy import ndimage
+    from fibsem.structures import FibsemImage
+
+    rng = np.random.default_rng(1)
+    texture = ndimage.gaussian_filter(rng.normal(size=(256, 384)), sigma=3)
+    texture = (texture - texture.min()) / (texture.max() - texture.min()) * 255
+    ref_image = FibsemImage.generate_blank_image(resolution=(384, 256))
+    ref_image.data = texture.astype(np.uint8)
+
+    shift = (3.3, -5.6) # (y, x) pixels
+    shifted = np.fft.ifft2(ndimage.fourier_shift(np.fft.fft2(texture), shift)).real
+    new_image = FibsemImage(data=np.clip(shifted, 0, 255).astype(np.uint8), metadata=ref_image.metadata)
+
+    dx, dy, xcorr, confidence = alignment.shift_from_crosscorrelation(
+        ref_image, new_image, lowpass=128, highpass=2, sigma=3, use_rect_mask=True, return_confidence=True
+    )
+    pixel_size = ref_image.metadata.pixel_size.x
+    assert np.isclose(dx / pixel_size, shift[1], atol=0.25), dx / pixel_size
+    assert np.isclose(dy / pixel_size, shift[0], atol=0.25), dy / pixel_size
+
+    # an unrelated image has a much lower confidence
+    noise_image = FibsemImage(data=rng.integers(0, 255, size=texture.shape, dtype=np.uint8), metadata=ref_image.metadata)
+    _, _, _, noise_confidence = alignment.shift_from_crosscorrelation(
+        ref_image, noise_image, lowpass=128, highpass=2, sigma=3, use_rect_mask=True, return_confidence=True
+    )
+    assert confidence > 2 * noise_confidence
+
+
+@pytest.mark.parametrize("shape", [(101, 151), (128, 192)])
+def test_shift_from_crosscorrelation_zero_shift(shape):
+    from scipy import ndimage
+    from fibsem.structures import FibsemImage
+
+    rng = np.random.default_rng(2)
+    texture = ndimage.gaussian_filter(rng.normal(size=shape), sigma=3)
+    texture = (texture - texture.min()) / (texture.max() - texture.min()) * 255
+    ref_image = FibsemImage.generate_blank_image(resolution=(shape[1], shape[0]))
+    ref_image.data = texture.astype(np.uint8)
+    new_image = FibsemImage(data=ref_image.data.copy(), metadata=ref_image.metadata)
+
+    # identical images have zero shift, also for odd-sized correlation maps
+    dx, dy, _ = alignment.shift_from_crosscorrelation(
+        ref_image, new_image, lowpass=128, highpass=2, sigma=3, use_rect_mask=True, subpixel=True
+    )
+    pixel_size = ref_image.metadata.pixel_size.x
+    assert np.isclose(dx / pixel_size, 0, atol=0.05), dx / pixel_size
+    assert np.isclose(dy / pixel_size, 0, atol=0.05), dy / pixel_size
+
+
+def test_refine_peak_subpixel():
+    y, x = np.mgrid[0:21, 0:21]
+    xcorr = -((y - 10.3) ** 2) - (x - 8.75) ** 2
+    peak = np.unravel_index(np.argmax(xcorr), xcorr.shape)
+    assert np.allclose(alignment.refine_peak_subpixel(xcorr, peak), (10.3, 8.75))
+
+    # peaks on the border are not refined
+    assert alignment.refine_peak_subpixel(xcorr, (0, 20)) == (0.0, 20.0)
+
+
+def test_alignment_data_writer(tmp_path, monkeypatch):
+    import pandas as pd
+    from fibsem import config as cfg
+    from fibsem.structures import FibsemImage
+
+    monkeypatch.setattr(cfg, "DATA_CC_PATH", str(tmp_path))
+    writer = alignment.AlignmentDataWriter(max_queue_size=16, sample_every=2, failure_confidence=5.0)
+    monkeypatch.setattr(alignment, "_ALIGNMENT_DATA_WRITER", writer)
+
+    image = FibsemImage.generate_blank_image(resolution=(64, 64), random=True)
+    xcorr = np.zeros((64, 64), dtype=np.float32)
+    queued = []
+    for i, confidence in enumerate([10.0, 10.0, 10.0, 1.0]):
+        queued.append(alignment._save_alignment_data(ref_image=image, new_image=image, bandpass=xcorr, xcorr=xcorr,
+                                                     dx=float(i), dy=0.0, confidence=confidence))
+    assert writer.flush(timeout=30)
+    writer.close()
+
+    # every 2nd alignment is saved, failures are always saved
+    assert queued == [True, False, True, True]
+    metrics = writer.metrics
+    assert metrics["written"] == 3 and metrics["sampled_out"] == 1 and metrics["dropped"] == 0
+    assert metrics["queue_depth"] == 0
+
+    df = pd.read_csv(tmp_path / "data.csv")
+    assert list(df["dx"]) == [0.0, 2.0, 3.0]
+    assert len(list(tmp_path.glob("*_xcorr.tif"))) == 3
+    loaded = FibsemImage.load(str(tmp_path / f"{df['timestamp'][0]}_new.tif"))
+    np.testing.assert_array_equal(loaded.data, image.data)
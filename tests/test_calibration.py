@@ -0,0 +1,45 @@
+import numpy as np
+import pytest
+from scipy import ndimage
+
+from fibsem import calibration, utils
+from fibsem.structures import BeamType
+
+
+def test_focus_metrics():
+    """Test the focus metrics are higher for a sharper image."""
+    rng = np.random.default_rng(0)
+    sharp = rng.integers(0, 255, size=(256, 384)).astype(np.uint8)
+    blurred = ndimage.gaussian_filter(sharp, sigma=2)
+
+    for name in ["laplacian_variance", "brenner", "fft_high_frequency_energy"]:
+        metric_fn = calibration.FOCUS_METRICS[name]
+        assert metric_fn(sharp) > metric_fn(blurred), name
+
+
+def test_adaptive_auto_focus(tmp_path, monkeypatch):
+    """Test the adaptive auto focus finds the peak of the metric curve with fewer images than a fine sweep."""
+    monkeypatch.setenv("FIBSEM_SIM_SPEED_UP", "inf")
+    microscope, settings = utils.setup_session(session_path=tmp_path, manufacturer="Demo")
+
+    best_wd = 4.03e-3
+    def metric_fn(image, **kwargs):
+        wd = image.metadata.microscope_state.electron_beam.working_distance
+        return float(np.exp(-((wd - best_wd) / 50e-6) ** 2))
+
+    microscope.set("working_distance", 4.0e-3, BeamType.ELECTRON)
+    result = calibration.adaptive_auto_focus(microscope, BeamType.ELECTRON, metric_fn=metric_fn,
+                                             search_range=0.25e-3, fit="gaussian")
+
+    assert result.fitted
+    assert result.working_distance == pytest.approx(best_wd, abs=1e-6)
+    assert microscope.get("working_distance", BeamType.ELECTRON) == pytest.approx(result.working_distance)
+    assert result.initial_working_distance == pytest.approx(4.0e-3)
+    assert len(result.metrics) == result.n_images <= 9
+
+
+def test_fit_peak():
+    wds = np.linspace(-1, 1, 5)
+    assert calibration._fit_peak(wds, -(wds - 0.2) ** 2) == pytest.approx(0.2)
+    assert calibration._fit_peak(wds, wds ** 2) is None     # no maximum
+    assert calibration._fit_peak(wds[:2], wds[:2]) is None  # not enough points
@@ -0,0 +1,46 @@
+import numpy as np
+import pytest
+
+from fibsem.correlation import util
+
+
+@pytest.mark.parametrize("method", ["linear", "cubic"])
+@pytest.mark.parametrize("separable", [True, False])
+def test_multi_channel_interpolation(method, separable, tmp_path):
+    """Test the chunked multi-channel interpolation matches interpolating each channel with ndimage.zoom."""
+    rng = np.random.default_rng(0)
+    image = (rng.random((2, 12, 70, 50)) * 60000).astype(np.uint16)
+
+    expected = np.array([util.interpolate_z_stack(channel, 200e-9, 80e-9, method=method) for channel in image])
+    interpolated = util.multi_channel_interpolation(image, 200e-9, 80e-9, method=method,
+                                                    separable=separable, chunk_size=16)
+
+    assert interpolated.shape == expected.shape
+    assert interpolated.dtype == image.dtype
+    assert np.abs(interpolated.astype(int) - expected.astype(int)).max() <= 1   # float32 rounding
+
+    # memory-mapped output
+    output_path = tmp_path / "interpolated.npy"
+    interpolated_mm = util.multi_channel_interpolation(image, 200e-9, 80e-9, method=method,
+                                                       separable=separable, output_path=str(output_path))
+    np.testing.assert_array_equal(np.load(output_path), interpolated_mm)
+
+
+def test_multi_channel_interpolation_progress():
+    """Test the progress is reported for each chunk."""
+    class ProgressSignal:
+        def __init__(self):
+            self.updates = []
+        def emit(self, update):
+            self.updates.append(update)
+
+    class ParentUI:
+        progress_update = ProgressSignal()
+
+    image = np.zeros((3, 4, 10, 8), dtype=np.float32)
+    ui = ParentUI()
+    util.multi_channel_interpolation(image, 2, 1, parent_ui=ui, chunk_size=5)
+
+    updates = ui.progress_update.updates
+    assert updates[0] == {"value": 0, "max": 6}
+    assert updates[-1] == {"value": 6, "max": 6}
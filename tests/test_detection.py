@@ -0,0 +1,142 @@
+import numpy as np
+import pytest
+
+from fibsem.detection.detection import (
+    decode_rle,
+    encode_rle,
+    get_instance_mask,
+    get_keypoints,
+    get_objects,
+    load_json,
+    save_json,
+)
+
+
+def test_get_objects():
+    """Test objects are extracted per class and instance, with bbox-local masks."""
+    mask = np.zeros((64, 96), dtype=np.uint8)
+    mask[10:20, 10:30] = 1      # class 1, instance 1
+    mask[40:50, 60:90] = 1      # class 1, instance 2
+    mask[5:15, 50:60] = 2       # class 2, instance 1
+    mask[20:22, 70:72] = 2      # class 2, instance 2 (too small)
+    mask[30:40, 0:10] = 3       # ignored class
+
+    objects = get_objects(mask, min_pixels=10)
+    assert [(obj["class"], obj["instance"]) for obj in objects] == [(1, 1), (1, 2), (2, 1)]
+
+    obj = objects[0]
+    assert obj["bbox"] == [(10, 10), (20, 30)]
+    assert len(obj["mask"]) == 200
+    assert np.allclose(obj["keypoints"]["centre"], (19.5, 14.5))
+    assert obj["keypoints"]["top_left"] == (10, 10)
+    assert obj["keypoints"]["bottom_right"] == (29, 19)
+
+    # keypoints match the full image keypoints
+    kmask = (mask[:32] == 1).astype(np.uint8)
+    for key, value in get_keypoints(kmask).items():
+        assert np.allclose(value, obj["keypoints"][key])
+
+    # compact masks
+    rle_objects = get_objects(mask, min_pixels=10, mask_format="rle")
+    bbox_objects = get_objects(mask, min_pixels=10, mask_format="bbox")
+    for obj, rle_obj, bbox_obj in zip(objects, rle_objects, bbox_objects):
+        crop = decode_rle(rle_obj["mask"])
+        assert np.array_equal(crop, bbox_obj["mask"])
+        assert np.array_equal(np.argwhere(crop) + obj["bbox"][0], obj["mask"])
+
+
+def test_get_instance_mask(tmp_path):
+    """Test the full image instance mask is the same for each mask format, also after saving to json."""
+    mask = np.zeros((64, 96), dtype=np.uint8)
+    mask[10:20, 10:30] = 1
+    mask[40:50, 60:90] = 1
+    mask[5:15, 50:60] = 2
+    expected = [(mask == 1) & (np.arange(64)[:, None] < 32),
+                (mask == 1) & (np.arange(64)[:, None] >= 32),
+                mask == 2]
+
+    for mask_format in ["coords", "rle", "bbox"]:
+        objects = get_objects(mask, min_pixels=10, mask_format=mask_format)
+        save_json(objects, tmp_path / "data.json")
+        loaded = load_json(tmp_path / "data.json")
+        for obj, loaded_obj, expected_mask in zip(objects, loaded, expected):
+            assert loaded_obj["mask_format"] == mask_format
+            assert np.array_equal(get_instance_mask(obj, mask.shape), expected_mask)
+            assert np.array_equal(get_instance_mask(loaded_obj, mask.shape), expected_mask)
+
+    # objects without a mask format are pixel coordinates (e.g. older data.json files)
+    obj = get_objects(mask, min_pixels=10)[0]
+    del obj["mask_format"]
+    assert np.array_equal(get_instance_mask(obj, mask.shape), expected[0])
+
+
+def test_plot_instance_masks_rle(tmp_path):
+    """Test the instance mask plots decode run length encoded masks."""
+    pytest.importorskip("fibsem.segmentation.utils")   # requires the segmentation dependencies
+    import matplotlib
+    matplotlib.use("Agg")
+    from fibsem.detection.detection import plot_instance_masks, plot_instance_masks_grid
+
+    mask = np.zeros((64, 96), dtype=np.uint8)
+    mask[10:20, 10:30] = 1
+    mask[5:15, 50:60] = 2
+    save_json(get_objects(mask, min_pixels=10, mask_format="rle"), tmp_path / "data.json")
+    objects = load_json(tmp_path / "data.json")
+
+    image = np.zeros_like(mask)
+    plot_instance_masks(image, mask, objects, show=False)
+    plot_instance_masks_grid(image, mask, objects, show=False)
+
+
+def test_rle_roundtrip():
+    rng = np.random.default_rng(0)
+    for shape in [(1, 1), (5, 7), (32, 48)]:
+        mask = rng.random(shape) > 0.5
+        assert np.array_equal(decode_rle(encode_rle(mask)), mask)
+    assert encode_rle(np.ones((2, 2), dtype=bool))["counts"] == [0, 4]
+
+
+class _ThresholdModel:
+    """Segment the bright pixels as lamella (class 1), with batch inference."""
+    checkpoint = "threshold"
+    num_classes = 3
+    supports_batch_inference = True
+
+    def __init__(self):
+        self.batch_sizes = []
+
+    def inference(self, img: np.ndarray, rgb: bool = False) -> np.ndarray:
+        batch = img if img.ndim == 3 else img[np.newaxis]
+        self.batch_sizes.append(len(batch))
+        return (batch > 128).astype(np.int64)
+
+
+def test_detect_features_batch():
+    """Test batch detection gives the same detections as detecting each image, in order."""
+    pytest.importorskip("fibsem.segmentation.utils")   # requires the segmentation dependencies
+    from fibsem.detection.detection import LamellaCentre, LamellaLeftEdge, detect_features, detect_features_batch
+    from fibsem.structures import FibsemImage, Point
+
+    images = []
+    for i in range(5):
+        image = np.zeros((128, 192), dtype=np.uint8)
+        image[40:80, 20 + 10 * i:100 + 10 * i] = 255
+        images.append(FibsemImage.generate_blank_image(resolution=(192, 128), pixel_size=Point(10e-9, 10e-9)))
+        images[-1].data = image
+    features = [LamellaCentre(), LamellaLeftEdge()]
+
+    expected = [detect_features(image, _ThresholdModel(), features=features) for image in images]
+
+    for num_workers in [0, 1]:
+        model = _ThresholdModel()
+        dets = list(detect_features_batch(iter(images), model, features=features, batch_size=2, num_workers=num_workers))
+        assert model.batch_sizes == [2, 2, 1]
+        assert len(dets) == len(expected)
+        for det, exp in zip(dets, expected):
+            assert [f.name for f in det.features] == [f.name for f in exp.features]
+            for f, e in zip(det.features, exp.features):
+                assert (f.px.x, f.px.y) == (e.px.x, e.px.y)
+                assert (f.feature_m.x, f.feature_m.y) == (e.feature_m.x, e.feature_m.y)
+            assert np.array_equal(det.mask, exp.mask)
+            assert np.array_equal(det.rgb, exp.rgb)
+            assert det.pixelsize == exp.pixelsize == 10e-9
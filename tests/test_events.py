@@ -0,0 +1,44 @@
+import glob
+import os
+
+from fibsem import utils
+from fibsem.events import (
+    EVENT_LOG_FILENAME,
+    configure_event_log,
+    log_event,
+    read_events,
+    stop_event_log,
+)
+from fibsem.structures import BeamType, FibsemStagePosition
+
+
+def test_event_log_microscope_events(tmp_path, monkeypatch):
+    monkeypatch.setenv("FIBSEM_SIM_SPEED_UP", "inf")
+    microscope, settings = utils.setup_session(session_path=str(tmp_path / "session"), manufacturer="Demo")
+
+    configure_event_log(str(tmp_path))
+    microscope.acquire_image(beam_type=BeamType.ELECTRON)
+    microscope.move_stage_relative(FibsemStagePosition(x=10e-6, y=0))
+    microscope.set("beam_current", 1e-9, BeamType.ION)
+    stop_event_log()
+
+    events = list(read_events(str(tmp_path)))
+    assert [e["event"] for e in events] == ["acquire_image", "move_stage_relative", "set"]
+    assert events[0]["beam_type"] == "ELECTRON"
+    assert events[0]["duration"] >= 0
+    assert events[1]["position"]["x"] == 10e-6
+    assert list(read_events(str(tmp_path), event="set"))[0]["value"] == 1e-9
+
+
+def test_event_log_rollover(tmp_path):
+    configure_event_log(str(tmp_path), max_bytes=1024)
+    for i in range(100):
+        log_event("test", idx=i, point=(i, i))
+    stop_event_log()
+
+    assert len(glob.glob(os.path.join(tmp_path, f"{EVENT_LOG_FILENAME}.*.gz"))) > 1
+    assert [e["idx"] for e in read_events(str(tmp_path))] == list(range(100))
+
+    # no events are written once the event log is stopped
+    log_event("test", idx=100)
+    assert len(list(read_events(str(tmp_path)))) == 100
@@ -0,0 +1,70 @@
+import threading
+import time
+
+import numpy as np
+
+from fibsem import utils
+from fibsem.live import LiveFramePipeline
+from fibsem.structures import BeamType, FibsemImage
+
+
+def _wait_for(condition, timeout: float = 5.0) -> bool:
+    t0 = time.time()
+    while time.time() - t0 < timeout:
+        if condition():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+def test_live_pipeline_latest_frame_wins():
+    """Test a slow consumer doesn't block submitting frames, and the latest frame is emitted."""
+    release = threading.Event()
+    emitted = []
+
+    def slow_emit(image):
+        emitted.append(image)
+        release.wait(timeout=5)
+
+    pipeline = LiveFramePipeline(emit=slow_emit, maxsize=2)
+    images = [FibsemImage(data=np.full((4, 4), i, dtype=np.uint8)) for i in range(10)]
+
+    # first frame is picked up by the consumer, which then blocks
+    pipeline.submit(images[0])
+    assert _wait_for(lambda: len(emitted) == 1)
+
+    t0 = time.time()
+    for image in images[1:]:
+        pipeline.submit(image)
+    assert time.time() - t0 < 1.0   # submitting never waits for the consumer
+
+    release.set()
+    assert _wait_for(lambda: pipeline.stats.frames_emitted == 2)
+    pipeline.stop()
+
+    assert emitted[-1] is images[-1]
+    stats = pipeline.stats
+    assert stats.frames_acquired == 10
+    assert stats.frames_emitted + stats.frames_dropped == 10
+    assert stats.latency >= 0
+
+
+def test_live_acquisition_stats(tmp_path, monkeypatch):
+    """Test the live acquisition emits frames through the pipeline and reports its counters."""
+    monkeypatch.setenv("FIBSEM_SIM_SPEED_UP", "inf")
+    microscope, settings = utils.setup_session(session_path=tmp_path, manufacturer="Demo")
+    assert microscope.live_stream_stats is None
+
+    images = []
+    microscope.sem_acquisition_signal.connect(images.append)
+    try:
+        microscope.start_acquisition(BeamType.ELECTRON)
+        assert _wait_for(lambda: len(images) >= 3)
+    finally:
+        microscope.stop_acquisition()
+        microscope.sem_acquisition_signal.disconnect(images.append)
+
+    stats = microscope.live_stream_stats
+    assert stats.frames_emitted >= 3
+    assert stats.frames_acquired >= stats.frames_emitted
+    assert stats.acquisition_fps > 0
@@ -4,10 +4,10 @@ from fibsem import utils
 from fibsem.structures import BeamType
 
 
-def test_microscope():
+def test_microscope(tmp_path):
     """Test get/set microscope functions."""
 
-    microscope, settings = utils.setup_session(manufacturer="Demo")
+    microscope, settings = utils.setup_session(session_path=tmp_path, manufacturer="Demo")
 
     hfw = 150e-6
     microscope.set_field_of_view(hfw, BeamType.ELECTRON)
@@ -15,4 +15,210 @@ def test_microscope():
 
     beam_current = 1e-9
     microscope.set_beam_current(beam_current, BeamType.ION)
-    assert microscope.get_beam_current(BeamType.ION) == beam_current
\ No newline at end of file
+    assert microscope.get_beam_current(BeamType.ION) == beam_current
+
+def test_simulator_clock(tmp_path, monkeypatch):
+    """Test the simulator clock scales simulated durations, and milling time is estimated from the patterns."""
+    import time
+    from fibsem.microscopes.simulator import SimulatorClock
+    from fibsem.structures import FibsemRectangleSettings
+
+    monkeypatch.setenv("FIBSEM_SIM_SPEED_UP", "inf")
+    microscope, settings = utils.setup_session(session_path=tmp_path, manufacturer="Demo")
+    assert microscope.clock.instant
+
+    # instant mode: the simulated time advances without sleeping
+    t0, sim_t0 = time.time(), microscope.clock.time()
+    microscope.clock.sleep(100)
+    assert time.time() - t0 < 1.0
+    assert microscope.clock.time() - sim_t0 >= 100
+
+    # milling time scales with the pattern volume and current
+    microscope.set_beam_current(1e-9, BeamType.ION)
+    microscope.draw_rectangle(FibsemRectangleSettings(width=10e-6, height=5e-6, depth=1e-6, centre_x=0, centre_y=0))
+    estimated_time = microscope.estimate_milling_time()
+    microscope.draw_rectangle(FibsemRectangleSettings(width=10e-6, height=5e-6, depth=1e-6, centre_x=0, centre_y=0))
+    assert estimated_time > 0
+    assert microscope.estimate_milling_time() == pytest.approx(2 * estimated_time)
+
+    progress = []
+    microscope.milling_progress_signal.connect(lambda ddict: progress.append(ddict["progress"]))
+    t0 = time.time()
+    microscope.run_milling(milling_current=1e-9, milling_voltage=30e3)
+    assert time.time() - t0 < 5.0
+
+    # the remaining time counts down to zero, and doesn't overshoot
+    remaining = [p["remaining_time"] for p in progress]
+    assert remaining[-1] == 0
+    assert min(remaining) >= 0
+    assert remaining == sorted(remaining, reverse=True)
+
+    # the shipped configuration (and a configuration without a speed up) doesn't wait for simulated durations
+    monkeypatch.delenv("FIBSEM_SIM_SPEED_UP")
+    microscope, settings = utils.setup_session(session_path=tmp_path, manufacturer="Demo")
+    assert microscope.clock.instant
+    assert SimulatorClock.from_config({}).instant
+    assert SimulatorClock.from_config({"speed_up": 10.0}).speed_up == 10.0
+
+
+def test_simulator_image_sequence_cache(tmp_path):
+    """Test the simulator image sequence playback cache."""
+    import numpy as np
+    from skimage.transform import resize
+    from fibsem.structures import FibsemImage
+
+    for beam in ["sem", "fib"]:
+        (tmp_path / beam).mkdir()
+        for i in range(3):
+            FibsemImage.generate_blank_image(resolution=(96, 64), random=True).save(str(tmp_path / beam / f"{i}.tif"))
+
+    microscope, settings = utils.setup_session(session_path=tmp_path, manufacturer="Demo")
+    microscope.system.sim = {"sem": str(tmp_path / "sem"), "fib": str(tmp_path / "fib"), "use_cycle": True}
+    microscope._setup_image_iterators()
+    assert microscope.use_image_sequence
+
+    cache = microscope._image_sequence_cache
+    frames = [microscope._generate_next_image(BeamType.ELECTRON, output_shape=(32, 48)) for _ in range(6)]
+
+    # frames are resized from the sequence, and cycle
+    expected = resize(FibsemImage.load(str(tmp_path / "sem" / "0.tif")).data, output_shape=(32, 48),
+                      anti_aliasing=True, preserve_range=True).astype(np.uint8)
+    np.testing.assert_array_equal(frames[0], expected)
+    np.testing.assert_array_equal(frames[0], frames[3])
+    assert frames[0].flags.writeable
+
+    # only the first frame is decoded synchronously, the rest are prefetched or cached
+    assert cache.misses == 1
+    assert cache.hits == 5
+
+
+def test_microscope_state_cache(tmp_path):
+    """Test the state cache serves repeated reads, and is invalidated by set and stage motion."""
+    from fibsem.structures import FibsemStagePosition
+
+    microscope, settings = utils.setup_session(session_path=tmp_path, manufacturer="Demo")
+    microscope.state_cache_ttl = 60
+
+    calls = []
+    _get = microscope._get
+    microscope._get = lambda key, beam_type=None: calls.append(key) or _get(key, beam_type)
+
+    microscope.get_microscope_state()
+    assert len(calls) > 0
+    calls.clear()
+    state = microscope.get_microscope_state()
+    assert calls == []
+
+    # set invalidates the cached value, it is read back once from the microscope
+    microscope.set_beam_current(2e-9, BeamType.ION)
+    assert microscope.get_beam_current(BeamType.ION) == 2e-9
+    assert microscope.get_beam_current(BeamType.ION) == 2e-9
+    assert calls == ["current"]
+    calls.clear()
+
+    # the cache holds the value applied by the microscope, not the requested value
+    _set = microscope._set
+    def clipped_set(key, value, beam_type=None):
+        if key == "hfw":
+            value = min(value, 900e-6)
+        return _set(key, value, beam_type)
+    microscope._set = clipped_set
+    microscope.set("hfw", 2e-3, BeamType.ELECTRON)
+    assert microscope.get("hfw", BeamType.ELECTRON) == 900e-6
+    assert microscope.get_field_of_view(BeamType.ELECTRON) == 900e-6
+    calls.clear()
+
+    # cached values can't be modified by the caller
+    state.stage_position.x += 1
+    assert microscope.get_stage_position().x == state.stage_position.x - 1
+
+    # stage motion invalidates the cached stage position
+    position = microscope.get_stage_position()
+    new_position = microscope.move_stage_relative(FibsemStagePosition(x=10e-6, y=0))
+    assert new_position.x == pytest.approx(position.x + 10e-6)
+    assert microscope.get_stage_position().x == pytest.approx(position.x + 10e-6)
+
+    # refresh reads all values from the microscope
+    calls.clear()
+    microscope.get_microscope_state(refresh=True)
+    assert "stage_position" in calls
+
+
+def test_microscope_state_cache_auto_functions(tmp_path):
+    """Test the auto functions invalidate the cached values they change outside of set()."""
+    from fibsem.microscopes.simulator import DemoMicroscope
+
+    class DirectDemoMicroscope(DemoMicroscope):
+        # write to the microscope directly, like the auto functions of the connection
+        def auto_focus(self, beam_type, reduced_area=None):
+            system = self.electron_system if beam_type is BeamType.ELECTRON else self.ion_system
+            system.beam.working_distance += 50e-6
+
+        def autocontrast(self, beam_type, reduced_area=None):
+            system = self.electron_system if beam_type is BeamType.ELECTRON else self.ion_system
+            system.detector.brightness, system.detector.contrast = 0.25, 0.75
+
+    _, settings = utils.setup_session(session_path=tmp_path, manufacturer="Demo")
+    microscope = DirectDemoMicroscope(settings.system)
+    microscope.connect_to_microscope(ip_address="localhost", port=7520)
+    microscope.state_cache_ttl = 60
+
+    wd = microscope.get_working_distance(BeamType.ELECTRON)
+    microscope.get_detector_brightness(BeamType.ELECTRON)
+    microscope.get_detector_contrast(BeamType.ELECTRON)
+
+    microscope.auto_focus(BeamType.ELECTRON)
+    assert microscope.get_working_distance(BeamType.ELECTRON) == pytest.approx(wd + 50e-6)
+
+    microscope.autocontrast(BeamType.ELECTRON)
+    assert microscope.get_detector_brightness(BeamType.ELECTRON) == 0.25
+    assert microscope.get_detector_contrast(BeamType.ELECTRON) == 0.75
+
+
+def test_set_microscope_state_diff(tmp_path):
+    """Test only the changed values are written when restoring a microscope state."""
+    from fibsem.structures import FibsemStagePosition
+
+    microscope, settings = utils.setup_session(session_path=tmp_path, manufacturer="Demo")
+    state = microscope.get_microscope_state()
+
+    # nothing has changed
+    report = microscope.set_microscope_state(state, diff=True)
+    assert report["written"] == []
+    assert "ION.beam_current" in report["skipped"]
+    assert "stage_position" in report["skipped"]
+
+    microscope.set_beam_current(20e-9, BeamType.ION)
+    microscope.move_stage_relative(FibsemStagePosition(x=50e-6, y=0))
+    report = microscope.set_microscope_state(state, diff=True)
+    assert report["written"] == ["ION.beam_current", "stage_position"]
+    assert microscope.get_beam_current(BeamType.ION) == state.ion_beam.beam_current
+    assert microscope.get_stage_position().is_close2(state.stage_position, tol=1e-7)
+
+
+def test_simulator_image_sequence_cache_lru(tmp_path):
+    """Test the image sequence cache only keeps the most recently used arrays open."""
+    from fibsem.microscopes.simulator import ImageSequenceCache
+    from fibsem.structures import FibsemImage
+
+    filenames = []
+    for i in range(4):
+        filenames.append(str(tmp_path / f"{i}.tif"))
+        FibsemImage.generate_blank_image(resolution=(96, 64), random=True).save(filenames[-1])
+
+    cache = ImageSequenceCache(cache_dir=str(tmp_path / "cache"), max_open=2)
+    try:
+        for shape in [(32, 48), (16, 24)]:
+            for filename in filenames:
+                cache.get(filename, shape)
+        assert len(cache._arrays) == 2
+        assert list(cache._arrays) == [cache._key(filenames[2], (16, 24), "uint8"),
+                                       cache._key(filenames[3], (16, 24), "uint8")]
+
+        # evicted frames are re-opened from the decoded array on disk
+        arr = cache.get(filenames[0], (32, 48))
+        assert arr.shape == (32, 48)
+        assert len(cache._arrays) == 2
+        assert cache.misses == 9
+    finally:
+        cache.close()
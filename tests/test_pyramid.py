@@ -0,0 +1,58 @@
+import numpy as np
+import pytest
+
+from fibsem.imaging.pyramid import (
+    OverviewPyramidWriter,
+    get_pyramid_path,
+    load_pyramid_metadata,
+    open_pyramid,
+    select_level,
+)
+from fibsem.imaging.tiled import TileProcessingPipeline
+from fibsem.structures import FibsemImage
+
+
+@pytest.mark.parametrize("compression", [None, 1])
+def test_pyramid_incremental_write(tmp_path, compression):
+
+    rng = np.random.default_rng(0)
+    mosaic = rng.integers(0, 255, size=(150, 230), dtype=np.uint8)
+    path = str(tmp_path / "overview.ome.zarr")
+    writer = OverviewPyramidWriter(path, shape=mosaic.shape, chunk_size=32,
+                                   pixel_size=1e-6, compression=compression, metadata={"name": "test"})
+
+    # write overlapping tiles, in a non-raster order
+    positions = [(y, x) for y in (0, 50, 100) for x in (0, 45, 90, 135, 180)]
+    for k in rng.permutation(len(positions)):
+        y, x = positions[k]
+        writer.write(y, x, mosaic[y:y+50, x:x+50])
+
+    levels = open_pyramid(path)
+    assert [level.shape for level in levels] == [(150, 230), (75, 115), (38, 58), (19, 29)]
+    np.testing.assert_array_equal(np.asarray(levels[0]), mosaic)
+    np.testing.assert_array_equal(levels[0][10:70, 33:101], mosaic[10:70, 33:101])
+    np.testing.assert_array_equal(levels[0][5, ::3], mosaic[5, ::3])
+
+    # downsampled levels are the 2x2 mean of the previous level
+    expected = mosaic.astype(np.float64).reshape(75, 2, 115, 2).mean(axis=(1, 3))
+    np.testing.assert_allclose(np.asarray(levels[1]), np.round(expected), atol=1)
+    assert load_pyramid_metadata(path) == {"name": "test"}
+    assert select_level(levels, max_size=64) == 2
+
+
+def test_tile_processing_pipeline_pyramid(tmp_path):
+
+    tile_shape = (32, 32)
+    writer = OverviewPyramidWriter(get_pyramid_path(str(tmp_path / "overview.tif")),
+                                   shape=(64, 96), chunk_size=16)
+    pipeline = TileProcessingPipeline(mosaic_shape=(64, 96), tile_shape=tile_shape, max_workers=3, pyramid=writer)
+    for i in range(2):
+        for j in range(3):
+            image = FibsemImage.generate_blank_image(resolution=tile_shape, random=True)
+            pipeline.submit(image, i, j)
+    pipeline.wait()
+    pipeline.shutdown()
+
+    assert writer.path.endswith("overview.ome.zarr")
+    levels = open_pyramid(writer.path)
+    np.testing.assert_array_equal(np.asarray(levels[0]), pipeline.mosaic)
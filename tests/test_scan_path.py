@@ -0,0 +1,65 @@
+import numpy as np
+import pytest
+
+from fibsem.imaging import scan_path
+from fibsem.structures import ImageSettings, OverviewAcquisitionSettings
+
+
+@pytest.mark.parametrize("scan_order", scan_path.SCAN_ORDERS)
+def test_scan_order_visits_every_tile_once(scan_order):
+
+    tiles = scan_path.generate_scan_order(4, 5, scan_order=scan_order)
+    assert len(tiles) == 20
+    assert set(tiles) == {(i, j) for i in range(4) for j in range(5)}
+
+
+def test_serpentine_order():
+
+    tiles = scan_path.serpentine_order(2, 3)
+    assert tiles == [(0, 0), (0, 1), (0, 2), (1, 2), (1, 1), (1, 0)]
+
+
+def test_spiral_order_starts_at_centre():
+
+    tiles = scan_path.spiral_order(3, 3)
+    assert tiles[0] == (1, 1)
+    assert len(set(tiles)) == 9
+
+
+def test_scan_order_with_mask():
+
+    mask = scan_path.circular_grid_mask(5, 5, tile_size=100e-6, radius=150e-6)
+    assert mask[2, 2] and not mask[0, 0]
+
+    for scan_order in scan_path.SCAN_ORDERS:
+        tiles = scan_path.generate_scan_order(5, 5, scan_order=scan_order, mask=mask)
+        assert set(tiles) == set(zip(*np.nonzero(mask)))
+
+    with pytest.raises(ValueError):
+        scan_path.generate_scan_order(4, 4, mask=mask)
+
+
+def test_compare_scan_plans():
+
+    settings = OverviewAcquisitionSettings(
+        image_settings=ImageSettings(hfw=100e-6, resolution=(512, 512), dwell_time=1e-6),
+        nrows=5, ncols=5,
+    )
+    plans = scan_path.compare_scan_plans(settings)
+    assert len(plans) == len(scan_path.SCAN_ORDERS)
+    assert plans[0].estimated_time <= plans[-1].estimated_time
+
+    plans = {p.scan_order: p for p in plans}
+    raster = plans[scan_path.SCAN_ORDER_RASTER]
+    serpentine = plans[scan_path.SCAN_ORDER_SERPENTINE]
+    shortest = plans[scan_path.SCAN_ORDER_SHORTEST]
+
+    # serpentine avoids the return move on each row
+    assert serpentine.n_moves == 24
+    assert serpentine.travel < raster.travel
+    assert serpentine.estimated_time < raster.estimated_time
+    assert np.isclose(shortest.estimated_time, serpentine.estimated_time)
+
+    # scan order is serialised with the settings
+    settings.scan_order = scan_path.SCAN_ORDER_SERPENTINE
+    assert OverviewAcquisitionSettings.from_dict(settings.to_dict()).scan_order == "serpentine"
@@ -0,0 +1,134 @@
+import concurrent.futures
+import threading
+import time
+
+import numpy as np
+import pytest
+
+
+def _reference_inference(model, img: np.ndarray) -> np.ndarray:
+    """Windowed inference, one window at a time, normalised by the summed window weights."""
+    w_matrix = model.GaussianWeightMatrix(model.window_shape)
+    img, windows, h, w, pad_h, pad_w, stride = model.pre_process(img)
+    wh, ww = model.window_shape
+    container = np.zeros([model.num_output_classes, pad_h, pad_w], dtype=np.float32)
+    weights = np.zeros([1, pad_h, pad_w], dtype=np.float32)
+    for i, j in model.window_indices(pad_h, pad_w, model.window_shape, stride, windows):
+        logits = model.session.run([model.output_name], {model.input_name: windows[i // stride, j // stride][np.newaxis]})[0]
+        container[:, i:i + wh, j:j + ww] += logits[0] * w_matrix
+        weights[:, i:i + wh, j:j + ww] += w_matrix
+    assert np.min(weights[:, :h, :w]) > 0, "There are pixels not predicted."
+    return np.argmax(container[:, :h, :w] / weights[:, :h, :w], axis=0)
+
+
+def test_window_onnx_batched_inference(tmp_path):
+    """Test batched windowed inference gives the same mask as one window per run."""
+    pytest.importorskip("fibsem.segmentation.onnx_model")   # requires the segmentation dependencies
+    from fibsem.segmentation.onnx_model import SegmentationModelWindowONNX
+    from fibsem.segmentation.testing import create_synthetic_model
+
+    checkpoint = create_synthetic_model(str(tmp_path / "synthetic.onnx"), window=64, channels=8)
+    rng = np.random.default_rng(0)
+    image = rng.integers(0, 255, size=(150, 230), dtype=np.uint8)   # not a multiple of the window or stride
+
+    model = SegmentationModelWindowONNX(checkpoint, batch_size=1)
+    model_batched = SegmentationModelWindowONNX(checkpoint, batch_size=4)
+    assert model_batched.batch_size == 4
+
+    mask = model.inference(image, rgb=False)
+    assert mask.shape == image.shape
+    np.testing.assert_array_equal(model_batched.inference(image, rgb=False), mask)
+    np.testing.assert_array_equal(_reference_inference(model, image), mask)
+
+
+def test_window_onnx_fixed_batch_size(tmp_path):
+    """Test the batch size is clamped to the batch dimension of a fixed batch model."""
+    pytest.importorskip("fibsem.segmentation.onnx_model")   # requires the segmentation dependencies
+    from fibsem.segmentation.onnx_model import SegmentationModelWindowONNX
+    from fibsem.segmentation.testing import create_synthetic_model
+
+    checkpoint = create_synthetic_model(str(tmp_path / "synthetic.onnx"), window=64, channels=8, batch_size=1)
+    image = np.random.default_rng(1).integers(0, 255, size=(100, 140), dtype=np.uint8)
+
+    model = SegmentationModelWindowONNX(checkpoint, batch_size=4)
+    assert model.batch_size == 1
+    assert model.inference(image, rgb=False).shape == image.shape
+
+
+class _FakeModel:
+    """A model that records the number of concurrent inferences."""
+    def __init__(self):
+        self.active = 0
+        self.max_active = 0
+        self.n_inferences = 0
+        self._lock = threading.Lock()
+
+    def inference(self, img: np.ndarray, rgb: bool = True) -> np.ndarray:
+        with self._lock:
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        time.sleep(0.01)
+        with self._lock:
+            self.active -= 1
+            self.n_inferences += 1
+        return np.zeros(img.shape[-2:], dtype=np.int64)
+
+
+@pytest.fixture
+def fake_model_loader(monkeypatch):
+    model_module = pytest.importorskip("fibsem.segmentation.model")   # requires the segmentation dependencies
+    loaded = []
+
+    def _load_model(checkpoint, encoder, nc, _fix_numeric_scaling, backend):
+        time.sleep(0.05)    # slow load, so concurrent requests overlap
+        loaded.append(checkpoint)
+        return _FakeModel()
+
+    model_module.clear_model_cache()
+    monkeypatch.setattr(model_module, "_load_model", _load_model)
+    yield model_module, loaded
+    model_module.clear_model_cache()
+
+
+def test_model_registry_loads_once(fake_model_loader):
+    """Test concurrent requests for the same model load it once, and use_cache bypasses the registry."""
+    model_module, loaded = fake_model_loader
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=8) as executor:
+        models = list(executor.map(lambda _: model_module.load_model("fake.pt", backend="smp"), range(8)))
+    assert loaded == ["fake.pt"]
+    assert all(model is models[0] for model in models)
+    assert model_module.load_model("fake.pt", backend="smp") is models[0]
+
+    # use_cache loads a new (unshared) model, and doesn't update the registry
+    model = model_module.load_model("fake.pt", backend="smp", use_cache=False)
+    assert model is not models[0]
+    assert loaded == ["fake.pt", "fake.pt"]
+    assert model_module.load_model("fake.pt", backend="smp") is models[0]
+    assert len(model_module.get_model_timings()) == 1
+
+
+def test_model_registry_warm_up(fake_model_loader):
+    """Test warm up records the first inference time, and doesn't run concurrently with other inference."""
+    model_module, loaded = fake_model_loader
+
+    model = model_module.load_model("fake.pt", backend="smp")
+    timings = model_module.get_model_timings()
+    assert timings[0].load_time > 0
+    assert timings[0].first_inference_time is None
+
+    # the background warm up shares the model with inference from the tasks
+    thread = model_module.warm_up_models(["fake.pt"], background=True)
+    with concurrent.futures.ThreadPoolExecutor(max_workers=4) as executor:
+        list(executor.map(lambda _: model.inference(np.zeros((8, 8), dtype=np.uint8), rgb=False), range(8)))
+    thread.join(timeout=10)
+
+    assert loaded == ["fake.pt"]
+    assert model_module.get_model_timings()[0].first_inference_time is not None
+    assert model.n_inferences == 9
+    assert model.max_active == 1
+
+    # the first inference is only timed once
+    timing = model_module.warm_up_model("fake.pt", backend="smp")
+    assert timing is model_module.get_model_timings()[0]
+    assert model.n_inferences == 9
@@ -0,0 +1,56 @@
+import numpy as np
+from scipy import ndimage
+
+from fibsem.alignment import crosscorrelation_v2
+from fibsem.imaging.stitching import stitch_tiles
+
+
+def _make_tiles(nrows: int, ncols: int, size: int, overlap: float, jitter: int, seed: int = 0):
+    """Cut jittered, overlapping tiles out of a random textured image."""
+    rng = np.random.default_rng(seed)
+    step = size - int(round(size * overlap))
+    pad = jitter + 1
+    g = ndimage.gaussian_filter(rng.random((step * nrows + size + 2 * pad, step * ncols + size + 2 * pad)), 3)
+    image = ((g - g.mean()) / g.std() * 40 + 128).clip(0, 255).astype(np.uint8)
+
+    tiles = [[None] * ncols for _ in range(nrows)]
+    positions = {}
+    for i in range(nrows):
+        for j in range(ncols):
+            ey, ex = rng.integers(-jitter, jitter + 1, 2)
+            y, x = pad + i * step + ey, pad + j * step + ex
+            tiles[i][j] = image[y:y + size, x:x + size]
+            positions[(i, j)] = (y - pad, x - pad)
+    return tiles, positions
+
+
+def test_crosscorrelation_v2_batched():
+
+    rng = np.random.default_rng(0)
+    a = ndimage.gaussian_filter(rng.random((64, 80)), 2)
+    b = np.roll(a, (3, -4), axis=(0, 1))
+
+    xcorr = crosscorrelation_v2(a, b)
+    xcorr_batch = crosscorrelation_v2(np.stack([a, a]), np.stack([b, a]))
+    assert xcorr_batch.shape == (2, 64, 80)
+    np.testing.assert_allclose(xcorr_batch[0], xcorr)
+
+
+def test_stitch_tiles_recovers_positions():
+
+    tiles, true_positions = _make_tiles(nrows=3, ncols=4, size=128, overlap=0.2, jitter=5)
+    tiles[2][3] = None # missing tile
+
+    result = stitch_tiles(tiles, overlap=0.2)
+
+    assert len(result.positions) == 11
+    assert all(p.confidence > 0.5 for p in result.pairs)
+
+    # positions are recovered up to a global offset
+    err = np.array([np.subtract(result.positions[k], true_positions[k]) for k in result.positions])
+    err -= err.mean(axis=0)
+    assert np.abs(err).max() < 1.5
+
+    step = 128 - int(round(128 * 0.2))
+    assert result.mosaic.shape == (step * 2 + 128, step * 3 + 128)
+    assert result.mosaic.dtype == np.uint8
@@ -133,3 +133,30 @@ if THERMO_API_AVAILABLE:
         assert stage_position.r == 0
         assert stage_position.t == autoscript_compustage_position.a
         assert stage_position.coordinate_system == "SPECIMEN"
+
+
+def test_fibsem_image_filtered_data_is_lazy():
+
+    image = FibsemImage.generate_blank_image(resolution=(64, 32), random=True)
+
+    # filtered data is not computed until requested
+    assert image._filtered_data is None
+    filtered = image.filtered_data
+    assert filtered.shape == image.data.shape
+    assert image.filtered_data is filtered # cached
+
+    # re-assigning data invalidates the cache
+    image.data = image.data.copy()
+    assert image._filtered_data is None
+    assert image.filtered_data is not filtered
+
+    # changing the filter parameters invalidates the cache
+    filtered = image.filtered_data
+    image.set_filter_parameters(size=5, sigma=2)
+    assert image.filter_parameters == (5, 2.0)
+    assert image.filtered_data is not filtered
+
+    # setting the same parameters keeps the cache
+    filtered = image.filtered_data
+    image.set_filter_parameters(size=5, sigma=2)
+    assert image.filtered_data is filtered
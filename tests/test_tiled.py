@@ -0,0 +1,43 @@
+import numpy as np
+
+from fibsem.imaging import autogamma
+from fibsem.imaging.tiled import TileProcessingPipeline
+from fibsem.structures import FibsemImage
+
+
+def test_tile_processing_pipeline(tmp_path):
+
+    tile_shape = (32, 32)
+    pipeline = TileProcessingPipeline(mosaic_shape=(64, 96), tile_shape=tile_shape, max_workers=2)
+
+    tiles = {}
+    for i in range(2):
+        for j in range(3):
+            image = FibsemImage.generate_blank_image(resolution=tile_shape, random=True)
+            tiles[(i, j)] = image
+            pipeline.submit(image, i, j, path=str(tmp_path / f"tile_{i}_{j}"))
+    pipeline.wait()
+    pipeline.shutdown()
+
+    assert pipeline.n_processed == 6
+    assert len(list(tmp_path.glob("tile_*.tif"))) == 6
+    for (i, j), image in tiles.items():
+        tile = pipeline.mosaic[i*32:(i+1)*32, j*32:(j+1)*32]
+        np.testing.assert_array_equal(tile, image.filtered_data)
+
+    # the accumulated histogram matches the stitched image
+    np.testing.assert_array_equal(pipeline.histogram, np.bincount(pipeline.mosaic.ravel(), minlength=256))
+    assert np.isclose(pipeline.mean(), np.mean(pipeline.mosaic))
+
+
+def test_apply_gamma_matches_auto_gamma():
+
+    image = FibsemImage.generate_blank_image(resolution=(64, 64), random=True)
+    image.data = (image.data // 4).astype(np.uint8) # dark image, gamma != 1
+
+    histogram = np.bincount(image.data.ravel(), minlength=256)
+    gamma = autogamma.calculate_gamma(autogamma.histogram_mean(histogram))
+    assert gamma != 1.0
+
+    expected = autogamma.auto_gamma(image, method="autogamma")
+    np.testing.assert_array_equal(autogamma.apply_gamma(image.data, gamma), expected.data)